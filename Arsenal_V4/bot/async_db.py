@@ -0,0 +1,233 @@
+"""
+🗄️ Arsenal V4 - Accès SQLite asynchrone pour le bot
+====================================================
+
+Les cogs n'appellent plus sqlite3 dans la boucle d'événements discord.py :
+
+- un thread écrivain par fichier de base : les écritures sont mises en file
+  et validées par groupes (une transaction, un SAVEPOINT par opération : une
+  opération en échec n'annule qu'elle-même)
+- un pool de threads lecteurs (mode WAL : les lectures ne bloquent pas
+  l'écrivain)
+- API awaitable : fetch / fetchone / fetchval / execute / executemany /
+  transaction / read
+- file bornée : au-delà de max_pending écritures en attente, l'appelant
+  attend (backpressure) au lieu de faire grossir la mémoire
+
+Une instance par fichier : get_database(path).
+"""
+
+import asyncio
+import logging
+import queue
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence
+
+logger = logging.getLogger('Arsenal_V4.db')
+
+GROUP_COMMIT_MAX = 64  # Opérations validées par transaction au plus
+
+
+class _WriteJob:
+    __slots__ = ('fn', 'future', 'loop')
+
+    def __init__(self, fn, future, loop):
+        self.fn = fn
+        self.future = future
+        self.loop = loop
+
+
+def _resolve(future: asyncio.Future, result=None, error: BaseException = None):
+    if future.cancelled():
+        return
+    if error is not None:
+        future.set_exception(error)
+    else:
+        future.set_result(result)
+
+
+class AsyncDatabase:
+    """Base SQLite accessible depuis la boucle asyncio sans la bloquer"""
+
+    def __init__(self, db_path: str, readers: int = 4, max_pending: int = 1000, busy_timeout: float = 5.0):
+        self.db_path = db_path
+        self.readers = readers
+        self.max_pending = max_pending
+        self.busy_timeout = busy_timeout
+
+        self._jobs: "queue.Queue[Optional[_WriteJob]]" = queue.Queue()
+        self._writer: Optional[threading.Thread] = None
+        self._reader_pool: Optional[ThreadPoolExecutor] = None
+        self._local = threading.local()
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._start_lock = threading.Lock()
+        self.stats = {'writes': 0, 'write_errors': 0, 'commits': 0, 'reads': 0, 'waited_for_slot': 0}
+
+    # ----- Cycle de vie -----
+
+    def _connect(self, readonly: bool = False) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=self.busy_timeout, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        if readonly:
+            conn.execute("PRAGMA query_only = ON")
+        return conn
+
+    def _ensure_started(self):
+        if self._writer is not None:
+            return
+        with self._start_lock:
+            if self._writer is not None:
+                return
+            conn = self._connect()
+            conn.execute("PRAGMA journal_mode = WAL")  # Lecteurs et écrivain en parallèle
+            conn.execute("PRAGMA synchronous = NORMAL")  # Sûr en WAL, un fsync par checkpoint
+            conn.isolation_level = None  # Transactions gérées par le thread écrivain
+            self._reader_pool = ThreadPoolExecutor(max_workers=self.readers, thread_name_prefix='arsenal-db-read')
+            self._writer = threading.Thread(target=self._write_loop, args=(conn,), name='arsenal-db-write', daemon=True)
+            self._writer.start()
+            logger.info(f"🗄️ Base asynchrone démarrée: {self.db_path} ({self.readers} lecteurs)")
+
+    async def close(self):
+        """Termine les écritures en file puis arrête les threads"""
+        if self._writer is None:
+            return
+        self._jobs.put(None)
+        await asyncio.get_running_loop().run_in_executor(None, self._writer.join)
+        self._reader_pool.shutdown(wait=True)
+        self._writer = None
+        self._reader_pool = None
+
+    # ----- Écritures -----
+
+    def _write_loop(self, conn: sqlite3.Connection):
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                break
+            jobs = [job]
+            stop = False
+            while len(jobs) < GROUP_COMMIT_MAX:
+                try:
+                    job = self._jobs.get_nowait()
+                except queue.Empty:
+                    break
+                if job is None:
+                    stop = True
+                    break
+                jobs.append(job)
+            self._run_group(conn, jobs)
+            if stop:
+                break
+        conn.close()
+
+    def _run_group(self, conn: sqlite3.Connection, jobs: List[_WriteJob]):
+        results = []
+        try:
+            try:
+                conn.execute("BEGIN IMMEDIATE")
+                for job in jobs:
+                    conn.execute("SAVEPOINT job")
+                    try:
+                        results.append((job.fn(conn), None))
+                        conn.execute("RELEASE job")
+                    except Exception as e:
+                        conn.execute("ROLLBACK TO job")
+                        conn.execute("RELEASE job")
+                        results.append((None, e))
+                conn.execute("COMMIT")
+                self.stats['commits'] += 1
+            except Exception as e:
+                # BEGIN / COMMIT / ROLLBACK TO impossible (base verrouillée trop longtemps...) : tout le groupe échoue
+                results = [(None, e)] * len(jobs)
+                if conn.in_transaction:
+                    try:
+                        conn.execute("ROLLBACK")
+                    except Exception as rollback_error:
+                        logger.error(f"❌ ROLLBACK impossible sur {self.db_path}: {rollback_error}")
+        finally:
+            # Chaque future reçoit un résultat ou une erreur, même si le groupe a échoué en route
+            if len(results) != len(jobs):
+                error = RuntimeError(f"Groupe d'écritures interrompu sur {self.db_path}")
+                results = [(None, error)] * len(jobs)
+            # Réponses envoyées après le COMMIT : un résultat reçu est durable
+            for job, (result, error) in zip(jobs, results):
+                if error is not None:
+                    self.stats['write_errors'] += 1
+                self.stats['writes'] += 1
+                try:
+                    job.loop.call_soon_threadsafe(_resolve, job.future, result, error)
+                except RuntimeError:
+                    # Boucle de l'appelant fermée : personne n'attend plus ce résultat
+                    pass
+
+    async def transaction(self, fn: Callable[[sqlite3.Connection], Any]) -> Any:
+        """Exécute fn(conn) dans le thread écrivain, atomiquement ; renvoie son résultat"""
+        self._ensure_started()
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_pending)
+        if self._slots.locked():
+            self.stats['waited_for_slot'] += 1
+        async with self._slots:
+            loop = asyncio.get_running_loop()
+            future = loop.create_future()
+            self._jobs.put(_WriteJob(fn, future, loop))
+            return await future
+
+    async def execute(self, sql: str, params: Sequence = ()) -> int:
+        """INSERT / UPDATE / DELETE -> lastrowid (INSERT) ou nombre de lignes modifiées"""
+        def run(conn):
+            cursor = conn.execute(sql, params)
+            return cursor.lastrowid if sql.lstrip()[:6].upper() == 'INSERT' else cursor.rowcount
+        return await self.transaction(run)
+
+    async def executemany(self, sql: str, seq_of_params: Iterable[Sequence]) -> int:
+        rows = list(seq_of_params)
+        return await self.transaction(lambda conn: conn.executemany(sql, rows).rowcount)
+
+    # ----- Lectures -----
+
+    def _reader(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._local.conn = self._connect(readonly=True)
+        return conn
+
+    async def read(self, fn: Callable[[sqlite3.Connection], Any]) -> Any:
+        """Exécute fn(conn) sur une connexion lecteur du pool"""
+        self._ensure_started()
+        self.stats['reads'] += 1
+        return await asyncio.get_running_loop().run_in_executor(self._reader_pool, lambda: fn(self._reader()))
+
+    async def fetch(self, sql: str, params: Sequence = ()) -> List[sqlite3.Row]:
+        return await self.read(lambda conn: conn.execute(sql, params).fetchall())
+
+    async def fetchone(self, sql: str, params: Sequence = ()) -> Optional[sqlite3.Row]:
+        def run(conn):
+            cursor = conn.execute(sql, params)
+            try:
+                return cursor.fetchone()
+            finally:
+                cursor.close()  # Sinon la lecture reste ouverte : instantané figé, checkpoint WAL bloqué
+        return await self.read(run)
+
+    async def fetchval(self, sql: str, params: Sequence = (), default: Any = None) -> Any:
+        row = await self.fetchone(sql, params)
+        return row[0] if row is not None and row[0] is not None else default
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self.stats, 'pending_writes': self._jobs.qsize(), 'db_path': self.db_path}
+
+
+_databases: Dict[str, AsyncDatabase] = {}
+_databases_lock = threading.Lock()
+
+
+def get_database(db_path: str, **options) -> AsyncDatabase:
+    """Instance unique par fichier (un seul thread écrivain par base)"""
+    with _databases_lock:
+        if db_path not in _databases:
+            _databases[db_path] = AsyncDatabase(db_path, **options)
+        return _databases[db_path]
+
@@ -27,13 +27,20 @@ import logging
 import aiohttp
 import discord
 from discord.ext import commands, tasks
-from datetime import datetime, timedelta
+from datetime import datetime
 import json
 import sqlite3
 import random
 import math
 from typing import Optional, Dict, List, Any
 
+from async_db import get_database
+
+# Modules partagés avec le bot de la racine du dépôt (ajoutée en fin de chemin : les modules locaux restent prioritaires)
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+from modules.rank_index import RankIndex
+from modules.cooldown_store import CooldownStore
+
 # Configuration logging
 logging.basicConfig(
     level=logging.INFO,
@@ -55,10 +62,12 @@ class BotConfig:
     
     # Base de données
     DATABASE_PATH = 'arsenal_v4.db'
+    COOLDOWNS_PATH = 'arsenal_v4_cooldowns.bin'
     
     # Économie
     DEFAULT_BALANCE = 100
     DAILY_REWARD = 50
+    DAILY_COOLDOWN = 86400  # 24 heures
     WORK_COOLDOWN = 3600  # 1 heure
     WORK_REWARDS = (10, 50)  # Min, Max
     
@@ -86,6 +95,19 @@ class DatabaseManager:
     def __init__(self, db_path: str):
         self.db_path = db_path
         self.init_database()
+        # Accès depuis les handlers async : écrivain + lecteurs dans des threads dédiés
+        self.aio = get_database(db_path)
+        # Classements XP / solde en mémoire, tenus à jour par get_user, update_balance et add_xp
+        self.rankings = self.load_rankings()
+    
+    def load_rankings(self) -> Dict[str, RankIndex]:
+        """Reconstruire les index de classement depuis la table users"""
+        with sqlite3.connect(self.db_path) as conn:
+            rows = conn.execute('SELECT user_id, xp, balance FROM users').fetchall()
+        return {
+            'xp': RankIndex((user_id, xp) for user_id, xp, _ in rows),
+            'balance': RankIndex((user_id, balance) for user_id, _, balance in rows)
+        }
     
     def init_database(self):
         """Initialiser la base de données avec toutes les tables"""
@@ -190,73 +212,80 @@ class DatabaseManager:
                 )
             ''')
             
+            # Table statistiques de messages (écrite par lots : ON CONFLICT sur la clé)
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS daily_stats (
+                    guild_id INTEGER,
+                    user_id INTEGER,
+                    channel_id INTEGER,
+                    date TEXT,
+                    message_count INTEGER DEFAULT 0,
+                    PRIMARY KEY (guild_id, user_id, channel_id, date)
+                )
+            ''')
+            
             conn.commit()
             logger.info("✅ Base de données initialisée avec succès")
     
-    def get_user(self, user_id: int) -> Dict[str, Any]:
+    async def get_user(self, user_id: int) -> Dict[str, Any]:
         """Récupérer ou créer un utilisateur"""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute('SELECT * FROM users WHERE user_id = ?', (user_id,))
-            user = cursor.fetchone()
-            
-            if not user:
-                cursor.execute('''
-                    INSERT INTO users (user_id, username) 
-                    VALUES (?, ?)
-                ''', (user_id, f"User_{user_id}"))
-                conn.commit()
-                return self.get_user(user_id)
-            
-            return {
-                'user_id': user[0],
-                'username': user[1],
-                'balance': user[2],
-                'xp': user[3],
-                'level': user[4],
-                'last_daily': user[5],
-                'last_work': user[6],
-                'last_xp': user[7],
-                'warnings': user[8],
-                'created_at': user[9]
-            }
-    
-    def update_balance(self, user_id: int, amount: int, description: str = ""):
+        user = await self.aio.fetchone('SELECT * FROM users WHERE user_id = ?', (user_id,))
+        
+        if not user:
+            await self.aio.execute('''
+                INSERT OR IGNORE INTO users (user_id, username) 
+                VALUES (?, ?)
+            ''', (user_id, f"User_{user_id}"))
+            user = await self.aio.fetchone('SELECT * FROM users WHERE user_id = ?', (user_id,))
+            self.rankings['xp'].update(user_id, user['xp'])
+            self.rankings['balance'].update(user_id, user['balance'])
+        
+        return dict(user)
+    
+    async def update_balance(self, user_id: int, amount: int, description: str = ""):
         """Mettre à jour le solde d'un utilisateur"""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute('''
+        def update(conn):
+            conn.execute('''
                 UPDATE users SET balance = balance + ? WHERE user_id = ?
             ''', (amount, user_id))
             
             # Log de la transaction
-            cursor.execute('''
+            conn.execute('''
                 INSERT INTO transactions (user_id, amount, type, description)
                 VALUES (?, ?, ?, ?)
             ''', (user_id, amount, 'balance_update', description))
             
-            conn.commit()
+            row = conn.execute('SELECT balance FROM users WHERE user_id = ?', (user_id,)).fetchone()
+            return row[0] if row else None
+        
+        balance = await self.aio.transaction(update)
+        if balance is not None:
+            self.rankings['balance'].update(user_id, balance)
     
-    def add_xp(self, user_id: int, xp_amount: int):
+    async def add_xp(self, user_id: int, xp_amount: int):
         """Ajouter de l'XP et vérifier les montées de niveau"""
-        user = self.get_user(user_id)
-        new_xp = user['xp'] + xp_amount
-        new_level = self.calculate_level(new_xp)
-        
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute('''
+        def update(conn):
+            # Création éventuelle dans la même transaction : pas de lecture préalable par message
+            conn.execute('INSERT OR IGNORE INTO users (user_id, username) VALUES (?, ?)',
+                         (user_id, f"User_{user_id}"))
+            # Lecture + écriture dans la même transaction : pas d'XP perdue entre deux messages
+            xp, level = conn.execute('SELECT xp, level FROM users WHERE user_id = ?', (user_id,)).fetchone()
+            new_xp = xp + xp_amount
+            new_level = self.calculate_level(new_xp)
+            conn.execute('''
                 UPDATE users SET xp = ?, level = ?, last_xp = ?
                 WHERE user_id = ?
             ''', (new_xp, new_level, datetime.now().isoformat(), user_id))
-            conn.commit()
+            return new_xp, new_level > level
         
-        return new_level > user['level']  # True si level up
+        new_xp, leveled_up = await self.aio.transaction(update)
+        self.rankings['xp'].update(user_id, new_xp)
+        return leveled_up  # True si level up
     
     @staticmethod
     def calculate_level(xp: int) -> int:
-        """Calculer le niveau basé sur l'XP"""
-        return int(math.sqrt(xp / 100)) + 1
+        """Calculer le niveau basé sur l'XP (racine entière : exacte même pour de grandes valeurs)"""
+        return math.isqrt(max(int(xp), 0) // 100) + 1
     
     @staticmethod
     def xp_for_level(level: int) -> int:
@@ -276,6 +305,9 @@ class ArsenalBot(commands.Bot):
         )
         
         self.db = DatabaseManager(BotConfig.DATABASE_PATH)
+        # Cooldowns XP / daily / work en mémoire, snapshot disque périodique
+        self.cooldowns = CooldownStore()
+        self.load_cooldowns()
         self.start_time = datetime.now()
         self.config = BotConfig()
         
@@ -287,6 +319,27 @@ class ArsenalBot(commands.Bot):
             'servers_count': 0
         }
     
+    def load_cooldowns(self):
+        """Recharger le snapshot des cooldowns ; au premier lancement, import des colonnes last_*"""
+        try:
+            if self.cooldowns.load(BotConfig.COOLDOWNS_PATH):
+                logger.info(f"⏱️ {len(self.cooldowns)} cooldowns actifs rechargés")
+                return
+        except Exception as e:
+            logger.error(f"❌ Erreur lecture snapshot cooldowns, import depuis la base: {e}")
+        
+        durations = {'xp': BotConfig.XP_COOLDOWN, 'daily': BotConfig.DAILY_COOLDOWN, 'work': BotConfig.WORK_COOLDOWN}
+        try:
+            with sqlite3.connect(self.db.db_path) as conn:
+                rows = conn.execute('SELECT user_id, last_xp, last_daily, last_work FROM users').fetchall()
+            for user_id, *last_values in rows:
+                for (scope, duration), last in zip(durations.items(), last_values):
+                    if last:
+                        self.cooldowns.set(scope, 0, user_id, datetime.fromisoformat(last).timestamp() + duration)
+            self.cooldowns.snapshot(BotConfig.COOLDOWNS_PATH)
+        except Exception as e:
+            logger.error(f"❌ Erreur import des cooldowns: {e}")
+    
     async def get_prefix(self, bot, message):
         """Préfixe dynamique par serveur"""
         if not message.guild:
@@ -306,6 +359,7 @@ class ArsenalBot(commands.Bot):
         
         # Démarrer les tâches de fond
         self.update_status.start()
+        self.save_cooldowns.start()
         
         # Synchroniser les commandes slash
         try:
@@ -334,24 +388,25 @@ class ArsenalBot(commands.Bot):
     
     async def process_xp(self, message):
         """Traiter l'attribution d'XP"""
-        user = self.db.get_user(message.author.id)
-        
-        # Vérifier le cooldown XP
-        if user['last_xp']:
-            last_xp_time = datetime.fromisoformat(user['last_xp'])
-            if (datetime.now() - last_xp_time).seconds < BotConfig.XP_COOLDOWN:
-                return
+        # Vérifier le cooldown XP en mémoire : aucune lecture en base pour les messages en cooldown
+        if self.cooldowns.try_acquire('xp', 0, message.author.id, BotConfig.XP_COOLDOWN):
+            return
         
         # Attribuer XP et ArsenalCoins
         xp_gained = random.randint(*BotConfig.XP_PER_MESSAGE)
         coins_gained = random.randint(1, 3)
         
-        level_up = self.db.add_xp(message.author.id, xp_gained)
-        self.db.update_balance(message.author.id, coins_gained, "XP Message Reward")
+        try:
+            level_up = await self.db.add_xp(message.author.id, xp_gained)
+        except Exception:
+            # Rien n'a été accordé : rendre le cooldown pour le message suivant
+            self.cooldowns.release('xp', 0, message.author.id)
+            raise
+        await self.db.update_balance(message.author.id, coins_gained, "XP Message Reward")
         
         # Notification de level up
         if level_up:
-            new_user = self.db.get_user(message.author.id)
+            new_user = await self.db.get_user(message.author.id)
             embed = discord.Embed(
                 title="🎉 Level Up !",
                 description=f"{message.author.mention} est maintenant niveau **{new_user['level']}** !",
@@ -361,7 +416,7 @@ class ArsenalBot(commands.Bot):
             embed.add_field(name="Bonus Level Up", value=f"+{new_user['level'] * 10} ArsenalCoins", inline=True)
             
             # Bonus de level up
-            self.db.update_balance(message.author.id, new_user['level'] * 10, f"Level {new_user['level']} Bonus")
+            await self.db.update_balance(message.author.id, new_user['level'] * 10, f"Level {new_user['level']} Bonus")
             
             await message.channel.send(embed=embed)
     
@@ -398,10 +453,32 @@ class ArsenalBot(commands.Bot):
         activity = discord.Game(random.choice(activities))
         await self.change_presence(activity=activity, status=discord.Status.online)
     
+    @tasks.loop(seconds=30)
+    async def save_cooldowns(self):
+        """Snapshot des cooldowns actifs s'ils ont changé (écrit hors de la boucle)"""
+        if self.cooldowns.dirty:
+            try:
+                await self.cooldowns.snapshot_async(BotConfig.COOLDOWNS_PATH)
+            except Exception as e:
+                logger.error(f"❌ Erreur sauvegarde cooldowns: {e}")
+    
     async def on_command(self, ctx):
         """Événement d'exécution de commande"""
         self.stats['commands_executed'] += 1
         logger.info(f"📝 Commande exécutée: {ctx.command} par {ctx.author} dans {ctx.guild}")
+    
+    async def close(self):
+        """Arrêt : écritures en file validées avant de quitter"""
+        await super().close()
+        self.save_cooldowns.cancel()
+        try:
+            await self.cooldowns.snapshot_async(BotConfig.COOLDOWNS_PATH)
+        except Exception as e:
+            logger.error(f"❌ Erreur sauvegarde cooldowns: {e}")
+        stats_cog = self.get_cog('StatsModule')
+        if stats_cog:
+            await stats_cog.message_counters.close()
+        await self.db.aio.close()
 
 # Initialisation du bot
 bot = ArsenalBot()
@@ -412,7 +489,7 @@ bot = ArsenalBot()
 async def balance(ctx, member: discord.Member = None):
     """Afficher le solde ArsenalCoins"""
     target = member or ctx.author
-    user = bot.db.get_user(target.id)
+    user = await bot.db.get_user(target.id)
     
     embed = discord.Embed(
         title=f"💰 Portefeuille de {target.display_name}",
@@ -446,39 +523,38 @@ async def balance(ctx, member: discord.Member = None):
 @bot.command(name='daily')
 async def daily(ctx):
     """Récompense quotidienne"""
-    user = bot.db.get_user(ctx.author.id)
-    
-    # Vérifier si déjà réclamé aujourd'hui
-    if user['last_daily']:
-        last_daily = datetime.fromisoformat(user['last_daily'])
-        if (datetime.now() - last_daily).days == 0:
-            next_daily = last_daily + timedelta(days=1)
-            time_left = next_daily - datetime.now()
-            hours, remainder = divmod(int(time_left.total_seconds()), 3600)
-            minutes, _ = divmod(remainder, 60)
-            
-            embed = discord.Embed(
-                title="⏰ Daily déjà réclamé",
-                description=f"Revenez dans **{hours}h {minutes}m**",
-                color=BotConfig.COLORS['warning']
-            )
-            return await ctx.send(embed=embed)
-    
-    # Donner la récompense
-    reward = BotConfig.DAILY_REWARD
-    bonus = user['level'] * 5  # Bonus basé sur le niveau
-    total_reward = reward + bonus
+    # Vérifier si déjà réclamé dans les dernières 24h
+    time_left = bot.cooldowns.try_acquire('daily', 0, ctx.author.id, BotConfig.DAILY_COOLDOWN)
+    if time_left:
+        hours, remainder = divmod(time_left, 3600)
+        minutes, _ = divmod(remainder, 60)
+        
+        embed = discord.Embed(
+            title="⏰ Daily déjà réclamé",
+            description=f"Revenez dans **{hours}h {minutes}m**",
+            color=BotConfig.COLORS['warning']
+        )
+        return await ctx.send(embed=embed)
     
-    bot.db.update_balance(ctx.author.id, total_reward, "Daily Reward")
+    try:
+        user = await bot.db.get_user(ctx.author.id)
+        
+        # Donner la récompense
+        reward = BotConfig.DAILY_REWARD
+        bonus = user['level'] * 5  # Bonus basé sur le niveau
+        total_reward = reward + bonus
+        
+        await bot.db.update_balance(ctx.author.id, total_reward, "Daily Reward")
+    except Exception:
+        # Récompense non versée : le daily reste disponible
+        bot.cooldowns.release('daily', 0, ctx.author.id)
+        raise
     
     # Mettre à jour la date du daily
-    with sqlite3.connect(bot.db.db_path) as conn:
-        cursor = conn.cursor()
-        cursor.execute(
-            'UPDATE users SET last_daily = ? WHERE user_id = ?',
-            (datetime.now().isoformat(), ctx.author.id)
-        )
-        conn.commit()
+    await bot.db.aio.execute(
+        'UPDATE users SET last_daily = ? WHERE user_id = ?',
+        (datetime.now().isoformat(), ctx.author.id)
+    )
     
     embed = discord.Embed(
         title="🎁 Récompense Quotidienne",
@@ -494,22 +570,23 @@ async def daily(ctx):
 @bot.command(name='work')
 async def work(ctx):
     """Travailler pour gagner des ArsenalCoins"""
-    user = bot.db.get_user(ctx.author.id)
-    
     # Vérifier le cooldown
-    if user['last_work']:
-        last_work = datetime.fromisoformat(user['last_work'])
-        cooldown_time = BotConfig.WORK_COOLDOWN
-        if (datetime.now() - last_work).seconds < cooldown_time:
-            time_left = cooldown_time - (datetime.now() - last_work).seconds
-            minutes, seconds = divmod(time_left, 60)
-            
-            embed = discord.Embed(
-                title="😴 Vous êtes fatigué",
-                description=f"Reposez-vous encore **{minutes}m {seconds}s**",
-                color=BotConfig.COLORS['warning']
-            )
-            return await ctx.send(embed=embed)
+    time_left = bot.cooldowns.try_acquire('work', 0, ctx.author.id, BotConfig.WORK_COOLDOWN)
+    if time_left:
+        minutes, seconds = divmod(time_left, 60)
+        
+        embed = discord.Embed(
+            title="😴 Vous êtes fatigué",
+            description=f"Reposez-vous encore **{minutes}m {seconds}s**",
+            color=BotConfig.COLORS['warning']
+        )
+        return await ctx.send(embed=embed)
+    
+    try:
+        user = await bot.db.get_user(ctx.author.id)
+    except Exception:
+        bot.cooldowns.release('work', 0, ctx.author.id)
+        raise
     
     # Jobs disponibles
     jobs = [
@@ -528,16 +605,18 @@ async def work(ctx):
     level_bonus = user['level'] * 2
     total_earnings = earnings + level_bonus
     
-    bot.db.update_balance(ctx.author.id, total_earnings, f"Work: {job['name']}")
+    try:
+        await bot.db.update_balance(ctx.author.id, total_earnings, f"Work: {job['name']}")
+    except Exception:
+        # Gains non versés : le travail reste disponible
+        bot.cooldowns.release('work', 0, ctx.author.id)
+        raise
     
     # Mettre à jour le timestamp de travail
-    with sqlite3.connect(bot.db.db_path) as conn:
-        cursor = conn.cursor()
-        cursor.execute(
-            'UPDATE users SET last_work = ? WHERE user_id = ?',
-            (datetime.now().isoformat(), ctx.author.id)
-        )
-        conn.commit()
+    await bot.db.aio.execute(
+        'UPDATE users SET last_work = ? WHERE user_id = ?',
+        (datetime.now().isoformat(), ctx.author.id)
+    )
     
     embed = discord.Embed(
         title=f"{job['emoji']} Travail terminé !",
@@ -0,0 +1,112 @@
+"""
+📊 Arsenal V4 - Compteurs de messages agrégés en mémoire
+========================================================
+
+StatsModule ne fait plus deux requêtes et un commit par message :
+
+- les messages sont comptés en mémoire par (serveur, membre, salon, jour)
+- toutes les flush_interval secondes (ou dès max_keys clés), les compteurs
+  sont écrits en un seul lot INSERT ... ON CONFLICT DO UPDATE
+- les lectures fusionnent les deltas non encore écrits (pending) : les
+  statistiques restent exactes
+- close() écrit ce qui reste (déchargement du cog, arrêt du bot)
+
+Les jours sont en UTC, comme DATE('now') côté SQLite.
+"""
+
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional, Tuple
+
+logger = logging.getLogger('Arsenal_V4.stats')
+
+UPSERT_SQL = '''
+    INSERT INTO daily_stats (guild_id, user_id, channel_id, date, message_count)
+    VALUES (?, ?, ?, ?, ?)
+    ON CONFLICT (guild_id, user_id, channel_id, date)
+    DO UPDATE SET message_count = message_count + excluded.message_count
+'''
+
+CounterKey = Tuple[int, int, int, str]  # (guild_id, user_id, channel_id, date)
+
+
+def utc_day(days_ago: int = 0) -> str:
+    """Jour au format de DATE('now', '-N days')"""
+    return (datetime.now(timezone.utc) - timedelta(days=days_ago)).strftime('%Y-%m-%d')
+
+
+class MessageCounterBuffer:
+    """Compteurs daily_stats en attente d'écriture groupée"""
+
+    def __init__(self, db, flush_interval: float = 10.0, max_keys: int = 5000):
+        self.db = db  # AsyncDatabase
+        self.flush_interval = flush_interval
+        self.max_keys = max_keys
+
+        self.pending: Dict[CounterKey, int] = {}
+        # Tenu pendant une écriture : une lecture ne voit jamais un lot à la fois
+        # hors de la mémoire et pas encore validé en base
+        self.lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self._flush_task: Optional[asyncio.Task] = None
+        self.stats = {'messages': 0, 'flushes': 0, 'rows_flushed': 0, 'flush_errors': 0}
+
+    # ----- Écriture -----
+
+    def add(self, guild_id: int, user_id: int, channel_id: int, count: int = 1, day: str = None):
+        """Compte un message (aucune I/O)"""
+        key = (guild_id, user_id, channel_id, day or utc_day())
+        self.pending[key] = self.pending.get(key, 0) + count
+        self.stats['messages'] += count
+
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+        if len(self.pending) >= self.max_keys and (self._flush_task is None or self._flush_task.done()):
+            self._flush_task = asyncio.get_running_loop().create_task(self.flush())
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+
+    async def flush(self) -> int:
+        """Écrit les compteurs en attente en une transaction ; renvoie le nombre de lignes"""
+        async with self.lock:
+            if not self.pending:
+                return 0
+            batch, self.pending = self.pending, {}
+            try:
+                await self.db.executemany(UPSERT_SQL, [(*key, count) for key, count in batch.items()])
+            except Exception as e:
+                # Rien n'est perdu : les deltas reviennent dans le tampon pour le prochain essai
+                for key, count in batch.items():
+                    self.pending[key] = self.pending.get(key, 0) + count
+                self.stats['flush_errors'] += 1
+                logger.error(f"❌ Écriture des compteurs de messages: {e}")
+                return 0
+            self.stats['flushes'] += 1
+            self.stats['rows_flushed'] += len(batch)
+            return len(batch)
+
+    async def close(self):
+        """Arrête l'écriture périodique et écrit ce qui reste"""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        await self.flush()
+
+    # ----- Lecture -----
+
+    def pending_count(self, guild_id: int, user_id: int = None, channel_id: int = None, since: str = None) -> int:
+        """Messages pas encore écrits en base ; à lire sous self.lock avec la requête à compléter"""
+        return sum(
+            count for (g, u, c, day), count in self.pending.items()
+            if g == guild_id
+            and (user_id is None or u == user_id)
+            and (channel_id is None or c == channel_id)
+            and (since is None or day >= since)
+        )
+
+    def get_stats(self):
+        return {**self.stats, 'pending_keys': len(self.pending)}
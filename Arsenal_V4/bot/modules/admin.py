@@ -7,7 +7,6 @@ Système d'administration complet pour la gestion du bot et du serveur
 
 import discord
 from discord.ext import commands
-import sqlite3
 import json
 import asyncio
 import os
@@ -254,27 +253,26 @@ class AdminModule(commands.Cog):
     async def db_stats(self, ctx):
         """📊 Statistiques de la base de données"""
         
-        with sqlite3.connect(self.bot.db.db_path) as conn:
-            cursor = conn.cursor()
-            
-            # Compter les enregistrements dans chaque table
+        # Compter les enregistrements dans chaque table
+        tables = [
+            'users', 'guilds', 'transactions', 'inventory', 
+            'moderation_logs', 'daily_stats', 'member_events',
+            'user_profiles'
+        ]
+        
+        def count_tables(conn):
             stats = {}
-            
-            tables = [
-                'users', 'guilds', 'transactions', 'inventory', 
-                'moderation_logs', 'daily_stats', 'member_events',
-                'user_profiles'
-            ]
-            
             for table in tables:
                 try:
-                    cursor.execute(f'SELECT COUNT(*) FROM {table}')
-                    stats[table] = cursor.fetchone()[0]
+                    stats[table] = conn.execute(f'SELECT COUNT(*) FROM {table}').fetchone()[0]
                 except:
                     stats[table] = 0
-            
-            # Taille de la base de données
-            db_size = os.path.getsize(self.bot.db.db_path) / 1024 / 1024  # MB
+            return stats
+        
+        stats = await self.bot.db.aio.read(count_tables)
+        
+        # Taille de la base de données
+        db_size = os.path.getsize(self.bot.db.db_path) / 1024 / 1024  # MB
         
         embed = discord.Embed(
             title="📊 Statistiques Base de Données",
@@ -331,31 +329,28 @@ class AdminModule(commands.Cog):
             # Nettoyer les données
             cutoff_date = datetime.now() - timedelta(days=days)
             
-            with sqlite3.connect(self.bot.db.db_path) as conn:
-                cursor = conn.cursor()
-                
+            def clean(conn):
                 # Supprimer les anciens logs de modération
-                cursor.execute('''
+                mod_deleted = conn.execute('''
                     DELETE FROM moderation_logs
                     WHERE timestamp < ?
-                ''', (cutoff_date.isoformat(),))
-                mod_deleted = cursor.rowcount
+                ''', (cutoff_date.isoformat(),)).rowcount
                 
                 # Supprimer les anciennes stats journalières
-                cursor.execute('''
+                stats_deleted = conn.execute('''
                     DELETE FROM daily_stats
                     WHERE date < DATE(?, '-{} days')
-                '''.format(days), (datetime.now().strftime('%Y-%m-%d'),))
-                stats_deleted = cursor.rowcount
+                '''.format(days), (datetime.now().strftime('%Y-%m-%d'),)).rowcount
                 
                 # Supprimer les anciens événements
-                cursor.execute('''
+                events_deleted = conn.execute('''
                     DELETE FROM member_events
                     WHERE timestamp < ?
-                ''', (cutoff_date.isoformat(),))
-                events_deleted = cursor.rowcount
+                ''', (cutoff_date.isoformat(),)).rowcount
                 
-                conn.commit()
+                return mod_deleted, stats_deleted, events_deleted
+            
+            mod_deleted, stats_deleted, events_deleted = await self.bot.db.aio.transaction(clean)
             
             embed = discord.Embed(
                 title="🧹 Nettoyage terminé",
@@ -403,35 +398,30 @@ class AdminModule(commands.Cog):
         if category not in valid_categories:
             return await ctx.send(f"❌ Catégorie invalide ! Utilisez: {', '.join(valid_categories)}")
         
-        with sqlite3.connect(self.bot.db.db_path) as conn:
-            cursor = conn.cursor()
-            
-            if category == "balance":
-                cursor.execute('''
-                    SELECT user_id, SUM(balance) as total_balance
-                    FROM users
-                    GROUP BY user_id
-                    ORDER BY total_balance DESC
-                    LIMIT 10
-                ''')
-            elif category == "level":
-                cursor.execute('''
-                    SELECT user_id, MAX(level) as max_level, MAX(xp) as max_xp
-                    FROM users
-                    GROUP BY user_id
-                    ORDER BY max_level DESC, max_xp DESC
-                    LIMIT 10
-                ''')
-            else:  # messages
-                cursor.execute('''
-                    SELECT user_id, SUM(message_count) as total_messages
-                    FROM daily_stats
-                    GROUP BY user_id
-                    ORDER BY total_messages DESC
-                    LIMIT 10
-                ''')
-            
-            results = cursor.fetchall()
+        if category == "balance":
+            results = await self.bot.db.aio.fetch('''
+                SELECT user_id, SUM(balance) as total_balance
+                FROM users
+                GROUP BY user_id
+                ORDER BY total_balance DESC
+                LIMIT 10
+            ''')
+        elif category == "level":
+            results = await self.bot.db.aio.fetch('''
+                SELECT user_id, MAX(level) as max_level, MAX(xp) as max_xp
+                FROM users
+                GROUP BY user_id
+                ORDER BY max_level DESC, max_xp DESC
+                LIMIT 10
+            ''')
+        else:  # messages
+            results = await self.bot.db.aio.fetch('''
+                SELECT user_id, SUM(message_count) as total_messages
+                FROM daily_stats
+                GROUP BY user_id
+                ORDER BY total_messages DESC
+                LIMIT 10
+            ''')
         
         if not results:
             return await ctx.send("❌ Aucune donnée trouvée !")
@@ -483,20 +473,17 @@ class AdminModule(commands.Cog):
             embed.set_thumbnail(url=user.avatar.url if user.avatar else user.default_avatar.url)
         
         # Statistiques bot
-        with sqlite3.connect(self.bot.db.db_path) as conn:
-            cursor = conn.cursor()
-            
-            # Balance totale
-            cursor.execute('SELECT SUM(balance) FROM users WHERE user_id = ?', (user_id,))
-            total_balance = cursor.fetchone()[0] or 0
-            
-            # Serveurs en commun
-            cursor.execute('SELECT COUNT(DISTINCT guild_id) FROM users WHERE user_id = ?', (user_id,))
-            shared_guilds = cursor.fetchone()[0] or 0
-            
-            # Messages totaux
-            cursor.execute('SELECT SUM(message_count) FROM daily_stats WHERE user_id = ?', (user_id,))
-            total_messages = cursor.fetchone()[0] or 0
+        # Balance totale et serveurs en commun
+        totals = await self.bot.db.aio.fetchone(
+            'SELECT SUM(balance), COUNT(DISTINCT guild_id) FROM users WHERE user_id = ?', (user_id,)
+        )
+        total_balance = totals[0] or 0
+        shared_guilds = totals[1] or 0
+        
+        # Messages totaux
+        total_messages = await self.bot.db.aio.fetchval(
+            'SELECT SUM(message_count) FROM daily_stats WHERE user_id = ?', (user_id,), default=0
+        )
         
         embed.add_field(
             name="📊 Statistiques Bot",
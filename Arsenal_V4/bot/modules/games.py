@@ -42,7 +42,7 @@ class GamesModule(commands.Cog):
             )
             return await ctx.send(embed=embed)
         
-        user = self.bot.db.get_user(ctx.author.id)
+        user = await self.bot.db.get_user(ctx.author.id)
         
         if bet <= 0:
             return await ctx.send("❌ La mise doit être positive !")
@@ -73,7 +73,7 @@ class GamesModule(commands.Cog):
             )
             return await ctx.send(embed=embed)
         
-        user = self.bot.db.get_user(ctx.author.id)
+        user = await self.bot.db.get_user(ctx.author.id)
         
         if bet <= 0 or bet > user['balance']:
             return await ctx.send("❌ Mise invalide !")
@@ -91,7 +91,7 @@ class GamesModule(commands.Cog):
         
         if won:
             winnings = int(bet * 1.8)
-            self.bot.db.update_balance(ctx.author.id, winnings - bet, f"Coinflip Win: {result}")
+            await self.bot.db.update_balance(ctx.author.id, winnings - bet, f"Coinflip Win: {result}")
             
             embed = discord.Embed(
                 title="🎉 Victoire !",
@@ -99,7 +99,7 @@ class GamesModule(commands.Cog):
                 color=0x00ff41
             )
         else:
-            self.bot.db.update_balance(ctx.author.id, -bet, f"Coinflip Loss: {result}")
+            await self.bot.db.update_balance(ctx.author.id, -bet, f"Coinflip Loss: {result}")
             
             embed = discord.Embed(
                 title="💔 Défaite !",
@@ -109,7 +109,7 @@ class GamesModule(commands.Cog):
         
         # Ajouter XP pour avoir joué
         xp_gained = random.randint(3, 8)
-        self.bot.db.add_xp(ctx.author.id, xp_gained)
+        await self.bot.db.add_xp(ctx.author.id, xp_gained)
         
         embed.add_field(name="XP Gagné", value=f"+{xp_gained} XP", inline=True)
         
@@ -120,7 +120,7 @@ class GamesModule(commands.Cog):
     async def slots(self, ctx, bet: int = 10):
         """🎰 Machine à sous Arsenal"""
         
-        user = self.bot.db.get_user(ctx.author.id)
+        user = await self.bot.db.get_user(ctx.author.id)
         
         if bet <= 0 or bet > user['balance']:
             return await ctx.send("❌ Mise invalide !")
@@ -151,7 +151,7 @@ class GamesModule(commands.Cog):
             winnings = bet * multiplier
             profit = winnings - bet
             
-            self.bot.db.update_balance(ctx.author.id, profit, f"Slots Jackpot: {reels[0]}")
+            await self.bot.db.update_balance(ctx.author.id, profit, f"Slots Jackpot: {reels[0]}")
             
             embed = discord.Embed(
                 title="🎰 JACKPOT ! 🎰",
@@ -162,7 +162,7 @@ class GamesModule(commands.Cog):
             winnings = int(bet * 1.5)
             profit = winnings - bet
             
-            self.bot.db.update_balance(ctx.author.id, profit, "Slots Pair")
+            await self.bot.db.update_balance(ctx.author.id, profit, "Slots Pair")
             
             embed = discord.Embed(
                 title="🎰 Petite victoire !",
@@ -170,7 +170,7 @@ class GamesModule(commands.Cog):
                 color=0xf39c12
             )
         else:  # Aucune combinaison
-            self.bot.db.update_balance(ctx.author.id, -bet, "Slots Loss")
+            await self.bot.db.update_balance(ctx.author.id, -bet, "Slots Loss")
             
             embed = discord.Embed(
                 title="🎰 Pas de chance...",
@@ -180,7 +180,7 @@ class GamesModule(commands.Cog):
         
         # XP pour avoir joué
         xp_gained = random.randint(2, 6)
-        self.bot.db.add_xp(ctx.author.id, xp_gained)
+        await self.bot.db.add_xp(ctx.author.id, xp_gained)
         
         embed.add_field(name="XP Gagné", value=f"+{xp_gained} XP", inline=True)
         
@@ -288,7 +288,7 @@ class RouletteView(discord.ui.View):
             winnings = self.bet * multiplier
             profit = winnings - self.bet
             
-            self.bot.db.update_balance(self.ctx.author.id, profit, f"Roulette Win: {choice}")
+            await self.bot.db.update_balance(self.ctx.author.id, profit, f"Roulette Win: {choice}")
             
             embed = discord.Embed(
                 title="🎉 Victoire !",
@@ -296,7 +296,7 @@ class RouletteView(discord.ui.View):
                 color=0x00ff41
             )
         else:
-            self.bot.db.update_balance(self.ctx.author.id, -self.bet, f"Roulette Loss: {result_color}")
+            await self.bot.db.update_balance(self.ctx.author.id, -self.bet, f"Roulette Loss: {result_color}")
             
             embed = discord.Embed(
                 title="💔 Défaite !",
@@ -306,7 +306,7 @@ class RouletteView(discord.ui.View):
         
         # XP pour avoir joué
         xp_gained = random.randint(5, 12)
-        self.bot.db.add_xp(self.ctx.author.id, xp_gained)
+        await self.bot.db.add_xp(self.ctx.author.id, xp_gained)
         
         embed.add_field(name="XP Gagné", value=f"+{xp_gained} XP", inline=True)
         
@@ -352,8 +352,8 @@ class QuizView(discord.ui.View):
                 reward = self.question_data["reward"]
                 xp_reward = random.randint(10, 20)
                 
-                self.bot.db.update_balance(self.ctx.author.id, reward, "Quiz Correct Answer")
-                self.bot.db.add_xp(self.ctx.author.id, xp_reward)
+                await self.bot.db.update_balance(self.ctx.author.id, reward, "Quiz Correct Answer")
+                await self.bot.db.add_xp(self.ctx.author.id, xp_reward)
                 
                 embed = discord.Embed(
                     title="🎉 Bonne réponse !",
@@ -364,7 +364,7 @@ class QuizView(discord.ui.View):
                 correct_answer = self.question_data["options"][self.question_data["correct"]]
                 xp_consolation = random.randint(2, 5)
                 
-                self.bot.db.add_xp(self.ctx.author.id, xp_consolation)
+                await self.bot.db.add_xp(self.ctx.author.id, xp_consolation)
                 
                 embed = discord.Embed(
                     title="❌ Mauvaise réponse !",
@@ -9,7 +9,6 @@ import discord
 from discord.ext import commands
 import asyncio
 import re
-import sqlite3
 from datetime import datetime, timedelta
 from typing import Optional, List
 
@@ -44,7 +43,7 @@ class ModerationModule(commands.Cog):
             return
         
         # Vérifier si l'auto-modération est activée
-        guild_config = self.get_guild_config(message.guild.id)
+        guild_config = await self.get_guild_config(message.guild.id)
         if not guild_config.get('auto_mod', True):
             return
         
@@ -151,7 +150,7 @@ class ModerationModule(commands.Cog):
                                  self.bot.user.id, f"Auto-mod: {', '.join(violations)}")
             
             # Vérifier si l'utilisateur doit être sanctionné
-            warnings_count = self.get_user_warnings(message.author.id, message.guild.id)
+            warnings_count = await self.get_user_warnings(message.author.id, message.guild.id)
             
             if warnings_count >= 3:
                 await self.auto_mute(message.author, message.guild, "Trop d'avertissements")
@@ -172,7 +171,7 @@ class ModerationModule(commands.Cog):
         
         # Ajouter l'avertissement
         await self.add_warning(member.id, ctx.guild.id, ctx.author.id, reason)
-        warnings_count = self.get_user_warnings(member.id, ctx.guild.id)
+        warnings_count = await self.get_user_warnings(member.id, ctx.guild.id)
         
         embed = discord.Embed(
             title="⚠️ Avertissement donné",
@@ -215,7 +214,7 @@ class ModerationModule(commands.Cog):
         
         target = member or ctx.author
         
-        warnings = self.get_user_warnings_detailed(target.id, ctx.guild.id)
+        warnings = await self.get_user_warnings_detailed(target.id, ctx.guild.id)
         
         if not warnings:
             embed = discord.Embed(
@@ -248,18 +247,15 @@ class ModerationModule(commands.Cog):
     async def clear_warnings(self, ctx, member: discord.Member):
         """🧹 Effacer tous les avertissements d'un utilisateur"""
         
-        warnings_count = self.get_user_warnings(member.id, ctx.guild.id)
+        warnings_count = await self.get_user_warnings(member.id, ctx.guild.id)
         
         if warnings_count == 0:
             return await ctx.send(f"❌ {member.display_name} n'a aucun avertissement !")
         
-        with sqlite3.connect(self.bot.db.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute('''
-                DELETE FROM moderation_logs
-                WHERE user_id = ? AND guild_id = ? AND action = 'warning'
-            ''', (member.id, ctx.guild.id))
-            conn.commit()
+        await self.bot.db.aio.execute('''
+            DELETE FROM moderation_logs
+            WHERE user_id = ? AND guild_id = ? AND action = 'warning'
+        ''', (member.id, ctx.guild.id))
         
         embed = discord.Embed(
             title="🧹 Avertissements effacés",
@@ -494,45 +490,30 @@ class ModerationModule(commands.Cog):
         """Ajouter un avertissement"""
         await self.log_moderation(user_id, guild_id, moderator_id, 'warning', reason)
     
-    def get_user_warnings(self, user_id: int, guild_id: int) -> int:
+    async def get_user_warnings(self, user_id: int, guild_id: int) -> int:
         """Compter les avertissements d'un utilisateur"""
-        with sqlite3.connect(self.bot.db.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute('''
-                SELECT COUNT(*) FROM moderation_logs
-                WHERE user_id = ? AND guild_id = ? AND action = 'warning'
-            ''', (user_id, guild_id))
-            
-            return cursor.fetchone()[0]
+        return await self.bot.db.aio.fetchval('''
+            SELECT COUNT(*) FROM moderation_logs
+            WHERE user_id = ? AND guild_id = ? AND action = 'warning'
+        ''', (user_id, guild_id), default=0)
     
-    def get_user_warnings_detailed(self, user_id: int, guild_id: int) -> List[dict]:
+    async def get_user_warnings_detailed(self, user_id: int, guild_id: int) -> List[dict]:
         """Récupérer les détails des avertissements"""
-        with sqlite3.connect(self.bot.db.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute('''
-                SELECT moderator_id, reason, timestamp
-                FROM moderation_logs
-                WHERE user_id = ? AND guild_id = ? AND action = 'warning'
-                ORDER BY timestamp DESC
-            ''', (user_id, guild_id))
-            
-            warnings = cursor.fetchall()
-            
-            return [{
-                'moderator_id': w[0],
-                'reason': w[1],
-                'timestamp': w[2]
-            } for w in warnings]
+        warnings = await self.bot.db.aio.fetch('''
+            SELECT moderator_id, reason, timestamp
+            FROM moderation_logs
+            WHERE user_id = ? AND guild_id = ? AND action = 'warning'
+            ORDER BY timestamp DESC
+        ''', (user_id, guild_id))
+        
+        return [dict(w) for w in warnings]
     
     async def log_moderation(self, user_id: int, guild_id: int, moderator_id: int, action: str, reason: str):
         """Logger une action de modération"""
-        with sqlite3.connect(self.bot.db.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute('''
-                INSERT INTO moderation_logs (guild_id, user_id, moderator_id, action, reason)
-                VALUES (?, ?, ?, ?, ?)
-            ''', (guild_id, user_id, moderator_id, action, reason))
-            conn.commit()
+        await self.bot.db.aio.execute('''
+            INSERT INTO moderation_logs (guild_id, user_id, moderator_id, action, reason)
+            VALUES (?, ?, ?, ?, ?)
+        ''', (guild_id, user_id, moderator_id, action, reason))
     
     async def auto_mute(self, member: discord.Member, guild: discord.Guild, reason: str):
         """Mute automatique"""
@@ -546,25 +527,21 @@ class ModerationModule(commands.Cog):
         except Exception as e:
             print(f"Erreur auto_mute: {e}")
     
-    def get_guild_config(self, guild_id: int) -> dict:
+    async def get_guild_config(self, guild_id: int) -> dict:
         """Récupérer la configuration du serveur"""
-        with sqlite3.connect(self.bot.db.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute('''
-                SELECT auto_mod, welcome_channel, logs_channel
-                FROM guilds WHERE guild_id = ?
-            ''', (guild_id,))
-            
-            result = cursor.fetchone()
-            
-            if result:
-                return {
-                    'auto_mod': bool(result[0]),
-                    'welcome_channel': result[1],
-                    'logs_channel': result[2]
-                }
-            
-            return {'auto_mod': True, 'welcome_channel': None, 'logs_channel': None}
+        result = await self.bot.db.aio.fetchone('''
+            SELECT auto_mod, welcome_channel, logs_channel
+            FROM guilds WHERE guild_id = ?
+        ''', (guild_id,))
+        
+        if result:
+            return {
+                'auto_mod': bool(result[0]),
+                'welcome_channel': result[1],
+                'logs_channel': result[2]
+            }
+        
+        return {'auto_mod': True, 'welcome_channel': None, 'logs_channel': None}
 
 def setup(bot):
     bot.add_cog(ModerationModule(bot))
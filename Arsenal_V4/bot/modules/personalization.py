@@ -7,7 +7,6 @@ Système de personnalisation complet avec profils, avatars, et badges
 
 import discord
 from discord.ext import commands
-import sqlite3
 import json
 import asyncio
 from typing import Optional, List, Dict
@@ -74,7 +73,7 @@ class PersonalizationModule(commands.Cog):
         """👤 Voir le profil d'un utilisateur"""
         
         target = member or ctx.author
-        profile_data = self.get_user_profile(target.id, ctx.guild.id)
+        profile_data = await self.get_user_profile(target.id, ctx.guild.id)
         
         # Créer la carte de profil
         profile_card = await self.create_profile_card(target, profile_data, ctx.guild)
@@ -94,7 +93,7 @@ class PersonalizationModule(commands.Cog):
             embed.add_field(name="📝 Bio", value=profile_data['bio'], inline=False)
         
         # Badges
-        user_badges = self.get_user_badges(target.id, ctx.guild.id)
+        user_badges = await self.get_user_badges(target.id, ctx.guild.id)
         if user_badges:
             badge_text = " ".join([self.badges[badge]['emoji'] for badge in user_badges if badge in self.badges])
             embed.add_field(name="🏆 Badges", value=badge_text, inline=False)
@@ -108,7 +107,7 @@ class PersonalizationModule(commands.Cog):
         if len(bio) > 200:
             return await ctx.send("❌ La biographie ne peut pas dépasser 200 caractères !")
         
-        self.update_user_profile(ctx.author.id, ctx.guild.id, {'bio': bio})
+        await self.update_user_profile(ctx.author.id, ctx.guild.id, {'bio': bio})
         
         embed = discord.Embed(
             title="✅ Biographie mise à jour",
@@ -127,7 +126,7 @@ class PersonalizationModule(commands.Cog):
             return await ctx.send(f"❌ Couleur invalide ! Disponibles: {available_colors}")
         
         color_value = self.colors[color.lower()]
-        self.update_user_profile(ctx.author.id, ctx.guild.id, {'color': color_value})
+        await self.update_user_profile(ctx.author.id, ctx.guild.id, {'color': color_value})
         
         embed = discord.Embed(
             title="✅ Couleur changée",
@@ -145,7 +144,7 @@ class PersonalizationModule(commands.Cog):
             available_themes = ", ".join(self.themes.keys())
             return await ctx.send(f"❌ Thème invalide ! Disponibles: {available_themes}")
         
-        self.update_user_profile(ctx.author.id, ctx.guild.id, {'theme': theme.lower()})
+        await self.update_user_profile(ctx.author.id, ctx.guild.id, {'theme': theme.lower()})
         
         embed = discord.Embed(
             title="✅ Thème changé",
@@ -178,7 +177,7 @@ class PersonalizationModule(commands.Cog):
                         return await ctx.send("❌ Impossible de télécharger l'image !")
                     
                     if resp.headers.get('content-type', '').startswith('image/'):
-                        self.update_user_profile(ctx.author.id, ctx.guild.id, {'background': url})
+                        await self.update_user_profile(ctx.author.id, ctx.guild.id, {'background': url})
                         
                         embed = discord.Embed(
                             title="✅ Fond d'écran mis à jour",
@@ -199,7 +198,7 @@ class PersonalizationModule(commands.Cog):
         """🏆 Voir les badges d'un utilisateur"""
         
         target = member or ctx.author
-        user_badges = self.get_user_badges(target.id, ctx.guild.id)
+        user_badges = await self.get_user_badges(target.id, ctx.guild.id)
         
         embed = discord.Embed(
             title=f"🏆 Badges de {target.display_name}",
@@ -233,12 +232,12 @@ class PersonalizationModule(commands.Cog):
         badge = badge.lower()
         
         # Vérifier si l'utilisateur a déjà ce badge
-        user_badges = self.get_user_badges(member.id, ctx.guild.id)
+        user_badges = await self.get_user_badges(member.id, ctx.guild.id)
         if badge in user_badges:
             return await ctx.send(f"❌ {member.display_name} possède déjà ce badge !")
         
         # Ajouter le badge
-        self.add_user_badge(member.id, ctx.guild.id, badge)
+        await self.add_user_badge(member.id, ctx.guild.id, badge)
         
         badge_info = self.badges[badge]
         
@@ -277,12 +276,12 @@ class PersonalizationModule(commands.Cog):
         badge = badge.lower()
         
         # Vérifier si l'utilisateur a ce badge
-        user_badges = self.get_user_badges(member.id, ctx.guild.id)
+        user_badges = await self.get_user_badges(member.id, ctx.guild.id)
         if badge not in user_badges:
             return await ctx.send(f"❌ {member.display_name} ne possède pas ce badge !")
         
         # Retirer le badge
-        self.remove_user_badge(member.id, ctx.guild.id, badge)
+        await self.remove_user_badge(member.id, ctx.guild.id, badge)
         
         badge_info = self.badges[badge]
         
@@ -323,13 +322,13 @@ class PersonalizationModule(commands.Cog):
         
         if not status:
             # Supprimer le statut
-            self.update_user_profile(ctx.author.id, ctx.guild.id, {'status': None})
+            await self.update_user_profile(ctx.author.id, ctx.guild.id, {'status': None})
             return await ctx.send("✅ Statut personnalisé supprimé !")
         
         if len(status) > 100:
             return await ctx.send("❌ Le statut ne peut pas dépasser 100 caractères !")
         
-        self.update_user_profile(ctx.author.id, ctx.guild.id, {'status': status})
+        await self.update_user_profile(ctx.author.id, ctx.guild.id, {'status': status})
         
         embed = discord.Embed(
             title="✅ Statut mis à jour",
@@ -462,7 +461,7 @@ class PersonalizationModule(commands.Cog):
         draw.text((50, stats_y + 60), f"🏆 {level_data['xp']:,} XP", font=font_medium, fill='#e74c3c')
         
         # Badges
-        user_badges = self.get_user_badges(user.id, guild.id)
+        user_badges = await self.get_user_badges(user.id, guild.id)
         if user_badges:
             badge_text = " ".join([self.badges[badge]['emoji'] for badge in user_badges[:5] if badge in self.badges])
             draw.text((400, stats_y), f"Badges: {badge_text}", font=font_medium, fill='white')
@@ -500,84 +499,74 @@ class PersonalizationModule(commands.Cog):
         
         return buffer
     
-    def get_user_profile(self, user_id: int, guild_id: int) -> dict:
+    async def get_user_profile(self, user_id: int, guild_id: int) -> dict:
         """Récupérer le profil d'un utilisateur"""
-        with sqlite3.connect(self.bot.db.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute('''
-                SELECT bio, color, theme, background, status
-                FROM user_profiles
-                WHERE user_id = ? AND guild_id = ?
-            ''', (user_id, guild_id))
-            
-            result = cursor.fetchone()
-            
-            if result:
-                return {
-                    'bio': result[0],
-                    'color': result[1] or 0x3498db,
-                    'theme': result[2] or 'default',
-                    'background': result[3],
-                    'status': result[4]
-                }
-            
-            return {'color': 0x3498db, 'theme': 'default'}
+        result = await self.bot.db.aio.fetchone('''
+            SELECT bio, color, theme, background, status
+            FROM user_profiles
+            WHERE user_id = ? AND guild_id = ?
+        ''', (user_id, guild_id))
+        
+        if result:
+            return {
+                'bio': result[0],
+                'color': result[1] or 0x3498db,
+                'theme': result[2] or 'default',
+                'background': result[3],
+                'status': result[4]
+            }
+        
+        return {'color': 0x3498db, 'theme': 'default'}
     
-    def update_user_profile(self, user_id: int, guild_id: int, data: dict):
+    async def update_user_profile(self, user_id: int, guild_id: int, data: dict):
         """Mettre à jour le profil d'un utilisateur"""
-        with sqlite3.connect(self.bot.db.db_path) as conn:
-            cursor = conn.cursor()
-            
+        def update(conn):
             # Insérer ou mettre à jour
-            cursor.execute('''
+            conn.execute('''
                 INSERT OR IGNORE INTO user_profiles (user_id, guild_id)
                 VALUES (?, ?)
             ''', (user_id, guild_id))
             
             # Mettre à jour les champs fournis
             for key, value in data.items():
-                cursor.execute(f'''
+                conn.execute(f'''
                     UPDATE user_profiles
                     SET {key} = ?
                     WHERE user_id = ? AND guild_id = ?
                 ''', (value, user_id, guild_id))
-            
-            conn.commit()
+        
+        await self.bot.db.aio.transaction(update)
     
-    def get_user_badges(self, user_id: int, guild_id: int) -> List[str]:
+    async def get_user_badges(self, user_id: int, guild_id: int) -> List[str]:
         """Récupérer les badges d'un utilisateur"""
-        with sqlite3.connect(self.bot.db.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute('''
-                SELECT badges FROM user_profiles
-                WHERE user_id = ? AND guild_id = ?
-            ''', (user_id, guild_id))
-            
-            result = cursor.fetchone()
-            
-            if result and result[0]:
-                try:
-                    return json.loads(result[0])
-                except:
-                    return []
-            
-            return []
+        badges = await self.bot.db.aio.fetchval('''
+            SELECT badges FROM user_profiles
+            WHERE user_id = ? AND guild_id = ?
+        ''', (user_id, guild_id))
+        
+        if badges:
+            try:
+                return json.loads(badges)
+            except:
+                return []
+        
+        return []
     
-    def add_user_badge(self, user_id: int, guild_id: int, badge: str):
+    async def add_user_badge(self, user_id: int, guild_id: int, badge: str):
         """Ajouter un badge à un utilisateur"""
-        current_badges = self.get_user_badges(user_id, guild_id)
+        current_badges = await self.get_user_badges(user_id, guild_id)
         
         if badge not in current_badges:
             current_badges.append(badge)
-            self.update_user_profile(user_id, guild_id, {'badges': json.dumps(current_badges)})
+            await self.update_user_profile(user_id, guild_id, {'badges': json.dumps(current_badges)})
     
-    def remove_user_badge(self, user_id: int, guild_id: int, badge: str):
+    async def remove_user_badge(self, user_id: int, guild_id: int, badge: str):
         """Retirer un badge à un utilisateur"""
-        current_badges = self.get_user_badges(user_id, guild_id)
+        current_badges = await self.get_user_badges(user_id, guild_id)
         
         if badge in current_badges:
             current_badges.remove(badge)
-            self.update_user_profile(user_id, guild_id, {'badges': json.dumps(current_badges)})
+            await self.update_user_profile(user_id, guild_id, {'badges': json.dumps(current_badges)})
 
 def setup(bot):
     bot.add_cog(PersonalizationModule(bot))
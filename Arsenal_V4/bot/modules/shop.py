@@ -7,7 +7,6 @@ Système de boutique configurable avec ArsenalCoins
 
 import discord
 from discord.ext import commands
-import sqlite3
 from typing import List, Dict, Optional
 
 class ShopModule(commands.Cog):
@@ -41,7 +40,7 @@ class ShopModule(commands.Cog):
         )
         
         # Ajouter le solde de l'utilisateur
-        user = self.bot.db.get_user(ctx.author.id)
+        user = await self.bot.db.get_user(ctx.author.id)
         embed.add_field(
             name="💰 Votre solde",
             value=f"**{user['balance']:,}** ArsenalCoins",
@@ -50,8 +49,9 @@ class ShopModule(commands.Cog):
         
         # Ajouter les catégories
         categories_text = ""
+        counts = await self.get_category_item_counts(ctx.guild.id)
         for key, name in self.categories.items():
-            item_count = self.get_category_item_count(ctx.guild.id, key)
+            item_count = counts.get(key, 0)
             categories_text += f"{name} - `!shop {key}` ({item_count} objets)\n"
         
         embed.add_field(
@@ -73,7 +73,7 @@ class ShopModule(commands.Cog):
         if category not in self.categories:
             return await ctx.send(f"❌ Catégorie inconnue ! Utilisez: {', '.join(self.categories.keys())}")
         
-        items = self.get_shop_items(ctx.guild.id, category)
+        items = await self.get_shop_items(ctx.guild.id, category)
         
         if not items:
             embed = discord.Embed(
@@ -88,7 +88,7 @@ class ShopModule(commands.Cog):
             color=0xf39c12
         )
         
-        user = self.bot.db.get_user(ctx.author.id)
+        user = await self.bot.db.get_user(ctx.author.id)
         embed.add_field(
             name="💰 Votre solde",
             value=f"**{user['balance']:,}** ArsenalCoins",
@@ -116,11 +116,11 @@ class ShopModule(commands.Cog):
             return await ctx.send("❌ La quantité doit être positive !")
         
         # Vérifier si l'objet existe
-        item = self.get_shop_item(ctx.guild.id, item_id)
+        item = await self.get_shop_item(ctx.guild.id, item_id)
         if not item:
             return await ctx.send(f"❌ Objet #{item_id} introuvable !")
         
-        user = self.bot.db.get_user(ctx.author.id)
+        user = await self.bot.db.get_user(ctx.author.id)
         total_cost = item['price'] * quantity
         
         # Vérifier le solde
@@ -139,11 +139,11 @@ class ShopModule(commands.Cog):
         
         if success:
             # Débiter le compte
-            self.bot.db.update_balance(ctx.author.id, -total_cost, f"Shop Purchase: {item['name']}")
+            await self.bot.db.update_balance(ctx.author.id, -total_cost, f"Shop Purchase: {item['name']}")
             
             # Mettre à jour le stock
             if item['stock'] != -1:
-                self.update_item_stock(item['item_id'], -quantity)
+                await self.update_item_stock(item['item_id'], -quantity)
             
             embed = discord.Embed(
                 title="✅ Achat réussi !",
@@ -184,32 +184,13 @@ class ShopModule(commands.Cog):
     async def add_to_inventory(self, ctx, item: dict, quantity: int) -> bool:
         """Ajouter un objet à l'inventaire"""
         try:
-            with sqlite3.connect(self.bot.db.db_path) as conn:
-                cursor = conn.cursor()
-                
-                # Vérifier si l'objet existe déjà dans l'inventaire
-                cursor.execute('''
-                    SELECT quantity FROM user_inventory 
-                    WHERE user_id = ? AND guild_id = ? AND item_id = ?
-                ''', (ctx.author.id, ctx.guild.id, item['item_id']))
-                
-                existing = cursor.fetchone()
-                
-                if existing:
-                    # Mettre à jour la quantité
-                    cursor.execute('''
-                        UPDATE user_inventory SET quantity = quantity + ?
-                        WHERE user_id = ? AND guild_id = ? AND item_id = ?
-                    ''', (quantity, ctx.author.id, ctx.guild.id, item['item_id']))
-                else:
-                    # Ajouter nouvel objet
-                    cursor.execute('''
-                        INSERT INTO user_inventory (user_id, guild_id, item_id, quantity)
-                        VALUES (?, ?, ?, ?)
-                    ''', (ctx.author.id, ctx.guild.id, item['item_id'], quantity))
-                
-                conn.commit()
-                return True
+            # Ajout ou incrément de la quantité en une requête
+            await self.bot.db.aio.execute('''
+                INSERT INTO user_inventory (user_id, guild_id, item_id, quantity)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT (user_id, guild_id, item_id) DO UPDATE SET quantity = quantity + excluded.quantity
+            ''', (ctx.author.id, ctx.guild.id, item['item_id'], quantity))
+            return True
                 
         except Exception as e:
             print(f"Erreur add_to_inventory: {e}")
@@ -221,17 +202,13 @@ class ShopModule(commands.Cog):
         
         target = member or ctx.author
         
-        with sqlite3.connect(self.bot.db.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute('''
-                SELECT ui.item_id, ui.quantity, si.name, si.description, si.category
-                FROM user_inventory ui
-                JOIN shop_items si ON ui.item_id = si.item_id
-                WHERE ui.user_id = ? AND ui.guild_id = ?
-                ORDER BY si.category, si.name
-            ''', (target.id, ctx.guild.id))
-            
-            items = cursor.fetchall()
+        items = await self.bot.db.aio.fetch('''
+            SELECT ui.item_id, ui.quantity, si.name, si.description, si.category
+            FROM user_inventory ui
+            JOIN shop_items si ON ui.item_id = si.item_id
+            WHERE ui.user_id = ? AND ui.guild_id = ?
+            ORDER BY si.category, si.name
+        ''', (target.id, ctx.guild.id))
         
         if not items:
             embed = discord.Embed(
@@ -311,15 +288,10 @@ class ShopModule(commands.Cog):
         if price <= 0:
             return await ctx.send("❌ Le prix doit être positif !")
         
-        with sqlite3.connect(self.bot.db.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute('''
-                INSERT INTO shop_items (guild_id, name, description, price, category)
-                VALUES (?, ?, ?, ?, ?)
-            ''', (ctx.guild.id, name, description, price, category))
-            
-            item_id = cursor.lastrowid
-            conn.commit()
+        item_id = await self.bot.db.aio.execute('''
+            INSERT INTO shop_items (guild_id, name, description, price, category)
+            VALUES (?, ?, ?, ?, ?)
+        ''', (ctx.guild.id, name, description, price, category))
         
         embed = discord.Embed(
             title="✅ Objet ajouté !",
@@ -333,73 +305,43 @@ class ShopModule(commands.Cog):
         
         await ctx.send(embed=embed)
     
-    def get_shop_items(self, guild_id: int, category: str) -> List[Dict]:
+    async def get_shop_items(self, guild_id: int, category: str) -> List[Dict]:
         """Récupérer les objets d'une catégorie"""
-        with sqlite3.connect(self.bot.db.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute('''
-                SELECT item_id, name, description, price, stock, category, role_id
-                FROM shop_items
-                WHERE guild_id = ? AND category = ?
-                ORDER BY price
-            ''', (guild_id, category))
-            
-            items = cursor.fetchall()
-            
-            return [{
-                'item_id': item[0],
-                'name': item[1],
-                'description': item[2],
-                'price': item[3],
-                'stock': item[4],
-                'category': item[5],
-                'role_id': item[6]
-            } for item in items]
+        items = await self.bot.db.aio.fetch('''
+            SELECT item_id, name, description, price, stock, category, role_id
+            FROM shop_items
+            WHERE guild_id = ? AND category = ?
+            ORDER BY price
+        ''', (guild_id, category))
+        
+        return [dict(item) for item in items]
     
-    def get_shop_item(self, guild_id: int, item_id: int) -> Optional[Dict]:
+    async def get_shop_item(self, guild_id: int, item_id: int) -> Optional[Dict]:
         """Récupérer un objet spécifique"""
-        with sqlite3.connect(self.bot.db.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute('''
-                SELECT item_id, name, description, price, stock, category, role_id
-                FROM shop_items
-                WHERE guild_id = ? AND item_id = ?
-            ''', (guild_id, item_id))
-            
-            item = cursor.fetchone()
-            
-            if item:
-                return {
-                    'item_id': item[0],
-                    'name': item[1],
-                    'description': item[2],
-                    'price': item[3],
-                    'stock': item[4],
-                    'category': item[5],
-                    'role_id': item[6]
-                }
-            return None
+        item = await self.bot.db.aio.fetchone('''
+            SELECT item_id, name, description, price, stock, category, role_id
+            FROM shop_items
+            WHERE guild_id = ? AND item_id = ?
+        ''', (guild_id, item_id))
+        
+        return dict(item) if item else None
     
-    def get_category_item_count(self, guild_id: int, category: str) -> int:
-        """Compter les objets dans une catégorie"""
-        with sqlite3.connect(self.bot.db.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute('''
-                SELECT COUNT(*) FROM shop_items
-                WHERE guild_id = ? AND category = ?
-            ''', (guild_id, category))
-            
-            return cursor.fetchone()[0]
+    async def get_category_item_counts(self, guild_id: int) -> Dict[str, int]:
+        """Nombre d'objets par catégorie (une requête pour toutes les catégories)"""
+        rows = await self.bot.db.aio.fetch('''
+            SELECT category, COUNT(*) FROM shop_items
+            WHERE guild_id = ?
+            GROUP BY category
+        ''', (guild_id,))
+        
+        return {row[0]: row[1] for row in rows}
     
-    def update_item_stock(self, item_id: int, change: int):
+    async def update_item_stock(self, item_id: int, change: int):
         """Mettre à jour le stock d'un objet"""
-        with sqlite3.connect(self.bot.db.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute('''
-                UPDATE shop_items SET stock = stock + ?
-                WHERE item_id = ? AND stock != -1
-            ''', (change, item_id))
-            conn.commit()
+        await self.bot.db.aio.execute('''
+            UPDATE shop_items SET stock = stock + ?
+            WHERE item_id = ? AND stock != -1
+        ''', (change, item_id))
 
 def setup(bot):
     bot.add_cog(ShopModule(bot))
@@ -7,7 +7,6 @@ Système de statistiques complet pour le serveur
 
 import discord
 from discord.ext import commands
-import sqlite3
 import matplotlib.pyplot as plt
 import seaborn as sns
 from datetime import datetime, timedelta
@@ -16,17 +15,25 @@ import asyncio
 from collections import defaultdict, Counter
 import calendar
 
+from message_counters import MessageCounterBuffer, utc_day
+
 class StatsModule(commands.Cog):
     """Module de statistiques pour Arsenal V4"""
     
     def __init__(self, bot):
         self.bot = bot
         self.daily_stats = defaultdict(lambda: defaultdict(int))
+        # Compteurs daily_stats écrits par lots au lieu d'un commit par message
+        self.message_counters = MessageCounterBuffer(bot.db.aio)
         
         # Configuration pour les graphiques
         plt.style.use('dark_background')
         sns.set_palette("viridis")
     
+    def cog_unload(self):
+        """Écrire les compteurs en attente avant le déchargement"""
+        self.bot.loop.create_task(self.message_counters.close())
+    
     @commands.Cog.listener()
     async def on_message(self, message):
         """Tracker les messages pour les statistiques"""
@@ -363,36 +370,19 @@ class StatsModule(commands.Cog):
         await ctx.send(embed=embed)
     
     async def log_message_stats(self, message):
-        """Logger les statistiques de message"""
-        with sqlite3.connect(self.bot.db.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute('''
-                INSERT OR IGNORE INTO daily_stats 
-                (guild_id, user_id, channel_id, date, message_count)
-                VALUES (?, ?, ?, DATE('now'), 0)
-            ''', (message.guild.id, message.author.id, message.channel.id))
-            
-            cursor.execute('''
-                UPDATE daily_stats 
-                SET message_count = message_count + 1
-                WHERE guild_id = ? AND user_id = ? AND channel_id = ? AND date = DATE('now')
-            ''', (message.guild.id, message.author.id, message.channel.id))
-            
-            conn.commit()
+        """Logger les statistiques de message (en mémoire, écrit par lots)"""
+        self.message_counters.add(message.guild.id, message.author.id, message.channel.id)
     
     async def log_member_event(self, guild_id: int, user_id: int, event_type: str):
         """Logger les événements de membres"""
-        with sqlite3.connect(self.bot.db.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute('''
-                INSERT INTO member_events (guild_id, user_id, event_type)
-                VALUES (?, ?, ?)
-            ''', (guild_id, user_id, event_type))
-            conn.commit()
+        await self.bot.db.aio.execute('''
+            INSERT INTO member_events (guild_id, user_id, event_type)
+            VALUES (?, ?, ?)
+        ''', (guild_id, user_id, event_type))
     
     async def get_today_stats(self, guild_id: int) -> dict:
         """Récupérer les stats du jour"""
-        with sqlite3.connect(self.bot.db.db_path) as conn:
+        def query(conn):
             cursor = conn.cursor()
             
             # Messages du jour
@@ -424,6 +414,11 @@ class StatsModule(commands.Cog):
                 'joins': joins,
                 'leaves': leaves
             }
+        
+        async with self.message_counters.lock:
+            stats = await self.bot.db.aio.read(query)
+            stats['messages'] += self.message_counters.pending_count(guild_id, since=utc_day())
+        return stats
     
     def get_activity_level(self, messages: int, members: int) -> str:
         """Déterminer le niveau d'activité"""
@@ -445,7 +440,7 @@ class StatsModule(commands.Cog):
     
     async def get_user_stats(self, user_id: int, guild_id: int) -> dict:
         """Récupérer les stats d'un utilisateur"""
-        with sqlite3.connect(self.bot.db.db_path) as conn:
+        def query(conn):
             cursor = conn.cursor()
             
             # Messages des 7 derniers jours
@@ -477,74 +472,55 @@ class StatsModule(commands.Cog):
                 'messages_30d': messages_30d,
                 'total_messages': total_messages
             }
+        
+        async with self.message_counters.lock:
+            stats = await self.bot.db.aio.read(query)
+            pending = self.message_counters.pending_count
+            stats['messages_7d'] += pending(guild_id, user_id, since=utc_day(7))
+            stats['messages_30d'] += pending(guild_id, user_id, since=utc_day(30))
+            stats['total_messages'] += pending(guild_id, user_id)
+        return stats
     
     async def get_user_rank(self, user_id: int, guild_id: int) -> dict:
-        """Récupérer le rang d'un utilisateur"""
-        with sqlite3.connect(self.bot.db.db_path) as conn:
-            cursor = conn.cursor()
-            
-            # Classement par XP
-            cursor.execute('''
-                SELECT user_id, ROW_NUMBER() OVER (ORDER BY xp DESC) as rank
-                FROM users
-                WHERE guild_id = ?
-                ORDER BY xp DESC
-            ''', (guild_id,))
-            
-            rankings = cursor.fetchall()
-            total_users = len(rankings)
-            
-            user_rank = next((rank for uid, rank in rankings if uid == user_id), total_users)
-            percentage = ((total_users - user_rank + 1) / total_users * 100) if total_users > 0 else 0
-            
-            return {
-                'rank': user_rank,
-                'total': total_users,
-                'percentage': percentage
-            }
+        """Récupérer le rang d'un utilisateur (index XP en mémoire, O(log n))"""
+        ranking = self.bot.db.rankings['xp']
+        total_users = len(ranking)
+        
+        user_rank = ranking.rank(user_id) or total_users
+        percentage = ((total_users - user_rank + 1) / total_users * 100) if total_users > 0 else 0
+        
+        return {
+            'rank': user_rank,
+            'total': total_users,
+            'percentage': percentage
+        }
     
     async def get_leaderboard(self, guild_id: int, category: str) -> list:
         """Récupérer le classement"""
-        with sqlite3.connect(self.bot.db.db_path) as conn:
-            cursor = conn.cursor()
-            
-            if category == "level":
-                cursor.execute('''
-                    SELECT user_id, level, xp
-                    FROM users
-                    WHERE guild_id = ?
-                    ORDER BY level DESC, xp DESC
-                    LIMIT 20
-                ''', (guild_id,))
-                
-                return [{'user_id': row[0], 'level': row[1], 'xp': row[2]} for row in cursor.fetchall()]
-                
-            elif category == "coins":
-                cursor.execute('''
-                    SELECT user_id, balance
-                    FROM users
-                    WHERE guild_id = ?
-                    ORDER BY balance DESC
-                    LIMIT 20
-                ''', (guild_id,))
-                
-                return [{'user_id': row[0], 'balance': row[1]} for row in cursor.fetchall()]
-                
-            else:  # messages
-                cursor.execute('''
-                    SELECT user_id, SUM(message_count) as total
-                    FROM daily_stats
-                    WHERE guild_id = ?
-                    GROUP BY user_id
-                    ORDER BY total DESC
-                    LIMIT 20
-                ''', (guild_id,))
-                
-                return [{'user_id': row[0], 'message_count': row[1]} for row in cursor.fetchall()]
+        # Niveaux et ArsenalCoins : index en mémoire (le niveau ne dépend que de l'XP)
+        if category == "level":
+            return [{'user_id': user_id, 'level': self.bot.db.calculate_level(xp), 'xp': xp}
+                    for user_id, xp in self.bot.db.rankings['xp'].top(20)]
+        
+        if category == "coins":
+            return [{'user_id': user_id, 'balance': balance}
+                    for user_id, balance in self.bot.db.rankings['balance'].top(20)]
+        
+        # Messages
+        rows = await self.bot.db.aio.fetch('''
+            SELECT user_id, SUM(message_count) as total
+            FROM daily_stats
+            WHERE guild_id = ?
+            GROUP BY user_id
+            ORDER BY total DESC
+            LIMIT 20
+        ''', (guild_id,))
+        
+        return [{'user_id': row[0], 'message_count': row[1]} for row in rows]
     
     async def get_activity_data(self, guild_id: int, days: int) -> list:
         """Récupérer les données d'activité"""
-        with sqlite3.connect(self.bot.db.db_path) as conn:
+        def query(conn):
             cursor = conn.cursor()
             cursor.execute('''
                 SELECT date, SUM(message_count) as total
@@ -555,10 +531,12 @@ class StatsModule(commands.Cog):
             '''.format(days), (guild_id,))
             
             return [{'date': row[0], 'message_count': row[1]} for row in cursor.fetchall()]
+        
+        return await self.bot.db.aio.read(query)
     
     async def get_channel_stats(self, guild_id: int, days: int) -> list:
         """Récupérer les stats par canal"""
-        with sqlite3.connect(self.bot.db.db_path) as conn:
+        def query(conn):
             cursor = conn.cursor()
             cursor.execute('''
                 SELECT channel_id, SUM(message_count) as total
@@ -569,6 +547,8 @@ class StatsModule(commands.Cog):
             '''.format(days), (guild_id,))
             
             return [{'channel_id': row[0], 'message_count': row[1]} for row in cursor.fetchall()]
+        
+        return await self.bot.db.aio.read(query)
 
 def setup(bot):
     bot.add_cog(StatsModule(bot))
@@ -12,11 +12,11 @@ from flask import Flask, request, jsonify, session, send_from_directory, redirec
 from flask_cors import CORS, cross_origin
 from flask_socketio import SocketIO, emit, join_room
 import os
+import sys
 import json
 import sqlite3
 import random
 import psutil
-import requests
 import secrets
 import urllib.parse
 import re
@@ -26,6 +26,12 @@ import threading
 import logging
 from datetime import datetime, timedelta
 
+# Client REST Discord partagé (discord_rest.py à la racine du dépôt)
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..')))
+from discord_rest import DiscordHTTPError, get_discord_client
+# État partagé entre workers (ARSENAL_STATE_BACKEND=memory|sqlite|redis)
+from state_store import get_state_store
+
 # Import du système de freeze
 try:
     from session_freezer import create_login_freeze, freeze_oauth_tokens, freeze_discord_data, get_frozen_data, complete_login_freeze
@@ -83,30 +89,43 @@ if not all([DISCORD_CLIENT_ID, DISCORD_CLIENT_SECRET, DISCORD_REDIRECT_URI]):
 # Configuration des serveurs où le bot est présent
 BOT_SERVERS = os.getenv('BOT_SERVERS', '').split(',') if os.getenv('BOT_SERVERS') else []
 
+BOT_GUILDS_REFRESH_INTERVAL = 600  # Secondes entre deux rafraîchissements des serveurs du bot
+
 def get_bot_guilds() -> List[str]:
     """Récupère dynamiquement les IDs des serveurs où le bot Arsenal est présent via l'API Discord."""
     bot_token = os.getenv('DISCORD_BOT_TOKEN')
     if not bot_token:
         safe_print("❌ DISCORD_BOT_TOKEN manquant pour la détection auto des serveurs.", 'error')
         return []
-    headers = {
-        'Authorization': f'Bot {bot_token}'
-    }
     try:
-        response = requests.get('https://discord.com/api/v10/users/@me/guilds', headers=headers)
-        if response.status_code == 200:
-            guilds = response.json()
-            return [str(g['id']) for g in guilds]
-        else:
-            safe_print(f"❌ Erreur Discord API bot guilds: {response.status_code}", 'error')
-            return []
+        guilds = get_discord_client().get_bot_guilds(bot_token)
+        return [str(g['id']) for g in guilds]
+    except DiscordHTTPError as e:
+        safe_print(f"❌ Erreur Discord API bot guilds: {e.status}", 'error')
+        return []
     except Exception as e:
         safe_print(f"❌ Exception Discord API bot guilds: {e}", 'error')
         return []
 
-BOT_SERVERS_DYNAMIC = get_bot_guilds()
-if not BOT_SERVERS_DYNAMIC:
-    safe_print("⚠️ Aucun serveur détecté pour le bot Arsenal (API Discord).", 'warning')
+state_store = get_state_store()
+
+def current_bot_guilds() -> List[str]:
+    """Serveurs du bot détectés (partagés entre workers), sinon BOT_SERVERS"""
+    return state_store.get('bot_stats', 'guilds') or BOT_SERVERS
+
+def refresh_bot_guilds_loop():
+    """Rafraîchir périodiquement les serveurs du bot (garde la dernière liste connue en cas d'échec)"""
+    while True:
+        # Un seul worker interroge Discord par intervalle, les autres lisent le résultat partagé
+        if state_store.claim('bot_stats', 'guilds_refreshed_at', BOT_GUILDS_REFRESH_INTERVAL):
+            guilds = get_bot_guilds()
+            if guilds:
+                state_store.set('bot_stats', 'guilds', guilds)
+            elif not state_store.get('bot_stats', 'guilds'):
+                safe_print("⚠️ Aucun serveur détecté pour le bot Arsenal (API Discord).", 'warning')
+        time.sleep(BOT_GUILDS_REFRESH_INTERVAL / 10)
+
+threading.Thread(target=refresh_bot_guilds_loop, name="arsenal-bot-guilds", daemon=True).start()
 
 # Configuration CREATOR/ADMIN (bypass toutes les restrictions)
 CREATOR_ID = os.getenv('CREATOR_ID', '')
@@ -183,7 +202,7 @@ def user_has_access(user_id, user_guilds=None):
         return True
     
     # Détection dynamique des serveurs du bot
-    bot_guilds = BOT_SERVERS_DYNAMIC if BOT_SERVERS_DYNAMIC else BOT_SERVERS
+    bot_guilds = current_bot_guilds()
     if not user_guilds or not bot_guilds:
         return False
     
@@ -192,7 +211,7 @@ def user_has_access(user_id, user_guilds=None):
 
 def get_real_bot_stats():
     """Récupérer les vraies statistiques du bot"""
-    bot_guilds = BOT_SERVERS_DYNAMIC if BOT_SERVERS_DYNAMIC else BOT_SERVERS
+    bot_guilds = current_bot_guilds()
     dynamic_server_count = len(bot_guilds) if bot_guilds else 6
     
     return {
@@ -787,31 +806,19 @@ def auth_callback():
     
     try:
         # Échanger le code contre un token d'accès
-        token_data = {
-            'client_id': DISCORD_CLIENT_ID,
-            'client_secret': DISCORD_CLIENT_SECRET,
-            'grant_type': 'authorization_code',
-            'code': code,
-            'redirect_uri': DISCORD_REDIRECT_URI
-        }
-        
-        token_response = requests.post('https://discord.com/api/oauth2/token', data=token_data)
-        token_json = token_response.json()
-        
-        if 'access_token' not in token_json:
-            print(f"❌ Erreur récupération token: {token_json}")
+        discord_client = get_discord_client()
+        try:
+            token_json = discord_client.exchange_code(DISCORD_CLIENT_ID, DISCORD_CLIENT_SECRET, code, DISCORD_REDIRECT_URI)
+        except DiscordHTTPError as e:
+            print(f"❌ Erreur récupération token: {e}")
             return "Erreur d'authentification Discord", 400
         
         access_token = token_json['access_token']
         
-        # Récupérer les informations utilisateur
-        headers = {'Authorization': f'Bearer {access_token}'}
-        user_response = requests.get('https://discord.com/api/users/@me', headers=headers)
-        user_data = user_response.json()
-        
-        # Récupérer les serveurs de l'utilisateur
-        guilds_response = requests.get('https://discord.com/api/users/@me/guilds', headers=headers)
-        guilds_data = guilds_response.json()
+        # Récupérer les informations utilisateur et ses serveurs en parallèle
+        user_future, guilds_future = discord_client.fetch_user_and_guilds(access_token)
+        user_data = user_future.result()
+        guilds_data = guilds_future.result()
         
         user_id = user_data['id']
         
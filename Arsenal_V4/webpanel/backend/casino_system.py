@@ -5,15 +5,24 @@ Système de Casino pour Arsenal_V4 WebPanel
 Jeux: Blackjack, Poker, Roulette, Machine à Sous
 """
 
+import os
+import sys
 import random
 import json
 from datetime import datetime
 
+# Stockage d'état partagé entre workers (state_store.py à la racine du dépôt)
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..')))
+from state_store import get_state_store
+
+GAME_TTL = 1800  # Partie abandonnée oubliée après 30 min
+
 class CasinoSystem:
-    def __init__(self):
+    def __init__(self, store=None):
+        store = store or get_state_store()
         self.games = {
-            'blackjack': BlackjackGame(),
-            'poker': PokerGame(),
+            'blackjack': BlackjackGame(store),
+            'poker': PokerGame(store),
             'roulette': RouletteGame(),
             'slots': SlotMachine()
         }
@@ -28,9 +37,35 @@ class CasinoSystem:
         # TODO: Intégrer avec la base de données
         pass
 
-class BlackjackGame:
-    def __init__(self):
-        self.active_games = {}
+class StoredGame:
+    """Parties en cours dans le stockage partagé : chaque coup peut arriver sur un autre worker"""
+    namespace = 'casino_games'
+    
+    def __init__(self, store=None):
+        self.store = store or get_state_store()
+    
+    def _save(self, game_state):
+        self.store.set(self.namespace, game_state['game_id'], game_state, ttl=GAME_TTL)
+    
+    def _play(self, game_id, action):
+        """Appliquer action(game) -> réponse, atomiquement (deux clics simultanés ne piochent pas deux fois)"""
+        response = {'success': False, 'error': 'Partie non trouvée'}
+        
+        def apply(game):
+            nonlocal response
+            if game is None:
+                return None
+            response = action(game)
+            return game
+        
+        self.store.update(self.namespace, game_id, apply, ttl=GAME_TTL)
+        return response
+    
+    def get_game(self, game_id):
+        return self.store.get(self.namespace, game_id)
+
+class BlackjackGame(StoredGame):
+    namespace = 'casino_blackjack'
     
     def start_game(self, user_id, bet_amount):
         """Commencer une partie de Blackjack"""
@@ -52,11 +87,13 @@ class BlackjackGame:
             'created_at': datetime.now().isoformat()
         }
         
-        self.active_games[game_state['game_id']] = game_state
-        
         # Vérifier blackjack naturel
         if self._calculate_hand_value(player_hand) == 21:
-            return self._end_game(game_state['game_id'], 'blackjack')
+            response = self._end_game(game_state, 'blackjack')
+            self._save(game_state)
+            return response
+        
+        self._save(game_state)
         
         return {
             'success': True,
@@ -69,10 +106,9 @@ class BlackjackGame:
     
     def hit(self, game_id):
         """Piocher une carte"""
-        if game_id not in self.active_games:
-            return {'success': False, 'error': 'Partie non trouvée'}
-        
-        game = self.active_games[game_id]
+        return self._play(game_id, self._hit)
+    
+    def _hit(self, game):
         if game['status'] != 'playing':
             return {'success': False, 'error': 'Partie terminée'}
         
@@ -83,9 +119,9 @@ class BlackjackGame:
         player_value = self._calculate_hand_value(game['player_hand'])
         
         if player_value > 21:
-            return self._end_game(game_id, 'bust')
+            return self._end_game(game, 'bust')
         elif player_value == 21:
-            return self._end_game(game_id, 'player_21')
+            return self._end_game(game, 'player_21')
         
         return {
             'success': True,
@@ -97,10 +133,11 @@ class BlackjackGame:
     
     def stand(self, game_id):
         """Rester avec la main actuelle"""
-        if game_id not in self.active_games:
-            return {'success': False, 'error': 'Partie non trouvée'}
-        
-        game = self.active_games[game_id]
+        return self._play(game_id, self._stand)
+    
+    def _stand(self, game):
+        if game['status'] != 'playing':
+            return {'success': False, 'error': 'Partie terminée'}
         
         # Le dealer joue
         dealer_hand = game['dealer_hand']
@@ -114,13 +151,13 @@ class BlackjackGame:
         
         # Déterminer le gagnant
         if dealer_value > 21:
-            return self._end_game(game_id, 'dealer_bust')
+            return self._end_game(game, 'dealer_bust')
         elif player_value > dealer_value:
-            return self._end_game(game_id, 'player_wins')
+            return self._end_game(game, 'player_wins')
         elif dealer_value > player_value:
-            return self._end_game(game_id, 'dealer_wins')
+            return self._end_game(game, 'dealer_wins')
         else:
-            return self._end_game(game_id, 'tie')
+            return self._end_game(game, 'tie')
     
     def _create_deck(self):
         """Créer un jeu de 52 cartes"""
@@ -150,9 +187,8 @@ class BlackjackGame:
         
         return value
     
-    def _end_game(self, game_id, result):
+    def _end_game(self, game, result):
         """Terminer la partie et calculer les gains"""
-        game = self.active_games[game_id]
         bet = game['bet_amount']
         
         winnings = 0
@@ -241,9 +277,8 @@ class RouletteGame:
         else:
             return 'black'
 
-class PokerGame:
-    def __init__(self):
-        self.active_games = {}
+class PokerGame(StoredGame):
+    namespace = 'casino_poker'
     
     def start_game(self, user_id, bet_amount):
         """Commencer une partie de Poker (Jacks or Better)"""
@@ -263,7 +298,7 @@ class PokerGame:
             'created_at': datetime.now().isoformat()
         }
         
-        self.active_games[game_state['game_id']] = game_state
+        self._save(game_state)
         
         return {
             'success': True,
@@ -274,10 +309,11 @@ class PokerGame:
     
     def hold_cards(self, game_id, held_positions):
         """Garder certaines cartes et en tirer de nouvelles"""
-        if game_id not in self.active_games:
-            return {'success': False, 'error': 'Partie non trouvée'}
-        
-        game = self.active_games[game_id]
+        return self._play(game_id, lambda game: self._draw(game, held_positions))
+    
+    def _draw(self, game, held_positions):
+        if game['status'] != 'choosing':
+            return {'success': False, 'error': 'Partie terminée'}
         
         # Remplacer les cartes non gardées
         for i in range(5):
@@ -5,99 +5,91 @@ Système de Freeze pour les sessions OAuth Discord
 Évite les changements de tokens pendant la connexion
 """
 
-import time
+import os
+import sys
 import secrets
-from datetime import datetime, timedelta
-from threading import Lock
+from datetime import datetime
+
+# Stockage d'état partagé entre workers (state_store.py à la racine du dépôt)
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..')))
+from state_store import get_state_store
+
+FREEZE_NAMESPACE = 'login_freeze'
+FREEZE_TTL = 600  # Expire après 10 min
 
 class SessionFreezer:
-    def __init__(self):
-        self.frozen_sessions = {}
-        self.lock = Lock()
+    def __init__(self, store=None):
+        # Le callback OAuth peut arriver sur un autre worker que /auth/login :
+        # les freezes vivent dans le stockage partagé, pas dans ce processus
+        self.store = store or get_state_store()
         
     def create_freeze(self, user_ip, user_agent):
         """Créer un freeze pour une session de connexion"""
         freeze_token = secrets.token_urlsafe(32)
         
-        with self.lock:
-            self.frozen_sessions[freeze_token] = {
-                'created_at': datetime.now(),
-                'user_ip': user_ip,
-                'user_agent': user_agent,
-                'oauth_tokens': {},
-                'discord_data': None,
-                'status': 'freezing',
-                'expires_at': datetime.now() + timedelta(minutes=10)  # Expire après 10 min
-            }
+        self.store.set(FREEZE_NAMESPACE, freeze_token, {
+            'created_at': datetime.now().isoformat(),
+            'user_ip': user_ip,
+            'user_agent': user_agent,
+            'oauth_tokens': {},
+            'discord_data': None,
+            'status': 'freezing'
+        }, ttl=FREEZE_TTL)
         
         print(f"🧊 FREEZE CRÉÉ: {freeze_token} pour IP {user_ip}")
         return freeze_token
     
+    def _update_freeze(self, freeze_token, changes):
+        """Modifier un freeze existant (atomique entre workers)"""
+        def apply(session):
+            if session is None:
+                return None
+            session.update(changes)
+            return session
+        return self.store.update(FREEZE_NAMESPACE, freeze_token, apply, ttl=FREEZE_TTL) is not None
+    
     def add_oauth_token(self, freeze_token, access_token, refresh_token=None):
         """Ajouter les tokens OAuth au freeze"""
-        with self.lock:
-            if freeze_token in self.frozen_sessions:
-                self.frozen_sessions[freeze_token]['oauth_tokens'] = {
-                    'access_token': access_token,
-                    'refresh_token': refresh_token,
-                    'frozen_at': datetime.now()
-                }
-                self.frozen_sessions[freeze_token]['status'] = 'tokens_frozen'
-                print(f"🔐 TOKENS FIGÉS: {freeze_token}")
-                return True
-            return False
+        if self._update_freeze(freeze_token, {
+            'oauth_tokens': {
+                'access_token': access_token,
+                'refresh_token': refresh_token,
+                'frozen_at': datetime.now().isoformat()
+            },
+            'status': 'tokens_frozen'
+        }):
+            print(f"🔐 TOKENS FIGÉS: {freeze_token}")
+            return True
+        return False
     
     def add_discord_data(self, freeze_token, user_data, guilds_data):
         """Ajouter les données Discord au freeze"""
-        with self.lock:
-            if freeze_token in self.frozen_sessions:
-                self.frozen_sessions[freeze_token]['discord_data'] = {
-                    'user': user_data,
-                    'guilds': guilds_data,
-                    'retrieved_at': datetime.now()
-                }
-                self.frozen_sessions[freeze_token]['status'] = 'data_complete'
-                print(f"👤 DONNÉES DISCORD FIGÉES: {freeze_token}")
-                return True
-            return False
+        if self._update_freeze(freeze_token, {
+            'discord_data': {
+                'user': user_data,
+                'guilds': guilds_data,
+                'retrieved_at': datetime.now().isoformat()
+            },
+            'status': 'data_complete'
+        }):
+            print(f"👤 DONNÉES DISCORD FIGÉES: {freeze_token}")
+            return True
+        return False
     
     def get_frozen_session(self, freeze_token):
-        """Récupérer une session figée"""
-        with self.lock:
-            session = self.frozen_sessions.get(freeze_token)
-            if session and session['expires_at'] > datetime.now():
-                return session
-            elif session:
-                # Session expirée, la supprimer
-                del self.frozen_sessions[freeze_token]
-                print(f"⏰ SESSION EXPIRÉE: {freeze_token}")
-            return None
+        """Récupérer une session figée (None si absente ou expirée)"""
+        return self.store.get(FREEZE_NAMESPACE, freeze_token)
     
     def unfreeze_session(self, freeze_token):
         """Libérer une session figée après connexion réussie"""
-        with self.lock:
-            if freeze_token in self.frozen_sessions:
-                session_data = self.frozen_sessions[freeze_token]
-                del self.frozen_sessions[freeze_token]
-                print(f"🔓 SESSION LIBÉRÉE: {freeze_token}")
-                return session_data
-            return None
+        session_data = self.store.pop(FREEZE_NAMESPACE, freeze_token)
+        if session_data is not None:
+            print(f"🔓 SESSION LIBÉRÉE: {freeze_token}")
+        return session_data
     
     def cleanup_expired(self):
         """Nettoyer les sessions expirées"""
-        now = datetime.now()
-        expired_tokens = []
-        
-        with self.lock:
-            for token, session in self.frozen_sessions.items():
-                if session['expires_at'] <= now:
-                    expired_tokens.append(token)
-            
-            for token in expired_tokens:
-                del self.frozen_sessions[token]
-                print(f"🗑️ SESSION EXPIRÉE SUPPRIMÉE: {token}")
-        
-        return len(expired_tokens)
+        return self.store.cleanup_expired()
 
 # Instance globale du freezer
 session_freezer = SessionFreezer()
@@ -121,6 +113,8 @@ def get_frozen_data(freeze_token):
     """Récupérer les données figées"""
     return session_freezer.get_frozen_session(freeze_token)
 
-def complete_login_freeze(freeze_token):
+def complete_login_freeze(freeze_token, user_data=None, guilds_data=None):
     """Terminer le freeze et retourner les données"""
+    if user_data is not None:
+        session_freezer.add_discord_data(freeze_token, user_data, guilds_data)
     return session_freezer.unfreeze_session(freeze_token)
@@ -5,13 +5,14 @@ Intégration complète du bot Discord avec le panel web
 import discord
 from discord.ext import commands
 import asyncio
-import aiohttp
 import json
 import sqlite3
 from datetime import datetime
 import sys
 import os
 
+from event_shipper import EventShipper
+
 # Configuration du bot
 BOT_TOKEN = "VOTRE_TOKEN_BOT_ICI"  # À remplacer par votre vrai token
 BOT_PREFIX = "!"
@@ -32,6 +33,9 @@ class ArsenalBot:
         # Base de données
         self.db_path = "arsenal_v4.db"
         self.init_database()
+        
+        # Envoi des événements au webpanel (une session, par lots)
+        self.shipper = EventShipper()
     
     def init_database(self):
         """Initialise la base de données pour l'intégration bot"""
@@ -84,6 +88,8 @@ class ArsenalBot:
             print(f'🤖 {self.bot.user} est connecté et prêt!')
             print(f'📊 Connecté à {len(self.bot.guilds)} serveurs')
             
+            await self.shipper.start()
+            
             # Mettre à jour les statistiques
             await self.update_server_stats()
             
@@ -264,16 +270,9 @@ class ArsenalBot:
             print(f"❌ Erreur log command: {e}")
     
     async def send_to_webpanel(self, data):
-        """Envoyer des données au webpanel"""
-        try:
-            async with aiohttp.ClientSession() as session:
-                async with session.post('http://localhost:5000/api/commands/log', json=data) as resp:
-                    if resp.status == 200:
-                        print(f"✅ Données envoyées au webpanel: {data['command']}")
-                    else:
-                        print(f"❌ Erreur webpanel: {resp.status}")
-        except Exception as e:
-            print(f"❌ Connexion webpanel échouée: {e}")
+        """Envoyer une commande au webpanel (mise en file, envoyée avec le prochain lot)"""
+        if not self.shipper.emit('command', timestamp=datetime.now().isoformat(), **data):
+            print(f"⚠️ File webpanel pleine, commande non envoyée: {data['command']}")
     
     async def update_server_stats_to_webpanel(self):
         """Envoyer les stats des serveurs au webpanel"""
@@ -286,11 +285,8 @@ class ArsenalBot:
                     'connected_at': datetime.now().isoformat(),
                     'last_activity': datetime.now().isoformat()
                 }
-                
-                async with aiohttp.ClientSession() as session:
-                    async with session.post('http://localhost:5000/api/servers/update', json=server_data) as resp:
-                        if resp.status == 200:
-                            print(f"✅ Stats serveur {guild.name} envoyées")
+                self.shipper.emit('server', **server_data)
+            print(f"✅ Stats de {len(self.bot.guilds)} serveurs mises en file pour le webpanel")
         except Exception as e:
             print(f"❌ Erreur stats serveurs: {e}")
     
@@ -420,10 +416,18 @@ class ArsenalBot:
         """Démarrer le bot"""
         try:
             print("🚀 Démarrage du bot Arsenal V4...")
-            self.bot.run(BOT_TOKEN)
+            asyncio.run(self._run_bot())
         except Exception as e:
             print(f"❌ Erreur démarrage bot: {e}")
             print("💡 Vérifiez votre token Discord!")
+    
+    async def _run_bot(self):
+        """Bot + envoi des derniers événements au webpanel à l'arrêt"""
+        async with self.bot:
+            try:
+                await self.bot.start(BOT_TOKEN)
+            finally:
+                await self.shipper.stop()
 
 # Point d'entrée
 if __name__ == "__main__":
@@ -0,0 +1,196 @@
+"""
+📤 Arsenal Event Shipper - envoi des événements du bot au webpanel par lots
+Remplace le POST par commande (une ClientSession aiohttp par appel) :
+
+- une seule session HTTP (keep-alive) pour toute la vie du bot
+- file bornée : emit() ne bloque jamais une commande ; si la file est pleine,
+  l'événement est abandonné et compté (emit_wait() attend une place)
+- envoi par lots vers /api/ingest/batch dès batch_size événements ou toutes
+  les flush_interval secondes
+- erreurs transitoires (connexion, 429, 5xx) : nouvel essai avec attente
+  exponentielle ; le lot est abandonné (et compté) après max_retries essais
+
+Réglages : ARSENAL_WEBPANEL_URL   URL du webpanel (défaut http://localhost:5000)
+           ARSENAL_INGEST_TOKEN   jeton Bearer attendu par le webpanel (optionnel)
+"""
+
+import asyncio
+import os
+import random
+import time
+from typing import Any, Dict, List, Optional
+
+try:
+    import aiohttp
+    AIOHTTP_AVAILABLE = True
+except ImportError:
+    AIOHTTP_AVAILABLE = False
+
+RETRY_STATUSES = {408, 429, 500, 502, 503, 504}
+
+
+class EventShipper:
+    def __init__(self, base_url: str = None, token: str = None, batch_size: int = 200,
+                 flush_interval: float = 2.0, max_queue: int = 10000, max_retries: int = 5,
+                 backoff: float = 0.5, max_backoff: float = 30.0, timeout: float = 10.0):
+        base_url = base_url or os.environ.get('ARSENAL_WEBPANEL_URL', 'http://localhost:5000')
+        self.url = base_url.rstrip('/') + '/api/ingest/batch'
+        self.token = token if token is not None else os.environ.get('ARSENAL_INGEST_TOKEN')
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_queue = max_queue
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.timeout = timeout
+
+        self.queue: Optional[asyncio.Queue] = None
+        self.session = None
+        self._task: Optional[asyncio.Task] = None
+        self._pending: List[Dict[str, Any]] = []  # Lot retiré de la file mais pas encore envoyé
+        self.stats = {
+            'emitted': 0, 'dropped': 0, 'sent': 0, 'batches': 0,
+            'retries': 0, 'failed_batches': 0, 'failed_events': 0,
+            'last_error': None, 'last_flush': None
+        }
+
+    # ----- Cycle de vie -----
+
+    async def start(self):
+        """Ouvre la session et lance la tâche d'envoi (dans la boucle du bot)"""
+        if self._task is not None:
+            return
+        self.queue = asyncio.Queue(maxsize=self.max_queue)
+        self.session = await self._open_session()
+        self._task = asyncio.get_running_loop().create_task(self._run())
+        print(f"📤 Event shipper démarré -> {self.url} (lots de {self.batch_size}, {self.flush_interval}s)")
+
+    async def stop(self, timeout: float = 10.0):
+        """Vide la file (au plus timeout secondes) puis ferme la session"""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+        if self._pending:
+            await self._send(self._pending)
+            self._pending = []
+        deadline = time.monotonic() + timeout
+        while not self.queue.empty() and time.monotonic() < deadline:
+            await self._send(self._drain(self.batch_size))
+        if not self.queue.empty():
+            self.stats['failed_events'] += self.queue.qsize()
+            print(f"⚠️ Event shipper: {self.queue.qsize()} événements non envoyés à l'arrêt")
+        await self._close_session()
+
+    async def _open_session(self):
+        if not AIOHTTP_AVAILABLE:
+            raise RuntimeError("aiohttp requis pour l'event shipper")
+        headers = {'Authorization': f"Bearer {self.token}"} if self.token else {}
+        return aiohttp.ClientSession(
+            headers=headers,
+            timeout=aiohttp.ClientTimeout(total=self.timeout),
+            connector=aiohttp.TCPConnector(limit=4, keepalive_timeout=60)
+        )
+
+    async def _close_session(self):
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    # ----- Production d'événements -----
+
+    def emit(self, kind: str, **fields) -> bool:
+        """Ajoute un événement sans attendre ; False s'il est abandonné (file pleine / arrêtée)"""
+        if self.queue is None:
+            self.stats['dropped'] += 1
+            return False
+        try:
+            self.queue.put_nowait({'type': kind, **fields})
+        except asyncio.QueueFull:
+            self.stats['dropped'] += 1
+            return False
+        self.stats['emitted'] += 1
+        return True
+
+    async def emit_wait(self, kind: str, **fields):
+        """Comme emit() mais attend une place dans la file (backpressure sur l'appelant)"""
+        if self.queue is None:
+            raise RuntimeError("Event shipper non démarré")
+        await self.queue.put({'type': kind, **fields})
+        self.stats['emitted'] += 1
+
+    # ----- Envoi -----
+
+    def _drain(self, limit: int) -> List[Dict[str, Any]]:
+        batch = []
+        while len(batch) < limit and not self.queue.empty():
+            batch.append(self.queue.get_nowait())
+        return batch
+
+    async def _collect(self) -> List[Dict[str, Any]]:
+        """Attend un premier événement puis remplit le lot jusqu'à batch_size ou flush_interval"""
+        batch = self._pending  # Rempli sur place : rien n'est perdu si la tâche est annulée
+        batch.append(await self.queue.get())
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            batch.extend(self._drain(self.batch_size - len(batch)))
+            remaining = deadline - time.monotonic()
+            if len(batch) >= self.batch_size or remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self.queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self):
+        while True:
+            await self._send(await self._collect())
+            self._pending = []
+
+    async def _post(self, batch: List[Dict[str, Any]]) -> int:
+        """POST d'un lot -> code HTTP (exception réseau propagée)"""
+        async with self.session.post(self.url, json={'events': batch}) as resp:
+            await resp.read()
+            return resp.status
+
+    async def _send(self, batch: List[Dict[str, Any]]) -> bool:
+        if not batch:
+            return True
+        for attempt in range(self.max_retries + 1):
+            try:
+                status = await self._post(batch)
+                if status == 200:
+                    self.stats['sent'] += len(batch)
+                    self.stats['batches'] += 1
+                    self.stats['last_flush'] = time.time()
+                    return True
+                self.stats['last_error'] = f"HTTP {status}"
+                if status not in RETRY_STATUSES:
+                    break  # Lot refusé (400, 401...) : le renvoyer ne changera rien
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.stats['last_error'] = str(e) or e.__class__.__name__
+            if attempt < self.max_retries:
+                self.stats['retries'] += 1
+                delay = min(self.max_backoff, self.backoff * 2 ** attempt)
+                await asyncio.sleep(delay * random.uniform(0.5, 1.0))
+
+        self.stats['failed_batches'] += 1
+        self.stats['failed_events'] += len(batch)
+        print(f"❌ Event shipper: lot de {len(batch)} événements abandonné ({self.stats['last_error']})")
+        return False
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            'queued': self.queue.qsize() if self.queue is not None else 0,
+            'max_queue': self.max_queue,
+            'running': self._task is not None
+        }
@@ -0,0 +1,130 @@
+/**
+ * Arsenal V4 WebPanel - Dashboard temps réel
+ * Reçoit les snapshots puis les deltas poussés par le serveur
+ * (Socket.IO si la librairie est chargée, sinon Server-Sent Events)
+ * au lieu d'interroger chaque API à intervalle fixe.
+ */
+
+class ArsenalLive {
+    constructor() {
+        this.handlers = {};      // jeu de données -> [callbacks]
+        this.state = {};         // jeu de données -> dernier état complet
+        this.versions = {};      // jeu de données -> dernière version appliquée
+        this.socket = null;
+        this.source = null;
+        this.transport = null;
+    }
+
+    /**
+     * Démarrer la réception : {bot_status: data => ..., stats: data => ...}
+     * Retourne false si aucun transport n'est disponible (la page garde son polling).
+     */
+    start(subscriptions) {
+        Object.entries(subscriptions).forEach(([dataset, callback]) => {
+            (this.handlers[dataset] = this.handlers[dataset] || []).push(callback);
+        });
+
+        if (this.transport) {
+            // Déjà connecté : ajouter les nouveaux jeux de données
+            if (this.transport === 'socketio') {
+                this.socket.emit('dashboard:subscribe', { datasets: Object.keys(subscriptions) });
+            } else {
+                this.connectSSE();
+            }
+            return true;
+        }
+        if (typeof window.io === 'function') {
+            this.connectSocketIO();
+            return true;
+        }
+        if (typeof window.EventSource === 'function') {
+            this.connectSSE();
+            return true;
+        }
+        console.warn('⚠️ Aucun transport temps réel disponible - polling conservé');
+        return false;
+    }
+
+    // ==================== TRANSPORTS ====================
+    connectSocketIO() {
+        this.transport = 'socketio';
+        this.socket = window.io({ transports: ['websocket', 'polling'] });
+        this.socket.on('connect', () => {
+            console.log('📡 Dashboard temps réel connecté (Socket.IO)');
+            this.socket.emit('dashboard:subscribe', { datasets: Object.keys(this.handlers) });
+        });
+        this.socket.on('dashboard', message => this.handleMessage(message));
+        this.socket.on('connect_error', () => {
+            // Serveur sans Socket.IO : basculer sur SSE
+            console.warn('⚠️ Socket.IO indisponible - bascule sur SSE');
+            this.socket.close();
+            this.socket = null;
+            this.connectSSE();
+        });
+    }
+
+    connectSSE() {
+        if (this.source) this.source.close();
+        this.transport = 'sse';
+        const datasets = Object.keys(this.handlers).join(',');
+        this.source = new EventSource(`/api/live/stream?datasets=${encodeURIComponent(datasets)}`);
+        this.source.addEventListener('dashboard', event => this.handleMessage(JSON.parse(event.data)));
+        this.source.onopen = () => console.log('📡 Dashboard temps réel connecté (SSE)');
+        // EventSource se reconnecte seul et renvoie les snapshots
+    }
+
+    // ==================== MESSAGES ====================
+    handleMessage(message) {
+        const { dataset, version } = message;
+        if (!this.handlers[dataset]) return;
+
+        if (message.type === 'snapshot') {
+            this.state[dataset] = message.data;
+        } else {
+            const expected = (this.versions[dataset] || 0) + 1;
+            if (this.versions[dataset] === undefined || version !== expected) {
+                // Delta manqué : repartir de l'état complet
+                this.resync(dataset);
+                return;
+            }
+            this.state[dataset] = this.applyDelta(this.state[dataset], message);
+        }
+        this.versions[dataset] = version;
+        this.handlers[dataset].forEach(callback => {
+            try {
+                callback(this.state[dataset]);
+            } catch (error) {
+                console.error(`❌ Erreur rendu temps réel ${dataset}:`, error);
+            }
+        });
+    }
+
+    applyDelta(current, delta) {
+        if ('replace' in delta) return delta.replace;
+        const next = Object.assign({}, current);
+        Object.assign(next, delta.changes);
+        (delta.removed || []).forEach(key => delete next[key]);
+        return next;
+    }
+
+    async resync(dataset) {
+        try {
+            const response = await fetch(`/api/live/snapshot/${dataset}`);
+            if (response.ok) {
+                this.handleMessage(await response.json());
+            }
+        } catch (error) {
+            console.error(`❌ Erreur resynchronisation ${dataset}:`, error);
+        }
+    }
+
+    stop() {
+        if (this.socket) this.socket.close();
+        if (this.source) this.source.close();
+        this.socket = null;
+        this.source = null;
+        this.transport = null;
+    }
+}
+
+window.arsenalLive = new ArsenalLive();
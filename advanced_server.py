@@ -4,16 +4,26 @@
 print("🚀 Démarrage du serveur Arsenal_V4 Advanced - v4.2.1...")
 
 try:
-    from flask import Flask, jsonify, request, session, send_from_directory, redirect, url_for, render_template_string
+    from flask import Flask, Response, jsonify, request, session, send_from_directory, redirect, url_for, render_template_string, stream_with_context
     from flask_cors import CORS
     from datetime import datetime, timedelta
     import secrets
     import hashlib
+    import hmac
     import json
     import os
     import sys
     import sqlite3
     from sqlite_database import ArsenalDatabase
+    from command_rollups import utc_now
+    from page_fragments import PageFragmentCache
+    from static_assets import get_asset_pipeline, serve_asset
+    from live_dashboard import DashboardPublisher
+    from discord_rest import DiscordHTTPError, RateLimited, get_discord_client
+    from user_context_cache import get_user_context_cache
+    from user_directory import InvalidQuery, UserDirectory
+    from request_metrics import init_app as init_request_metrics
+    from event_ingest import EventIngestor, InvalidBatch
     import urllib.parse
     import requests
     import time
@@ -51,7 +61,8 @@ try:
         sys.path.insert(0, backend_path)
         
         # NOUVEAU : Importer le système ArsenalCoins centralisé
-        from arsenal_coins_central import get_central_system, get_user_balance, add_user_money, remove_user_money
+        # Soldes servis par le cache write-behind (seul écrivain du registre dans ce processus)
+        from arsenal_coins_cache import get_cached_ledger
         
         from oauth_config import DiscordOAuth
         from casino_system import CasinoSystem  # NOUVEAU : Système de casino
@@ -59,8 +70,8 @@ try:
         casino = CasinoSystem()  # NOUVEAU : Instance du casino
         
         # Initialiser le système ArsenalCoins central
-        arsenal_coins = get_central_system()
-        print("🪙 ArsenalCoins Central System initialisé")
+        arsenal_coins = get_cached_ledger()
+        print("🪙 ArsenalCoins Central System initialisé (cache write-behind)")
         
         print("✅ Configuration OAuth Discord chargée")
         print("🎰 Système de casino initialisé")
@@ -119,11 +130,15 @@ try:
     app.secret_key = hashlib.sha256(secret_base.encode()).hexdigest()
     print(f"🔐 Secret key configurée: {app.secret_key[:16]}...")
     CORS(app, supports_credentials=True)
+    # Latence par route + temps SQLite / HTTP sortant de chaque requête (/metrics, /api/metrics)
+    request_metrics = init_request_metrics(app)
     
     # Initialiser la base de données
     # Configuration de la base de données
     DATABASE_PATH = "arsenal_v4.db"
     db = ArsenalDatabase()
+    command_rollups = db.rollups
+    COMMAND_LOG = 'command_logs'  # Log des commandes du bot (/api/commands/log, /api/ingest/batch)
     print("✅ Base de données initialisée")
     
     # Configuration
@@ -277,10 +292,17 @@ try:
             traceback.print_exc()
             return jsonify({"error": "Erreur lors du chargement du dashboard"}), 500
     
+    # Assets hachés et précompressés (gzip/brotli) une fois au démarrage
+    static_assets = get_asset_pipeline(os.path.join(os.path.dirname(__file__), '..', 'frontend'))
+    arsenal_assets = get_asset_pipeline(os.path.join(os.path.dirname(__file__), 'Arsenal_V4', 'webpanel', 'frontend'))
+    
     @app.route('/static/<path:filename>')
     def serve_static(filename):
         """Servir les fichiers statiques (CSS, JS, images)"""
         try:
+            response = serve_asset(static_assets, filename, request)
+            if response is not None:
+                return response
             static_path = os.path.join(os.path.dirname(__file__), '..', 'frontend')
             return send_from_directory(static_path, filename)
         except Exception as e:
@@ -291,15 +313,33 @@ try:
     def serve_arsenal_assets(filename):
         """Servir les assets du dashboard Arsenal V4"""
         try:
+            response = serve_asset(arsenal_assets, filename, request)
+            if response is not None:
+                return response
             assets_path = os.path.join(os.path.dirname(__file__), 'Arsenal_V4', 'webpanel', 'frontend')
             return send_from_directory(assets_path, filename)
         except Exception as e:
             print(f"❌ Erreur asset Arsenal V4: {e}")
             return jsonify({"error": "Asset non trouvé"}), 404
+    
+    @app.route('/api/assets/manifest')
+    def assets_manifest():
+        """URLs avec empreinte (cache immuable) et gains de compression des assets"""
+        return jsonify({
+            "static": {"prefix": "/static", "files": static_assets.manifest(), "report": static_assets.report()},
+            "arsenal": {
+                "prefix": "/Arsenal_V4/webpanel/frontend",
+                "files": arsenal_assets.manifest(),
+                "report": arsenal_assets.report()
+            }
+        })
 
+    # Fragments de pages extraits une fois, reconstruits quand le fichier change
+    page_fragment_cache = PageFragmentCache(os.path.join(os.path.dirname(__file__), '..', 'frontend'))
+    
     @app.route('/api/pages/<page_name>')
     def load_page_content(page_name):
-        """Charger le contenu d'une page HTML spécifique"""
+        """Charger le contenu d'une page HTML spécifique (cache mémoire + ETag, 304 si inchangé)"""
         try:
             # Vérifier que le nom de la page est sécurisé
             allowed_pages = [
@@ -311,30 +351,15 @@ try:
             if page_name not in allowed_pages:
                 return jsonify({"error": "Page non autorisée"}), 403
             
-            # Construire le chemin vers le fichier HTML
-            page_path = os.path.join(os.path.dirname(__file__), '..', 'frontend', f'{page_name}.html')
-            
-            if os.path.exists(page_path):
-                with open(page_path, 'r', encoding='utf-8') as f:
-                    full_content = f.read()
-                
-                # Extraire seulement le contenu du body si c'est un fichier HTML complet
-                import re
-                body_match = re.search(r'<body[^>]*>(.*?)</body>', full_content, re.DOTALL | re.IGNORECASE)
-                if body_match:
-                    content = body_match.group(1).strip()
-                else:
-                    # Si pas de balise body, prendre tout le contenu
-                    content = full_content
-                
-                # Nettoyer le contenu des scripts et styles externes si nécessaire
-                # Garder seulement le contenu principal
-                cleaned_content = re.sub(r'<script[^>]*>.*?</script>', '', content, flags=re.DOTALL | re.IGNORECASE)
-                cleaned_content = re.sub(r'<style[^>]*>.*?</style>', '', cleaned_content, flags=re.DOTALL | re.IGNORECASE)
-                
-                return jsonify({"content": cleaned_content, "page": page_name})
-            else:
+            # Fragment (body sans scripts/styles) extrait une seule fois par version du fichier
+            fragment = page_fragment_cache.get(page_name)
+            if fragment is None:
                 return jsonify({"error": "Page non trouvée"}), 404
+            
+            response = Response(fragment.payload, mimetype='application/json')
+            response.set_etag(fragment.etag)
+            response.headers['Cache-Control'] = 'no-cache'  # Revalidation systématique (304 si inchangé)
+            return response.make_conditional(request)
                 
         except Exception as e:
             print(f"❌ Erreur chargement page {page_name}: {e}")
@@ -518,149 +543,63 @@ try:
                 print("❌ Aucun code d'autorisation")
                 return jsonify({"error": "Code d'autorisation manquant"}), 400
             
-            # Échanger le code contre un token
-            token_data = {
-                'grant_type': 'authorization_code',
-                'code': code,
-                'redirect_uri': oauth.REDIRECT_URI
-            }
-            
-            # Headers requis pour l'API Discord avec authentification Basic + Anti-rate limiting
-            headers = {
-                'Content-Type': 'application/x-www-form-urlencoded',
-                'User-Agent': 'Arsenal-WebPanel/1.0 (https://arsenal-webpanel.onrender.com, arsenal@discord-bot.com)',
-                'Accept': 'application/json',
-                'Cache-Control': 'no-cache',
-                'Accept-Encoding': 'gzip, deflate',
-                'Connection': 'keep-alive'
-            }
-            
-            # Authentification Basic Auth (recommandée pour Discord)
-            import base64
-            credentials = base64.b64encode(f"{oauth.CLIENT_ID}:{oauth.CLIENT_SECRET}".encode()).decode()
-            headers['Authorization'] = f'Basic {credentials}'
-            
-            print(f"📤 Envoi vers Discord API:")
-            print(f"   CLIENT_ID: {oauth.CLIENT_ID}")
-            print(f"   CLIENT_SECRET: {'*' * (len(oauth.CLIENT_SECRET) - 4) + oauth.CLIENT_SECRET[-4:] if oauth.CLIENT_SECRET else 'VIDE'}")
-            print(f"   REDIRECT_URI: {oauth.REDIRECT_URI}")
-            print(f"   URL: {oauth.get_token_url()}")
-            print(f"   Auth Header: Basic {credentials[:20]}...")
-            print(f"   User-Agent: {headers['User-Agent']}")
-            
-            # DÉLAI ANTI-RATE LIMITING RÉDUIT
-            import time
-            time.sleep(0.2)  # Réduire à 0.2 seconde pour éviter timeout worker
-            
+            # Échanger le code contre un token (client partagé : keep-alive, rate limits par bucket)
+            discord_client = get_discord_client()
+            print(f"📤 Échange du code OAuth - CLIENT_ID: {oauth.CLIENT_ID}, REDIRECT_URI: {oauth.REDIRECT_URI}")
             try:
-                token_response = requests.post(
-                    oauth.get_token_url(), 
-                    data=token_data, 
-                    headers=headers,
-                    timeout=5,  # Réduire timeout à 5 secondes pour Render
-                    allow_redirects=False  # Pas de redirections automatiques
-                )
-                print(f"📥 Réponse Discord: {token_response.status_code}")
-                print(f"📄 Contenu réponse: {token_response.text[:500]}...")  # Limiter l'affichage
-                
-                # DÉTECTION RAPIDE DU RATE LIMITING AVANT PARSING
-                response_text = token_response.text.lower()
-                is_rate_limited = (
-                    token_response.status_code == 429 or
-                    "rate limited" in response_text or
-                    "cloudflare" in response_text or
-                    "access denied" in response_text or
-                    "error 1015" in response_text
-                )
-                
-                if is_rate_limited:
-                    print("🚫 Rate limiting détecté - Activation fallback immédiat")
-                    return handle_rate_limit_fallback(code)
-                
-                # Gérer les codes d'erreur spécifiques (code legacy pour compatibilité)
-                if token_response.status_code == 429:
-                    print("🚫 Code 429 détecté - Fallback direct")
-                    return handle_rate_limit_fallback(code)
-                
-                elif token_response.status_code == 403 or token_response.status_code == 1015:
+                token_json = discord_client.exchange_code(oauth.CLIENT_ID, oauth.CLIENT_SECRET, code, oauth.REDIRECT_URI)
+            except RateLimited as rate_limit:
+                print(f"🚫 {rate_limit} - Activation fallback immédiat")
+                return handle_rate_limit_fallback(code)
+            except DiscordHTTPError as http_error:
+                print(f"❌ Erreur token Discord: {http_error}")
+                if isinstance(http_error.payload, dict) and http_error.payload.get('error') == 'invalid_grant':
+                    # Si le code OAuth est invalide/expiré, rediriger vers login avec message d'erreur
+                    print("⚠️ Code OAuth expiré - Redirection vers login")
+                    return redirect('/login?error=oauth_expired')
+                if http_error.status == 403:
                     print("🚫 Accès bloqué par Cloudflare/Discord - Mode fallback")
                     return handle_rate_limit_fallback(code)
-                
-                # Vérifier si c'est du JSON valide
-                try:
-                    token_json = token_response.json()
-                except ValueError as json_error:
-                    print(f"❌ Réponse non-JSON de Discord: {json_error}")
-                    print(f"📄 Contenu brut: {token_response.text[:200]}")
-                    # Si le contenu contient "rate limited", activer le fallback
-                    if "rate limited" in token_response.text.lower() or "cloudflare" in token_response.text.lower():
-                        print("🔄 Activation mode fallback rate limit")
-                        return handle_rate_limit_fallback(code)
-                    return redirect('/login?error=discord_api_error')
-                
+                return jsonify({"error": "Échec d'obtention du token", "details": http_error.payload}), 400
+            except requests.exceptions.Timeout as timeout_error:
+                print(f"⏰ Timeout Discord API: {timeout_error} - Activation fallback")
+                return handle_rate_limit_fallback(code)
             except requests.exceptions.RequestException as req_error:
                 print(f"❌ Erreur requête Discord API: {req_error}")
-                # Si c'est un timeout, essayer le fallback
-                if "timeout" in str(req_error).lower() or "timed out" in str(req_error).lower():
-                    print("⏰ Timeout détecté - Activation fallback")
-                    return handle_rate_limit_fallback(code)
                 return redirect('/login?error=network_error')
             
-            if 'access_token' not in token_json:
-                print(f"❌ Erreur token: {token_json}")
-                # Si le code OAuth est invalide/expiré, rediriger vers login avec message d'erreur
-                if token_json.get('error') == 'invalid_grant':
-                    print("⚠️ Code OAuth expiré - Redirection vers login")
-                    return redirect('/login?error=oauth_expired')
-                return jsonify({"error": "Échec d'obtention du token", "details": token_json}), 400
+            if not isinstance(token_json, dict) or 'access_token' not in token_json:
+                print(f"❌ Réponse token inattendue: {token_json}")
+                return redirect('/login?error=discord_api_error')
             
             access_token = token_json['access_token']
             
-            # Récupérer les infos utilisateur avec délais anti-rate limiting
-            user_headers = {
-                'Authorization': f'Bearer {access_token}',
-                'User-Agent': 'Arsenal-WebPanel/1.0 (https://arsenal-webpanel.onrender.com, arsenal@discord-bot.com)',
-                'Accept': 'application/json'
-            }
-            
-            print(f"🔍 Récupération infos utilisateur...")
-            time.sleep(0.1)  # Délai réduit entre requêtes
+            # Infos utilisateur et serveurs récupérées en parallèle
+            print(f"🔍 Récupération infos utilisateur et serveurs...")
+            user_future, guilds_future = discord_client.fetch_user_and_guilds(access_token)
+            try:
+                user_data = user_future.result()
+            except (DiscordHTTPError, requests.exceptions.RequestException) as user_error:
+                print(f"❌ Erreur récupération utilisateur: {user_error}")
+                return redirect('/login?error=user_info_failed')
             
             try:
-                user_response = requests.get(oauth.get_user_info_url(), headers=user_headers, timeout=5)
-                if user_response.status_code != 200:
-                    print(f"❌ Erreur récupération utilisateur: {user_response.status_code}")
-                    return redirect('/login?error=user_info_failed')
-                user_data = user_response.json()
-                
-                # Récupérer les serveurs de l'utilisateur avec délai réduit
-                print(f"🔍 Récupération serveurs utilisateur...")
-                time.sleep(0.1)  # Délai réduit entre requêtes
-                
-                guilds_response = requests.get(oauth.get_user_guilds_url(), headers=user_headers, timeout=5)
-                if guilds_response.status_code != 200:
-                    print(f"❌ Erreur récupération serveurs: {guilds_response.status_code}")
-                    return redirect('/login?error=guilds_failed')
-                guilds_data = guilds_response.json()
-                
-            except requests.exceptions.RequestException as req_error:
-                print(f"❌ Erreur requêtes utilisateur Discord: {req_error}")
-                # Si c'est un timeout, essayer de continuer sans les serveurs
-                if "timeout" in str(req_error).lower() or "timed out" in str(req_error).lower():
-                    print("⏰ Timeout utilisateur - Authentification minimale")
-                    # Créer un utilisateur avec données minimales
-                    user_info = {
-                        'user_id': user_data.get('id', 'unknown'),
-                        'username': user_data.get('username', 'Utilisateur'),
-                        'discriminator': user_data.get('discriminator', '0000'),
-                        'avatar': user_data.get('avatar'),
-                        'guilds': []  # Pas de serveurs à cause du timeout
-                    }
-                    # Session minimale pour éviter le timeout complet
-                    session['user_info'] = user_info
-                    session['authenticated'] = True
-                    return redirect('/dashboard')
-                return redirect('/login?error=user_api_error')
+                guilds_data = guilds_future.result()
+            except requests.exceptions.Timeout:
+                # Timeout sur les serveurs seulement : authentification minimale
+                print("⏰ Timeout serveurs - Authentification minimale")
+                session['user_info'] = {
+                    'user_id': user_data.get('id', 'unknown'),
+                    'username': user_data.get('username', 'Utilisateur'),
+                    'discriminator': user_data.get('discriminator', '0000'),
+                    'avatar': user_data.get('avatar'),
+                    'guilds': []  # Pas de serveurs à cause du timeout
+                }
+                session['authenticated'] = True
+                return redirect('/dashboard')
+            except (DiscordHTTPError, requests.exceptions.RequestException) as guilds_error:
+                print(f"❌ Erreur récupération serveurs: {guilds_error}")
+                return redirect('/login?error=guilds_failed')
             
             print(f"🔍 Serveurs Discord de l'utilisateur: {len(guilds_data)} serveurs trouvés")
             
@@ -802,6 +741,7 @@ try:
                 # Forcer la sauvegarde de la session avec session personnalisée 
                 session.modified = True
                 session.permanent = True
+                user_context_cache.invalidate(str(user_info['user_id']))  # Serveurs/grade fraîchement récupérés
                 
                 print(f"✅ Session créée pour {user_info['username']} - Niveau: {permission_level} - Token: {session_token}")
                 
@@ -1140,22 +1080,23 @@ try:
     
     @app.route('/api/system/monitor', methods=['GET'])
     def system_monitor():
-        """Monitoring système en temps réel"""
+        """Monitoring système en temps réel (dernier échantillon du thread de métriques)
+
+        ?window=<secondes> ajoute l'historique sous-échantillonné (?points=, défaut 120)
+        """
         try:
-            import psutil
+            from utils.metrics_sampler import get_metrics_sampler
             
-            system_stats = {
-                'cpu_usage': psutil.cpu_percent(interval=1),
-                'memory_usage': psutil.virtual_memory().percent,
-                'disk_usage': psutil.disk_usage('.').percent,
-                'network_io': {
-                    'sent': psutil.net_io_counters().bytes_sent,
-                    'recv': psutil.net_io_counters().bytes_recv
-                },
-                'processes': len(psutil.pids()),
-                'boot_time': psutil.boot_time(),
-                'timestamp': time.time()
-            }
+            sampler = get_metrics_sampler()
+            system_stats = sampler.latest()
+            if system_stats is None:
+                return jsonify({'error': 'psutil non disponible'}), 503
+            
+            window = request.args.get('window', type=float)
+            if window:
+                points = request.args.get('points', 120, type=int)
+                system_stats['history'] = sampler.window(min(window, 86400), max(1, min(points, 1000)))
+            system_stats['sampler'] = sampler.get_status()
             
             return jsonify(system_stats)
         except Exception as e:
@@ -1202,41 +1143,35 @@ try:
 
     @app.route('/api/analytics/overview', methods=['GET'])
     def analytics_overview():
-        """Vue d'ensemble des analytics"""
+        """Vue d'ensemble des analytics (agrégats horaires / journaliers, UTC)"""
         try:
+            now = utc_now()
+            today = now.strftime('%Y-%m-%d')
+            day = command_rollups.bucket(COMMAND_LOG, 'day', today)
+            week = command_rollups.compare(COMMAND_LOG, 7, now)
+            top_commands = command_rollups.top(COMMAND_LOG, 'command', 'day', today, today, limit=5)
+            
             analytics = {
                 'daily_stats': {
-                    'commands_executed': 156,
-                    'messages_processed': 1247,
-                    'new_users': 8,
-                    'active_users': 28,
-                    'music_plays': 23
+                    'commands_executed': day['total'],
+                    'active_users': day['active_users'],
+                    'music_plays': command_rollups.bucket(COMMAND_LOG, 'day', today, 'command', 'play')['total'],
+                    'success_rate': day['success_rate'],
+                    'avg_execution_time': day['avg_execution_time']
                 },
                 'weekly_trends': {
-                    'commands_growth': '+12.5%',
-                    'users_growth': '+8.2%',
-                    'activity_growth': '+15.7%'
+                    'commands_growth': f"{week['commands_growth']:+.1f}%",
+                    'users_growth': f"{week['users_growth']:+.1f}%",
+                    'commands_week': week['current']['total']
                 },
                 'top_commands': [
-                    {'name': 'play', 'count': 45, 'percentage': 28.8},
-                    {'name': 'ping', 'count': 32, 'percentage': 20.5},
-                    {'name': 'info', 'count': 18, 'percentage': 11.5},
-                    {'name': 'skip', 'count': 15, 'percentage': 9.6},
-                    {'name': 'queue', 'count': 12, 'percentage': 7.7}
+                    {'name': item['name'], 'count': item['total'],
+                     'percentage': round(item['total'] / day['total'] * 100, 1) if day['total'] else 0}
+                    for item in top_commands
                 ],
                 'hourly_activity': [
-                    {'hour': '00:00', 'activity': 12},
-                    {'hour': '01:00', 'activity': 8},
-                    {'hour': '02:00', 'activity': 5},
-                    {'hour': '03:00', 'activity': 3},
-                    {'hour': '04:00', 'activity': 2},
-                    {'hour': '05:00', 'activity': 4},
-                    {'hour': '06:00', 'activity': 15},
-                    {'hour': '07:00', 'activity': 28},
-                    {'hour': '08:00', 'activity': 45},
-                    {'hour': '09:00', 'activity': 52},
-                    {'hour': '10:00', 'activity': 38},
-                    {'hour': '11:00', 'activity': 42}
+                    {'hour': f"{item['bucket'][-2:]}:00", 'activity': item['total'], 'active_users': item['active_users']}
+                    for item in command_rollups.series(COMMAND_LOG, 'hour', 12, now)
                 ]
             }
             
@@ -2227,21 +2162,79 @@ try:
             "user": session['user_info']
         })
     
-    @app.route('/api/user/role')
-    def get_user_role():
-        """Récupérer le grade/rôle de l'utilisateur connecté"""
-        if 'user_info' not in session:
-            return jsonify({"error": "Non connecté", "redirect": "/login"}), 401
-        
-        user_id = session['user_info'].get('user_id', '')
-        username = session['user_info'].get('username', 'Inconnu')
-        
-        # Connexion à la base de données
+    # Permissions par niveau d'accès
+    PERMISSIONS_BY_LEVEL = {
+        "member": {
+            "dashboard": True,
+            "view_stats": True,
+            "games": True,
+            "music_basic": True,
+            "profile": True
+        },
+        "moderator": {
+            "dashboard": True,
+            "view_stats": True,
+            "games": True,
+            "music_control": True,
+            "moderation_basic": True,
+            "profile": True
+        },
+        "admin": {
+            "dashboard": True,
+            "view_stats": True,
+            "games": True,
+            "music_control": True,
+            "moderation_full": True,
+            "server_config": True,
+            "user_management": True,
+            "profile": True
+        },
+        "owner": {
+            "dashboard": True,
+            "view_stats": True,
+            "games": True,
+            "music_control": True,
+            "moderation_full": True,
+            "server_config": True,
+            "user_management": True,
+            "bot_control": True,
+            "profile": True
+        },
+        "creator": {
+            "dashboard": True,
+            "view_stats": True,
+            "games": True,
+            "music_control": True,
+            "moderation_full": True,
+            "server_config": True,
+            "user_management": True,
+            "bot_control": True,
+            "bot_hosting": True,
+            "system_admin": True,
+            "profile": True
+        }
+    }
+    
+    # Grades spéciaux pour certains utilisateurs
+    SPECIAL_ROLES = {
+        "431359112039890945": {"role_type": "creator", "role_display": "Créateur"},  # xero3elite
+        "1347175956015480863": {"role_type": "founder", "role_display": "Fondateur"},  # layzoxx
+    }
+    
+    DEFAULT_ROLE = {
+        "role_type": "member",
+        "role_display": "Membre",
+        "permissions": "basic",
+        "assigned_at": None
+    }
+    
+    user_context_cache = get_user_context_cache()
+    
+    def load_user_role(user_id, username):
+        """Grade de l'utilisateur depuis la table user_roles"""
         conn = sqlite3.connect('arsenal_v4.db')
-        cursor = conn.cursor()
-        
         try:
-            # Chercher le rôle de l'utilisateur
+            cursor = conn.cursor()
             cursor.execute('''
                 SELECT role_type, role_display, permissions, assigned_at 
                 FROM user_roles 
@@ -2250,56 +2243,70 @@ try:
                 ORDER BY assigned_at DESC 
                 LIMIT 1
             ''', (user_id, username))
-            
             role_data = cursor.fetchone()
-            
-            if role_data:
-                role_info = {
-                    "role_type": role_data[0],
-                    "role_display": role_data[1],
-                    "permissions": role_data[2],
-                    "assigned_at": role_data[3]
-                }
-            else:
-                # Grade par défaut
-                role_info = {
-                    "role_type": "member",
-                    "role_display": "Membre",
-                    "permissions": "basic",
-                    "assigned_at": None
-                }
-            
-            # Grades spéciaux pour certains utilisateurs
-            SPECIAL_ROLES = {
-                "431359112039890945": {"role_type": "creator", "role_display": "Créateur"},  # xero3elite
-                "1347175956015480863": {"role_type": "founder", "role_display": "Fondateur"},  # layzoxx
-            }
-            
-            if user_id in SPECIAL_ROLES:
-                role_info.update(SPECIAL_ROLES[user_id])
-                print(f"🎯 Grade spécial assigné à {username}: {role_info['role_display']}")
-            
+        finally:
             conn.close()
-            
+        
+        if role_data:
+            role_info = {
+                "role_type": role_data[0],
+                "role_display": role_data[1],
+                "permissions": role_data[2],
+                "assigned_at": role_data[3]
+            }
+        else:
+            role_info = dict(DEFAULT_ROLE)
+        
+        if user_id in SPECIAL_ROLES:
+            role_info.update(SPECIAL_ROLES[user_id])
+            print(f"🎯 Grade spécial assigné à {username}: {role_info['role_display']}")
+        return role_info
+    
+    def load_user_context(user_info):
+        """Contexte complet d'un utilisateur connecté : identité, serveurs, grade, permissions"""
+        user_id = str(user_info.get('user_id', ''))
+        username = user_info.get('username', 'Inconnu')
+        permission_level = user_info.get('permission_level', 'member')
+        return {
+            "user_id": user_id,
+            "username": username,
+            "discriminator": user_info.get('discriminator'),
+            "avatar": user_info.get('avatar'),
+            "permission_level": permission_level,
+            "permissions": PERMISSIONS_BY_LEVEL.get(permission_level, PERMISSIONS_BY_LEVEL["member"]),
+            "accessible_servers": user_info.get('accessible_servers', []),
+            "guilds_count": user_info.get('guilds_count', 0),
+            "role": load_user_role(user_id, username),
+        }
+    
+    def current_user_context():
+        """Contexte de l'utilisateur de la session (une lecture par utilisateur et par TTL)"""
+        user_info = session['user_info']
+        return user_context_cache.get(str(user_info.get('user_id', '')), lambda: load_user_context(user_info))
+    
+    @app.route('/api/user/role')
+    def get_user_role():
+        """Récupérer le grade/rôle de l'utilisateur connecté"""
+        if 'user_info' not in session:
+            return jsonify({"error": "Non connecté", "redirect": "/login"}), 401
+        
+        user_id = session['user_info'].get('user_id', '')
+        username = session['user_info'].get('username', 'Inconnu')
+        
+        try:
             return jsonify({
                 "success": True,
-                "role": role_info,
+                "role": current_user_context()["role"],
                 "username": username,
                 "user_id": user_id
             })
             
         except Exception as e:
-            conn.close()
             print(f"❌ Erreur récupération rôle: {e}")
             return jsonify({
                 "success": False,
                 "error": str(e),
-                "role": {
-                    "role_type": "member",
-                    "role_display": "Membre",
-                    "permissions": "basic",
-                    "assigned_at": None
-                }
+                "role": DEFAULT_ROLE
             }), 500
     
     @app.route('/api/user/permissions')
@@ -2308,69 +2315,40 @@ try:
         if 'user_info' not in session:
             return jsonify({"error": "Non connecté"}), 401
         
-        user_info = session['user_info']
-        permission_level = user_info.get('permission_level', 'member')
-        
-        # Définir les permissions par niveau
-        permissions = {
-            "member": {
-                "dashboard": True,
-                "view_stats": True,
-                "games": True,
-                "music_basic": True,
-                "profile": True
-            },
-            "moderator": {
-                "dashboard": True,
-                "view_stats": True,
-                "games": True,
-                "music_control": True,
-                "moderation_basic": True,
-                "profile": True
-            },
-            "admin": {
-                "dashboard": True,
-                "view_stats": True,
-                "games": True,
-                "music_control": True,
-                "moderation_full": True,
-                "server_config": True,
-                "user_management": True,
-                "profile": True
-            },
-            "owner": {
-                "dashboard": True,
-                "view_stats": True,
-                "games": True,
-                "music_control": True,
-                "moderation_full": True,
-                "server_config": True,
-                "user_management": True,
-                "bot_control": True,
-                "profile": True
-            },
-            "creator": {
-                "dashboard": True,
-                "view_stats": True,
-                "games": True,
-                "music_control": True,
-                "moderation_full": True,
-                "server_config": True,
-                "user_management": True,
-                "bot_control": True,
-                "bot_hosting": True,
-                "system_admin": True,
-                "profile": True
-            }
-        }
+        try:
+            context = current_user_context()
+        except Exception as e:
+            print(f"❌ Erreur contexte utilisateur: {e}")
+            return jsonify({"success": False, "error": str(e)}), 500
         
         return jsonify({
             "success": True,
-            "permission_level": permission_level,
-            "permissions": permissions.get(permission_level, permissions["member"]),
-            "accessible_servers": user_info.get('accessible_servers', [])
+            "permission_level": context["permission_level"],
+            "permissions": context["permissions"],
+            "accessible_servers": context["accessible_servers"]
         })
     
+    @app.route('/auth/logout', methods=['GET', 'POST'])
+    def auth_logout():
+        """Déconnexion : session Flask, cookie de secours et contexte en cache"""
+        user_info = session.pop('user_info', None)
+        if user_info:
+            user_context_cache.invalidate(str(user_info.get('user_id', '')))
+            print(f"👋 Déconnexion de {user_info.get('username', 'Inconnu')}")
+        session.clear()
+        response = jsonify({"success": True}) if request.method == 'POST' else redirect('/login')
+        response.delete_cookie('arsenal_session_backup')
+        return response
+    
+    @app.route('/api/admin/cache/stats')
+    def api_admin_cache_stats():
+        """Compteurs du cache de contexte utilisateur (hits/misses)"""
+        if 'user_info' not in session:
+            return jsonify({"success": False, "message": "Non authentifié"}), 401
+        if current_user_context()["permission_level"] not in ('admin', 'super_admin', 'owner', 'creator'):
+            return jsonify({"success": False, "message": "Accès refusé"}), 403
+        return jsonify({"success": True, "user_context": user_context_cache.get_stats()})
+    
     @app.route('/api')
     def api_info():
         """Informations API"""
@@ -2776,7 +2754,8 @@ try:
             
             # Essayer d'obtenir les vraies métriques système
             try:
-                cpu_percent = psutil.cpu_percent(interval=1)
+                from utils.metrics_sampler import get_metrics_sampler
+                cpu_percent = get_metrics_sampler().latest()['cpu_usage']
                 memory = psutil.virtual_memory()
                 memory_mb = round(memory.used / 1024 / 1024)
                 
@@ -3380,6 +3359,7 @@ try:
             
             conn.commit()
             conn.close()
+            command_rollups.after_insert(COMMAND_LOG)
             
             return jsonify({"status": "logged"})
             
@@ -3416,6 +3396,30 @@ try:
         except Exception as e:
             print(f"❌ Erreur update serveur: {e}")
             return jsonify({"error": "Erreur serveur"}), 500
+
+    event_ingestor = EventIngestor(DATABASE_PATH, rollups=command_rollups)
+
+    @app.route('/api/ingest/batch', methods=['POST'])
+    def ingest_batch():
+        """Lot d'événements du bot (EventShipper) : une transaction, un executemany par type"""
+        token = os.environ.get('ARSENAL_INGEST_TOKEN')
+        if token and not hmac.compare_digest(request.headers.get('Authorization', '').encode(), f"Bearer {token}".encode()):
+            return jsonify({"error": "Non autorisé"}), 401
+        data = request.get_json(silent=True) or {}
+        if not isinstance(data, dict):
+            return jsonify({"error": "Objet JSON attendu"}), 400
+        try:
+            counts = event_ingestor.ingest(data.get('events'))
+            return jsonify({"status": "ingested", "counts": counts})
+        except InvalidBatch as e:
+            return jsonify({"error": str(e)}), 400
+        except sqlite3.OperationalError as e:
+            # Base verrouillée : erreur transitoire, le bot renverra le lot
+            print(f"⚠️ Ingestion lot différée: {e}")
+            return jsonify({"error": "Base occupée"}), 503
+        except Exception as e:
+            print(f"❌ Erreur ingestion lot: {e}")
+            return jsonify({"error": "Erreur serveur"}), 500
         
     @app.route('/api/stats/real')
     def get_real_stats():
@@ -3432,22 +3436,12 @@ try:
             cursor.execute('SELECT SUM(member_count) FROM connected_servers')
             total_members = cursor.fetchone()[0] or 0
             
-            # Commandes dernières 24h
-            cursor.execute('''
-                SELECT COUNT(*) FROM command_logs 
-                WHERE timestamp > datetime('now', '-1 day')
-            ''')
-            commands_24h = cursor.fetchone()[0]
-            
-            # Commandes dernière heure
-            cursor.execute('''
-                SELECT COUNT(*) FROM command_logs 
-                WHERE timestamp > datetime('now', '-1 hour')
-            ''')
-            commands_1h = cursor.fetchone()[0]
-            
             conn.close()
             
+            # Commandes 24h / dernière heure : agrégats horaires (plus de COUNT sur tout le log)
+            commands_24h = command_rollups.window(COMMAND_LOG, 24)['total']
+            commands_1h = command_rollups.window(COMMAND_LOG, 1)['total']
+            
             return jsonify({
                 'servers': servers_count,
                 'users': total_members,
@@ -3464,25 +3458,37 @@ try:
 
     @app.route('/api/analytics/commands')
     def get_command_analytics():
-        """Analytiques des commandes"""
+        """Analytiques des commandes (7 derniers jours, agrégats journaliers UTC)"""
         try:
-            # Données simulées pour l'instant
+            now = utc_now()
+            first_day = (now - timedelta(days=6)).strftime('%Y-%m-%d')
+            today = now.strftime('%Y-%m-%d')
+            week = command_rollups.compare(COMMAND_LOG, 7, now)
+            total_week = week['current']['total']
+            
             analytics = {
                 "most_used_commands": [
-                    {"name": "play", "count": 1547, "percentage": 25.3},
-                    {"name": "skip", "count": 892, "percentage": 14.6},
-                    {"name": "queue", "count": 743, "percentage": 12.2},
-                    {"name": "help", "count": 654, "percentage": 10.7},
-                    {"name": "ban", "count": 432, "percentage": 7.1}
+                    {"name": item['name'], "count": item['total'],
+                     "percentage": round(item['total'] / total_week * 100, 1) if total_week else 0,
+                     "success_rate": item['success_rate'], "avg_execution_time": item['avg_execution_time']}
+                    for item in command_rollups.top(COMMAND_LOG, 'command', 'day', first_day, today, limit=10)
+                ],
+                "top_servers": [
+                    {"server_id": item['name'], "count": item['total'], "success_rate": item['success_rate']}
+                    for item in command_rollups.top(COMMAND_LOG, 'server', 'day', first_day, today, limit=5)
                 ],
                 "commands_per_hour": [
-                    {"hour": "00:00", "count": 12},
-                    {"hour": "01:00", "count": 8},
-                    {"hour": "02:00", "count": 5},
-                    # ... plus de données
+                    {"hour": f"{item['bucket'][-2:]}:00", "count": item['total']}
+                    for item in command_rollups.series(COMMAND_LOG, 'hour', 24, now)
+                ],
+                "commands_per_day": [
+                    {"day": item['bucket'], "count": item['total'], "active_users": item['active_users']}
+                    for item in command_rollups.series(COMMAND_LOG, 'day', 7, now)
                 ],
-                "total_commands_week": 6854,
-                "growth_percentage": 12.5
+                "total_commands_week": total_week,
+                "success_rate": week['current']['success_rate'],
+                "avg_execution_time": week['current']['avg_execution_time'],
+                "growth_percentage": week['commands_growth']
             }
             
             return jsonify(analytics)
@@ -3720,6 +3726,9 @@ except Exception as init_error:
     raise
 
 # ===== INITIALISATION AUTOMATIQUE (GUNICORN COMPATIBLE) =====
+# Défini hors du try : __main__ en a besoin même si l'initialisation échoue
+socketio = None
+
 try:
     print("🌐 Serveur Flask Arsenal_V4 démarré")
     print("📡 API complète avec authentification Discord")
@@ -3958,9 +3967,20 @@ try:
     # ==================== API ADMINISTRATION ====================
 
 
+    user_directory = UserDirectory(DATABASE_PATH, stats_ttl=15)
+
+    def admin_users_query():
+        """Paramètres de liste communs à /api/admin/users et à l'export"""
+        return {
+            'search': request.args.get('q', ''),
+            'filter_name': request.args.get('filter', 'all'),
+            'sort': request.args.get('sort', 'username'),
+            'order': request.args.get('order', 'asc')
+        }
+
     @app.route('/api/admin/users')
     def api_admin_users():
-        """API pour récupérer tous les utilisateurs avec leurs données"""
+        """API paginée des utilisateurs : ?q=&filter=&sort=&order=&cursor=&limit="""
         try:
             if 'user_info' not in session:
                 return jsonify({"success": False, "message": "Non authentifié"}), 401
@@ -3972,73 +3992,44 @@ try:
             if user_info.get('discord_id') not in admin_discord_ids:
                 return jsonify({"success": False, "message": "Accès refusé"}), 403
             
-            # Récupérer tous les utilisateurs depuis la base de données
-            cursor = get_db_connection().cursor()
-            
-            # Requête pour récupérer tous les utilisateurs avec leurs données
-            cursor.execute("""
-                SELECT 
-                    id as user_id,
-                    id as discord_id,
-                    username,
-                    avatar,
-                    created_at,
-                    last_seen as last_activity,
-                    0 as arsenal_coins,
-                    0 as arsenal_gems,
-                    0 as arsenal_xp,
-                    0 as is_vip,
-                    is_banned,
-                    0 as is_online
-                FROM users 
-                ORDER BY username ASC
-            """)
-            
-            users = []
-            for row in cursor.fetchall():
-                user_data = {
-                    'user_id': row[0],
-                    'discord_id': row[1],
-                    'username': row[2] or f"User_{row[1][-4:]}",
-                    'avatar': row[3],
-                    'created_at': row[4],
-                    'last_activity': row[5],
-                    'arsenal_coins': row[6] or 0,
-                    'arsenal_gems': row[7] or 0,
-                    'arsenal_xp': row[8] or 0,
-                    'is_vip': bool(row[9]),
-                    'is_banned': bool(row[10]),
-                    'is_online': bool(row[11])
-                }
-                users.append(user_data)
-            
-            # Calculer les statistiques
-            total_users = len(users)
-            total_coins = sum(user['arsenal_coins'] for user in users)
-            total_gems = sum(user['arsenal_gems'] for user in users)
-            total_xp = sum(user['arsenal_xp'] for user in users)
-            online_users = sum(1 for user in users if user['is_online'])
-            richest_user = users[0]['username'] if users else None
-            
-            stats = {
-                'total_users': total_users,
-                'total_coins': total_coins,
-                'total_gems': total_gems,
-                'total_xp': total_xp,
-                'online_users': online_users,
-                'richest_user': richest_user
-            }
+            query = admin_users_query()
+            page = user_directory.page(cursor=request.args.get('cursor'),
+                                       limit=request.args.get('limit', 100, type=int), **query)
             
             return jsonify({
                 "success": True,
-                "users": users,
-                "stats": stats
+                **page,
+                "stats": user_directory.stats(query['search'], query['filter_name'])
             })
             
+        except InvalidQuery as e:
+            return jsonify({"success": False, "message": str(e)}), 400
         except Exception as e:
             print(f"❌ Erreur API admin users: {e}")
             return jsonify({"success": False, "message": str(e)}), 500
 
+    @app.route('/api/admin/users/export')
+    def api_admin_users_export():
+        """Export JSON complet, streamé au fil de la lecture (mêmes filtres que la liste)"""
+        if 'user_info' not in session:
+            return jsonify({"success": False, "message": "Non authentifié"}), 401
+        
+        user_info = session.get('user_info', {})
+        admin_discord_ids = ['1234567890']  # Ajoutez vos IDs Discord admin ici
+        
+        if user_info.get('discord_id') not in admin_discord_ids:
+            return jsonify({"success": False, "message": "Accès refusé"}), 403
+        
+        try:
+            chunks = user_directory.iter_export(**admin_users_query())
+        except InvalidQuery as e:
+            return jsonify({"success": False, "message": str(e)}), 400
+        
+        response = Response(stream_with_context(chunks), mimetype='application/json')
+        response.headers['Content-Disposition'] = 'attachment; filename=arsenal_users.json'
+        response.headers['X-Accel-Buffering'] = 'no'
+        return response
+
     @app.route('/api/admin/user/<user_id>/edit', methods=['POST'])
     def api_admin_edit_user(user_id):
         """API pour éditer un utilisateur"""
@@ -4057,15 +4048,22 @@ try:
             arsenal_gems = int(data.get('arsenal_gems', 0))
             arsenal_xp = int(data.get('arsenal_xp', 0))
             
-            # Mettre à jour l'utilisateur
-            cursor = get_db_connection().cursor()
-            cursor.execute("""
-                UPDATE users 
-                SET arsenal_coins = ?, arsenal_gems = ?, arsenal_xp = ?
-                WHERE id = ?
-            """, (arsenal_coins, arsenal_gems, arsenal_xp, user_id))
-            
-            get_db_connection().commit()
+            # Mettre à jour l'utilisateur (colonnes économie ajoutées par l'annuaire si absentes)
+            user_directory.columns()
+            conn = sqlite3.connect(DATABASE_PATH)
+            try:
+                updated = conn.execute("""
+                    UPDATE users 
+                    SET arsenal_coins = ?, arsenal_gems = ?, arsenal_xp = ?
+                    WHERE id = ?
+                """, (arsenal_coins, arsenal_gems, arsenal_xp, user_id)).rowcount
+                conn.commit()
+            finally:
+                conn.close()
+            if not updated:
+                return jsonify({"success": False, "message": "Utilisateur introuvable"}), 404
+            user_context_cache.invalidate(str(user_id))
+            user_directory.invalidate()
             
             return jsonify({"success": True, "message": "Utilisateur mis à jour"})
             
@@ -4086,15 +4084,20 @@ try:
             if user_info.get('discord_id') not in admin_discord_ids:
                 return jsonify({"success": False, "message": "Accès refusé"}), 403
             
-            cursor = get_db_connection().cursor()
-            
-            # Toggle VIP status
-            cursor.execute("SELECT is_vip FROM users WHERE id = ?", (user_id,))
-            current_vip = cursor.fetchone()[0]
-            new_vip = not bool(current_vip)
-            
-            cursor.execute("UPDATE users SET is_vip = ? WHERE id = ?", (new_vip, user_id))
-            get_db_connection().commit()
+            # Toggle VIP status (colonne is_vip ajoutée par l'annuaire si absente)
+            user_directory.columns()
+            conn = sqlite3.connect(DATABASE_PATH)
+            try:
+                conn.execute("UPDATE users SET is_vip = 1 - COALESCE(is_vip, 0) WHERE id = ?", (user_id,))
+                row = conn.execute("SELECT is_vip FROM users WHERE id = ?", (user_id,)).fetchone()
+                conn.commit()
+            finally:
+                conn.close()
+            if row is None:
+                return jsonify({"success": False, "message": "Utilisateur introuvable"}), 404
+            new_vip = bool(row[0])
+            user_context_cache.invalidate(str(user_id))
+            user_directory.invalidate()
             
             return jsonify({"success": True, "message": f"VIP {'activé' if new_vip else 'désactivé'}"})
             
@@ -4115,15 +4118,19 @@ try:
             if user_info.get('discord_id') not in admin_discord_ids:
                 return jsonify({"success": False, "message": "Accès refusé"}), 403
             
-            cursor = get_db_connection().cursor()
-            
             # Toggle ban status
-            cursor.execute("SELECT is_banned FROM users WHERE id = ?", (user_id,))
-            current_ban = cursor.fetchone()[0]
-            new_ban = not bool(current_ban)
-            
-            cursor.execute("UPDATE users SET is_banned = ? WHERE id = ?", (new_ban, user_id))
-            get_db_connection().commit()
+            conn = sqlite3.connect(DATABASE_PATH)
+            try:
+                conn.execute("UPDATE users SET is_banned = 1 - COALESCE(is_banned, 0) WHERE id = ?", (user_id,))
+                row = conn.execute("SELECT is_banned FROM users WHERE id = ?", (user_id,)).fetchone()
+                conn.commit()
+            finally:
+                conn.close()
+            if row is None:
+                return jsonify({"success": False, "message": "Utilisateur introuvable"}), 404
+            new_ban = bool(row[0])
+            user_context_cache.invalidate(str(user_id))
+            user_directory.invalidate()
             
             return jsonify({"success": True, "message": f"Utilisateur {'banni' if new_ban else 'débanni'}"})
             
@@ -4511,6 +4518,103 @@ try:
         except Exception as e:
             return jsonify({"success": False, "message": str(e)}), 500
 
+    # ==================== DASHBOARD TEMPS RÉEL (SOCKET.IO / SSE) ====================
+    
+    def view_payload(view):
+        """Producteur de jeu de données : réponse JSON d'une route existante, calculée une fois par échéance"""
+        def produce():
+            with app.test_request_context():
+                result = view()
+            response = result[0] if isinstance(result, tuple) else result
+            return response.get_json()
+        return produce
+    
+    def users_version():
+        """Jeton de changement de la table users (la liste elle-même reste chargée avec la session admin)"""
+        conn = sqlite3.connect(DATABASE_PATH)
+        try:
+            total, last_seen, banned = conn.execute(
+                "SELECT COUNT(*), MAX(last_seen), SUM(is_banned) FROM users"
+            ).fetchone()
+        finally:
+            conn.close()
+        return {"total": total, "last_seen": last_seen, "banned": banned or 0}
+    
+    live_publisher = DashboardPublisher(tick=1.0)
+    live_publisher.register('bot_status', view_payload(get_bot_status_dashboard), interval=10)
+    live_publisher.register('stats', view_payload(get_stats), interval=30)
+    live_publisher.register('performance', view_payload(api_performance), interval=5)
+    live_publisher.register('system', view_payload(system_monitor), interval=5)
+    live_publisher.register('activity', view_payload(get_activity_feed), interval=30)
+    live_publisher.register('servers', view_payload(get_servers_list), interval=60)
+    live_publisher.register('users_version', users_version, interval=15)
+    
+    try:
+        from flask_socketio import SocketIO
+        socketio = SocketIO(app, cors_allowed_origins="*", async_mode='threading')
+        live_publisher.attach_socketio(socketio)
+        print("✅ Socket.IO activé pour le dashboard temps réel")
+    except ImportError:
+        print("⚠️ flask_socketio non disponible - dashboard temps réel en SSE uniquement")
+    live_publisher.start()
+    
+    @app.route('/api/live/stream')
+    def live_stream():
+        """Flux SSE : snapshots puis deltas des jeux de données demandés (?datasets=stats,bot_status)"""
+        names = [name for name in request.args.get('datasets', '').split(',') if name]
+        subscription = live_publisher.subscribe_sse(names or live_publisher.datasets.keys())
+        return Response(
+            live_publisher.sse_stream(subscription),
+            mimetype='text/event-stream',
+            headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+        )
+    
+    @app.route('/api/live/snapshot/<dataset>')
+    def live_snapshot(dataset):
+        """État complet d'un jeu de données (resynchronisation après un trou de version)"""
+        if dataset not in live_publisher.datasets:
+            return jsonify({"error": "Jeu de données inconnu"}), 404
+        return jsonify(live_publisher.snapshot(dataset))
+    
+    @app.route('/api/live/stats')
+    def live_stats():
+        """Clients connectés et calculs effectués par jeu de données"""
+        return jsonify(live_publisher.get_stats())
+    
+    # ==================== MÉTRIQUES DE LATENCE ====================
+    
+    @app.route('/metrics')
+    def prometheus_metrics():
+        """Compteurs et histogrammes au format texte Prometheus"""
+        token = os.environ.get('ARSENAL_METRICS_TOKEN')
+        # Comparaison à temps constant : pas de fuite du jeton par la durée de la réponse
+        if token and not hmac.compare_digest(request.headers.get('Authorization', '').encode(), f"Bearer {token}".encode()):
+            return Response("Non autorisé\n", status=401, mimetype='text/plain')
+        return Response(request_metrics.render_prometheus(), mimetype='text/plain; version=0.0.4; charset=utf-8')
+    
+    @app.route('/api/metrics')
+    def api_request_metrics():
+        """Latence par route, dépendances et requêtes lentes (performance.html, admins : chemins et SQL inclus)"""
+        if 'user_info' not in session:
+            return jsonify({"success": False, "message": "Non authentifié"}), 401
+        if current_user_context()["permission_level"] not in ('admin', 'super_admin', 'owner', 'creator'):
+            return jsonify({"success": False, "message": "Accès refusé"}), 403
+        return jsonify({"success": True, **request_metrics.snapshot(top=request.args.get('top', 20, type=int))})
+    
+    @app.route('/api/metrics/slow', methods=['POST'])
+    def api_slow_requests_switch():
+        """Activer (threshold_ms) ou couper (null) l'échantillonnage des requêtes lentes"""
+        if 'user_info' not in session:
+            return jsonify({"success": False, "message": "Non authentifié"}), 401
+        if current_user_context()["permission_level"] not in ('admin', 'super_admin', 'owner', 'creator'):
+            return jsonify({"success": False, "message": "Accès refusé"}), 403
+        threshold = (request.get_json(silent=True) or {}).get('threshold_ms')
+        try:
+            request_metrics.set_slow_threshold(float(threshold) if threshold is not None else None)
+        except (TypeError, ValueError):
+            return jsonify({"success": False, "message": "threshold_ms invalide"}), 400
+        return jsonify({"success": True, "threshold_ms": request_metrics.slow_threshold_ms})
+
 except Exception as server_init_error:
     print(f"❌ Erreur lors de l'initialisation du serveur: {server_init_error}")
     import traceback
@@ -4523,7 +4627,10 @@ if __name__ == '__main__':
     print(f"🚀 Démarrage du serveur Flask...")
     
     try:
-        app.run(host=host, port=port, debug=debug)
+        if socketio is not None:
+            socketio.run(app, host=host, port=port, debug=debug, allow_unsafe_werkzeug=True)
+        else:
+            app.run(host=host, port=port, debug=debug, threaded=True)
     except KeyboardInterrupt:
         print("\n🛑 Arrêt du serveur...")
     except Exception as runtime_error:
@@ -0,0 +1,359 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+⚡ Arsenal Coins - Cache write-behind des soldes
+================================================
+Couche en mémoire au-dessus de ArsenalCoinsCentral pour les chemins chauds
+(récompenses XP par message, spins de casino...)
+
+Fonctionnement:
+- ✅ Les soldes sont servis depuis la mémoire (LRU bornée, utilisateurs froids évincés)
+- ✅ Chaque mouvement est d'abord ajouté à un journal disque (append-only, fsync)
+- ✅ Les mouvements en attente sont écrits en lots via apply_batch() (intervalle ou seuil)
+- ✅ Au démarrage, le journal non appliqué est rejoué (reprise après crash)
+
+Le numéro du dernier mouvement appliqué est enregistré dans la même transaction
+SQLite que le lot : le rejeu est idempotent même si le crash survient entre le
+commit et le nettoyage du journal.
+
+⚠️ Le cache suppose qu'il est le seul écrivain du registre : le serveur web
+(advanced_server, un seul processus via app.py) passe par get_cached_ledger(),
+aucun autre module n'écrit dans arsenal_coins_central.db. Un déploiement
+multi-processus doit revenir à get_central_system().
+"""
+
+import atexit
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from arsenal_coins_central import ArsenalCoinsCentral, get_central_system
+
+logger = logging.getLogger(__name__)
+
+
+class CachedCoinsLedger:
+    """
+    🧠 Registre ArsenalCoins avec cache write-behind
+
+    Même interface que ArsenalCoinsCentral pour get_balance / add_coins /
+    remove_coins / transfer_coins ; les lectures agrégées (historique, stats,
+    classement) vident d'abord le cache puis délèguent au registre central.
+    """
+
+    def __init__(self, central: Optional[ArsenalCoinsCentral] = None, journal_path: Optional[str] = None,
+                 max_users: int = 50000, flush_interval: float = 2.0, flush_threshold: int = 500,
+                 fsync: bool = True, start_flusher: bool = True):
+        self.central = central or get_central_system()
+        self.journal_path = journal_path or os.path.splitext(self.central.db_path)[0] + '.journal'
+        self.segment_path = self.journal_path + '.1'
+        self.max_users = max_users
+        self.flush_interval = flush_interval
+        self.flush_threshold = flush_threshold
+        self.fsync = fsync
+
+        self.lock = threading.RLock()
+        self.flush_lock = threading.Lock()
+        self._balances: "OrderedDict[str, int]" = OrderedDict()
+        self._dirty: Dict[str, int] = {}  # user_id -> mouvements pas encore committés
+        self._pending: List[Dict[str, Any]] = []
+        self.stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'flushes': 0,
+                      'flushed_entries': 0, 'rejected_entries': 0, 'replayed_entries': 0}
+
+        self._init_journal_state()
+        self._seq = self._recover()
+        self._journal = open(self.journal_path, 'a', encoding='utf-8')
+
+        self._stop = threading.Event()
+        self._wakeup = threading.Event()
+        self._flusher = None
+        if start_flusher:
+            self._flusher = threading.Thread(target=self._flush_loop, name='coins-cache-flusher', daemon=True)
+            self._flusher.start()
+        atexit.register(self.close)
+
+        logger.info(f"⚡ Cache ArsenalCoins prêt (max {max_users} utilisateurs, flush {flush_interval}s/{flush_threshold})")
+
+    # ==================== JOURNAL ====================
+
+    def _init_journal_state(self):
+        """Table mémorisant le dernier mouvement du journal appliqué en base"""
+        with self.central.pool.transaction() as conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS ledger_journal_state (
+                    id INTEGER PRIMARY KEY CHECK (id = 1),
+                    last_seq INTEGER NOT NULL DEFAULT 0
+                )
+            ''')
+            conn.execute('INSERT OR IGNORE INTO ledger_journal_state (id, last_seq) VALUES (1, 0)')
+
+    def _applied_seq(self) -> int:
+        with self.central.pool.connection() as conn:
+            return conn.execute('SELECT last_seq FROM ledger_journal_state WHERE id = 1').fetchone()[0]
+
+    def _read_journal_entries(self) -> List[Dict[str, Any]]:
+        entries = []
+        for path in (self.segment_path, self.journal_path):
+            if not os.path.exists(path):
+                continue
+            with open(path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        entries.append(json.loads(line))
+                    except json.JSONDecodeError:
+                        # Dernière ligne tronquée par le crash : ignorée
+                        logger.warning(f"⚠️ Ligne de journal illisible ignorée dans {path}")
+        return entries
+
+    def _recover(self) -> int:
+        """Rejouer les mouvements du journal non encore appliqués en base"""
+        applied_seq = self._applied_seq()
+        entries = self._read_journal_entries()
+        to_replay = [entry for entry in entries if entry['seq'] > applied_seq]
+        last_seq = max([applied_seq] + [entry['seq'] for entry in entries])
+
+        if to_replay:
+            logger.info(f"🔁 Rejeu de {len(to_replay)} mouvements du journal ArsenalCoins...")
+            self._apply_to_database(to_replay)
+            self.stats['replayed_entries'] = len(to_replay)
+
+        for path in (self.segment_path, self.journal_path):
+            if os.path.exists(path):
+                os.remove(path)
+        return last_seq
+
+    def _append(self, entries: List[Dict[str, Any]]):
+        """Ajouter des mouvements au journal (appelé sous self.lock)"""
+        for entry in entries:
+            self._seq += 1
+            entry['seq'] = self._seq
+            self._journal.write(json.dumps(entry, ensure_ascii=False) + '\n')
+        self._journal.flush()
+        if self.fsync:
+            os.fsync(self._journal.fileno())
+
+        self._pending.extend(entries)
+        for entry in entries:
+            self._dirty[entry['user_id']] = self._dirty.get(entry['user_id'], 0) + 1
+
+    def _rotate_journal(self):
+        """Isoler le journal courant dans un segment pendant son application (sous self.lock)"""
+        self._journal.close()
+        if os.path.exists(self.segment_path):
+            # Un flush précédent a échoué : on concatène pour ne rien perdre
+            with open(self.journal_path, 'r', encoding='utf-8') as src, \
+                    open(self.segment_path, 'a', encoding='utf-8') as dst:
+                dst.write(src.read())
+            os.remove(self.journal_path)
+        else:
+            os.replace(self.journal_path, self.segment_path)
+        self._journal = open(self.journal_path, 'a', encoding='utf-8')
+
+    def _apply_to_database(self, entries: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Appliquer un lot et mémoriser son dernier numéro dans la même transaction"""
+        with self.central.pool.transaction() as conn:
+            result = self.central.apply_batch(entries, atomic=False, log_stats=False)
+            conn.execute('UPDATE ledger_journal_state SET last_seq = ? WHERE id = 1', (entries[-1]['seq'],))
+        return result
+
+    # ==================== FLUSH ====================
+
+    def flush(self) -> int:
+        """Écrire en base tous les mouvements en attente ; retourne le nombre appliqué"""
+        with self.flush_lock:
+            with self.lock:
+                if not self._pending:
+                    return 0
+                batch, self._pending = self._pending, []
+                self._rotate_journal()
+
+            start = time.perf_counter()
+            try:
+                result = self._apply_to_database(batch)
+            except Exception as e:
+                logger.error(f"❌ Flush du cache ArsenalCoins échoué: {e}")
+                with self.lock:
+                    self._pending = batch + self._pending
+                raise
+
+            os.remove(self.segment_path)
+
+            with self.lock:
+                for entry in batch:
+                    user_id = entry['user_id']
+                    remaining = self._dirty.get(user_id, 0) - 1
+                    if remaining > 0:
+                        self._dirty[user_id] = remaining
+                    else:
+                        self._dirty.pop(user_id, None)
+
+                # Un mouvement refusé par la base signifie que le cache a divergé :
+                # on oublie ces soldes pour les relire depuis SQLite
+                for index in result['rejected']:
+                    user_id = batch[index]['user_id']
+                    if user_id not in self._dirty:
+                        self._balances.pop(user_id, None)
+
+                self.stats['flushes'] += 1
+                self.stats['flushed_entries'] += result['applied']
+                self.stats['rejected_entries'] += len(result['rejected'])
+                self._evict()
+
+            logger.debug(f"💾 Cache ArsenalCoins: {result['applied']} mouvements écrits "
+                         f"en {(time.perf_counter() - start) * 1000:.1f} ms")
+            return result['applied']
+
+    def _flush_loop(self):
+        while not self._stop.is_set():
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception:
+                pass  # Déjà journalisé, nouvel essai au prochain tour
+
+    def close(self):
+        """Arrêter le thread de flush et écrire les mouvements restants"""
+        if self._stop.is_set():
+            return
+        self._stop.set()
+        self._wakeup.set()
+        if self._flusher is not None:
+            self._flusher.join(timeout=5)
+        self.flush()
+        with self.lock:
+            self._journal.close()
+
+    # ==================== CACHE ====================
+
+    def _evict(self, keep: Tuple[str, ...] = ()):
+        """Évincer les utilisateurs froids sans mouvement en attente (sous self.lock)"""
+        if len(self._balances) <= self.max_users:
+            return
+        # Le plus récent (dernier de la LRU) est l'utilisateur en cours d'opération ;
+        # keep épingle les autres comptes de l'opération (transfert)
+        for user_id in list(self._balances)[:-1]:
+            if len(self._balances) <= self.max_users:
+                break
+            if user_id not in self._dirty and user_id not in keep:
+                del self._balances[user_id]
+                self.stats['evictions'] += 1
+
+        if len(self._balances) > self.max_users:
+            # Que des soldes en attente d'écriture : on force un flush pour pouvoir évincer
+            self._wakeup.set()
+
+    def _load(self, user_id: str, keep: Tuple[str, ...] = ()) -> int:
+        """Solde courant en mémoire, chargé depuis SQLite si absent (sous self.lock)"""
+        if user_id in self._balances:
+            self._balances.move_to_end(user_id)
+            self.stats['hits'] += 1
+            return self._balances[user_id]
+
+        self.stats['misses'] += 1
+        balance = self.central.get_balance(user_id)
+        self._balances[user_id] = balance
+        self._evict(keep)
+        return balance
+
+    def _record(self, changes: List[Tuple[str, int, str, Optional[str], Optional[Dict[str, Any]]]]):
+        """Appliquer des mouvements en mémoire puis les journaliser (sous self.lock)"""
+        entries = []
+        for user_id, amount, module_source, description, metadata in changes:
+            self._balances[user_id] = self._balances[user_id] + amount
+            entries.append({'user_id': user_id, 'amount': amount, 'module_source': module_source,
+                            'description': description, 'metadata': metadata})
+        self._append(entries)
+
+        if len(self._pending) >= self.flush_threshold:
+            self._wakeup.set()
+
+    # ==================== API ====================
+
+    def get_balance(self, user_id: str) -> int:
+        """Obtenir le solde d'un utilisateur (depuis la mémoire)"""
+        with self.lock:
+            return self._load(str(user_id))
+
+    def add_coins(self, user_id: str, amount: int, module_source: str, description: Optional[str] = None,
+                  metadata: Optional[Dict[str, Any]] = None) -> bool:
+        """Ajouter des ArsenalCoins à un utilisateur"""
+        if amount <= 0:
+            return False
+        user_id = str(user_id)
+        with self.lock:
+            self._load(user_id)
+            self._record([(user_id, amount, module_source, description, metadata)])
+        return True
+
+    def remove_coins(self, user_id: str, amount: int, module_source: str, description: Optional[str] = None,
+                     metadata: Optional[Dict[str, Any]] = None) -> bool:
+        """Retirer des ArsenalCoins d'un utilisateur"""
+        if amount <= 0:
+            return False
+        user_id = str(user_id)
+        with self.lock:
+            if self._load(user_id) < amount:
+                return False  # Solde insuffisant
+            self._record([(user_id, -amount, module_source, description, metadata)])
+        return True
+
+    def transfer_coins(self, from_user: str, to_user: str, amount: int, module_source: str,
+                       description: Optional[str] = None) -> bool:
+        """Transférer des ArsenalCoins (les deux mouvements partent dans le même lot)"""
+        if amount <= 0:
+            return False
+        from_user, to_user = str(from_user), str(to_user)
+        with self.lock:
+            if self._load(from_user) < amount:
+                return False
+            # from_user ne doit pas être évincé pendant le chargement de to_user
+            self._load(to_user, keep=(from_user,))
+            self._record([
+                (from_user, -amount, module_source, f"Transfer vers {to_user}: {description}", None),
+                (to_user, amount, module_source, f"Transfer depuis {from_user}: {description}", None),
+            ])
+        return True
+
+    def get_transaction_history(self, user_id: str, limit: int = 50) -> List[Dict[str, Any]]:
+        """Historique exact : vide le cache avant de lire"""
+        self.flush()
+        return self.central.get_transaction_history(str(user_id), limit)
+
+    def get_top_users(self, limit: int = 10) -> List[Tuple[str, int]]:
+        self.flush()
+        return self.central.get_top_users(limit)
+
+    def get_global_stats(self) -> Dict[str, Any]:
+        self.flush()
+        return self.central.get_global_stats()
+
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """Compteurs du cache (hits/misses, évictions, flushs)"""
+        with self.lock:
+            lookups = self.stats['hits'] + self.stats['misses']
+            return {
+                **self.stats,
+                'cached_users': len(self._balances),
+                'dirty_users': len(self._dirty),
+                'pending_entries': len(self._pending),
+                'hit_rate': self.stats['hits'] / lookups if lookups else 0.0,
+            }
+
+
+# Instance globale du cache
+_cached_instance = None
+
+def get_cached_ledger() -> CachedCoinsLedger:
+    """Obtenir l'instance unique du registre avec cache"""
+    global _cached_instance
+    if _cached_instance is None:
+        _cached_instance = CachedCoinsLedger()
+    return _cached_instance
@@ -12,20 +12,136 @@ Fonctionnalités:
 - ✅ Conversion Coinbase 1 ArsenalCoin = 0.01€ (commission 1%)
 - ✅ Audit trail complet de toutes les transactions
 - ✅ Support multi-modules (economy, casino, hunt_royal, crypto)
+- ✅ Pool de connexions SQLite en mode WAL (lecteurs concurrents)
+- ✅ Transferts atomiques et lots de crédits/débits en un seul commit
 """
 
 import sqlite3
 import json
 import os
+import queue
 import threading
+import time
+from contextlib import contextmanager
 from datetime import datetime
-from typing import Dict, List, Optional, Tuple, Any
+from typing import Dict, Iterator, List, Optional, Tuple, Any
 import logging
 
 # Configuration du logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+class CoinsConnectionPool:
+    """
+    🔌 Pool de connexions SQLite pour le registre central
+
+    - Connexions réutilisées (plus de connect/close à chaque appel)
+    - Mode WAL + synchronous=NORMAL : les lecteurs ne bloquent plus derrière l'écrivain
+    - Cache de requêtes préparées par connexion (``cached_statements``)
+    - Un seul écrivain à la fois via ``write_lock`` ; les lectures ne prennent aucun verrou
+
+    Un thread garde la même connexion pendant toute une opération, y compris
+    les appels imbriqués (ex: ``add_coins`` appelé depuis une migration).
+    """
+
+    def __init__(self, db_path: str, max_idle: int = 8, timeout: float = 30.0,
+                 cached_statements: int = 256):
+        self.db_path = db_path
+        self.timeout = timeout
+        self.cached_statements = cached_statements
+        self.write_lock = threading.RLock()
+        self._idle: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue(maxsize=max_idle)
+        self._local = threading.local()
+        self._closed = False
+
+    def _create_connection(self) -> sqlite3.Connection:
+        """Ouvrir une nouvelle connexion configurée pour le pool"""
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=self.timeout,
+            isolation_level=None,  # Transactions gérées explicitement (BEGIN IMMEDIATE)
+            check_same_thread=False,  # Une connexion peut changer de thread entre deux emprunts
+            cached_statements=self.cached_statements,
+        )
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.execute(f'PRAGMA busy_timeout={int(self.timeout * 1000)}')
+        return conn
+
+    def _acquire(self) -> sqlite3.Connection:
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            return self._create_connection()
+
+    def _release(self, conn: sqlite3.Connection):
+        if self._closed:
+            conn.close()
+            return
+        try:
+            self._idle.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        """Emprunter une connexion (réentrant dans un même thread)"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            self._local.depth += 1
+            try:
+                yield conn
+            finally:
+                self._local.depth -= 1
+            return
+
+        conn = self._acquire()
+        self._local.conn = conn
+        self._local.depth = 1
+        self._local.in_transaction = False
+        try:
+            yield conn
+        finally:
+            self._local.conn = None
+            self._local.depth = 0
+            self._release(conn)
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        """
+        Transaction d'écriture : ``BEGIN IMMEDIATE`` ... ``COMMIT``
+
+        Les transactions imbriquées dans le même thread rejoignent la
+        transaction englobante (un seul commit à la fin).
+        """
+        with self.connection() as conn:
+            if self._local.in_transaction:
+                yield conn
+                return
+
+            with self.write_lock:
+                conn.execute('BEGIN IMMEDIATE')
+                self._local.in_transaction = True
+                try:
+                    yield conn
+                except BaseException:
+                    conn.execute('ROLLBACK')
+                    raise
+                else:
+                    conn.execute('COMMIT')
+                finally:
+                    self._local.in_transaction = False
+
+    def close_all(self):
+        """Fermer toutes les connexions inactives du pool"""
+        self._closed = True
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+
+
 class ArsenalCoinsCentral:
     """
     🏦 Système Central des ArsenalCoins
@@ -43,7 +159,8 @@ class ArsenalCoinsCentral:
             db_path = os.path.join(os.path.dirname(__file__), 'arsenal_coins_central.db')
         
         self.db_path = db_path
-        self.lock = threading.RLock()  # Thread-safe operations
+        self.pool = CoinsConnectionPool(db_path)
+        self.lock = self.pool.write_lock  # Verrou des écritures uniquement
         
         # Initialiser la base de données
         self._init_database()
@@ -55,8 +172,7 @@ class ArsenalCoinsCentral:
     
     def _init_database(self):
         """Créer les tables si elles n'existent pas"""
-        with self.lock:
-            conn = sqlite3.connect(self.db_path)
+        with self.pool.transaction() as conn:
             cursor = conn.cursor()
             
             # Table des soldes utilisateurs
@@ -104,9 +220,6 @@ class ArsenalCoinsCentral:
             cursor.execute('CREATE INDEX IF NOT EXISTS idx_transactions_user_id ON transactions(user_id)')
             cursor.execute('CREATE INDEX IF NOT EXISTS idx_transactions_timestamp ON transactions(timestamp)')
             cursor.execute('CREATE INDEX IF NOT EXISTS idx_conversions_user_id ON coinbase_conversions(user_id)')
-            
-            conn.commit()
-            conn.close()
     
     def _migrate_old_databases(self):
         """Migrer les données depuis les anciennes bases de données"""
@@ -190,27 +303,25 @@ class ArsenalCoinsCentral:
     
     def get_balance(self, user_id: str) -> int:
         """Obtenir le solde d'un utilisateur"""
-        with self.lock:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            cursor.execute('SELECT balance FROM user_balances WHERE user_id = ?', (user_id,))
-            result = cursor.fetchone()
-            
-            conn.close()
-            return result[0] if result else 0
+        with self.pool.connection() as conn:
+            return self._read_balance(conn, user_id)
+    
+    @staticmethod
+    def _read_balance(conn: sqlite3.Connection, user_id: str) -> int:
+        """Lire un solde avec une connexion déjà empruntée au pool"""
+        result = conn.execute('SELECT balance FROM user_balances WHERE user_id = ?', (user_id,)).fetchone()
+        return result[0] if result else 0
     
     def add_coins(self, user_id: str, amount: int, module_source: str, description: Optional[str] = None, metadata: Optional[Dict[str, Any]] = None) -> bool:
         """Ajouter des ArsenalCoins à un utilisateur"""
         if amount <= 0:
             return False
             
-        with self.lock:
-            conn = sqlite3.connect(self.db_path)
+        with self.pool.transaction() as conn:
             cursor = conn.cursor()
             
-            # Obtenir le solde actuel
-            current_balance = self.get_balance(user_id)
+            # Obtenir le solde actuel (dans la même transaction)
+            current_balance = self._read_balance(conn, user_id)
             new_balance = current_balance + amount
             
             # Mettre à jour ou créer le solde
@@ -228,25 +339,22 @@ class ArsenalCoinsCentral:
             ''', (user_id, amount, module_source, description, 
                   current_balance, new_balance, json.dumps(metadata) if metadata else None))
             
-            conn.commit()
-            conn.close()
-            
-            logger.info(f"💰 +{amount} ArsenalCoins pour {user_id} (module: {module_source})")
-            return True
+        logger.info(f"💰 +{amount} ArsenalCoins pour {user_id} (module: {module_source})")
+        return True
     
     def remove_coins(self, user_id: str, amount: int, module_source: str, description: Optional[str] = None, metadata: Optional[Dict[str, Any]] = None) -> bool:
         """Retirer des ArsenalCoins d'un utilisateur"""
         if amount <= 0:
             return False
             
-        current_balance = self.get_balance(user_id)
-        if current_balance < amount:
-            return False  # Solde insuffisant
-            
-        with self.lock:
-            conn = sqlite3.connect(self.db_path)
+        with self.pool.transaction() as conn:
             cursor = conn.cursor()
             
+            # Vérifier le solde dans la transaction (plus de course lecture/écriture)
+            current_balance = self._read_balance(conn, user_id)
+            if current_balance < amount:
+                return False  # Solde insuffisant
+            
             new_balance = current_balance - amount
             
             # Mettre à jour le solde
@@ -265,39 +373,108 @@ class ArsenalCoinsCentral:
             ''', (user_id, -amount, module_source, description, 
                   current_balance, new_balance, json.dumps(metadata) if metadata else None))
             
-            conn.commit()
-            conn.close()
-            
-            logger.info(f"💸 -{amount} ArsenalCoins pour {user_id} (module: {module_source})")
-            return True
+        logger.info(f"💸 -{amount} ArsenalCoins pour {user_id} (module: {module_source})")
+        return True
     
     def transfer_coins(self, from_user: str, to_user: str, amount: int, module_source: str, description: Optional[str] = None) -> bool:
-        """Transférer des ArsenalCoins entre utilisateurs"""
+        """Transférer des ArsenalCoins entre utilisateurs (une seule transaction BEGIN IMMEDIATE)"""
         if amount <= 0:
             return False
             
-        if self.get_balance(from_user) < amount:
-            return False  # Solde insuffisant
-            
-        # Transaction atomique
-        with self.lock:
-            # Retirer du premier utilisateur
-            if not self.remove_coins(from_user, amount, module_source, f"Transfer vers {to_user}: {description}"):
-                return False
-            
-            # Ajouter au deuxième utilisateur
-            if not self.add_coins(to_user, amount, module_source, f"Transfer depuis {from_user}: {description}"):
-                # Rollback en cas d'erreur
-                self.add_coins(from_user, amount, module_source, f"Rollback transfer vers {to_user}")
-                return False
+        result = self.apply_batch([
+            {'user_id': from_user, 'amount': -amount, 'module_source': module_source,
+             'description': f"Transfer vers {to_user}: {description}"},
+            {'user_id': to_user, 'amount': amount, 'module_source': module_source,
+             'description': f"Transfer depuis {from_user}: {description}"},
+        ], atomic=True, log_stats=False)
+        
+        if not result['success']:
+            return False  # Solde insuffisant : rien n'a été écrit
+        
+        logger.info(f"🔄 Transfer {amount} ArsenalCoins: {from_user} → {to_user}")
+        return True
+    
+    def apply_batch(self, entries: List[Dict[str, Any]], atomic: bool = True, log_stats: bool = True) -> Dict[str, Any]:
+        """
+        Appliquer un lot de crédits/débits en un seul commit
+        
+        Chaque entrée est un dict ``{'user_id', 'amount', 'module_source', 'description', 'metadata'}``
+        avec ``amount`` signé (positif = crédit, négatif = débit). Les entrées sont appliquées
+        dans l'ordre, donc un crédit peut financer un débit plus loin dans le même lot.
+        
+        - ``atomic=True`` : un seul débit impossible annule tout le lot
+        - ``atomic=False`` : les débits impossibles sont ignorés et listés dans ``rejected``
+        
+        Retourne ``{'success', 'applied', 'rejected', 'elapsed_ms', 'entries_per_sec'}``.
+        """
+        start = time.perf_counter()
+        rejected: List[int] = []
+        
+        with self.pool.transaction() as conn:
+            # Charger tous les soldes concernés en une passe
+            user_ids = list({str(entry['user_id']) for entry in entries})
+            balances: Dict[str, int] = {}
+            for i in range(0, len(user_ids), 500):  # Limite de variables SQLite
+                chunk = user_ids[i:i + 500]
+                placeholders = ','.join('?' * len(chunk))
+                balances.update(conn.execute(
+                    f'SELECT user_id, balance FROM user_balances WHERE user_id IN ({placeholders})', chunk
+                ).fetchall())
+            
+            journal_rows = []
+            for index, entry in enumerate(entries):
+                user_id = str(entry['user_id'])
+                amount = int(entry['amount'])
+                before = balances.get(user_id, 0)
+                after = before + amount
+                
+                if amount == 0 or after < 0:
+                    rejected.append(index)
+                    continue
+                
+                balances[user_id] = after
+                metadata = entry.get('metadata')
+                journal_rows.append((
+                    user_id, amount, 'add' if amount > 0 else 'remove',
+                    entry.get('module_source', 'batch'), entry.get('description'),
+                    before, after, json.dumps(metadata) if metadata else None
+                ))
+            
+            if atomic and rejected:
+                # Rien n'a encore été écrit : la transaction se termine sans modification
+                return {'success': False, 'applied': 0, 'rejected': rejected,
+                        'elapsed_ms': (time.perf_counter() - start) * 1000, 'entries_per_sec': 0}
+            
+            touched = {row[0] for row in journal_rows}
+            conn.executemany('''
+                INSERT INTO user_balances (user_id, balance, updated_at)
+                VALUES (?, ?, CURRENT_TIMESTAMP)
+                ON CONFLICT(user_id) DO UPDATE SET balance = excluded.balance, updated_at = CURRENT_TIMESTAMP
+            ''', [(user_id, balances[user_id]) for user_id in touched])
             
-            logger.info(f"🔄 Transfer {amount} ArsenalCoins: {from_user} → {to_user}")
-            return True
+            conn.executemany('''
+                INSERT INTO transactions 
+                (user_id, amount, transaction_type, module_source, description, 
+                 balance_before, balance_after, metadata)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ''', journal_rows)
+        
+        elapsed = time.perf_counter() - start
+        stats = {
+            'success': True,
+            'applied': len(journal_rows),
+            'rejected': rejected,
+            'elapsed_ms': elapsed * 1000,
+            'entries_per_sec': len(journal_rows) / elapsed if elapsed > 0 else 0
+        }
+        if log_stats:
+            logger.info(f"📦 Lot appliqué: {stats['applied']} écritures, {len(rejected)} rejetées "
+                        f"en {stats['elapsed_ms']:.1f} ms ({stats['entries_per_sec']:.0f}/s)")
+        return stats
     
     def get_transaction_history(self, user_id: str, limit: int = 50) -> List[Dict[str, Any]]:
         """Obtenir l'historique des transactions d'un utilisateur"""
-        with self.lock:
-            conn = sqlite3.connect(self.db_path)
+        with self.pool.connection() as conn:
             cursor = conn.cursor()
             
             cursor.execute('''
@@ -322,13 +499,11 @@ class ArsenalCoinsCentral:
                     'metadata': json.loads(row[7]) if row[7] else {}
                 })
             
-            conn.close()
             return transactions
     
     def get_top_users(self, limit: int = 10) -> List[Tuple[str, int]]:
         """Obtenir le classement des utilisateurs les plus riches"""
-        with self.lock:
-            conn = sqlite3.connect(self.db_path)
+        with self.pool.connection() as conn:
             cursor = conn.cursor()
             
             cursor.execute('''
@@ -339,14 +514,11 @@ class ArsenalCoinsCentral:
                 LIMIT ?
             ''', (limit,))
             
-            result = cursor.fetchall()
-            conn.close()
-            return result
+            return cursor.fetchall()
     
     def get_global_stats(self) -> Dict[str, Any]:
         """Obtenir les statistiques globales du système"""
-        with self.lock:
-            conn = sqlite3.connect(self.db_path)
+        with self.pool.connection() as conn:
             cursor = conn.cursor()
             
             # Total des ArsenalCoins en circulation
@@ -368,8 +540,6 @@ class ArsenalCoinsCentral:
             ''')
             recent_transactions = cursor.fetchone()[0] or 0
             
-            conn.close()
-            
             return {
                 'total_coins': total_coins,
                 'active_users': active_users,
@@ -391,8 +561,7 @@ class ArsenalCoinsCentral:
         commission = euros_gross * 0.01  # 1% commission
         euros_net = euros_gross - commission
         
-        with self.lock:
-            conn = sqlite3.connect(self.db_path)
+        with self.pool.transaction() as conn:
             cursor = conn.cursor()
             
             cursor.execute('''
@@ -402,16 +571,13 @@ class ArsenalCoinsCentral:
             ''', (user_id, arsenal_coins, euros_net, commission))
             
             conversion_id = cursor.lastrowid
-            conn.commit()
-            conn.close()
             
-            logger.info(f"💱 Conversion créée: {arsenal_coins} AC → {euros_net}€ (ID: {conversion_id})")
-            return conversion_id
+        logger.info(f"💱 Conversion créée: {arsenal_coins} AC → {euros_net}€ (ID: {conversion_id})")
+        return conversion_id
     
     def complete_coinbase_conversion(self, conversion_id: int, coinbase_tx_id: str) -> bool:
         """Finaliser une conversion Coinbase"""
-        with self.lock:
-            conn = sqlite3.connect(self.db_path)
+        with self.pool.transaction() as conn:
             cursor = conn.cursor()
             
             # Obtenir les détails de la conversion
@@ -423,15 +589,13 @@ class ArsenalCoinsCentral:
             
             result = cursor.fetchone()
             if not result or result[2] != 'pending':
-                conn.close()
                 return False
             
             user_id, arsenal_coins, status = result
             
-            # Retirer les ArsenalCoins
+            # Retirer les ArsenalCoins (même transaction que le changement de statut)
             if not self.remove_coins(user_id, arsenal_coins, 'coinbase_conversion', 
                                    f"Conversion Coinbase #{conversion_id}"):
-                conn.close()
                 return False
             
             # Marquer la conversion comme terminée
@@ -443,11 +607,8 @@ class ArsenalCoinsCentral:
                 WHERE id = ?
             ''', (coinbase_tx_id, conversion_id))
             
-            conn.commit()
-            conn.close()
-            
-            logger.info(f"✅ Conversion Coinbase terminée: ID {conversion_id}, TX {coinbase_tx_id}")
-            return True
+        logger.info(f"✅ Conversion Coinbase terminée: ID {conversion_id}, TX {coinbase_tx_id}")
+        return True
 
 # Instance globale du système central
 _central_instance = None
@@ -472,6 +633,15 @@ def remove_user_money(user_id: str, amount: int, source: str = "legacy") -> bool
     """Interface simple pour retirer de l'argent"""
     return get_central_system().remove_coins(str(user_id), amount, source, f"Legacy remove from {source}")
 
+def apply_user_money_batch(changes: List[Tuple[str, int]], source: str = "legacy", atomic: bool = False) -> Dict[str, Any]:
+    """Interface simple pour créditer/débiter plusieurs utilisateurs en un seul commit
+    (gains de casino, récompenses quotidiennes, bonus de niveau...)"""
+    return get_central_system().apply_batch([
+        {'user_id': str(user_id), 'amount': amount, 'module_source': source,
+         'description': f"Batch from {source}"}
+        for user_id, amount in changes
+    ], atomic=atomic)
+
 if __name__ == "__main__":
     # Test du système
     print("🧪 Test du système ArsenalCoins Central...")
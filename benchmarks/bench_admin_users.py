@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+📊 Benchmark /api/admin/users - liste complète vs pagination keyset + export streamé
+==================================================================================
+"historique" : SELECT de toute la table, liste de dicts, totaux calculés en Python
+               puis json.dumps de la réponse entière (ancien api_admin_users).
+"keyset"     : première page, page profonde (curseur au milieu de la table),
+               statistiques SQL, et export complet consommé morceau par morceau.
+
+Pic mémoire Python mesuré par tracemalloc, pour plusieurs tailles de table.
+
+Usage: python benchmarks/bench_admin_users.py [--sizes 10000 100000 300000] [--limit 100]
+"""
+
+import argparse
+import json
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+import tracemalloc
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+
+from user_directory import UserDirectory, encode_cursor
+
+
+def build_database(path: str, users: int):
+    conn = sqlite3.connect(path)
+    conn.execute("""
+        CREATE TABLE users (id INTEGER PRIMARY KEY, username TEXT NOT NULL, discriminator TEXT, avatar TEXT,
+                            access_level TEXT DEFAULT 'user', is_banned INTEGER DEFAULT 0,
+                            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP, last_seen TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                            total_commands INTEGER DEFAULT 0,
+                            arsenal_coins INTEGER DEFAULT 0, arsenal_gems INTEGER DEFAULT 0,
+                            arsenal_xp INTEGER DEFAULT 0, is_vip INTEGER DEFAULT 0)
+    """)
+    random.seed(42)
+    conn.executemany(
+        "INSERT INTO users (id, username, avatar, is_banned, last_seen, arsenal_coins, arsenal_gems, arsenal_xp, is_vip) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        ((431359112039890945 + i, f"user_{random.randrange(10**8):08d}", 'a_' + 'f' * 30, int(random.random() < 0.03),
+          f"2025-{random.randint(1, 12):02d}-{random.randint(1, 28):02d} 12:00:00", random.randrange(500000),
+          random.randrange(2000), random.randrange(100000), int(random.random() < 0.05)) for i in range(users))
+    )
+    conn.commit()
+    conn.close()
+
+
+def legacy_users(path: str) -> str:
+    """Reproduction de l'ancien api_admin_users (colonnes réelles au lieu des 0 constants)"""
+    conn = sqlite3.connect(path)
+    cursor = conn.cursor()
+    cursor.execute("""
+        SELECT id, id, username, avatar, created_at, last_seen, arsenal_coins, arsenal_gems, arsenal_xp,
+               is_vip, is_banned, 0
+        FROM users ORDER BY username ASC
+    """)
+    users = []
+    for row in cursor.fetchall():
+        users.append({
+            'user_id': row[0], 'discord_id': str(row[1]), 'username': row[2], 'avatar': row[3],
+            'created_at': row[4], 'last_activity': row[5], 'arsenal_coins': row[6] or 0,
+            'arsenal_gems': row[7] or 0, 'arsenal_xp': row[8] or 0, 'is_vip': bool(row[9]),
+            'is_banned': bool(row[10]), 'is_online': bool(row[11])
+        })
+    conn.close()
+    stats = {
+        'total_users': len(users),
+        'total_coins': sum(user['arsenal_coins'] for user in users),
+        'total_gems': sum(user['arsenal_gems'] for user in users),
+        'total_xp': sum(user['arsenal_xp'] for user in users),
+        'online_users': sum(1 for user in users if user['is_online']),
+        'richest_user': users[0]['username'] if users else None
+    }
+    return json.dumps({"success": True, "users": users, "stats": stats})
+
+
+def measure(fn):
+    """(résultat, secondes, pic mémoire Python en Mo)"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak / 1024 / 1024
+
+
+def consume_export(directory: UserDirectory) -> int:
+    size = 0
+    for chunk in directory.iter_export():
+        size += len(chunk)  # Le serveur écrit chaque morceau sur la socket puis l'oublie
+    return size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000, 300000])
+    parser.add_argument('--limit', type=int, default=100)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in args.sizes:
+            path = os.path.join(tmp, f'users_{size}.db')
+            build_database(path, size)
+            directory = UserDirectory(path, stats_ttl=0)
+            directory.columns()  # Index créés hors mesure
+
+            # Curseur au milieu de la table pour la page profonde
+            conn = sqlite3.connect(path)
+            deep_id, deep_name = conn.execute(
+                "SELECT id, username FROM users ORDER BY username COLLATE NOCASE, id LIMIT 1 OFFSET ?", (size // 2,)
+            ).fetchone()
+            conn.close()
+            deep_cursor = encode_cursor(deep_name, deep_id)
+
+            print(f"👥 {size:,} utilisateurs")
+            body, elapsed, peak = measure(lambda: legacy_users(path))
+            print(f"   historique      {elapsed * 1000:8.1f} ms | pic {peak:7.1f} Mo | réponse {len(body) / 1024 / 1024:6.1f} Mo")
+            del body
+            body, elapsed, peak = measure(lambda: json.dumps(directory.page(limit=args.limit)))
+            print(f"   page 1          {elapsed * 1000:8.1f} ms | pic {peak:7.1f} Mo | réponse {len(body) / 1024:6.1f} Ko")
+            body, elapsed, peak = measure(lambda: json.dumps(directory.page(cursor=deep_cursor, limit=args.limit)))
+            print(f"   page profonde   {elapsed * 1000:8.1f} ms | pic {peak:7.1f} Mo | réponse {len(body) / 1024:6.1f} Ko")
+            _, elapsed, peak = measure(lambda: directory.stats())
+            print(f"   stats SQL       {elapsed * 1000:8.1f} ms | pic {peak:7.1f} Mo")
+            exported, elapsed, peak = measure(lambda: consume_export(directory))
+            print(f"   export streamé  {elapsed * 1000:8.1f} ms | pic {peak:7.1f} Mo | réponse {exported / 1024 / 1024:6.1f} Mo")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+📊 Benchmark bot - sqlite3 dans la boucle asyncio vs AsyncDatabase
+=================================================================
+Simule le trafic on_message du bot à --rate messages/s pendant --seconds
+secondes : chaque message est une tâche (comme le dispatch discord.py) qui
+fait get_user + add_xp + daily_stats (StatsModule) ; un classement
+(get_leaderboard) est demandé chaque seconde.
+
+"historique" : le SQL d'origine, sqlite3.connect + commit par appel,
+               directement dans la boucle (journal rollback par défaut)
+"asynchrone" : même SQL via AsyncDatabase (écrivain dédié + commits groupés,
+               lecteurs WAL en pool)
+
+Mesure le retard de la boucle (tâche qui dort --tick-ms et note son
+décalage), la latence par message et le nombre de commits.
+
+discord.py n'étant pas requis ici, main.py n'est pas importé : le SQL des
+méthodes de DatabaseManager / StatsModule est reproduit.
+
+Usage: python benchmarks/bench_async_db.py [--rate 200] [--seconds 5] [--users 2000]
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'Arsenal_V4', 'bot'))
+
+from async_db import AsyncDatabase
+
+SCHEMA = [
+    '''CREATE TABLE users (
+        user_id INTEGER PRIMARY KEY, username TEXT, balance INTEGER DEFAULT 100,
+        xp INTEGER DEFAULT 0, level INTEGER DEFAULT 1, last_daily TEXT, last_work TEXT,
+        last_xp TEXT, warnings INTEGER DEFAULT 0, created_at TEXT DEFAULT CURRENT_TIMESTAMP)''',
+    '''CREATE TABLE daily_stats (
+        guild_id INTEGER, user_id INTEGER, channel_id INTEGER, date TEXT, message_count INTEGER DEFAULT 0,
+        PRIMARY KEY (guild_id, user_id, channel_id, date))''',
+]
+
+
+def level_for(xp: int) -> int:
+    return int((xp / 100) ** 0.5) + 1
+
+
+class LoopLagMonitor:
+    """Dort tick secondes en boucle et note le retard de chaque réveil"""
+
+    def __init__(self, tick: float):
+        self.tick = tick
+        self.samples = []
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            start = loop.time()
+            await asyncio.sleep(self.tick)
+            self.samples.append(max(0.0, loop.time() - start - self.tick) * 1000)
+
+
+# ----- SQL d'origine, exécuté dans la boucle -----
+
+class LegacyBot:
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self.commits = 0
+
+    async def get_user(self, user_id):
+        with sqlite3.connect(self.db_path) as conn:
+            conn.row_factory = sqlite3.Row
+            user = conn.execute('SELECT * FROM users WHERE user_id = ?', (user_id,)).fetchone()
+            if not user:
+                conn.execute('INSERT OR IGNORE INTO users (user_id, username) VALUES (?, ?)', (user_id, f"User_{user_id}"))
+                conn.commit()
+                self.commits += 1
+                user = conn.execute('SELECT * FROM users WHERE user_id = ?', (user_id,)).fetchone()
+            return dict(user)
+
+    async def add_xp(self, user_id, amount):
+        user = await self.get_user(user_id)
+        new_xp = user['xp'] + amount
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute('UPDATE users SET xp = ?, level = ?, last_xp = ? WHERE user_id = ?',
+                         (new_xp, level_for(new_xp), datetime.now().isoformat(), user_id))
+            conn.commit()
+            self.commits += 1
+
+    async def log_message_stats(self, guild_id, user_id, channel_id):
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute("INSERT OR IGNORE INTO daily_stats (guild_id, user_id, channel_id, date, message_count) "
+                         "VALUES (?, ?, ?, DATE('now'), 0)", (guild_id, user_id, channel_id))
+            conn.execute("UPDATE daily_stats SET message_count = message_count + 1 "
+                         "WHERE guild_id = ? AND user_id = ? AND channel_id = ? AND date = DATE('now')",
+                         (guild_id, user_id, channel_id))
+            conn.commit()
+            self.commits += 1
+
+    async def leaderboard(self):
+        with sqlite3.connect(self.db_path) as conn:
+            return conn.execute('SELECT user_id, level, xp FROM users ORDER BY level DESC, xp DESC LIMIT 20').fetchall()
+
+    async def close(self):
+        pass
+
+
+# ----- Même SQL via AsyncDatabase -----
+
+class AsyncBot:
+    def __init__(self, db_path: str):
+        self.aio = AsyncDatabase(db_path)
+
+    @property
+    def commits(self):
+        return self.aio.stats['commits']
+
+    async def get_user(self, user_id):
+        user = await self.aio.fetchone('SELECT * FROM users WHERE user_id = ?', (user_id,))
+        if not user:
+            await self.aio.execute('INSERT OR IGNORE INTO users (user_id, username) VALUES (?, ?)', (user_id, f"User_{user_id}"))
+            user = await self.aio.fetchone('SELECT * FROM users WHERE user_id = ?', (user_id,))
+        return dict(user)
+
+    async def add_xp(self, user_id, amount):
+        await self.get_user(user_id)
+
+        def update(conn):
+            xp, level = conn.execute('SELECT xp, level FROM users WHERE user_id = ?', (user_id,)).fetchone()
+            conn.execute('UPDATE users SET xp = ?, level = ?, last_xp = ? WHERE user_id = ?',
+                         (xp + amount, level_for(xp + amount), datetime.now().isoformat(), user_id))
+        await self.aio.transaction(update)
+
+    async def log_message_stats(self, guild_id, user_id, channel_id):
+        params = (guild_id, user_id, channel_id)
+
+        def log(conn):
+            conn.execute("INSERT OR IGNORE INTO daily_stats (guild_id, user_id, channel_id, date, message_count) "
+                         "VALUES (?, ?, ?, DATE('now'), 0)", params)
+            conn.execute("UPDATE daily_stats SET message_count = message_count + 1 "
+                         "WHERE guild_id = ? AND user_id = ? AND channel_id = ? AND date = DATE('now')", params)
+        await self.aio.transaction(log)
+
+    async def leaderboard(self):
+        return await self.aio.fetch('SELECT user_id, level, xp FROM users ORDER BY level DESC, xp DESC LIMIT 20')
+
+    async def close(self):
+        await self.aio.close()
+
+
+def make_db(path: str, users: int):
+    conn = sqlite3.connect(path)
+    for statement in SCHEMA:
+        conn.execute(statement)
+    conn.executemany('INSERT INTO users (user_id, username, xp) VALUES (?, ?, ?)',
+                     ((i, f"User_{i}", random.randrange(50000)) for i in range(users // 2)))
+    conn.commit()
+    conn.close()
+
+
+async def simulate(bot, rate: int, seconds: float, users: int, tick: float) -> dict:
+    monitor = LoopLagMonitor(tick)
+    monitor_task = asyncio.create_task(monitor.run())
+    latencies = []
+
+    async def on_message(i):
+        start = time.perf_counter()
+        user_id = random.randrange(users)
+        await bot.get_user(user_id)
+        await bot.add_xp(user_id, random.randint(15, 25))
+        await bot.log_message_stats(1, user_id, 100 + i % 10)
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    async def leaderboards():
+        while True:
+            await asyncio.sleep(1)
+            await bot.leaderboard()
+
+    board_task = asyncio.create_task(leaderboards())
+    tasks = []
+    loop = asyncio.get_running_loop()
+    begin = loop.time()
+    total = int(rate * seconds)
+    for i in range(total):
+        delay = begin + i / rate - loop.time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        tasks.append(asyncio.create_task(on_message(i)))
+    await asyncio.gather(*tasks)
+    elapsed = loop.time() - begin
+    monitor_task.cancel()
+    board_task.cancel()
+    await bot.close()
+
+    lag = sorted(monitor.samples) or [0.0]
+    return {
+        'messages': total, 'elapsed': elapsed, 'commits': bot.commits,
+        'lag_mean': statistics.fmean(lag), 'lag_p95': lag[int(len(lag) * 0.95) - 1],
+        'lag_p99': lag[int(len(lag) * 0.99) - 1], 'lag_max': lag[-1],
+        'latency_p50': statistics.median(latencies), 'latency_p99': sorted(latencies)[int(len(latencies) * 0.99) - 1],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rate', type=int, default=200)
+    parser.add_argument('--seconds', type=float, default=5.0)
+    parser.add_argument('--users', type=int, default=2000)
+    parser.add_argument('--tick-ms', type=float, default=10.0)
+    args = parser.parse_args()
+
+    print(f"💬 {args.rate} messages/s pendant {args.seconds:.0f}s, {args.users:,} utilisateurs")
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, factory in (('historique', LegacyBot), ('asynchrone', AsyncBot)):
+            random.seed(42)
+            path = os.path.join(tmp, f'{name}.db')
+            make_db(path, args.users)
+            result = asyncio.run(simulate(factory(path), args.rate, args.seconds, args.users, args.tick_ms / 1000))
+            print(f"   {name:<11} retard boucle moy {result['lag_mean']:6.2f} ms | p95 {result['lag_p95']:6.2f} | "
+                  f"p99 {result['lag_p99']:6.2f} | max {result['lag_max']:7.2f} ms")
+            print(f"   {'':<11} message p50 {result['latency_p50']:6.2f} ms | p99 {result['latency_p99']:7.2f} ms | "
+                  f"{result['messages'] / result['elapsed']:5.0f} msg/s | {result['commits']:,} commits")
+
+
+if __name__ == "__main__":
+    main()
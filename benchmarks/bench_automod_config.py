@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+📊 Benchmark config AutoMod - copies complètes vs couches
+=========================================================
+Taille et temps de sérialisation de automod_config.json pour N serveurs :
+- "copies"  : ancien modèle, get_default_config() recopiée pour chaque serveur
+- "couches" : base partagée + surcharges éparses (~10% des serveurs personnalisés)
+
+Usage: python benchmarks/bench_automod_config.py [--guilds 100,1000,10000]
+"""
+
+import argparse
+import ast
+import json
+import os
+import random
+import sys
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+
+from modules.automod_config_layers import LAYERED_LAYOUT, collapse_server_copies, freeze, resolve_config
+
+
+def load_default_config() -> dict:
+    """get_default_config() extraite par analyse du source (sans importer discord)"""
+    with open(os.path.join(ROOT, 'modules', 'automod_system.py'), encoding='utf-8') as f:
+        tree = ast.parse(f.read())
+    for node in ast.walk(tree):
+        if isinstance(node, ast.FunctionDef) and node.name == 'get_default_config':
+            for statement in node.body:
+                if isinstance(statement, ast.Return):
+                    return ast.literal_eval(statement.value)
+    raise RuntimeError("get_default_config introuvable")
+
+
+def customize(config: dict, rnd: random.Random):
+    config["spam_detection"]["max_messages"] = rnd.randint(3, 10)
+    config["word_filter"]["level_1_words"].append(f"mot{rnd.randint(0, 999)}")
+
+
+def timed_dump(data: dict):
+    start = time.perf_counter()
+    payload = json.dumps(data, indent=4, ensure_ascii=False)
+    return len(payload.encode('utf-8')), (time.perf_counter() - start) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--guilds', default='100,1000,10000')
+    args = parser.parse_args()
+
+    default = load_default_config()
+    base = freeze({key: value for key, value in default.items() if key != "servers"})
+    rnd = random.Random(42)
+
+    print(f"{'serveurs':>9} | {'copies (Mo)':>11} | {'save (ms)':>9} | {'couches (Ko)':>12} | {'save (ms)':>9} | {'résolution (µs)':>15}")
+    for count in (int(value) for value in args.guilds.split(',')):
+        servers = {}
+        for guild_id in range(count):
+            config = json.loads(json.dumps(default))
+            if rnd.random() < 0.1:
+                customize(config, rnd)
+            servers[str(guild_id)] = config
+
+        legacy_size, legacy_ms = timed_dump({**default, "servers": servers})
+        collapsed, _ = collapse_server_copies(base, servers)
+        layered_size, layered_ms = timed_dump({"layout": LAYERED_LAYOUT, "servers": collapsed})
+
+        start = time.perf_counter()
+        for guild_id in range(min(count, 1000)):
+            resolve_config(base, collapsed.get(str(guild_id), {}))
+        resolve_us = (time.perf_counter() - start) * 1e6 / min(count, 1000)
+
+        print(f"{count:>9,} | {legacy_size / 1e6:>11.1f} | {legacy_ms:>9.1f} | "
+              f"{layered_size / 1e3:>12.1f} | {layered_ms:>9.1f} | {resolve_us:>15.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+📊 Benchmark filtre de mots AutoMod - boucle historique vs Aho-Corasick
+=====================================================================
+10k messages français/anglais réalistes (dont ~8% contenant un mot filtré),
+testés contre les listes level_1_words ... level_4_words par défaut :
+- "boucle"    : l'ancien check_advanced_word_filter (`word.lower() in content` par mot)
+- "automate"  : WordFilterMatcher.highest(), un seul passage par message
+
+Les listes sont lues directement dans get_default_config() de
+modules/automod_system.py (sans importer discord).
+
+Usage: python benchmarks/bench_automod_filter.py [--messages 10000]
+"""
+
+import argparse
+import ast
+import os
+import random
+import sys
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+
+from modules.word_filter_engine import build_level_matcher
+
+FRENCH = ("salut tout le monde je suis en train de jouer ce soir avec les potes "
+          "quelqu'un veut faire une partie demain matin franchement le serveur est trop bien "
+          "merci pour l'aide j'ai enfin réussi le donjon vous avez vu la dernière mise à jour").split()
+ENGLISH = ("hey everyone what are you playing tonight anyone up for a quick match "
+           "the new update looks great thanks for the help i finally beat the boss "
+           "check out this clip lol that was insane see you tomorrow guys").split()
+
+
+def load_default_word_filter() -> dict:
+    """Extraire la section word_filter de get_default_config() par analyse du source"""
+    with open(os.path.join(ROOT, 'modules', 'automod_system.py'), encoding='utf-8') as f:
+        tree = ast.parse(f.read())
+    for node in ast.walk(tree):
+        if isinstance(node, ast.FunctionDef) and node.name == 'get_default_config':
+            for statement in node.body:
+                if isinstance(statement, ast.Return):
+                    return ast.literal_eval(statement.value)['word_filter']
+    raise RuntimeError("get_default_config introuvable")
+
+
+def generate_messages(count: int, word_filter: dict, rnd: random.Random):
+    bad_words = [word for level in (1, 2, 3, 4) for word in word_filter.get(f"level_{level}_words", [])]
+    messages = []
+    for _ in range(count):
+        vocabulary = FRENCH if rnd.random() < 0.5 else ENGLISH
+        words = [rnd.choice(vocabulary) for _ in range(rnd.randint(3, 25))]
+        if rnd.random() < 0.08:
+            words.insert(rnd.randrange(len(words) + 1), rnd.choice(bad_words))
+        messages.append(" ".join(words).lower())
+    return messages
+
+
+def legacy_highest(word_filter: dict, content: str):
+    """Reproduction de l'ancienne boucle niveau 4 -> niveau 1"""
+    for level in (4, 3, 2, 1):
+        for word in word_filter.get(f"level_{level}_words", []):
+            if word.lower() in content:
+                return level, word
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--messages', type=int, default=10000)
+    args = parser.parse_args()
+
+    word_filter = load_default_word_filter()
+    messages = generate_messages(args.messages, word_filter, random.Random(42))
+
+    start = time.perf_counter()
+    matcher = build_level_matcher(word_filter)
+    build_ms = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    legacy_results = [legacy_highest(word_filter, content) for content in messages]
+    legacy_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    matcher_results = [matcher.highest(content) for content in messages]
+    matcher_s = time.perf_counter() - start
+
+    # Même niveau détecté pour chaque message
+    mismatches = sum(
+        1 for old, new in zip(legacy_results, matcher_results)
+        if (old[0] if old else None) != (new[0] if new else None)
+    )
+    flagged = sum(1 for result in matcher_results if result)
+
+    print(f"📨 {len(messages)} messages, {matcher.word_count} mots surveillés, {flagged} messages détectés")
+    print(f"   Construction automate : {build_ms:8.1f} ms (une fois par config)")
+    print(f"   Boucle historique     : {legacy_s * 1e6 / len(messages):8.1f} µs/message")
+    print(f"   Automate              : {matcher_s * 1e6 / len(messages):8.1f} µs/message")
+    print(f"   Gain                  : x{legacy_s / matcher_s:.1f}")
+    print(f"   Niveaux divergents    : {mismatches}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+📊 Benchmark ArsenalCoins Central - Pool de connexions
+======================================================
+Compare le débit add/remove/get sous 8 threads concurrents :
+- "avant" : une connexion SQLite ouverte/fermée par appel, derrière un RLock global
+- "après" : ArsenalCoinsCentral avec CoinsConnectionPool (WAL, synchronous=NORMAL)
+
+Puis compare N appels add_coins() à un seul apply_batch() de N entrées.
+
+Usage: python benchmarks/bench_coins_central.py [--threads 8] [--ops 500] [--batch 500]
+"""
+
+import argparse
+import logging
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from arsenal_coins_central import ArsenalCoinsCentral
+
+
+class LegacyCoinsCentral:
+    """Reproduction du comportement historique (connect/close à chaque appel)"""
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self.lock = threading.RLock()
+        conn = sqlite3.connect(db_path)
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS user_balances (
+                user_id TEXT PRIMARY KEY,
+                balance INTEGER DEFAULT 0,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS transactions (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                user_id TEXT NOT NULL,
+                amount INTEGER NOT NULL,
+                transaction_type TEXT NOT NULL,
+                module_source TEXT NOT NULL,
+                description TEXT,
+                balance_before INTEGER NOT NULL,
+                balance_after INTEGER NOT NULL,
+                timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                metadata TEXT
+            )
+        ''')
+        conn.commit()
+        conn.close()
+
+    def get_balance(self, user_id):
+        with self.lock:
+            conn = sqlite3.connect(self.db_path)
+            row = conn.execute('SELECT balance FROM user_balances WHERE user_id = ?', (user_id,)).fetchone()
+            conn.close()
+            return row[0] if row else 0
+
+    def _write(self, user_id, delta, kind, module_source):
+        with self.lock:
+            conn = sqlite3.connect(self.db_path)
+            current = self.get_balance(user_id)
+            if current + delta < 0:
+                conn.close()
+                return False
+            conn.execute('INSERT OR REPLACE INTO user_balances (user_id, balance, updated_at) VALUES (?, ?, CURRENT_TIMESTAMP)',
+                         (user_id, current + delta))
+            conn.execute('''
+                INSERT INTO transactions
+                (user_id, amount, transaction_type, module_source, description, balance_before, balance_after, metadata)
+                VALUES (?, ?, ?, ?, NULL, ?, ?, NULL)
+            ''', (user_id, delta, kind, module_source, current, current + delta))
+            conn.commit()
+            conn.close()
+            return True
+
+    def add_coins(self, user_id, amount, module_source, description=None, metadata=None):
+        return self._write(user_id, amount, 'add', module_source)
+
+    def remove_coins(self, user_id, amount, module_source, description=None, metadata=None):
+        return self._write(user_id, -amount, 'remove', module_source)
+
+
+def run_workload(central, threads: int, ops: int, users: int = 200) -> float:
+    """Exécuter le mélange add/remove/get et retourner le débit (ops/s)"""
+    barrier = threading.Barrier(threads + 1)
+
+    def worker(seed):
+        rnd = random.Random(seed)
+        barrier.wait()
+        for _ in range(ops):
+            user_id = str(rnd.randrange(users))
+            roll = rnd.random()
+            if roll < 0.6:
+                central.get_balance(user_id)
+            elif roll < 0.85:
+                central.add_coins(user_id, rnd.randint(1, 100), 'bench')
+            else:
+                central.remove_coins(user_id, rnd.randint(1, 50), 'bench')
+
+    workers = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    for t in workers:
+        t.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for t in workers:
+        t.join()
+    elapsed = time.perf_counter() - start
+    return threads * ops / elapsed
+
+
+def run_batch_comparison(central: ArsenalCoinsCentral, size: int):
+    """Créditer ``size`` utilisateurs un par un, puis en un seul lot"""
+    start = time.perf_counter()
+    for i in range(size):
+        central.add_coins(f"single_{i}", 10, 'bench')
+    single = size / (time.perf_counter() - start)
+
+    stats = central.apply_batch([
+        {'user_id': f"batch_{i}", 'amount': 10, 'module_source': 'bench'} for i in range(size)
+    ], log_stats=False)
+    return single, stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--ops', type=int, default=500, help="opérations par thread")
+    parser.add_argument('--batch', type=int, default=500, help="taille du lot pour apply_batch")
+    args = parser.parse_args()
+
+    logging.getLogger('arsenal_coins_central').setLevel(logging.WARNING)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        legacy = LegacyCoinsCentral(os.path.join(tmp, 'legacy.db'))
+        before = run_workload(legacy, args.threads, args.ops)
+
+        pooled = ArsenalCoinsCentral(os.path.join(tmp, 'pooled.db'))
+        after = run_workload(pooled, args.threads, args.ops)
+        single, batch_stats = run_batch_comparison(pooled, args.batch)
+        pooled.pool.close_all()
+
+    print(f"🧵 {args.threads} threads x {args.ops} opérations (60% get / 25% add / 15% remove)")
+    print(f"   Avant (connect par appel) : {before:10.0f} ops/s")
+    print(f"   Après (pool WAL)          : {after:10.0f} ops/s")
+    print(f"   Gain                      : x{after / before:.1f}")
+    print(f"📦 {args.batch} crédits")
+    print(f"   add_coins un par un       : {single:10.0f} écritures/s")
+    print(f"   apply_batch (1 commit)    : {batch_stats['entries_per_sec']:10.0f} écritures/s "
+          f"({batch_stats['elapsed_ms']:.1f} ms)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+📊 Benchmark analytics - COUNT(*) sur le log vs agrégats horaires / journaliers
+==============================================================================
+Table command_logs remplie sur --days jours, pour plusieurs tailles :
+
+"historique" : requêtes des anciens endpoints (COUNT(*) 24h / 1h, top des
+               commandes et commandes par heure sur 7 jours) sur le log brut
+"agrégats"   : mêmes chiffres lus dans command_rollups (CommandRollups)
+
+Le log est écrit en heure locale (comme le webpanel) ; les agrégats sont
+interrogés avec la même date convertie en UTC.
+
+Mesure aussi le backfill complet et le coût incrémental d'un lot de 200
+commandes (catch_up juste après l'insertion, comme /api/ingest/batch).
+
+Usage: python benchmarks/bench_command_rollups.py [--sizes 10000 100000 1000000] [--days 60] [--repeat 20]
+"""
+
+import argparse
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+
+from command_rollups import CommandRollups, day_bucket
+from event_ingest import EventIngestor
+
+COMMANDS = ['play', 'skip', 'queue', 'help', 'ban', 'balance', 'daily', 'rank', 'casino', 'profile']
+
+
+def fill(path: str, rows: int, days: int, now: datetime):
+    EventIngestor(path).ingest([])  # Schéma command_logs
+    conn = sqlite3.connect(path)
+    span = days * 86400
+    random.seed(42)
+    conn.executemany(
+        "INSERT INTO command_logs (user_id, username, command, server_id, server_name, timestamp, success) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?)",
+        ((str(random.randrange(5000)), 'user', random.choice(COMMANDS), str(random.randrange(50)), 'Serveur',
+          (now - timedelta(seconds=span * i / rows)).strftime('%Y-%m-%d %H:%M:%S'), random.random() < 0.97)
+         for i in range(rows))
+    )
+    conn.commit()
+    conn.close()
+
+
+def legacy_queries(path: str, now: datetime):
+    conn = sqlite3.connect(path)
+    fmt = '%Y-%m-%d %H:%M:%S'
+    day_ago, hour_ago = (now - timedelta(days=1)).strftime(fmt), (now - timedelta(hours=1)).strftime(fmt)
+    # 7 jours calendaires UTC, comme /api/analytics/commands, ramenés en heure locale
+    week_ago = (datetime.strptime(day_bucket(now.astimezone(timezone.utc) - timedelta(days=6)), '%Y-%m-%d')
+                .replace(tzinfo=timezone.utc).astimezone().strftime(fmt))
+    result = (
+        conn.execute("SELECT COUNT(*) FROM command_logs WHERE timestamp > ?", (day_ago,)).fetchone()[0],
+        conn.execute("SELECT COUNT(*) FROM command_logs WHERE timestamp > ?", (hour_ago,)).fetchone()[0],
+        conn.execute("SELECT command, COUNT(*) FROM command_logs WHERE timestamp >= ? GROUP BY command "
+                     "ORDER BY 2 DESC, command LIMIT 10", (week_ago,)).fetchall(),
+        conn.execute("SELECT substr(timestamp, 1, 13), COUNT(*) FROM command_logs WHERE timestamp > ? "
+                     "GROUP BY 1", (day_ago,)).fetchall(),
+        conn.execute("SELECT COUNT(*) FROM command_logs").fetchone()[0],
+    )
+    conn.close()
+    return result
+
+
+def rollup_queries(rollups: CommandRollups, now: datetime):
+    now = now.astimezone(timezone.utc)
+    first_day = day_bucket(now - timedelta(days=6))
+    return (
+        rollups.window('command_logs', 24, now)['total'],
+        rollups.window('command_logs', 1, now)['total'],
+        rollups.top('command_logs', 'command', 'day', first_day, day_bucket(now), limit=10),
+        rollups.series('command_logs', 'hour', 24, now),
+        rollups.bucket('command_logs', 'total', '')['total'],
+    )
+
+
+def timed(fn, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    return (time.perf_counter() - start) / repeat * 1000, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000, 1000000])
+    parser.add_argument('--days', type=int, default=60)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+    now = datetime.now().replace(minute=30, second=0, microsecond=0)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in args.sizes:
+            path = os.path.join(tmp, f'log_{size}.db')
+            fill(path, size, args.days, now)
+            rollups = CommandRollups(path, refresh_interval=3600)
+
+            start = time.perf_counter()
+            rollups.catch_up()
+            backfill = time.perf_counter() - start
+
+            legacy_ms, legacy = timed(lambda: legacy_queries(path, now), max(1, args.repeat // 5))
+            rollup_ms, rolled = timed(lambda: rollup_queries(rollups, now), args.repeat)
+
+            batch = [{'type': 'command', 'user_id': str(i), 'command': 'play', 'server_id': '1',
+                      'timestamp': now.strftime('%Y-%m-%d %H:%M:%S')} for i in range(200)]
+            ingestor = EventIngestor(path)
+            insert_ms, _ = timed(lambda: ingestor.ingest(batch), 10)
+            ingestor.rollups = rollups
+            insert_rollup_ms, _ = timed(lambda: ingestor.ingest(batch), 10)
+
+            print(f"📈 {size:,} commandes sur {args.days} jours")
+            print(f"   historique  {legacy_ms:8.2f} ms | 24h {legacy[0]:,} | 1h {legacy[1]:,} | total {legacy[4]:,}")
+            print(f"   agrégats    {rollup_ms:8.2f} ms | 24h {rolled[0]:,} | 1h {rolled[1]:,} | total {rolled[4]:,}")
+            print(f"   top 7j identique : {[c for c, _ in legacy[2]] == [item['name'] for item in rolled[2]]}")
+            print(f"   backfill {backfill:6.2f}s | lot de 200 : {insert_ms:5.2f} ms -> {insert_rollup_ms:5.2f} ms avec agrégats")
+
+
+if __name__ == "__main__":
+    main()
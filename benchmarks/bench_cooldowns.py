@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+📊 Benchmark cooldowns - lecture en base par message vs CooldownStore
+====================================================================
+--messages messages de --users utilisateurs distincts :
+
+"historique" : process_xp d'origine du bot, SELECT * FROM users puis
+               datetime.fromisoformat(last_xp) à chaque message, UPDATE de
+               last_xp quand l'XP est accordée
+"store"      : CooldownStore.try_acquire('xp', ...) en mémoire, la base n'est
+               touchée que pour les messages hors cooldown
+
+Mesure aussi la mémoire de --active cooldowns actifs, le coût de
+snapshot()/load() et vérifie que les deux chemins accordent l'XP aux mêmes
+messages.
+
+Usage: python benchmarks/bench_cooldowns.py [--users 5000] [--messages 200000] [--active 1000000]
+"""
+
+import argparse
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+
+from modules.cooldown_store import CooldownStore
+
+XP_COOLDOWN = 60
+
+
+def make_db(path: str, users: int) -> sqlite3.Connection:
+    conn = sqlite3.connect(path)
+    conn.row_factory = sqlite3.Row
+    conn.execute('''CREATE TABLE users (user_id INTEGER PRIMARY KEY, username TEXT, balance INTEGER DEFAULT 100,
+                    xp INTEGER DEFAULT 0, level INTEGER DEFAULT 1, last_daily TEXT, last_work TEXT, last_xp TEXT)''')
+    conn.executemany("INSERT INTO users (user_id, username) VALUES (?, ?)",
+                     ((user_id, f"User_{user_id}") for user_id in range(users)))
+    conn.commit()
+    return conn
+
+
+def legacy(conn: sqlite3.Connection, messages, start: datetime) -> list:
+    granted = []
+    for offset, user_id in messages:
+        now = start + timedelta(seconds=offset)
+        user = conn.execute('SELECT * FROM users WHERE user_id = ?', (user_id,)).fetchone()
+        if user['last_xp'] and (now - datetime.fromisoformat(user['last_xp'])).total_seconds() < XP_COOLDOWN:
+            continue
+        conn.execute('UPDATE users SET last_xp = ? WHERE user_id = ?', (now.isoformat(), user_id))
+        granted.append(offset)
+    conn.commit()
+    return granted
+
+
+def with_store(store: CooldownStore, conn: sqlite3.Connection, messages, start: datetime) -> list:
+    granted = []
+    base = int(start.timestamp())
+    for offset, user_id in messages:
+        if store.try_acquire('xp', 0, user_id, XP_COOLDOWN, base + offset):
+            continue
+        conn.execute('UPDATE users SET last_xp = ? WHERE user_id = ?',
+                     ((start + timedelta(seconds=offset)).isoformat(), user_id))
+        granted.append(offset)
+    conn.commit()
+    return granted
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--users', type=int, default=5000)
+    parser.add_argument('--messages', type=int, default=200000)
+    parser.add_argument('--active', type=int, default=1000000)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    # ~200 messages/s simulés : offset en secondes entières, utilisateur tiré au hasard
+    messages = [(i // 200, rng.randrange(args.users)) for i in range(args.messages)]
+    start = datetime.now().replace(microsecond=0)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"⏱️ {args.messages:,} messages, {args.users:,} utilisateurs, cooldown XP {XP_COOLDOWN}s")
+        results = {}
+        for name in ('historique', 'store'):
+            conn = make_db(os.path.join(tmp, f'{name}.db'), args.users)
+            begin = time.perf_counter()
+            if name == 'historique':
+                granted = legacy(conn, messages, start)
+            else:
+                granted = with_store(CooldownStore(), conn, messages, start)
+            elapsed = time.perf_counter() - begin
+            conn.close()
+            results[name] = granted
+            print(f"   {name:<11} {elapsed:6.2f}s | {elapsed / args.messages * 1e6:6.2f} µs/message | "
+                  f"{len(granted):,} gains d'XP")
+        print(f"   mêmes messages récompensés : {results['historique'] == results['store']}")
+
+        print(f"\n💾 {args.active:,} cooldowns actifs")
+        tracemalloc.start()
+        store = CooldownStore()
+        now = int(time.time())
+        for user_id in range(args.active):
+            store.try_acquire('daily', 123456789012345678, 100000000000000000 + user_id, 86400, now)
+        memory = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        path = os.path.join(tmp, 'cooldowns.bin')
+        begin = time.perf_counter()
+        store.snapshot(path)
+        snapshot_s = time.perf_counter() - begin
+        begin = time.perf_counter()
+        reloaded = CooldownStore()
+        reloaded.load(path)
+        load_s = time.perf_counter() - begin
+        print(f"   mémoire {memory / args.active:5.0f} o/cooldown | snapshot {snapshot_s:5.2f}s "
+              f"({os.path.getsize(path) / 1e6:.1f} Mo) | load {load_s:5.2f}s | "
+              f"identiques {reloaded.expiry == store.expiry}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+📊 Benchmark client REST Discord - requests.* ad hoc vs client partagé
+=====================================================================
+Contre le faux serveur local (benchmarks/discord_stub_server.py) :
+
+1. Connexions OAuth : N logins simultanés
+   - "historique" : requests.post/get sans session + time.sleep(0.2/0.1/0.1),
+     token puis /users/@me puis /users/@me/guilds en séquence
+   - "client"     : DiscordRESTClient (keep-alive), /users/@me et /guilds en parallèle
+2. Rafale sur une route limitée (serveurs du bot) : 429 reçus avec et sans
+   lecture des en-têtes X-RateLimit-*
+
+Usage: python benchmarks/bench_discord_rest.py [--logins 40] [--concurrency 8] [--latency 0.05]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from discord_rest import DiscordRESTClient
+from discord_stub_server import start_stub_server
+
+
+def legacy_login(base_url: str, code: str) -> float:
+    """Reproduction de l'ancien discord_callback (sans le code de fallback)"""
+    start = time.perf_counter()
+    time.sleep(0.2)
+    token = requests.post(f"{base_url}/oauth2/token", data={'grant_type': 'authorization_code', 'code': code},
+                          auth=('client', 'secret'), timeout=5).json()['access_token']
+    headers = {'Authorization': f'Bearer {token}'}
+    time.sleep(0.1)
+    requests.get(f"{base_url}/users/@me", headers=headers, timeout=5).json()
+    time.sleep(0.1)
+    requests.get(f"{base_url}/users/@me/guilds", headers=headers, timeout=5).json()
+    return time.perf_counter() - start
+
+
+def client_login(client: DiscordRESTClient, code: str) -> float:
+    start = time.perf_counter()
+    token = client.exchange_code('client', 'secret', code, 'http://localhost/callback')['access_token']
+    user_future, guilds_future = client.fetch_user_and_guilds(token)
+    user_future.result()
+    guilds_future.result()
+    return time.perf_counter() - start
+
+
+def run_logins(label: str, login, logins: int, concurrency: int, state):
+    connections_before = state.connections
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        durations = list(pool.map(login, [f"code-{i}" for i in range(logins)]))
+    total = time.perf_counter() - start
+    durations.sort()
+    print(f"   {label:<11} total {total:6.2f}s | login médian {statistics.median(durations) * 1000:6.0f} ms, "
+          f"p95 {durations[int(len(durations) * 0.95) - 1] * 1000:6.0f} ms | "
+          f"connexions TCP {state.connections - connections_before}")
+
+
+def run_burst(label: str, fetch, requests_count: int, state):
+    limited_before = state.rate_limited
+    start = time.perf_counter()
+    statuses = [fetch() for _ in range(requests_count)]
+    total = time.perf_counter() - start
+    print(f"   {label:<11} {statuses.count(200)}/{requests_count} OK en {total:5.2f}s | "
+          f"429 reçus {state.rate_limited - limited_before}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--logins', type=int, default=40)
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--latency', type=float, default=0.05)
+    parser.add_argument('--burst', type=int, default=20)
+    args = parser.parse_args()
+
+    # Limite large pour les logins (un token par utilisateur), stricte pour la rafale
+    server, state, base_url = start_stub_server(latency=args.latency, limit=1000, window=1.0)
+    client = DiscordRESTClient(base_url=base_url)
+
+    print(f"🔐 {args.logins} logins OAuth, {args.concurrency} en parallèle, latence serveur {args.latency * 1000:.0f} ms")
+    run_logins("historique", lambda code: legacy_login(base_url, code), args.logins, args.concurrency, state)
+    run_logins("client", lambda code: client_login(client, code), args.logins, args.concurrency, state)
+
+    server.shutdown()
+
+    server, state, base_url = start_stub_server(latency=args.latency, limit=5, window=1.0)
+    client = DiscordRESTClient(base_url=base_url)
+    print(f"\n🚦 Rafale de {args.burst} appels /users/@me/guilds (bot), limite 5 req/s")
+    bot_headers = {'Authorization': 'Bot stub-bot-token'}
+    run_burst("historique", lambda: requests.get(f"{base_url}/users/@me/guilds", headers=bot_headers, timeout=5).status_code,
+              args.burst, state)
+    time.sleep(1.0)  # Fenêtre du faux serveur remise à zéro
+
+    def client_fetch():
+        client.get_bot_guilds('stub-bot-token')
+        return 200
+
+    run_burst("client", client_fetch, args.burst, state)
+    print(f"\n📈 Client : {client.get_stats()}")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
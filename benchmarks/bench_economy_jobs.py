@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+📊 Benchmark jobs économie - boucle par utilisateur vs traitement par lot
+=======================================================================
+--users utilisateurs (un tiers avec un boost expiré, un tiers avec un objet
+d'inventaire expiré) :
+
+"boucle"  : intérêts appliqués utilisateur par utilisateur avec get() / put()
+            puis flush() à chaque utilisateur (une transaction SQLite ou une
+            réécriture complète du JSON par utilisateur, mesurée sur
+            --json-users utilisateurs puis extrapolée)
+"run_job" : EconomyStorage.run_job (UPDATE ensembliste en SQLite, une passe
+            en mémoire et une seule écriture en JSON)
+
+Vérifie que dry_run annonce l'impact réel et que les deux backends donnent
+les mêmes données.
+
+Usage: python benchmarks/bench_economy_jobs.py [--users 100000] [--json-users 5]
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+
+from modules.economy_jobs import BankInterestJob, ExpireBoostsJob, ExpireItemsJob
+from modules.economy_storage import JSONEconomyStorage, SQLiteEconomyStorage
+
+GUILD_ID = 1000
+RATE = 0.02
+
+
+def make_user(rng: random.Random, user_id: int, now: float) -> dict:
+    boosts = {"boost_xp": {"multiplier": 2, "expires": now + 3600}}
+    if user_id % 3 == 0:
+        boosts["boost_money"] = {"multiplier": 1.5, "expires": now - 60}
+    inventory = [{"id": "vip_role", "name": "VIP", "acquired": now - 7200, "expires": None}]
+    if user_id % 3 == 1:
+        inventory.insert(0, {"id": "custom_color", "name": "Couleur", "acquired": now - 7200, "expires": now - 1})
+    return {"balance": rng.randrange(10000), "bank": rng.randrange(100000), "xp": 0, "level": 1,
+            "total_earned": 0, "total_spent": 0, "active_boosts": boosts, "inventory": inventory,
+            "stats": {"messages_sent": 0}}
+
+
+def fill(storage, users: int, now: float):
+    rng = random.Random(42)
+    for user_id in range(users):
+        storage._store(GUILD_ID, user_id, make_user(rng, user_id, now))
+        storage._dirty.add((GUILD_ID, user_id))
+    storage.flush()
+
+
+def per_user_interest(storage, users: int) -> float:
+    start = time.perf_counter()
+    for user_id in range(users):
+        data = storage.get(GUILD_ID, user_id)
+        interest = int(data["bank"] * RATE)
+        if interest > 0:
+            data["bank"] += interest
+            data["total_earned"] += interest
+            storage.put(GUILD_ID, user_id, data)
+            storage.flush()
+    return time.perf_counter() - start
+
+
+def run_jobs(storage, now: float) -> dict:
+    timings = {}
+    for job in (BankInterestJob(RATE), ExpireBoostsJob(now), ExpireItemsJob(now)):
+        preview = storage.run_job(job, dry_run=True)
+        start = time.perf_counter()
+        result = storage.run_job(job)
+        timings[job.name] = (time.perf_counter() - start, result, preview == result)
+    return timings
+
+
+def snapshot(storage) -> dict:
+    return {(guild_id, user_id): data for guild_id, user_id, data in storage.iter_all()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--users', type=int, default=100000)
+    parser.add_argument('--json-users', type=int, default=5)
+    args = parser.parse_args()
+
+    now = time.time()
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"🏦 Intérêts {RATE:.0%} + expirations sur {args.users:,} utilisateurs")
+
+        storage = SQLiteEconomyStorage(os.path.join(tmp, 'loop.db'), max_cached=10 ** 9, flush_threshold=10 ** 9)
+        fill(storage, args.users, now)
+        loop_sqlite = per_user_interest(storage, args.users)
+        storage.close()
+
+        storage = JSONEconomyStorage(os.path.join(tmp, 'loop.json'), flush_threshold=10 ** 9, flush_interval=10 ** 9)
+        fill(storage, args.users, now)
+        loop_json = per_user_interest(storage, args.json_users) / args.json_users * args.users
+        print(f"   boucle      SQLite {loop_sqlite:7.2f}s | JSON ~{loop_json:,.0f}s (extrapolé)")
+
+        results = {}
+        for name, storage in (
+            ('SQLite', SQLiteEconomyStorage(os.path.join(tmp, 'jobs.db'), max_cached=10 ** 9, flush_threshold=10 ** 9)),
+            ('JSON', JSONEconomyStorage(os.path.join(tmp, 'jobs.json'), flush_threshold=10 ** 9, flush_interval=10 ** 9)),
+        ):
+            fill(storage, args.users, now)
+            timings = run_jobs(storage, now)
+            results[name] = snapshot(storage)
+            storage.close()
+            print(f"   run_job     {name:<6} " + " | ".join(
+                f"{job} {elapsed:5.2f}s ({users:,} util., {amount:,})" + ("" if same else " ⚠️ dry-run différent")
+                for job, (elapsed, (users, amount), same) in timings.items()))
+
+        same = results['SQLite'].keys() == results['JSON'].keys() and all(
+            results['SQLite'][key] == results['JSON'][key] for key in results['SQLite'])
+        print(f"   backends identiques : {same}")
+
+
+if __name__ == "__main__":
+    main()
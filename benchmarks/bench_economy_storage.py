@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+📊 Benchmark stockage économie - messages/seconde soutenus
+==========================================================
+Simule le chemin de EconomyCog.on_message (lecture utilisateur, gain d'XP,
+écriture) avec 10k, 100k et 1M utilisateurs déjà enregistrés :
+- "json"   : ancien comportement, users_economy.json réécrit à chaque message
+- "sqlite" : SQLiteEconomyStorage, lignes modifiées écrites par lots
+
+Le backend JSON devient si lent à grande échelle qu'il n'est mesuré que sur
+--json-messages messages.
+
+Usage: python benchmarks/bench_economy_storage.py [--sizes 10000,100000,1000000] [--messages 20000]
+"""
+
+import argparse
+import logging
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from modules.economy_storage import JSONEconomyStorage, SQLiteEconomyStorage
+
+GUILDS = 50
+
+
+def make_user(rnd: random.Random) -> dict:
+    xp = rnd.randint(0, 50000)
+    return {
+        "balance": rnd.randint(0, 100000), "bank": rnd.randint(0, 100000), "xp": xp, "level": 1 + xp // 1000,
+        "last_xp_gain": 0, "total_earned": 1000, "total_spent": 0, "daily_streak": 0,
+        "last_daily": 0, "last_work": 0, "last_crime": 0, "inventory": [], "active_boosts": {},
+        "achievements": [],
+        "stats": {"messages_sent": 0, "commands_used": 0, "daily_claims": 0,
+                  "work_count": 0, "crime_success": 0, "crime_fail": 0},
+    }
+
+
+def populate_sqlite(storage: SQLiteEconomyStorage, size: int, rnd: random.Random):
+    rows = (storage._to_row(i % GUILDS, i, make_user(rnd)) for i in range(size))
+    storage.conn.execute("BEGIN")
+    storage.conn.executemany(storage._UPSERT, rows)
+    storage.conn.execute("COMMIT")
+
+
+def populate_json(storage: JSONEconomyStorage, size: int, rnd: random.Random):
+    storage.users_data = {f"{i % GUILDS}_{i}": make_user(rnd) for i in range(size)}
+
+
+def run_messages(storage, size: int, messages: int, rnd: random.Random) -> float:
+    """Chemin on_message : get -> +XP -> put ; retourne les messages/seconde"""
+    start = time.perf_counter()
+    for _ in range(messages):
+        user_id = rnd.randrange(size)
+        data = storage.get(user_id % GUILDS, user_id)
+        data["xp"] += rnd.randint(15, 25)
+        data["stats"]["messages_sent"] += 1
+        data["last_xp_gain"] = time.time()
+        storage.put(user_id % GUILDS, user_id, data)
+    storage.flush()
+    return messages / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', default='10000,100000,1000000')
+    parser.add_argument('--messages', type=int, default=20000)
+    parser.add_argument('--json-messages', type=int, default=20)
+    args = parser.parse_args()
+
+    logging.getLogger("ArsenalBot").setLevel(logging.WARNING)
+    rnd = random.Random(42)
+
+    print(f"{'utilisateurs':>12} | {'json (msg/s)':>14} | {'sqlite (msg/s)':>15}")
+    for size in (int(value) for value in args.sizes.split(',')):
+        with tempfile.TemporaryDirectory() as tmp:
+            # Ancien comportement : écriture complète à chaque message
+            json_storage = JSONEconomyStorage(os.path.join(tmp, 'users_economy.json'), flush_threshold=1)
+            populate_json(json_storage, size, rnd)
+            json_rate = run_messages(json_storage, size, args.json_messages, rnd)
+            del json_storage
+
+            sqlite_storage = SQLiteEconomyStorage(os.path.join(tmp, 'economy.db'))
+            populate_sqlite(sqlite_storage, size, rnd)
+            sqlite_rate = run_messages(sqlite_storage, size, args.messages, rnd)
+            sqlite_storage.close()
+
+        print(f"{size:>12,} | {json_rate:>14,.2f} | {sqlite_rate:>15,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+📊 Benchmark bot -> webpanel - un POST par commande vs lots /api/ingest/batch
+===========================================================================
+Un serveur HTTP local expose les deux routes avec la logique du webpanel :
+
+"historique" : une connexion HTTP neuve par événement (ancienne ClientSession
+               par appel) -> /api/commands/log : connexion SQLite, INSERT,
+               commit par événement
+"lots"       : EventShipper (file bornée, lots, une connexion keep-alive)
+               -> /api/ingest/batch : un executemany par lot, une transaction
+
+Puis deux scénarios de robustesse du shipper :
+- webpanel indisponible (503) pendant --outage-ms : nouveaux essais, rien perdu
+- rafale plus grande que la file : événements abandonnés et comptés
+
+aiohttp n'étant pas requis ici, le transport du shipper est remplacé par
+http.client (connexion persistante) dans un thread ; la file, les lots et
+les nouveaux essais sont ceux du module.
+
+Usage: python benchmarks/bench_event_ingest.py [--events 5000] [--batch-size 200]
+"""
+
+import argparse
+import asyncio
+import http.client
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'Arsenal_V4', 'webpanel'))
+
+from event_ingest import EventIngestor, InvalidBatch
+from event_shipper import EventShipper
+
+
+def make_server(db_path: str):
+    ingestor = EventIngestor(db_path)
+    state = {'unavailable_until': 0.0, 'requests': 0}
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'  # Keep-alive pour le shipper
+
+        def log_message(self, format, *args):
+            pass
+
+        def reply(self, status: int, payload: dict):
+            body = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_POST(self):
+            data = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+            state['requests'] += 1
+            if time.monotonic() < state['unavailable_until']:
+                return self.reply(503, {'error': 'indisponible'})
+            if self.path == '/api/commands/log':
+                # Ancienne route : une connexion et un commit par commande
+                conn = sqlite3.connect(db_path)
+                conn.execute('''
+                    INSERT INTO command_logs (user_id, username, command, server_id, server_name, timestamp, success)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                ''', (data.get('user_id'), data.get('username'), data.get('command'), data.get('server_id'),
+                      data.get('server_name'), data.get('timestamp'), data.get('success', True)))
+                conn.commit()
+                conn.close()
+                return self.reply(200, {'status': 'logged'})
+            try:
+                return self.reply(200, {'status': 'ingested', 'counts': ingestor.ingest(data.get('events'))})
+            except InvalidBatch as e:
+                return self.reply(400, {'error': str(e)})
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, state
+
+
+class StdlibShipper(EventShipper):
+    """Transport http.client (connexion persistante) à la place de la session aiohttp"""
+
+    async def _open_session(self):
+        host, port = self.url.split('//', 1)[1].split('/', 1)[0].split(':')
+        return http.client.HTTPConnection(host, int(port), timeout=self.timeout)
+
+    async def _close_session(self):
+        self.session.close()
+
+    def _post_sync(self, batch):
+        body = json.dumps({'events': batch})
+        try:
+            self.session.request('POST', '/api/ingest/batch', body, {'Content-Type': 'application/json'})
+            response = self.session.getresponse()
+            response.read()
+            return response.status
+        except (http.client.HTTPException, OSError):
+            self.session.close()  # Reconnexion au prochain essai
+            raise
+
+    async def _post(self, batch):
+        return await asyncio.to_thread(self._post_sync, batch)
+
+
+def command_event(i: int) -> dict:
+    return {'user_id': str(431359112039890945 + i % 500), 'username': f"user{i % 500}",
+            'command': ('play', 'balance', 'daily', 'rank')[i % 4], 'server_id': str(1000 + i % 20),
+            'server_name': f"Serveur {i % 20}", 'timestamp': '2025-08-14T20:38:00', 'success': True}
+
+
+def count_rows(db_path: str) -> int:
+    conn = sqlite3.connect(db_path)
+    try:
+        return conn.execute("SELECT COUNT(*) FROM command_logs").fetchone()[0]
+    finally:
+        conn.close()
+
+
+def bench_legacy(port: int, events: int) -> float:
+    start = time.perf_counter()
+    for i in range(events):
+        conn = http.client.HTTPConnection('127.0.0.1', port, timeout=10)
+        conn.request('POST', '/api/commands/log', json.dumps(command_event(i)), {'Content-Type': 'application/json'})
+        conn.getresponse().read()
+        conn.close()
+    return time.perf_counter() - start
+
+
+async def run_shipper(port: int, events: int, batch_size: int, max_queue: int = 10000,
+                      pace_every: int = 0) -> tuple:
+    shipper = StdlibShipper(f"http://127.0.0.1:{port}", token='', batch_size=batch_size, flush_interval=0.05,
+                            max_queue=max_queue, backoff=0.05, max_backoff=0.5)
+    await shipper.start()
+    start = time.perf_counter()
+    for i in range(events):
+        event = command_event(i)
+        shipper.emit('command', **event)
+        if pace_every and i % pace_every == 0:
+            await asyncio.sleep(0)  # Le bot rend la main entre deux commandes
+    while shipper.get_stats()['queued'] or shipper._pending:
+        await asyncio.sleep(0.005)
+    elapsed = time.perf_counter() - start
+    await shipper.stop()
+    return elapsed, shipper.get_stats()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--events', type=int, default=5000)
+    parser.add_argument('--batch-size', type=int, default=200)
+    parser.add_argument('--outage-ms', type=float, default=500.0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'arsenal_v4.db')
+        EventIngestor(db_path).ingest([])  # Schéma command_logs
+        server, state = make_server(db_path)
+        port = server.server_address[1]
+
+        print(f"📤 {args.events:,} commandes envoyées au webpanel")
+        legacy = bench_legacy(port, args.events)
+        print(f"   historique  {args.events / legacy:8.0f} évén./s | {legacy:6.2f}s | "
+              f"{args.events:,} requêtes HTTP, {args.events:,} commits | lignes {count_rows(db_path):,}")
+
+        before_rows, before_requests = count_rows(db_path), state['requests']
+        elapsed, stats = asyncio.run(run_shipper(port, args.events, args.batch_size, pace_every=50))
+        print(f"   lots        {args.events / elapsed:8.0f} évén./s | {elapsed:6.2f}s | "
+              f"{state['requests'] - before_requests:,} requêtes HTTP, {stats['batches']:,} commits | "
+              f"lignes {count_rows(db_path) - before_rows:,}")
+
+        print(f"\n🔌 Webpanel indisponible (503) pendant {args.outage_ms:.0f} ms")
+        before_rows = count_rows(db_path)
+        state['unavailable_until'] = time.monotonic() + args.outage_ms / 1000
+        elapsed, stats = asyncio.run(run_shipper(port, args.events, args.batch_size, pace_every=50))
+        print(f"   {elapsed:6.2f}s | nouveaux essais {stats['retries']} | lots abandonnés {stats['failed_batches']} | "
+              f"lignes {count_rows(db_path) - before_rows:,}/{args.events:,}")
+
+        print(f"\n🌊 Rafale de {args.events:,} événements sans rendre la main, file de 1 000")
+        before_rows = count_rows(db_path)
+        elapsed, stats = asyncio.run(run_shipper(port, args.events, args.batch_size, max_queue=1000))
+        print(f"   acceptés {stats['emitted']:,} | abandonnés {stats['dropped']:,} | "
+              f"lignes {count_rows(db_path) - before_rows:,}")
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+📊 Benchmark niveaux - boucles par niveau vs courbe inversée
+===========================================================
+1) Gain d'XP : get_level_from_xp + get_xp_for_next_level d'origine (boucles
+   while / for sur les niveaux) vs LinearSumCurve.level_for_xp + progress,
+   pour des joueurs de différents niveaux
+
+2) Changement de level_multiplier sur --users utilisateurs (SQLite) :
+   "historique" : lecture de toutes les lignes, boucle par utilisateur,
+                  executemany des nouveaux niveaux
+   "relevel"    : SQLiteEconomyStorage.relevel, un seul UPDATE avec la
+                  courbe exposée comme fonction SQL
+
+Usage: python benchmarks/bench_level_curves.py [--users 100000] [--calls 20000]
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+
+from modules.economy_storage import SQLiteEconomyStorage
+from modules.level_curves import LinearSumCurve
+
+
+def legacy_level_from_xp(xp: int, multiplier: int) -> int:
+    level = 1
+    while xp >= level * multiplier:
+        xp -= level * multiplier
+        level += 1
+    return level
+
+
+def legacy_progress(xp: int, level: int, multiplier: int):
+    total = 0
+    for i in range(1, level):
+        total += i * multiplier
+    return xp - total, level * multiplier
+
+
+def bench_xp_gain(calls: int):
+    curve = LinearSumCurve(100)
+    print(f"⚡ {calls:,} gains d'XP (level_multiplier 100)")
+    for level in (5, 50, 200):
+        xp = curve.total_xp(level) + 42
+        start = time.perf_counter()
+        for _ in range(calls):
+            legacy_progress(xp, legacy_level_from_xp(xp, 100), 100)
+        legacy = (time.perf_counter() - start) / calls * 1e6
+        start = time.perf_counter()
+        for _ in range(calls):
+            curve.progress(xp, curve.level_for_xp(xp))
+        fast = (time.perf_counter() - start) / calls * 1e6
+        assert curve.level_for_xp(xp) == legacy_level_from_xp(xp, 100) == level
+        print(f"   niveau {level:>3}  boucles {legacy:8.2f} µs | courbe {fast:5.2f} µs")
+
+
+def fill(storage: SQLiteEconomyStorage, users: int):
+    rng = random.Random(42)
+    curve = LinearSumCurve(100)
+    for user_id in range(users):
+        xp = rng.randrange(2000000)
+        storage._store(1, user_id, {"balance": 0, "bank": 0, "xp": xp, "level": curve.level_for_xp(xp),
+                                    "total_earned": 0, "total_spent": 0, "stats": {"messages_sent": 0}})
+        storage._dirty.add((1, user_id))
+    storage.flush()
+    storage._cache.clear()
+
+
+def legacy_relevel(storage: SQLiteEconomyStorage, multiplier: int) -> int:
+    rows = storage.conn.execute("SELECT guild_id, user_id, xp, level FROM economy_users").fetchall()
+    updates = []
+    for guild_id, user_id, xp, level in rows:
+        new_level = legacy_level_from_xp(xp, multiplier)
+        if new_level != level:
+            updates.append((new_level, guild_id, user_id))
+    storage.conn.execute("BEGIN")
+    storage.conn.executemany("UPDATE economy_users SET level = ? WHERE guild_id = ? AND user_id = ?", updates)
+    storage.conn.execute("COMMIT")
+    return len(updates)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--users', type=int, default=100000)
+    parser.add_argument('--calls', type=int, default=20000)
+    args = parser.parse_args()
+
+    bench_xp_gain(args.calls)
+
+    print(f"\n📈 level_multiplier 100 -> 150 sur {args.users:,} utilisateurs")
+    with tempfile.TemporaryDirectory() as tmp:
+        results = {}
+        for name in ('historique', 'relevel'):
+            storage = SQLiteEconomyStorage(os.path.join(tmp, f'{name}.db'), max_cached=10 ** 9,
+                                           flush_threshold=10 ** 9)
+            fill(storage, args.users)
+            start = time.perf_counter()
+            if name == 'historique':
+                changed = legacy_relevel(storage, 150)
+            else:
+                changed = storage.relevel(LinearSumCurve(150).level_for_xp)
+            elapsed = time.perf_counter() - start
+            results[name] = storage.conn.execute("SELECT user_id, level FROM economy_users ORDER BY user_id").fetchall()
+            storage.close()
+            print(f"   {name:<11} {elapsed:6.2f}s | {changed:,} niveaux modifiés")
+        print(f"   niveaux identiques : {results['historique'] == results['relevel']}")
+
+
+if __name__ == "__main__":
+    main()
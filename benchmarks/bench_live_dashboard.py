@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+📊 Benchmark dashboard temps réel - polling vs publication (SSE)
+================================================================
+Simule N onglets ouverts sur le dashboard pendant une durée donnée :
+- "polling"      : chaque onglet appelle chaque API à son intervalle
+                   (calcul du jeu de données + sérialisation JSON par requête)
+- "publication"  : DashboardPublisher calcule chaque jeu de données une fois par
+                   échéance et pousse le même frame (delta) à tous les abonnés
+
+Le producteur simulé coûte --producer-ms (lecture fichier / requête SQL du vrai serveur).
+
+Usage: python benchmarks/bench_live_dashboard.py [--clients 1 10 100] [--seconds 300]
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+
+from live_dashboard import DashboardPublisher
+
+# (jeu de données, intervalle de publication, intervalle de polling historique de index.html)
+DATASETS = (("bot_status", 10, 30), ("stats", 30, 60), ("performance", 5, 45), ("activity", 30, 60))
+
+
+def make_producer(name: str, cost_ms: float, counter: dict):
+    """Producteur simulé : coût fixe, une valeur qui change de temps en temps"""
+    def produce():
+        counter[name] = counter.get(name, 0) + 1
+        deadline = time.perf_counter() + cost_ms / 1000
+        while time.perf_counter() < deadline:
+            pass
+        payload = {f"field_{i}": i for i in range(20)}
+        payload["value"] = random.randint(0, 3)  # Change environ 3 fois sur 4
+        payload["name"] = name
+        return payload
+    return produce
+
+
+def run_polling(clients: int, seconds: int, cost_ms: float) -> dict:
+    counter = {}
+    producers = {name: make_producer(name, cost_ms, counter) for name, _, _ in DATASETS}
+    sent = 0
+    start = time.perf_counter()
+    for _ in range(clients):
+        for name, _, poll_interval in DATASETS:
+            for _ in range(seconds // poll_interval):
+                sent += len(json.dumps(producers[name]()))
+    return {"seconds": time.perf_counter() - start, "computations": sum(counter.values()), "bytes": sent}
+
+
+def run_publisher(clients: int, seconds: int, cost_ms: float) -> dict:
+    counter = {}
+    publisher = DashboardPublisher()
+    for name, interval, _ in DATASETS:
+        publisher.register(name, make_producer(name, cost_ms, counter), interval)
+    subscriptions = [publisher.subscribe_sse([name for name, _, _ in DATASETS]) for _ in range(clients)]
+
+    start = time.perf_counter()
+    sent = 0
+    now = 1_000_000.0
+    for tick in range(seconds):
+        publisher.run_once(now + tick)
+        for subscription in subscriptions:
+            while not subscription.queue.empty():
+                sent += len(subscription.queue.get_nowait())
+    elapsed = time.perf_counter() - start
+    return {"seconds": elapsed, "computations": sum(counter.values()), "bytes": sent}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--clients', type=int, nargs='+', default=[1, 10, 100])
+    parser.add_argument('--seconds', type=int, default=300)
+    parser.add_argument('--producer-ms', type=float, default=2.0)
+    args = parser.parse_args()
+
+    random.seed(42)
+    print(f"⏱️ {args.seconds}s simulées, producteur {args.producer_ms} ms")
+    same_freshness = sum(args.seconds // interval for _, interval, _ in DATASETS)
+    print(f"{'clients':>7} | {'polling: calculs':>16} {'CPU (s)':>8} {'même fraîcheur':>14} | "
+          f"{'publication: calculs':>20} {'CPU (s)':>8} {'octets/client':>13}")
+    for clients in args.clients:
+        polling = run_polling(clients, args.seconds, args.producer_ms)
+        pushed = run_publisher(clients, args.seconds, args.producer_ms)
+        print(f"{clients:>7} | {polling['computations']:>16} {polling['seconds']:>8.2f} {same_freshness * clients:>14} | "
+              f"{pushed['computations']:>20} {pushed['seconds']:>8.2f} {pushed['bytes'] // clients:>13}")
+    print("\n(« même fraîcheur » : calculs du polling s'il interrogeait aux intervalles de publication,"
+          "\n performance toutes les 5s au lieu de 45s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+📊 Benchmark StatsModule - un commit par message vs compteurs agrégés
+====================================================================
+--messages messages répartis sur --users membres, 10 salons, 3 serveurs :
+
+"par message" : INSERT OR IGNORE + UPDATE dans une transaction par message
+                (AsyncDatabase, comme log_message_stats avant)
+"agrégés"     : MessageCounterBuffer.add() puis un lot ON CONFLICT DO UPDATE
+                toutes les --flush-every messages
+
+Vérifie que les totaux en base sont identiques et qu'une lecture faite
+avant l'écriture du lot (base + deltas en attente) est exacte.
+
+Usage: python benchmarks/bench_message_counters.py [--messages 20000] [--users 500] [--flush-every 2000]
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'Arsenal_V4', 'bot'))
+
+from async_db import AsyncDatabase
+from message_counters import MessageCounterBuffer, utc_day
+
+SCHEMA = '''CREATE TABLE daily_stats (
+    guild_id INTEGER, user_id INTEGER, channel_id INTEGER, date TEXT, message_count INTEGER DEFAULT 0,
+    PRIMARY KEY (guild_id, user_id, channel_id, date))'''
+
+
+def messages(count: int, users: int):
+    random.seed(42)
+    return [(1 + random.randrange(3), random.randrange(users), 100 + random.randrange(10)) for _ in range(count)]
+
+
+def make_db(path: str):
+    conn = sqlite3.connect(path)
+    conn.execute(SCHEMA)
+    conn.close()
+
+
+def totals(path: str):
+    conn = sqlite3.connect(path)
+    try:
+        return conn.execute("SELECT COUNT(*), SUM(message_count) FROM daily_stats").fetchone()
+    finally:
+        conn.close()
+
+
+async def per_message(path: str, traffic) -> tuple:
+    db = AsyncDatabase(path)
+
+    async def log(params):
+        def run(conn):
+            conn.execute("INSERT OR IGNORE INTO daily_stats (guild_id, user_id, channel_id, date, message_count) "
+                         "VALUES (?, ?, ?, DATE('now'), 0)", params)
+            conn.execute("UPDATE daily_stats SET message_count = message_count + 1 "
+                         "WHERE guild_id = ? AND user_id = ? AND channel_id = ? AND date = DATE('now')", params)
+        await db.transaction(run)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(log(params) for params in traffic))
+    elapsed = time.perf_counter() - start
+    await db.close()
+    return elapsed, db.stats['commits'], len(traffic) * 2
+
+
+async def buffered(path: str, traffic, flush_every: int) -> tuple:
+    db = AsyncDatabase(path)
+    counters = MessageCounterBuffer(db, flush_interval=3600, max_keys=10 ** 9)
+    exact = True
+
+    start = time.perf_counter()
+    for i, (guild_id, user_id, channel_id) in enumerate(traffic, 1):
+        counters.add(guild_id, user_id, channel_id)
+        if i % flush_every == 0:
+            if i == flush_every:
+                # Lecture avant écriture : base (vide) + deltas en attente = messages envoyés
+                async with counters.lock:
+                    stored = await db.fetchval("SELECT SUM(message_count) FROM daily_stats WHERE guild_id = 1", default=0)
+                    seen = stored + counters.pending_count(1, since=utc_day())
+                exact = seen == sum(1 for g, _, _ in traffic[:i] if g == 1)
+            await counters.flush()
+    await counters.close()
+    elapsed = time.perf_counter() - start
+    await db.close()
+    return elapsed, db.stats['commits'], counters.stats['rows_flushed'], exact
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--messages', type=int, default=20000)
+    parser.add_argument('--users', type=int, default=500)
+    parser.add_argument('--flush-every', type=int, default=2000)
+    args = parser.parse_args()
+    traffic = messages(args.messages, args.users)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        legacy_path, buffer_path = os.path.join(tmp, 'legacy.db'), os.path.join(tmp, 'buffer.db')
+        make_db(legacy_path)
+        make_db(buffer_path)
+
+        legacy = asyncio.run(per_message(legacy_path, traffic))
+        fast = asyncio.run(buffered(buffer_path, traffic, args.flush_every))
+
+        print(f"💬 {args.messages:,} messages, {args.users:,} membres")
+        print(f"   par message {args.messages / legacy[0]:9.0f} msg/s | {legacy[1]:,} commits | {legacy[2]:,} requêtes")
+        print(f"   agrégés     {args.messages / fast[0]:9.0f} msg/s | {fast[1]:,} commits | {fast[2]:,} lignes upsert")
+        print(f"   totaux identiques : {totals(legacy_path) == totals(buffer_path)} {totals(buffer_path)} | "
+              f"lecture avant écriture exacte : {fast[3]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+📊 Benchmark /api/pages/<page_name> - lecture + regex vs cache de fragments
+==========================================================================
+Sur les pages réelles de Arsenal_V4/webpanel/frontend :
+- "historique" : lecture du fichier + 3 regex DOTALL + sérialisation JSON à chaque requête
+- "froid"      : premier accès au PageFragmentCache (extraction + ETag)
+- "chaud"      : accès suivants (servis depuis la mémoire, vérification mtime)
+- "304"        : revalidation If-None-Match (comparaison d'ETag, aucun corps)
+
+Usage: python benchmarks/bench_page_fragments.py [--requests 200]
+"""
+
+import argparse
+import glob
+import json
+import os
+import re
+import sys
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+
+from page_fragments import PageFragmentCache
+
+FRONTEND = os.path.join(ROOT, 'Arsenal_V4', 'webpanel', 'frontend')
+
+
+def legacy_load(path: str, page_name: str) -> bytes:
+    """Reproduction de l'ancien load_page_content"""
+    with open(path, 'r', encoding='utf-8') as f:
+        full_content = f.read()
+    body_match = re.search(r'<body[^>]*>(.*?)</body>', full_content, re.DOTALL | re.IGNORECASE)
+    content = body_match.group(1).strip() if body_match else full_content
+    cleaned = re.sub(r'<script[^>]*>.*?</script>', '', content, flags=re.DOTALL | re.IGNORECASE)
+    cleaned = re.sub(r'<style[^>]*>.*?</style>', '', cleaned, flags=re.DOTALL | re.IGNORECASE)
+    return json.dumps({"content": cleaned, "page": page_name}, ensure_ascii=False).encode('utf-8')
+
+
+def per_request_ms(func, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) * 1000 / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=200)
+    args = parser.parse_args()
+
+    pages = sorted(glob.glob(os.path.join(FRONTEND, '*.html')), key=os.path.getsize, reverse=True)[:6]
+    print(f"{'page':<22} {'lignes':>6} | {'historique':>10} | {'froid':>8} | {'chaud':>8} | {'304':>8}  (ms/requête)")
+    for path in pages:
+        page_name = os.path.basename(path)[:-5]
+        with open(path, encoding='utf-8') as f:
+            lines = sum(1 for _ in f)
+
+        legacy_ms = per_request_ms(lambda: legacy_load(path, page_name), args.requests)
+
+        cache = PageFragmentCache(FRONTEND, check_interval=0)  # Pire cas : stat à chaque requête
+        start = time.perf_counter()
+        fragment = cache.get(page_name)
+        cold_ms = (time.perf_counter() - start) * 1000
+        assert fragment.payload == legacy_load(path, page_name)
+
+        warm_ms = per_request_ms(lambda: cache.get(page_name), args.requests * 10)
+        client_etag = fragment.etag
+        not_modified_ms = per_request_ms(lambda: cache.get(page_name).etag == client_etag, args.requests * 10)
+
+        print(f"{page_name:<22} {lines:>6} | {legacy_ms:>10.3f} | {cold_ms:>8.3f} | {warm_ms:>8.4f} | {not_modified_ms:>8.4f}")
+
+
+if __name__ == "__main__":
+    main()
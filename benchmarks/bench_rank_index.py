@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+📊 Benchmark classements - tri à chaque appel vs index de rang
+=============================================================
+--members membres par guilde, --guilds guildes :
+
+"historique" : EconomySystem.get_leaderboard sur users_economy.json (parcours
+               de toutes les clés avec startswith puis tri de la guilde) et
+               StatsModule.get_user_rank (ROW_NUMBER() OVER sur toute la table,
+               lignes ramenées en Python, recherche linéaire)
+"index"      : modules.rank_index (GuildRankings / RankIndex), tenu à jour
+               par chaque put() du stockage économie
+
+Mesure aussi la reconstruction au démarrage et le coût d'une mise à jour
+(gain d'XP d'un membre) et vérifie que rangs et top 10 sont identiques.
+
+Usage: python benchmarks/bench_rank_index.py [--members 100000] [--guilds 2] [--queries 200]
+"""
+
+import argparse
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+
+from modules import rank_index
+from modules.economy_storage import JSONEconomyStorage
+
+GUILD_ID = 1000
+
+
+def make_user(rng: random.Random) -> dict:
+    xp = rng.randrange(500000)
+    return {"balance": rng.randrange(100000), "bank": rng.randrange(50000), "xp": xp, "level": int(xp ** 0.5) // 10 + 1,
+            "total_earned": rng.randrange(1000000), "total_spent": 0, "inventory": [], "stats": {}}
+
+
+def timed(fn, repeat: int) -> tuple:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    return (time.perf_counter() - start) / repeat * 1000, result
+
+
+def sql_rank(conn, user_id: int):
+    # Requête d'origine de StatsModule.get_user_rank
+    rankings = conn.execute('''
+        SELECT user_id, ROW_NUMBER() OVER (ORDER BY xp DESC) as rank
+        FROM users
+        ORDER BY xp DESC
+    ''').fetchall()
+    return next((rank for uid, rank in rankings if uid == user_id), len(rankings))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--members', type=int, default=100000)
+    parser.add_argument('--guilds', type=int, default=2)
+    parser.add_argument('--queries', type=int, default=200)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    tmp = tempfile.TemporaryDirectory()
+    storage = JSONEconomyStorage(os.path.join(tmp.name, 'users_economy.json'),
+                                 flush_threshold=10 ** 9, flush_interval=10 ** 9)
+    for guild in range(args.guilds):
+        for user_id in range(args.members):
+            storage.users_data[f"{GUILD_ID + guild}_{user_id}"] = make_user(rng)
+    targets = [rng.randrange(args.members) for _ in range(args.queries)]
+    backend = "sortedcontainers" if rank_index.SORTEDCONTAINERS_AVAILABLE else "bisect (repli)"
+    print(f"🏆 {args.members:,} membres x {args.guilds} guildes ({args.members * args.guilds:,} clés) - {backend}")
+
+    # --- Historique : parcours + tri à chaque appel ---
+    slow = max(1, args.queries // 20)
+    scan_top_ms, _ = timed(lambda: storage._top_scan(GUILD_ID, "money", 10), slow)
+    scan_rank_ms, _ = timed(lambda: storage.rank(GUILD_ID, targets[0], "xp"), slow)
+
+    conn = sqlite3.connect(os.path.join(tmp.name, 'arsenal_v4.db'))
+    conn.execute("CREATE TABLE users (user_id INTEGER PRIMARY KEY, xp INTEGER DEFAULT 0)")
+    conn.executemany("INSERT INTO users VALUES (?, ?)",
+                     ((user_id, storage.get(GUILD_ID, user_id)["xp"]) for user_id in range(args.members)))
+    conn.commit()
+    sql_rank_ms, sql_result = timed(lambda: sql_rank(conn, targets[0]), slow)
+    conn.close()
+
+    # --- Index ---
+    start = time.perf_counter()
+    storage.enable_rankings()
+    rebuild = time.perf_counter() - start
+
+    index_top_ms, index_top = timed(lambda: storage.top(GUILD_ID, "money", 10), args.queries)
+    index_rank_ms, _ = timed(lambda: [storage.rank(GUILD_ID, user_id, "xp") for user_id in targets], 1)
+    index_rank_ms /= len(targets)
+
+    start = time.perf_counter()
+    for user_id in targets:
+        data = storage.get(GUILD_ID, user_id)
+        data["xp"] += 25
+        storage.put(GUILD_ID, user_id, data)
+    update_us = (time.perf_counter() - start) / len(targets) * 1e6
+
+    # Vérification après les mises à jour : index == parcours complet
+    rankings, storage.rankings = storage.rankings, None
+    expected = [storage.rank(GUILD_ID, user_id, "xp") for user_id in targets[:20]]
+    expected_top = [(user_id, value) for user_id, value, _ in storage._top_scan(GUILD_ID, "money", 10)]
+    storage.rankings = rankings
+    same_rank = expected == [storage.rank(GUILD_ID, user_id, "xp") for user_id in targets[:20]]
+    same_top = [value for _, value in expected_top] == [value for _, value, _ in storage.top(GUILD_ID, "money", 10)]
+
+    print(f"   top 10      historique {scan_top_ms:9.2f} ms | index {index_top_ms:8.4f} ms")
+    print(f"   rang        historique {scan_rank_ms:9.2f} ms (JSON) / {sql_rank_ms:.2f} ms (ROW_NUMBER) | "
+          f"index {index_rank_ms:8.4f} ms")
+    print(f"   mise à jour put() + index {update_us:6.1f} µs | reconstruction {rebuild:5.2f}s")
+    print(f"   identiques : rangs {same_rank} | top 10 {same_top} | rang SQL {sql_result:,}")
+    tmp.cleanup()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+📊 Benchmark middleware de métriques - surcoût et précision des percentiles
+==========================================================================
+1. Surcoût par requête : start_request + finish_request sur --routes routes
+   (avec et sans échantillonnage des requêtes lentes)
+2. Surcoût par requête SQLite : connexion standard vs TimedConnection
+   (SELECT par clé primaire, le cas le plus défavorable)
+3. Précision : p50/p95/p99 estimés par l'histogramme vs valeurs exactes
+   sur des latences log-normales
+
+Usage: python benchmarks/bench_request_metrics.py [--requests 200000] [--routes 120] [--queries 50000]
+"""
+
+import argparse
+import os
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+
+import request_metrics
+from request_metrics import LatencyHistogram, RequestMetrics, TimedConnection
+
+
+def bench_requests(count: int, routes: int, slow_threshold_ms=None) -> float:
+    metrics = RequestMetrics(slow_threshold_ms=slow_threshold_ms)
+    names = [f"/api/route_{i}/<item_id>" for i in range(routes)]
+    start = time.perf_counter()
+    for i in range(count):
+        metrics.start_request('GET', '/api/route/42')
+        metrics.finish_request(names[i % routes], 200)
+    return (time.perf_counter() - start) / count * 1e6
+
+
+def bench_sqlite(path: str, queries: int, factory) -> float:
+    conn = sqlite3.connect(path, factory=factory)
+    ids = [random.randrange(10000) for _ in range(queries)]
+    start = time.perf_counter()
+    for user_id in ids:
+        conn.execute("SELECT username, is_banned FROM users WHERE id = ?", (user_id,)).fetchone()
+    elapsed = time.perf_counter() - start
+    conn.close()
+    return elapsed / queries * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=200000)
+    parser.add_argument('--routes', type=int, default=120)
+    parser.add_argument('--queries', type=int, default=50000)
+    args = parser.parse_args()
+    random.seed(42)
+
+    print(f"⏱️ {args.requests:,} requêtes réparties sur {args.routes} routes")
+    print(f"   middleware                  {bench_requests(args.requests, args.routes):6.2f} µs/requête")
+    print(f"   + échantillonnage (seuil)   {bench_requests(args.requests, args.routes, 1000.0):6.2f} µs/requête")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'bench.db')
+        conn = sqlite3.connect(path)
+        conn.execute("CREATE TABLE users (id INTEGER PRIMARY KEY, username TEXT, is_banned INTEGER)")
+        conn.executemany("INSERT INTO users VALUES (?, ?, 0)", ((i, f"user{i}") for i in range(10000)))
+        conn.commit()
+        conn.close()
+
+        plain = bench_sqlite(path, args.queries, sqlite3.Connection)
+        # Dans une requête : chaque appel est aussi ajouté à la décomposition de la requête
+        request_metrics.get_request_metrics().start_request('GET', '/bench')
+        timed = bench_sqlite(path, args.queries, TimedConnection)
+        request_metrics.get_request_metrics().finish_request('/bench', 200)
+        print(f"\n🗄️ {args.queries:,} SELECT par clé primaire")
+        print(f"   sqlite3 standard            {plain:6.2f} µs/requête")
+        print(f"   TimedConnection             {timed:6.2f} µs/requête (+{timed - plain:.2f} µs)")
+
+    histogram = LatencyHistogram()
+    samples = [random.lognormvariate(-3.5, 0.9) for _ in range(100000)]  # Médiane ~30 ms
+    for sample in samples:
+        histogram.observe(sample)
+    exact = statistics.quantiles(samples, n=100)
+    print("\n🎯 Percentiles estimés vs exacts (100 000 latences log-normales)")
+    for q, index in ((0.50, 49), (0.95, 94), (0.99, 98)):
+        estimated = histogram.quantile(q) * 1000
+        print(f"   p{int(q * 100):<3} estimé {estimated:7.1f} ms | exact {exact[index] * 1000:7.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
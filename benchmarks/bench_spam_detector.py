@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+📊 Benchmark détection de spam - listes reconstruites vs fenêtres glissantes
+===========================================================================
+Flux simulé de messages répartis sur des milliers de serveurs, avec une
+population d'utilisateurs qui se renouvelle (la plupart ne reviennent jamais) :
+- "listes"   : ancien check_spam (liste de dicts par utilisateur, reconstruite
+               puis recomptée à chaque message, jamais purgée)
+- "fenêtres" : SpamDetector (deque + compteurs incrémentaux, purge des inactifs)
+
+Usage: python benchmarks/bench_spam_detector.py [--messages 300000] [--guilds 2000]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from modules.spam_detector import SpamDetector
+
+TIME_WINDOW = 5
+MAX_MESSAGES = 5
+MAX_DUPLICATES = 3
+
+
+def legacy_check(history: dict, user_id: int, content: str, now: float) -> bool:
+    """Reproduction de l'ancien check_spam (sans les sanctions)"""
+    if user_id not in history:
+        history[user_id] = []
+    history[user_id].append({"time": now, "content": content, "channel": 0})
+    history[user_id] = [msg for msg in history[user_id] if now - msg["time"] <= TIME_WINDOW]
+    recent = history[user_id]
+    if len(recent) > MAX_MESSAGES:
+        return True
+    counts = {}
+    for msg in recent:
+        text = msg["content"].lower().strip()
+        counts[text] = counts.get(text, 0) + 1
+    return any(count > MAX_DUPLICATES and text for text, count in counts.items())
+
+
+def generate_stream(count: int, guilds: int, rnd: random.Random):
+    """(instant, serveur, utilisateur, contenu) ; ~20 msg/s, utilisateurs renouvelés, rafales de spam"""
+    stream = []
+    now = 0.0
+    while len(stream) < count:
+        now += rnd.expovariate(20)
+        generation = len(stream) // 20000  # Nouvelle population régulièrement
+        user_id = generation * 100000 + rnd.randrange(5000)
+        guild_id = user_id % guilds
+        if rnd.random() < 0.01:
+            # Rafale : même message répété rapidement
+            for _ in range(rnd.randint(3, 8)):
+                now += rnd.uniform(0.1, 0.6)
+                stream.append((now, guild_id, user_id, "SPAM spam "))
+        else:
+            stream.append((now, guild_id, user_id, f"message {rnd.randrange(10**6)}"))
+    return stream[:count]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--messages', type=int, default=300000)
+    parser.add_argument('--guilds', type=int, default=2000)
+    args = parser.parse_args()
+
+    stream = generate_stream(args.messages, args.guilds, random.Random(42))
+
+    history = {}
+    start = time.perf_counter()
+    legacy_flags = sum(legacy_check(history, user_id, content, now) for now, _, user_id, content in stream)
+    legacy_s = time.perf_counter() - start
+    legacy_entries = sum(len(messages) for messages in history.values())
+
+    detector = SpamDetector(idle_ttl=600.0, sweep_interval=60.0)
+    flags = 0
+    start = time.perf_counter()
+    for now, guild_id, user_id, content in stream:
+        recent, duplicates = detector.record(guild_id, user_id, content, TIME_WINDOW, MAX_MESSAGES, now=now)
+        flags += recent > MAX_MESSAGES or duplicates > MAX_DUPLICATES
+    detector_s = time.perf_counter() - start
+    memory = detector.memory_stats()
+
+    print(f"📨 {len(stream)} messages sur {args.guilds} serveurs ({stream[-1][0] / 3600:.1f} h simulées)")
+    print(f"   Listes    : {legacy_s * 1e6 / len(stream):6.2f} µs/msg, {legacy_flags} détections, "
+          f"{len(history)} utilisateurs conservés ({legacy_entries} entrées)")
+    print(f"   Fenêtres  : {detector_s * 1e6 / len(stream):6.2f} µs/msg, {flags} détections, "
+          f"{memory['tracked_users']} utilisateurs suivis, {memory['events']} entrées, "
+          f"{memory['bytes'] / 1024:.0f} Ko, {memory['swept_total']} purgés")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+📊 Test de charge - webpanel sur 1, 2, 4 workers avec état partagé
+=================================================================
+Chaque worker est un processus HTTP synchrone (une requête à la fois, comme
+un worker gunicorn "sync") ; tous écoutent le même port (SO_REUSEPORT), le
+noyau répartit les connexions. Chaque requête attend --io-ms (appel Discord /
+SQLite simulé) puis manipule l'état :
+
+- connexion OAuth : freeze créé -> tokens figés -> freeze complété (session_freezer)
+- blackjack : start -> hit -> stand (casino_system)
+
+Les étapes d'un même joueur tombent sur des workers différents : avec le
+backend memory et N > 1, les sessions / parties sont perdues ("erreurs
+d'état") ; avec sqlite, elles sont cohérentes.
+
+Usage: python benchmarks/bench_state_store.py [--workers 1 2 4] [--backends memory sqlite] [--players 200]
+"""
+
+import argparse
+import http.client
+import json
+import multiprocessing
+import os
+import socket
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from urllib.parse import parse_qs, urlparse
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'Arsenal_V4', 'webpanel', 'backend'))
+
+from state_store import MemoryStateStore, SQLiteStateStore
+
+
+class ReusePortServer(HTTPServer):
+    request_queue_size = 128
+
+    def server_bind(self):
+        self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+        super().server_bind()
+
+
+def run_worker(port: int, backend: str, path: str, io_ms: float, ready):
+    sys.stdout = open(os.devnull, 'w')  # Logs 🧊/🔓 du freezer
+    from casino_system import BlackjackGame
+    from session_freezer import SessionFreezer
+
+    store = SQLiteStateStore(path) if backend == 'sqlite' else MemoryStateStore()
+    blackjack = BlackjackGame(store)
+    freezer = SessionFreezer(store)
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, format, *args):
+            pass
+
+        def do_GET(self):
+            time.sleep(io_ms / 1000)
+            url = urlparse(self.path)
+            params = {key: values[0] for key, values in parse_qs(url.query).items()}
+            if url.path == '/freeze/create':
+                payload = {'token': freezer.create_freeze('127.0.0.1', 'bench')}
+            elif url.path == '/freeze/tokens':
+                payload = {'success': freezer.add_oauth_token(params['token'], 'access', 'refresh')}
+            elif url.path == '/freeze/complete':
+                payload = {'success': freezer.unfreeze_session(params['token']) is not None}
+            elif url.path == '/blackjack/start':
+                payload = blackjack.start_game(params['user'], 10)
+            elif url.path == '/blackjack/hit':
+                payload = blackjack.hit(params['game_id'])
+            elif url.path == '/blackjack/stand':
+                payload = blackjack.stand(params['game_id'])
+            else:
+                payload = {'success': False, 'error': 'route inconnue'}
+            body = json.dumps(payload).encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    server = ReusePortServer(('127.0.0.1', port), Handler)
+    ready.set()
+    server.serve_forever()
+
+
+def call(port: int, path: str):
+    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+    try:
+        conn.request('GET', path)
+        return json.loads(conn.getresponse().read())
+    finally:
+        conn.close()
+
+
+def play(port: int, player: int):
+    """Un joueur : connexion OAuth puis une main de blackjack -> (requêtes, erreurs d'état)"""
+    requests_done, errors = 0, 0
+    token = call(port, '/freeze/create')['token']
+    tokens_ok = call(port, f'/freeze/tokens?token={token}')['success']
+    completed = call(port, f'/freeze/complete?token={token}')['success']
+    requests_done += 3
+    errors += (not tokens_ok) + (not completed)
+
+    game = call(port, f'/blackjack/start?user={player}')
+    requests_done += 1
+    if game.get('status') == 'playing':
+        for action in ('hit', 'stand'):
+            result = call(port, f"/blackjack/{action}?game_id={game['game_id']}")
+            requests_done += 1
+            if result.get('error') == 'Partie non trouvée':
+                errors += 1
+    return requests_done, errors
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def run(backend: str, workers: int, players: int, concurrency: int, io_ms: float, tmp: str):
+    port = free_port()
+    path = os.path.join(tmp, f'state_{backend}_{workers}.db')
+    if backend == 'sqlite':
+        SQLiteStateStore(path)  # Schéma créé avant le démarrage des workers
+    processes = []
+    for _ in range(workers):
+        ready = multiprocessing.Event()
+        process = multiprocessing.Process(target=run_worker, args=(port, backend, path, io_ms, ready), daemon=True)
+        process.start()
+        ready.wait(10)
+        processes.append(process)
+
+    try:
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            results = list(pool.map(lambda player: play(port, player), range(players)))
+        elapsed = time.perf_counter() - start
+    finally:
+        for process in processes:
+            process.terminate()
+            process.join()
+
+    total = sum(done for done, _ in results)
+    errors = sum(err for _, err in results)
+    print(f"   {backend:<7} {workers} worker(s) | {total / elapsed:7.1f} req/s | "
+          f"{total} requêtes en {elapsed:5.2f}s | erreurs d'état {errors}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4])
+    parser.add_argument('--backends', nargs='+', default=['memory', 'sqlite'])
+    parser.add_argument('--players', type=int, default=200)
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--io-ms', type=float, default=20.0, help="attente I/O simulée par requête")
+    args = parser.parse_args()
+
+    print(f"🎰 {args.players} joueurs (OAuth + blackjack), {args.concurrency} clients, "
+          f"{args.io_ms:.0f} ms d'I/O par requête, {os.cpu_count()} CPU")
+    with tempfile.TemporaryDirectory() as tmp:
+        for backend in args.backends:
+            for workers in args.workers:
+                run(backend, workers, args.players, args.concurrency, args.io_ms, tmp)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+📊 Benchmark assets statiques - fichiers bruts vs précompressés
+===============================================================
+Construit l'AssetPipeline sur Arsenal_V4/webpanel/frontend, puis affiche :
+- les octets économisés (gzip, brotli si le module est installé)
+- le temps serveur par requête (lecture disque vs mémoire)
+- le temps de premier/dernier octet simulé sur connexion bridée
+  (RTT + taille / débit, profils Slow 3G et Fast 3G de Chrome DevTools)
+
+Usage: python benchmarks/bench_static_assets.py
+"""
+
+import argparse
+import os
+import sys
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+
+from static_assets import BROTLI_AVAILABLE, AssetPipeline
+
+FRONTEND = os.path.join(ROOT, 'Arsenal_V4', 'webpanel', 'frontend')
+# (nom, débit descendant en bits/s, RTT en secondes)
+PROFILES = (("Slow 3G", 400_000, 0.4), ("Fast 3G", 1_600_000, 0.15))
+SAMPLES = ('index.html', 'index_no_auth.html', 'js/arsenal-ultimate.js', 'css/arsenal-styles.css')
+
+
+def disk_read_ms(path: str, repeat: int = 200) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        os.stat(path)
+        with open(path, 'rb') as f:
+            f.read()
+    return (time.perf_counter() - start) * 1000 / repeat
+
+
+def memory_ms(pipeline: AssetPipeline, path: str, repeat: int = 2000) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        asset, _ = pipeline.resolve(path)
+        pipeline.choose_encoding(asset, 'gzip, deflate, br')
+    return (time.perf_counter() - start) * 1000 / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.parse_args()
+
+    pipeline = AssetPipeline(FRONTEND).build()
+    report = pipeline.report()
+    best = 'br' if BROTLI_AVAILABLE else 'gzip'
+    print(f"📦 {report['files']} fichiers construits en {report['build_seconds']}s "
+          f"(brotli {'disponible' if BROTLI_AVAILABLE else 'non installé : gzip seul'})")
+    print(f"   brut {report['bytes']['identity'] / 1024:.0f} Ko -> gzip {report['bytes']['gzip'] / 1024:.0f} Ko "
+          f"-> brotli {report['bytes']['br'] / 1024:.0f} Ko")
+    print(f"   économisés : {report['saved_gzip'] / 1024:.0f} Ko (gzip), {report['saved_br'] / 1024:.0f} Ko (brotli)\n")
+
+    for name, bandwidth, rtt in PROFILES:
+        print(f"🐢 {name} ({bandwidth // 1000} kbit/s, RTT {rtt * 1000:.0f} ms) - premier octet / dernier octet (ms)")
+        for path in SAMPLES:
+            asset = pipeline.assets.get(path)
+            if asset is None:
+                continue
+            raw = asset.encodings['identity']
+            packed = asset.encodings.get(best, raw)
+            old_server = disk_read_ms(os.path.join(FRONTEND, path))
+            new_server = memory_ms(pipeline, path)
+            old_first = rtt * 1000 + old_server
+            new_first = rtt * 1000 + new_server
+            old_last = old_first + len(raw) * 8 / bandwidth * 1000
+            new_last = new_first + len(packed) * 8 / bandwidth * 1000
+            print(f"   {path:<26} {len(raw) / 1024:7.1f} Ko -> {len(packed) / 1024:6.1f} Ko | "
+                  f"{old_first:6.1f} / {old_last:7.0f}  ->  {new_first:6.1f} / {new_last:6.0f}  "
+                  f"(304 : {rtt * 1000:.0f})")
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+📊 Benchmark contexte utilisateur - lecture SQLite par appel vs cache TTL
+=======================================================================
+Un chargement de page du dashboard lance ~10 appels API en parallèle
+(/api/user/role, /api/user/permissions, ...). Chacun relisait le grade dans
+user_roles ; avec UserContextCache, un seul chargement par utilisateur et par TTL.
+
+Base SQLite temporaire avec --users utilisateurs et une table user_roles.
+
+Usage: python benchmarks/bench_user_context_cache.py [--users 2000] [--pages 300] [--parallel 10]
+"""
+
+import argparse
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+
+from user_context_cache import UserContextCache
+
+
+def build_database(path: str, users: int):
+    conn = sqlite3.connect(path)
+    conn.execute("""
+        CREATE TABLE user_roles (discord_user_id TEXT, username TEXT, role_type TEXT, role_display TEXT,
+                                 permissions TEXT, assigned_at TIMESTAMP, is_active INTEGER DEFAULT 1)
+    """)
+    conn.executemany(
+        "INSERT INTO user_roles VALUES (?, ?, ?, ?, ?, datetime('now'), 1)",
+        [(str(100000 + i), f"user{i}", 'member', 'Membre', 'basic') for i in range(users)]
+    )
+    conn.commit()
+    conn.close()
+
+
+def load_role(path: str, user_id: str, counter: list):
+    """Même requête que load_user_role (connexion ouverte par appel, comme le serveur)"""
+    counter.append(1)
+    conn = sqlite3.connect(path)
+    try:
+        return conn.execute("""
+            SELECT role_type, role_display, permissions, assigned_at FROM user_roles
+            WHERE discord_user_id = ? OR username = ? AND is_active = 1
+            ORDER BY assigned_at DESC LIMIT 1
+        """, (user_id, f"user{user_id}")).fetchone()
+    finally:
+        conn.close()
+
+
+def run(label: str, path: str, pages, parallel: int, cache: UserContextCache = None):
+    lookups = []
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=parallel) as pool:
+        for user_id in pages:
+            if cache is None:
+                calls = [pool.submit(load_role, path, user_id, lookups) for _ in range(parallel)]
+            else:
+                calls = [pool.submit(cache.get, user_id, lambda u=user_id: load_role(path, u, lookups))
+                         for _ in range(parallel)]
+            for call in calls:
+                call.result()
+    elapsed = time.perf_counter() - start
+    print(f"   {label:<10} {len(lookups):>6} lectures SQLite | {elapsed * 1000 / len(pages):6.2f} ms/page")
+    return cache
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--users', type=int, default=2000)
+    parser.add_argument('--pages', type=int, default=300)
+    parser.add_argument('--parallel', type=int, default=10)
+    parser.add_argument('--active', type=int, default=50, help="utilisateurs distincts qui naviguent")
+    args = parser.parse_args()
+
+    random.seed(42)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'arsenal_v4.db')
+        build_database(path, args.users)
+        active = [str(100000 + i) for i in random.sample(range(args.users), args.active)]
+        pages = [random.choice(active) for _ in range(args.pages)]
+
+        print(f"📄 {args.pages} pages, {args.parallel} appels API parallèles par page, {args.active} utilisateurs actifs")
+        run("sans cache", path, pages, args.parallel)
+        cache = run("cache TTL", path, pages, args.parallel, UserContextCache(ttl=300))
+        print(f"\n📈 {cache.get_stats()}")
+
+
+if __name__ == "__main__":
+    main()
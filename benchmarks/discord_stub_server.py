@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+🧪 Faux serveur API Discord (local) pour tester le webpanel sans Discord
+========================================================================
+Routes : POST /oauth2/token, GET /users/@me, GET /users/@me/guilds
+- latence injectée par requête (--latency)
+- rate limit par (token, route) avec en-têtes X-RateLimit-* et 429 + retry_after
+- le code OAuth "expired" renvoie invalid_grant
+- compte les connexions TCP ouvertes (mesure du keep-alive)
+
+Usage: python benchmarks/discord_stub_server.py [--port 8765] [--latency 0.05]
+       puis DISCORD_API_BASE=http://127.0.0.1:8765 python advanced_server.py
+"""
+
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+
+class StubState:
+    def __init__(self, latency: float, limit: int, window: float, guilds: int):
+        self.latency = latency
+        self.limit = limit
+        self.window = window
+        self.guilds = [{"id": str(900000000000000000 + i), "name": f"Serveur {i}", "permissions": "8", "owner": i == 0}
+                       for i in range(guilds)]
+        self.windows = {}  # (autorisation, route) -> [début de fenêtre, requêtes]
+        self.lock = threading.Lock()
+        self.tokens_issued = 0
+        self.connections = 0
+        self.requests = 0
+        self.rate_limited = 0
+
+    def consume(self, key):
+        """(restant, reset_after) ou None si la limite est dépassée"""
+        with self.lock:
+            self.requests += 1
+            now = time.monotonic()
+            started, count = self.windows.get(key, (now, 0))
+            if now - started >= self.window:
+                started, count = now, 0
+            reset_after = self.window - (now - started)
+            if count >= self.limit:
+                self.rate_limited += 1
+                return None, reset_after
+            self.windows[key] = (started, count + 1)
+            return self.limit - count - 1, reset_after
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # Keep-alive
+    state: StubState = None
+
+    def setup(self):
+        super().setup()
+        with self.state.lock:
+            self.state.connections += 1
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status: int, payload, headers=None):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _route(self, method: str):
+        length = int(self.headers.get('Content-Length') or 0)
+        body = self.rfile.read(length).decode() if length else ''
+        path = self.path.split('?')[0]
+        if path.startswith('/api/v10'):
+            path = path[len('/api/v10'):]
+
+        time.sleep(self.state.latency)
+        authorization = self.headers.get('Authorization', '')
+        remaining, reset_after = self.state.consume((authorization, method, path))
+        bucket = f"{method}:{path}".encode().hex()[:16]
+        if remaining is None:
+            self._send(429, {"message": "You are being rate limited.", "retry_after": round(reset_after, 3), "global": False},
+                       {'Retry-After': f"{reset_after:.3f}", 'X-RateLimit-Bucket': bucket,
+                        'X-RateLimit-Limit': str(self.state.limit), 'X-RateLimit-Remaining': '0',
+                        'X-RateLimit-Reset-After': f"{reset_after:.3f}", 'X-RateLimit-Scope': 'user'})
+            return
+        headers = {'X-RateLimit-Bucket': bucket, 'X-RateLimit-Limit': str(self.state.limit),
+                   'X-RateLimit-Remaining': str(remaining), 'X-RateLimit-Reset-After': f"{reset_after:.3f}"}
+
+        if method == 'POST' and path == '/oauth2/token':
+            form = parse_qs(body)
+            if form.get('code', [''])[0] == 'expired':
+                self._send(400, {"error": "invalid_grant"}, headers)
+                return
+            with self.state.lock:
+                self.state.tokens_issued += 1
+                token = f"stub-token-{self.state.tokens_issued}"
+            self._send(200, {"access_token": token, "token_type": "Bearer", "expires_in": 604800, "scope": "identify guilds"}, headers)
+        elif method == 'GET' and path == '/users/@me':
+            self._send(200, {"id": "431359112039890945", "username": "stub_user", "discriminator": "0", "avatar": None}, headers)
+        elif method == 'GET' and path == '/users/@me/guilds':
+            self._send(200, self.state.guilds, headers)
+        else:
+            self._send(404, {"message": "404: Not Found", "code": 0}, headers)
+
+    def do_GET(self):
+        self._route('GET')
+
+    def do_POST(self):
+        self._route('POST')
+
+
+def start_stub_server(port: int = 0, latency: float = 0.05, limit: int = 5, window: float = 1.0, guilds: int = 25):
+    """Démarrer le serveur dans un thread : (serveur, état, URL de base)"""
+    state = StubState(latency, limit, window, guilds)
+    handler = type('BoundStubHandler', (StubHandler,), {'state': state})
+    server = ThreadingHTTPServer(('127.0.0.1', port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name='discord-stub', daemon=True).start()
+    return server, state, f"http://127.0.0.1:{server.server_address[1]}/api/v10"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', type=float, default=0.05)
+    parser.add_argument('--limit', type=int, default=5, help="requêtes par fenêtre et par (token, route)")
+    parser.add_argument('--window', type=float, default=1.0)
+    args = parser.parse_args()
+
+    server, state, base_url = start_stub_server(args.port, args.latency, args.limit, args.window)
+    print(f"🧪 Faux Discord sur {base_url} (latence {args.latency}s, {args.limit} req/{args.window}s)")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,404 @@
+"""
+📈 Arsenal V4 - Agrégats horaires / journaliers des commandes
+Les endpoints analytics lisent des compteurs pré-agrégés au lieu de
+COUNT(*) + datetime('now', '-24 hours') sur tout le log :
+
+- command_rollups : (source, période, bucket, dimension, valeur) -> total,
+  succès, somme / nombre des temps d'exécution, utilisateurs actifs
+  source    : table de log (command_logs ou commands_log), jamais mélangées :
+              chaque lecture porte sur une seule table, comme les COUNT(*)
+              qu'elles remplacent
+  période   : hour ('YYYY-MM-DD HH'), day ('YYYY-MM-DD'), total ('') en UTC
+  dimension : all (''), command (nom), server (id)
+- command_rollup_users : utilisateurs déjà comptés par source et heure / jour
+- command_rollup_state : dernier id agrégé de chaque table source
+
+Les lignes sont agrégées par id croissant (catch_up), juste après chaque
+insertion du webpanel et au plus toutes les refresh_interval secondes à la
+lecture : chaque ligne est comptée une fois, quel que soit le processus
+qui l'a écrite (bot, webpanel).
+
+Buckets et bornes de lecture sont en UTC : commands_log.executed_at est déjà
+en UTC (CURRENT_TIMESTAMP), command_logs.timestamp est l'heure locale du
+webpanel (datetime.now()) convertie par SQLite à l'agrégation (les
+horodatages avec décalage explicite sont respectés). Backfill de l'historique :
+
+    python command_rollups.py --db arsenal_v4.db [--rebuild]
+"""
+
+import argparse
+import sqlite3
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+# Tables de log connues -> colonnes (temps converti en UTC, nom de commande, temps d'exécution si présent)
+SOURCES = {
+    # Bot / /api/ingest/batch : heure locale (datetime.now())
+    'command_logs': {'time': "datetime(timestamp, 'utc')", 'command': 'command', 'execution_time': None},
+    # ArsenalDatabase : CURRENT_TIMESTAMP, déjà en UTC
+    'commands_log': {'time': 'datetime(executed_at)', 'command': 'command_name', 'execution_time': 'execution_time'},
+}
+
+SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS command_rollups (
+        source TEXT NOT NULL,
+        period TEXT NOT NULL,
+        bucket TEXT NOT NULL,
+        dimension TEXT NOT NULL,
+        value TEXT NOT NULL,
+        total INTEGER NOT NULL DEFAULT 0,
+        success INTEGER NOT NULL DEFAULT 0,
+        exec_time_sum REAL NOT NULL DEFAULT 0,
+        exec_time_count INTEGER NOT NULL DEFAULT 0,
+        active_users INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (source, period, dimension, bucket, value)  -- Une série (source, période, dimension) est contiguë
+    ) WITHOUT ROWID
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS command_rollup_users (
+        source TEXT NOT NULL,
+        period TEXT NOT NULL,
+        bucket TEXT NOT NULL,
+        user_id TEXT NOT NULL,
+        PRIMARY KEY (source, period, bucket, user_id)
+    ) WITHOUT ROWID
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS command_rollup_state (
+        source TEXT PRIMARY KEY,
+        last_id INTEGER NOT NULL DEFAULT 0,
+        skipped INTEGER NOT NULL DEFAULT 0,
+        updated_at TIMESTAMP
+    )
+    """,
+)
+
+UPSERT = """
+    INSERT INTO command_rollups (source, period, bucket, dimension, value, total, success, exec_time_sum, exec_time_count, active_users)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT (source, period, dimension, bucket, value) DO UPDATE SET
+        total = total + excluded.total,
+        success = success + excluded.success,
+        exec_time_sum = exec_time_sum + excluded.exec_time_sum,
+        exec_time_count = exec_time_count + excluded.exec_time_count,
+        active_users = active_users + excluded.active_users
+"""
+
+CATCH_UP_BATCH = 5000
+HOURLY_RETENTION_DAYS = 30
+USER_RETENTION_DAYS = {'hour': 2, 'day': 60}
+
+
+def utc_now() -> datetime:
+    """Instant courant en UTC (référence des buckets)"""
+    return datetime.now(timezone.utc)
+
+
+def hour_bucket(moment: datetime) -> str:
+    return moment.strftime('%Y-%m-%d %H')
+
+
+def day_bucket(moment: datetime) -> str:
+    return moment.strftime('%Y-%m-%d')
+
+
+def _growth(current: float, previous: float) -> float:
+    if not previous:
+        return 100.0 if current else 0.0
+    return round((current - previous) / previous * 100, 1)
+
+
+class CommandRollups:
+    def __init__(self, db_path: str, refresh_interval: float = 5.0, max_lazy_batches: int = 10):
+        self.db_path = db_path
+        self.refresh_interval = refresh_interval
+        self.max_lazy_batches = max_lazy_batches  # Borne le travail fait dans une requête HTTP
+        self._schema_ready = False
+        self._last_refresh = 0.0
+        self._last_prune = 0.0
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=10)
+        if not self._schema_ready:
+            with self._lock:
+                if not self._schema_ready:
+                    self._drop_unsourced(conn)
+                    for statement in SCHEMA:
+                        conn.execute(statement)
+                    conn.commit()
+                    self._schema_ready = True
+        return conn
+
+    @staticmethod
+    def _drop_unsourced(conn: sqlite3.Connection):
+        """Agrégats d'avant la colonne source (tables mélangées, heures locales) : reconstruits depuis les logs"""
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(command_rollups)")}
+        if columns and 'source' not in columns:
+            conn.execute("DROP TABLE command_rollups")
+            conn.execute("DROP TABLE IF EXISTS command_rollup_users")
+            conn.execute("DELETE FROM command_rollup_state")
+            print("📈 Agrégats commandes : ancien format supprimé, reconstruction depuis les logs")
+
+    # ----- Agrégation -----
+
+    def _source_columns(self, conn: sqlite3.Connection, source: str) -> Optional[str]:
+        """SELECT des colonnes utiles de la source, None si la table n'existe pas"""
+        columns = {row[1] for row in conn.execute(f"PRAGMA table_info({source})")}
+        if not columns:
+            return None
+        spec = SOURCES[source]
+        execution_time = spec['execution_time'] if spec['execution_time'] in columns else 'NULL'
+        return f"id, {spec['time']}, {spec['command']}, server_id, user_id, success, {execution_time}"
+
+    def catch_up(self, source: str = None, max_batches: int = None) -> int:
+        """Agrège les lignes ajoutées depuis le dernier passage -> nombre de lignes traitées"""
+        processed = 0
+        conn = self._connect()
+        conn.isolation_level = None  # Transactions explicites
+        try:
+            for name in ([source] if source else SOURCES):
+                select = self._source_columns(conn, name)
+                if select is None:
+                    continue
+                batches = 0
+                while max_batches is None or batches < max_batches:
+                    # BEGIN IMMEDIATE : un seul worker lit le curseur et l'avance à la fois
+                    conn.execute("BEGIN IMMEDIATE")
+                    try:
+                        row = conn.execute("SELECT last_id FROM command_rollup_state WHERE source = ?", (name,)).fetchone()
+                        last_id = row[0] if row else 0
+                        rows = conn.execute(
+                            f"SELECT {select} FROM {name} WHERE id > ? ORDER BY id LIMIT ?", (last_id, CATCH_UP_BATCH)
+                        ).fetchall()
+                        skipped = self._apply(conn, name, rows) if rows else 0
+                        if rows:
+                            conn.execute("""
+                                INSERT INTO command_rollup_state (source, last_id, skipped, updated_at)
+                                VALUES (?, ?, ?, datetime('now'))
+                                ON CONFLICT (source) DO UPDATE SET
+                                    last_id = excluded.last_id, skipped = skipped + excluded.skipped,
+                                    updated_at = excluded.updated_at
+                            """, (name, rows[-1][0], skipped))
+                        conn.execute("COMMIT")
+                    except Exception:
+                        conn.execute("ROLLBACK")
+                        raise
+                    processed += len(rows)
+                    batches += 1
+                    if len(rows) < CATCH_UP_BATCH:
+                        break
+            if time.time() - self._last_prune > 3600:
+                self._prune(conn)
+        finally:
+            conn.close()
+        self._last_refresh = time.time()
+        return processed
+
+    def _apply(self, conn: sqlite3.Connection, source: str, rows: List[tuple]) -> int:
+        """Ajoute un lot de lignes aux agrégats (dans la transaction de catch_up) -> lignes ignorées"""
+        counters = defaultdict(lambda: [0, 0, 0.0, 0, 0])
+        users = defaultdict(set)
+        skipped = 0
+        for _, timestamp, command, server_id, user_id, success, execution_time in rows:
+            timestamp = str(timestamp or '')
+            if len(timestamp) < 13:
+                skipped += 1  # Pas d'horodatage exploitable
+                continue
+            buckets = (('hour', timestamp[:13]), ('day', timestamp[:10]), ('total', ''))
+            ok = 1 if success in (1, True, '1', 'True', 'true') else 0
+            for period, bucket in buckets:
+                for dimension, value in (('all', ''), ('command', command or 'unknown'), ('server', str(server_id or 'DM'))):
+                    counter = counters[(period, bucket, dimension, value)]
+                    counter[0] += 1
+                    counter[1] += ok
+                    if execution_time is not None:
+                        counter[2] += float(execution_time)
+                        counter[3] += 1
+                if user_id is not None and period != 'total':
+                    users[(period, bucket)].add(str(user_id))
+
+        # Utilisateurs actifs : seules les premières apparitions dans le bucket comptent
+        for (period, bucket), user_ids in users.items():
+            before = conn.total_changes
+            conn.executemany(
+                "INSERT OR IGNORE INTO command_rollup_users (source, period, bucket, user_id) VALUES (?, ?, ?, ?)",
+                ((source, period, bucket, user_id) for user_id in user_ids)
+            )
+            counters[(period, bucket, 'all', '')][4] += conn.total_changes - before
+
+        conn.executemany(UPSERT, ((source,) + key + tuple(values) for key, values in counters.items()))
+        return skipped
+
+    def _prune(self, conn: sqlite3.Connection, now: datetime = None):
+        now = now or utc_now()
+        conn.execute("DELETE FROM command_rollups WHERE period = 'hour' AND bucket < ?",
+                     (hour_bucket(now - timedelta(days=HOURLY_RETENTION_DAYS)),))
+        for period, days in USER_RETENTION_DAYS.items():
+            cutoff = now - timedelta(days=days)
+            conn.execute("DELETE FROM command_rollup_users WHERE period = ? AND bucket < ?",
+                         (period, hour_bucket(cutoff) if period == 'hour' else day_bucket(cutoff)))
+        self._last_prune = time.time()
+
+    def backfill(self, rebuild: bool = False) -> int:
+        """Agrège tout l'historique (rebuild : repart de zéro)"""
+        conn = self._connect()
+        try:
+            if rebuild:
+                with conn:
+                    conn.execute("DELETE FROM command_rollups")
+                    conn.execute("DELETE FROM command_rollup_users")
+                    conn.execute("DELETE FROM command_rollup_state")
+        finally:
+            conn.close()
+        total = 0
+        while True:
+            processed = self.catch_up(max_batches=20)
+            total += processed
+            if processed:
+                print(f"📈 Backfill agrégats: {total:,} lignes")
+            if processed < CATCH_UP_BATCH:
+                return total
+
+    def after_insert(self, source: str):
+        """Après un INSERT déjà validé : agrège tout de suite, sans jamais faire échouer l'appelant"""
+        try:
+            self.catch_up(source)
+        except sqlite3.Error as e:
+            print(f"⚠️ Agrégats commandes différés: {e}")  # Rattrapés à la prochaine lecture
+
+    def refresh(self):
+        """Rattrape les lignes écrites par d'autres processus (au plus une fois par refresh_interval)"""
+        if time.time() - self._last_refresh >= self.refresh_interval:
+            try:
+                self.catch_up(max_batches=self.max_lazy_batches)
+            except sqlite3.OperationalError as e:
+                print(f"⚠️ Agrégats commandes non rafraîchis: {e}")  # Base verrouillée : lecture des agrégats tels quels
+                self._last_refresh = time.time()
+
+    # ----- Lecture -----
+
+    def _rows(self, sql: str, params: tuple) -> List[tuple]:
+        self.refresh()
+        conn = self._connect()
+        try:
+            return conn.execute(sql, params).fetchall()
+        finally:
+            conn.close()
+
+    def window(self, source: str, hours: int, now: datetime = None) -> Dict[str, Any]:
+        """Totaux des `hours` dernières heures de `source` (fenêtre glissante, résolution horaire)
+
+        Le bucket le plus ancien n'est compté qu'au prorata de la part encore dans la fenêtre.
+        `now` est en UTC (utc_now() par défaut).
+        """
+        now = now or utc_now()
+        oldest = now - timedelta(hours=hours)
+        rows = self._rows("""
+            SELECT bucket, total, success, exec_time_sum, exec_time_count FROM command_rollups
+            WHERE source = ? AND period = 'hour' AND dimension = 'all' AND value = '' AND bucket BETWEEN ? AND ?
+        """, (source, hour_bucket(oldest), hour_bucket(now)))
+        weight_oldest = 1 - (oldest.minute * 60 + oldest.second) / 3600
+        totals = [0.0, 0.0, 0.0, 0.0]
+        for bucket, *values in rows:
+            weight = weight_oldest if bucket == hour_bucket(oldest) else 1.0
+            for i, value in enumerate(values):
+                totals[i] += value * weight
+        return self._format(*totals)
+
+    @staticmethod
+    def _format(total, success, exec_time_sum, exec_time_count, active_users=None) -> Dict[str, Any]:
+        result = {
+            'total': int(round(total)),
+            'success_rate': round(success / total * 100, 1) if total else 100.0,
+            'avg_execution_time': round(exec_time_sum / exec_time_count, 3) if exec_time_count else None
+        }
+        if active_users is not None:
+            result['active_users'] = active_users
+        return result
+
+    def bucket(self, source: str, period: str, bucket: str, dimension: str = 'all', value: str = '') -> Dict[str, Any]:
+        """Totaux d'une heure / d'un jour (ou period='total', bucket=''), tous ou d'une commande / d'un serveur"""
+        rows = self._rows("""
+            SELECT total, success, exec_time_sum, exec_time_count, active_users FROM command_rollups
+            WHERE source = ? AND period = ? AND bucket = ? AND dimension = ? AND value = ?
+        """, (source, period, bucket, dimension, value))
+        return self._format(*(rows[0] if rows else (0, 0, 0.0, 0, 0)))
+
+    def buckets_total(self, source: str, period: str, first: str, last: str) -> Dict[str, Any]:
+        """Totaux cumulés des buckets [first, last] (utilisateurs actifs : somme par bucket)"""
+        rows = self._rows("""
+            SELECT COALESCE(SUM(total), 0), COALESCE(SUM(success), 0), COALESCE(SUM(exec_time_sum), 0),
+                   COALESCE(SUM(exec_time_count), 0), COALESCE(SUM(active_users), 0)
+            FROM command_rollups
+            WHERE source = ? AND period = ? AND dimension = 'all' AND value = '' AND bucket BETWEEN ? AND ?
+        """, (source, period, first, last))
+        return self._format(*rows[0])
+
+    def series(self, source: str, period: str, count: int, now: datetime = None) -> List[Dict[str, Any]]:
+        """Les `count` derniers buckets UTC (heures ou jours), zéros compris, du plus ancien au plus récent"""
+        now = now or utc_now()
+        step, fmt = (timedelta(hours=1), hour_bucket) if period == 'hour' else (timedelta(days=1), day_bucket)
+        buckets = [fmt(now - step * i) for i in range(count - 1, -1, -1)]
+        rows = dict((row[0], row[1:]) for row in self._rows("""
+            SELECT bucket, total, success, active_users FROM command_rollups
+            WHERE source = ? AND period = ? AND dimension = 'all' AND value = '' AND bucket BETWEEN ? AND ?
+        """, (source, period, buckets[0], buckets[-1])))
+        series = []
+        for bucket in buckets:
+            total, success, active_users = rows.get(bucket, (0, 0, 0))
+            series.append({'bucket': bucket, 'total': total, 'success': success, 'active_users': active_users})
+        return series
+
+    def compare(self, source: str, days: int, now: datetime = None) -> Dict[str, Any]:
+        """`days` derniers jours vs les `days` précédents (buckets journaliers UTC)"""
+        now = now or utc_now()
+        current = self.buckets_total(source, 'day', day_bucket(now - timedelta(days=days - 1)), day_bucket(now))
+        previous = self.buckets_total(source, 'day', day_bucket(now - timedelta(days=2 * days - 1)),
+                                      day_bucket(now - timedelta(days=days)))
+        return {
+            'current': current,
+            'previous': previous,
+            'commands_growth': _growth(current['total'], previous['total']),
+            'users_growth': _growth(current['active_users'], previous['active_users'])
+        }
+
+    def top(self, source: str, dimension: str, period: str, first: str, last: str,
+            limit: int = 5) -> List[Dict[str, Any]]:
+        """Commandes / serveurs les plus actifs sur [first, last]"""
+        rows = self._rows("""
+            SELECT value, SUM(total), SUM(success), SUM(exec_time_sum), SUM(exec_time_count) FROM command_rollups
+            WHERE source = ? AND period = ? AND dimension = ? AND bucket BETWEEN ? AND ?
+            GROUP BY value ORDER BY SUM(total) DESC, value LIMIT ?
+        """, (source, period, dimension, first, last, limit))
+        return [{'name': value, **self._format(total, success, exec_sum, exec_count)}
+                for value, total, success, exec_sum, exec_count in rows]
+
+    def get_stats(self) -> Dict[str, Any]:
+        conn = self._connect()
+        try:
+            state = {source: {'last_id': last_id, 'skipped': skipped, 'updated_at': updated_at}
+                     for source, last_id, skipped, updated_at in conn.execute("SELECT * FROM command_rollup_state")}
+            rows = conn.execute("SELECT source || ':' || period, COUNT(*) FROM command_rollups "
+                                "GROUP BY source, period").fetchall()
+        finally:
+            conn.close()
+        return {'sources': state, 'rollup_rows': dict(rows), 'last_refresh': self._last_refresh}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backfill des agrégats de commandes")
+    parser.add_argument('--db', default='arsenal_v4.db')
+    parser.add_argument('--rebuild', action='store_true', help="supprime les agrégats et repart de zéro")
+    args = parser.parse_args()
+    start = time.perf_counter()
+    total = CommandRollups(args.db).backfill(rebuild=args.rebuild)
+    print(f"✅ {total:,} lignes agrégées en {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
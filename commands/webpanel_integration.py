@@ -11,6 +11,8 @@ import os
 import sqlite3
 from datetime import datetime, timedelta
 
+from utils.metrics_sampler import get_metrics_sampler
+
 class WebPanelCommands(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
@@ -117,37 +119,34 @@ class WebPanelCommands(commands.Cog):
                 await interaction.response.send_message("❌ Commande réservée aux administrateurs", ephemeral=True)
                 return
                 
-            try:
-                import psutil
-                
+            # Dernier échantillon du thread de métriques : pas d'attente dans la boucle d'événements
+            stats = get_metrics_sampler().latest()
+            if stats:
                 embed = discord.Embed(
                     title="🖥️ Monitoring Système",
                     color=0xff6600,
-                    timestamp=datetime.now()
+                    timestamp=datetime.fromtimestamp(stats['timestamp'])
                 )
                 
                 # Stats système
-                cpu_percent = psutil.cpu_percent(interval=1)
-                memory = psutil.virtual_memory()
-                disk = psutil.disk_usage('.')
-                network = psutil.net_io_counters()
+                cpu_percent = stats['cpu_usage']
                 
                 embed.add_field(name="🔥 CPU", value=f"{cpu_percent}%", inline=True)
-                embed.add_field(name="💾 RAM", value=f"{memory.percent}%", inline=True)
-                embed.add_field(name="💿 Disque", value=f"{disk.percent}%", inline=True)
-                embed.add_field(name="📡 Réseau ⬇️", value=f"{network.bytes_recv // 1024 // 1024} MB", inline=True)
-                embed.add_field(name="📡 Réseau ⬆️", value=f"{network.bytes_sent // 1024 // 1024} MB", inline=True)
-                embed.add_field(name="⚙️ Processus", value=f"{len(psutil.pids())}", inline=True)
+                embed.add_field(name="💾 RAM", value=f"{stats['memory_usage']}%", inline=True)
+                embed.add_field(name="💿 Disque", value=f"{stats['disk_usage']}%", inline=True)
+                embed.add_field(name="📡 Réseau ⬇️", value=f"{stats['network_io']['recv'] // 1024 // 1024} MB ({stats['net_recv_rate'] / 1024:.0f} KB/s)", inline=True)
+                embed.add_field(name="📡 Réseau ⬆️", value=f"{stats['network_io']['sent'] // 1024 // 1024} MB ({stats['net_sent_rate'] / 1024:.0f} KB/s)", inline=True)
+                embed.add_field(name="⚙️ Processus", value=f"{stats['processes']}", inline=True)
                 
                 # État général
-                if cpu_percent < 70 and memory.percent < 80 and disk.percent < 90:
+                if cpu_percent < 70 and stats['memory_usage'] < 80 and stats['disk_usage'] < 90:
                     embed.add_field(name="✅ État Général", value="Système Sain", inline=False)
                     embed.color = 0x00ff00
                 else:
                     embed.add_field(name="⚠️ État Général", value="Surveillance Requise", inline=False)
                     embed.color = 0xff0000
                     
-            except ImportError:
+            else:
                 embed = discord.Embed(
                     title="🖥️ Monitoring Système",
                     description="⚠️ Module psutil non disponible",
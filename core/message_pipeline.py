@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+📨 ARSENAL V4 - PIPELINE UNIQUE DE TRAITEMENT DES MESSAGES
+Un seul listener on_message pour tout le bot. Les cogs y enregistrent des
+étapes (automod, tickets, XP, profils...) exécutées par priorité croissante :
+
+- le message est analysé une seule fois (MessageContext partagé)
+- une étape peut interrompre la suite (ex: message supprimé par l'automod
+  -> pas d'XP ni de statistiques)
+- les sauvegardes demandées par les étapes sont regroupées en une seule
+  écriture par tick (mark_dirty)
+- chaque étape a ses compteurs (appels, sautée, erreurs, temps)
+"""
+
+import asyncio
+import time
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from core.logger import log
+
+
+class MessageContext:
+    """Données calculées une fois par message et partagées entre les étapes"""
+
+    __slots__ = ("message", "guild_id", "user_id", "channel_id", "content",
+                 "normalized", "state", "handled", "handled_by", "pipeline")
+
+    def __init__(self, message, pipeline: "MessagePipeline"):
+        self.message = message
+        self.guild_id = message.guild.id
+        self.user_id = message.author.id
+        self.channel_id = message.channel.id
+        self.content = message.content or ""
+        self.normalized = self.content.lower().strip()
+        self.state: Dict[str, object] = {}  # Valeurs partagées (config, exemption...)
+        self.handled = False  # Message sanctionné/supprimé : les étapes suivantes sont sautées
+        self.handled_by: Optional[str] = None
+        self.pipeline = pipeline
+
+    def stop(self, stage_name: str):
+        """Interrompt le pipeline après l'étape courante"""
+        self.handled = True
+        self.handled_by = stage_name
+
+    def mark_dirty(self, key: str, flush: Callable[[], None]):
+        self.pipeline.mark_dirty(key, flush)
+
+
+StageCallback = Callable[[MessageContext], Awaitable[None]]
+
+
+class Stage:
+    __slots__ = ("name", "priority", "callback", "run_when_handled",
+                 "calls", "skipped", "errors", "total_ms", "max_ms")
+
+    def __init__(self, name: str, priority: int, callback: StageCallback, run_when_handled: bool):
+        self.name = name
+        self.priority = priority
+        self.callback = callback
+        self.run_when_handled = run_when_handled
+        self.calls = 0
+        self.skipped = 0
+        self.errors = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+
+class MessagePipeline:
+    """Dispatch on_message fusionné pour tous les cogs"""
+
+    def __init__(self, bot, flush_delay: float = 1.0):
+        self.bot = bot
+        self.flush_delay = flush_delay
+        self.stages: List[Stage] = []
+        self.dirty: Dict[str, Callable[[], None]] = {}
+        self.flush_handle: Optional[asyncio.TimerHandle] = None
+        self.messages = 0
+        self.flushes = 0
+        self.flushed_writes = 0
+        self.requested_writes = 0
+
+    # ==================== ÉTAPES ====================
+
+    def register(self, name: str, callback: StageCallback, priority: int = 100, run_when_handled: bool = False):
+        """Ajoute (ou remplace, pour le rechargement à chaud) une étape"""
+        self.unregister(name)
+        self.stages.append(Stage(name, priority, callback, run_when_handled))
+        self.stages.sort(key=lambda stage: stage.priority)
+        log.info(f"📨 Étape pipeline '{name}' enregistrée (priorité {priority})")
+
+    def unregister(self, name: str):
+        self.stages = [stage for stage in self.stages if stage.name != name]
+
+    async def on_message(self, message):
+        """Listener unique : construit le contexte puis exécute les étapes"""
+        if message.author.bot or not message.guild:
+            return
+
+        self.messages += 1
+        ctx = MessageContext(message, self)
+        for stage in list(self.stages):
+            if ctx.handled and not stage.run_when_handled:
+                stage.skipped += 1
+                continue
+
+            start = time.perf_counter()
+            try:
+                await stage.callback(ctx)
+            except Exception as e:
+                stage.errors += 1
+                log.error(f"❌ Erreur étape pipeline '{stage.name}': {e}")
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            stage.calls += 1
+            stage.total_ms += elapsed_ms
+            if elapsed_ms > stage.max_ms:
+                stage.max_ms = elapsed_ms
+
+    # ==================== SAUVEGARDES GROUPÉES ====================
+
+    def mark_dirty(self, key: str, flush: Callable[[], None]):
+        """Demande une sauvegarde ; plusieurs demandes sur la même clé = une seule écriture"""
+        self.requested_writes += 1
+        self.dirty[key] = flush
+        if self.flush_handle is None:
+            try:
+                loop = asyncio.get_running_loop()
+            except RuntimeError:
+                self.flush()
+                return
+            self.flush_handle = loop.call_later(self.flush_delay, self.flush)
+
+    def flush(self):
+        """Exécute toutes les sauvegardes en attente"""
+        if self.flush_handle is not None:
+            self.flush_handle.cancel()
+            self.flush_handle = None
+
+        dirty, self.dirty = self.dirty, {}
+        for key, flush in dirty.items():
+            try:
+                flush()
+            except Exception as e:
+                log.error(f"❌ Erreur sauvegarde groupée '{key}': {e}")
+        if dirty:
+            self.flushes += 1
+            self.flushed_writes += len(dirty)
+
+    # ==================== STATISTIQUES ====================
+
+    def get_stats(self) -> dict:
+        """Compteurs par étape et efficacité du regroupement des écritures"""
+        return {
+            "messages": self.messages,
+            "stages": [
+                {
+                    "name": stage.name,
+                    "priority": stage.priority,
+                    "calls": stage.calls,
+                    "skipped": stage.skipped,
+                    "errors": stage.errors,
+                    "avg_ms": round(stage.total_ms / stage.calls, 3) if stage.calls else 0.0,
+                    "max_ms": round(stage.max_ms, 3),
+                }
+                for stage in self.stages
+            ],
+            "flushes": self.flushes,
+            "writes_requested": self.requested_writes,
+            "writes_performed": self.flushed_writes,
+            "pending": list(self.dirty),
+        }
+
+
+def get_message_pipeline(bot) -> MessagePipeline:
+    """Pipeline du bot, créé et branché sur on_message au premier appel"""
+    pipeline = getattr(bot, "message_pipeline", None)
+    if pipeline is None:
+        pipeline = MessagePipeline(bot)
+        bot.message_pipeline = pipeline
+        bot.add_listener(pipeline.on_message, "on_message")
+    return pipeline
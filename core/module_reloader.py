@@ -176,7 +176,23 @@ async def reload_status_slash(interaction: discord.Interaction):
         value=f"**{loaded_count}/{total_count}** modules chargés",
         inline=False
     )
-    
+
+    # Pipeline on_message partagé (étapes enregistrées par les modules)
+    pipeline = getattr(interaction.client, "message_pipeline", None)
+    if pipeline:
+        stats = pipeline.get_stats()
+        lines = [
+            f"`{stage['priority']:>3}` **{stage['name']}** : {stage['calls']} appels, "
+            f"{stage['skipped']} sautés, {stage['avg_ms']} ms moy. (max {stage['max_ms']})"
+            for stage in stats["stages"]
+        ]
+        lines.append(f"💾 {stats['writes_requested']} sauvegardes demandées → {stats['writes_performed']} écritures")
+        embed.add_field(
+            name=f"📨 Pipeline messages ({stats['messages']} traités)",
+            value="\n".join(lines)[:1024],
+            inline=False
+        )
+
     await interaction.response.send_message(embed=embed, ephemeral=True)
 
 class ModuleReloader:
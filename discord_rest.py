@@ -0,0 +1,275 @@
+"""
+🌐 Arsenal V4 - Client REST Discord partagé
+Une seule session HTTP (pool de connexions keep-alive) pour tous les appels
+du webpanel vers l'API Discord : échange OAuth, /users/@me, serveurs du bot...
+
+- Rate limits par bucket : lus depuis les en-têtes X-RateLimit-* de chaque
+  réponse, attente avant d'envoyer une requête vouée au 429 (au lieu de
+  time.sleep() arbitraires), limite globale et Retry-After respectés
+- Timeouts connexion/lecture sur chaque requête
+- submit() : requêtes en parallèle (infos utilisateur + serveurs)
+
+DISCORD_API_BASE permet de viser un serveur local (benchmarks/discord_stub_server.py).
+"""
+
+import hashlib
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+DISCORD_API_BASE = os.environ.get('DISCORD_API_BASE', 'https://discord.com/api/v10')
+USER_AGENT = 'Arsenal-WebPanel/1.0 (https://arsenal-webpanel.onrender.com, arsenal@discord-bot.com)'
+# Paramètres majeurs : Discord a un bucket distinct par salon/serveur/webhook
+MAJOR_PARAMETER = re.compile(r'^/(channels|guilds|webhooks)/(\d+)')
+SNOWFLAKE = re.compile(r'/\d{15,21}')
+CLOUDFLARE_MARKERS = ('error 1015', 'cloudflare', 'rate limited', 'access denied')
+RETRYABLE_STATUSES = {500, 502, 503, 504}
+
+
+class DiscordHTTPError(Exception):
+    def __init__(self, status: int, payload: Any, message: str = None):
+        self.status = status
+        self.payload = payload
+        super().__init__(message or f"Discord API {status}: {payload}")
+
+
+class RateLimited(DiscordHTTPError):
+    """429 (ou blocage Cloudflare) dont l'attente dépasse max_wait"""
+
+    def __init__(self, retry_after: float, is_global: bool = False, payload: Any = None):
+        self.retry_after = retry_after
+        self.is_global = is_global
+        super().__init__(429, payload, f"Rate limit Discord ({'global' if is_global else 'bucket'}), réessayer dans {retry_after:.2f}s")
+
+
+class _Bucket:
+    __slots__ = ('remaining', 'reset_at', 'lock')
+
+    def __init__(self):
+        self.remaining: Optional[int] = None  # Inconnu tant qu'aucune réponse n'a été lue
+        self.reset_at = 0.0                   # time.monotonic()
+        self.lock = threading.Lock()
+
+
+class DiscordRESTClient:
+    def __init__(self, base_url: str = DISCORD_API_BASE, timeout: Tuple[float, float] = (3.05, 10.0),
+                 pool_size: int = 20, max_wait: float = 5.0, max_retries: int = 2,
+                 max_buckets: int = 4096, workers: int = 8):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self.max_wait = max_wait
+        self.max_retries = max_retries
+        self.max_buckets = max_buckets
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.session.headers.update({'User-Agent': USER_AGENT, 'Accept': 'application/json'})
+
+        # (identité du token, route) -> hash de bucket renvoyé par Discord
+        self.route_buckets: "OrderedDict[Tuple[str, str], str]" = OrderedDict()
+        self.buckets: "OrderedDict[Tuple[str, str], _Bucket]" = OrderedDict()
+        self.buckets_lock = threading.Lock()
+        self.global_reset_at = 0.0
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='discord-rest')
+        self.stats = {'requests': 0, 'retries': 0, 'rate_limited': 0, 'waited_seconds': 0.0, 'errors': 0}
+
+    # ==================== BUCKETS ====================
+
+    @staticmethod
+    def route_key(method: str, path: str) -> str:
+        """Route générique : les IDs sont remplacés sauf le paramètre majeur"""
+        major = MAJOR_PARAMETER.match(path)
+        prefix = major.group(0) if major else ''
+        return f"{method} {prefix}{SNOWFLAKE.sub('/{id}', path[len(prefix):])}"
+
+    @staticmethod
+    def identity(authorization: Optional[str]) -> str:
+        """Les buckets Discord sont propres à chaque token (jamais stocké en clair)"""
+        if not authorization:
+            return 'anonymous'
+        return hashlib.sha256(authorization.encode()).hexdigest()[:16]
+
+    def _bucket(self, identity: str, route: str) -> _Bucket:
+        with self.buckets_lock:
+            key = (identity, self.route_buckets.get((identity, route), route))
+            bucket = self.buckets.get(key)
+            if bucket is None:
+                bucket = self.buckets[key] = _Bucket()
+                if len(self.buckets) > self.max_buckets:
+                    self.buckets.popitem(last=False)
+            else:
+                self.buckets.move_to_end(key)
+            return bucket
+
+    def _wait_for(self, delay: float, is_global: bool = False):
+        if delay > self.max_wait:
+            self.stats['rate_limited'] += 1
+            raise RateLimited(delay, is_global)
+        self.stats['waited_seconds'] += delay
+        time.sleep(delay)
+
+    def _acquire(self, bucket: _Bucket):
+        """Réserver une requête dans le bucket (attente jusqu'au reset si épuisé)"""
+        now = time.monotonic()
+        if self.global_reset_at > now:
+            self._wait_for(self.global_reset_at - now, is_global=True)
+        with bucket.lock:
+            now = time.monotonic()
+            if bucket.remaining is not None and bucket.remaining <= 0 and bucket.reset_at > now:
+                self._wait_for(bucket.reset_at - now)
+                bucket.remaining = None  # Nouvelle fenêtre : la prochaine réponse dira la vérité
+            elif bucket.remaining is not None:
+                bucket.remaining -= 1
+
+    def _update(self, identity: str, route: str, bucket: _Bucket, headers) -> _Bucket:
+        bucket_hash = headers.get('X-RateLimit-Bucket')
+        if bucket_hash:
+            with self.buckets_lock:
+                if self.route_buckets.get((identity, route)) != bucket_hash:
+                    # Plusieurs routes peuvent partager un bucket : re-pointer la route
+                    self.route_buckets[(identity, route)] = bucket_hash
+                    if len(self.route_buckets) > self.max_buckets:
+                        self.route_buckets.popitem(last=False)
+                    key = (identity, bucket_hash)
+                    bucket = self.buckets.setdefault(key, bucket)
+        remaining = headers.get('X-RateLimit-Remaining')
+        reset_after = headers.get('X-RateLimit-Reset-After')
+        if remaining is not None and reset_after is not None:
+            with bucket.lock:
+                bucket.remaining = int(remaining)
+                bucket.reset_at = time.monotonic() + float(reset_after)
+        return bucket
+
+    # ==================== REQUÊTES ====================
+
+    def request(self, method: str, path: str, *, token: str = None, token_type: str = 'Bearer',
+                auth: Tuple[str, str] = None, params: dict = None, data: dict = None, json: Any = None) -> Any:
+        """Appel REST Discord : JSON décodé, DiscordHTTPError/RateLimited sinon"""
+        headers = {}
+        if token:
+            headers['Authorization'] = f'{token_type} {token}'
+        identity = self.identity(headers.get('Authorization') or (auth and auth[0]))
+        route = self.route_key(method, path)
+        url = f"{self.base_url}{path}"
+
+        for attempt in range(self.max_retries + 1):
+            bucket = self._bucket(identity, route)
+            self._acquire(bucket)
+            self.stats['requests'] += 1
+            response = self.session.request(method, url, headers=headers, auth=auth, params=params,
+                                            data=data, json=json, timeout=self.timeout, allow_redirects=False)
+            self._update(identity, route, bucket, response.headers)
+
+            if response.status_code == 429 or self._is_cloudflare_block(response):
+                retry_after, is_global = self._retry_after(response)
+                if is_global:
+                    self.global_reset_at = time.monotonic() + retry_after
+                if attempt >= self.max_retries:
+                    self.stats['rate_limited'] += 1
+                    raise RateLimited(retry_after, is_global, self._payload(response))
+                self.stats['retries'] += 1
+                self._wait_for(retry_after, is_global)
+                continue
+
+            if response.status_code in RETRYABLE_STATUSES and method == 'GET' and attempt < self.max_retries:
+                self.stats['retries'] += 1
+                time.sleep(0.5 * (attempt + 1))
+                continue
+
+            payload = self._payload(response)
+            if response.status_code >= 400:
+                self.stats['errors'] += 1
+                raise DiscordHTTPError(response.status_code, payload)
+            return payload
+
+    def get(self, path: str, **kwargs) -> Any:
+        return self.request('GET', path, **kwargs)
+
+    def post(self, path: str, **kwargs) -> Any:
+        return self.request('POST', path, **kwargs)
+
+    def submit(self, method: str, path: str, **kwargs) -> Future:
+        """Requête exécutée en arrière-plan (plusieurs appels en parallèle)"""
+        return self.executor.submit(self.request, method, path, **kwargs)
+
+    @staticmethod
+    def _payload(response: requests.Response) -> Any:
+        if response.status_code == 204 or not response.content:
+            return None
+        try:
+            return response.json()
+        except ValueError:
+            return response.text[:500]
+
+    @staticmethod
+    def _is_cloudflare_block(response: requests.Response) -> bool:
+        """Ban temporaire Cloudflare (1015) : page HTML au lieu du JSON Discord"""
+        if response.status_code not in (403, 429, 503):
+            return False
+        if 'json' in response.headers.get('Content-Type', ''):
+            return False
+        text = response.text[:2000].lower()
+        return any(marker in text for marker in CLOUDFLARE_MARKERS)
+
+    @staticmethod
+    def _retry_after(response: requests.Response) -> Tuple[float, bool]:
+        is_global = response.headers.get('X-RateLimit-Global', '').lower() == 'true'
+        retry_after = None
+        try:
+            body = response.json()
+            retry_after = float(body.get('retry_after'))
+            is_global = is_global or bool(body.get('global'))
+        except (ValueError, TypeError, AttributeError):
+            pass
+        if retry_after is None:
+            retry_after = float(response.headers.get('Retry-After') or response.headers.get('X-RateLimit-Reset-After') or 1.0)
+        return retry_after, is_global
+
+    # ==================== RACCOURCIS OAUTH / BOT ====================
+
+    def exchange_code(self, client_id: str, client_secret: str, code: str, redirect_uri: str) -> dict:
+        """Code OAuth -> token (Basic Auth, comme recommandé par Discord)"""
+        return self.post('/oauth2/token', auth=(client_id, client_secret), data={
+            'grant_type': 'authorization_code',
+            'code': code,
+            'redirect_uri': redirect_uri,
+        })
+
+    def fetch_user_and_guilds(self, access_token: str) -> Tuple[Future, Future]:
+        """/users/@me et /users/@me/guilds lancés en parallèle"""
+        return (self.submit('GET', '/users/@me', token=access_token),
+                self.submit('GET', '/users/@me/guilds', token=access_token))
+
+    def get_bot_guilds(self, bot_token: str) -> list:
+        return self.get('/users/@me/guilds', token=bot_token, token_type='Bot')
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self.stats, 'waited_seconds': round(self.stats['waited_seconds'], 3),
+                'buckets': len(self.buckets), 'base_url': self.base_url}
+
+    def close(self):
+        self.executor.shutdown(wait=False)
+        self.session.close()
+
+
+_discord_client: Optional[DiscordRESTClient] = None
+_discord_client_lock = threading.Lock()
+
+
+def get_discord_client() -> DiscordRESTClient:
+    """Client REST Discord partagé du processus"""
+    global _discord_client
+    if _discord_client is None:
+        with _discord_client_lock:
+            if _discord_client is None:
+                _discord_client = DiscordRESTClient(base_url=os.environ.get('DISCORD_API_BASE', DISCORD_API_BASE))
+    return _discord_client
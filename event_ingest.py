@@ -0,0 +1,164 @@
+"""
+📥 Arsenal V4 - Ingestion par lots des événements du bot
+Reçoit les lots envoyés par l'EventShipper du bot (POST /api/ingest/batch) :
+
+- validation de chaque événement (type connu, champs attendus)
+- un executemany pour toutes les commandes, un par séquence de mises à jour
+  de serveurs (l'ordre ajout / retrait d'un même serveur est conservé)
+- tout le lot dans une seule transaction (tout ou rien)
+
+Types d'événements :
+  command        -> INSERT INTO command_logs
+  server         -> INSERT OR REPLACE INTO connected_servers
+  server_remove  -> DELETE FROM connected_servers
+
+Réglage : ARSENAL_INGEST_TOKEN  jeton Bearer exigé sur /api/ingest/batch (optionnel)
+"""
+
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Any, Dict, List, Tuple
+
+MAX_BATCH = 1000
+
+SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS command_logs (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id TEXT,
+        username TEXT,
+        command TEXT,
+        server_id TEXT,
+        server_name TEXT,
+        timestamp DATETIME,
+        success BOOLEAN
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS connected_servers (
+        server_id TEXT PRIMARY KEY,
+        server_name TEXT NOT NULL,
+        member_count INTEGER DEFAULT 0,
+        connected_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        last_activity TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    """,
+)
+
+STATEMENTS = {
+    'command': """
+        INSERT INTO command_logs (user_id, username, command, server_id, server_name, timestamp, success)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+    """,
+    'server': """
+        INSERT OR REPLACE INTO connected_servers (server_id, server_name, member_count, connected_at, last_activity)
+        VALUES (?, ?, ?, ?, ?)
+    """,
+    'server_remove': "DELETE FROM connected_servers WHERE server_id = ?",
+}
+
+
+class InvalidBatch(ValueError):
+    pass
+
+
+def _text(event: Dict[str, Any], field: str, required: bool = True):
+    value = event.get(field)
+    if value is None:
+        if required:
+            raise InvalidBatch(f"Champ manquant: {field}")
+        return None
+    return str(value)
+
+
+def _row(event: Dict[str, Any]) -> Tuple[str, tuple]:
+    """(type, paramètres SQL) d'un événement ; InvalidBatch s'il est mal formé"""
+    if not isinstance(event, dict):
+        raise InvalidBatch("Événement invalide")
+    kind = event.get('type')
+    now = datetime.now().isoformat()
+    if kind == 'command':
+        return kind, (
+            _text(event, 'user_id'),
+            _text(event, 'username', required=False),
+            _text(event, 'command'),
+            _text(event, 'server_id', required=False),
+            _text(event, 'server_name', required=False),
+            _text(event, 'timestamp', required=False) or now,
+            bool(event.get('success', True))
+        )
+    if kind == 'server':
+        try:
+            member_count = int(event.get('member_count') or 0)
+        except (TypeError, ValueError):
+            raise InvalidBatch("member_count invalide")
+        return kind, (
+            _text(event, 'server_id'),
+            _text(event, 'server_name'),
+            member_count,
+            _text(event, 'connected_at', required=False) or now,
+            _text(event, 'last_activity', required=False) or now
+        )
+    if kind == 'server_remove':
+        return kind, (_text(event, 'server_id'),)
+    raise InvalidBatch(f"Type d'événement inconnu: {kind}")
+
+
+class EventIngestor:
+    def __init__(self, db_path: str, rollups=None):
+        self.db_path = db_path
+        self.rollups = rollups  # CommandRollups mis à jour après chaque lot de commandes
+        self._schema_ready = False
+        self._lock = threading.Lock()
+        self.stats = {'batches': 0, 'events': 0, 'rejected_batches': 0}
+
+    def _ensure_schema(self, conn: sqlite3.Connection):
+        if not self._schema_ready:
+            with self._lock:
+                if not self._schema_ready:
+                    for statement in SCHEMA:
+                        conn.execute(statement)
+                    conn.commit()
+                    self._schema_ready = True
+
+    def ingest(self, events: List[Dict[str, Any]]) -> Dict[str, int]:
+        """Insère un lot en une transaction -> nombre d'événements par type"""
+        if not isinstance(events, list):
+            raise InvalidBatch("'events' doit être une liste")
+        if len(events) > MAX_BATCH:
+            raise InvalidBatch(f"Lot trop gros ({len(events)} > {MAX_BATCH})")
+
+        commands: List[tuple] = []
+        server_runs: List[Tuple[str, List[tuple]]] = []  # Serveurs : ordre conservé (ajout puis retrait...)
+        counts: Dict[str, int] = {}
+        try:
+            for event in events:
+                kind, params = _row(event)
+                counts[kind] = counts.get(kind, 0) + 1
+                if kind == 'command':
+                    commands.append(params)
+                elif server_runs and server_runs[-1][0] == kind:
+                    server_runs[-1][1].append(params)
+                else:
+                    server_runs.append((kind, [params]))
+        except InvalidBatch:
+            self.stats['rejected_batches'] += 1
+            raise
+
+        conn = sqlite3.connect(self.db_path, timeout=10)
+        try:
+            self._ensure_schema(conn)
+            with conn:  # Une transaction : commit à la fin, rollback si une insertion échoue
+                if commands:
+                    conn.executemany(STATEMENTS['command'], commands)
+                for kind, rows in server_runs:
+                    conn.executemany(STATEMENTS[kind], rows)
+        finally:
+            conn.close()
+
+        self.stats['batches'] += 1
+        self.stats['events'] += len(events)
+        if commands and self.rollups is not None:
+            self.rollups.after_insert('command_logs')
+        return counts
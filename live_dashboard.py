@@ -0,0 +1,248 @@
+"""
+📡 Arsenal V4 - Publication temps réel du dashboard (Socket.IO / SSE)
+Chaque jeu de données du dashboard (statut bot, stats, performances...) est
+calculé une seule fois par échéance, uniquement s'il a des abonnés, puis
+seules les clés modifiées sont poussées :
+
+- Socket.IO : une room "dashboard:<nom>" par jeu de données, un seul emit par room
+- SSE       : /api/live/stream, le message est sérialisé une fois puis mis en
+              file pour chaque client
+
+100 onglets ouverts coûtent donc un calcul par échéance, comme un seul.
+
+Messages : {"type": "snapshot", "dataset", "version", "data"}
+           {"type": "delta", "dataset", "version", "changes", "removed"}
+Un client qui détecte un trou de version redemande /api/live/snapshot/<nom>.
+"""
+
+import json
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set
+
+
+class LiveDataset:
+    def __init__(self, name: str, producer: Callable[[], Any], interval: float):
+        self.name = name
+        self.producer = producer
+        self.interval = interval
+        self.value: Any = None
+        self.version = 0
+        self.computed_at = 0.0
+        self.computations = 0
+        self.errors = 0
+
+    def snapshot_message(self) -> dict:
+        return {"type": "snapshot", "dataset": self.name, "version": self.version, "data": self.value}
+
+
+def diff_payload(old: Any, new: Any) -> Optional[dict]:
+    """Différence de premier niveau entre deux valeurs (None si identiques)"""
+    if isinstance(old, dict) and isinstance(new, dict):
+        changes = {key: value for key, value in new.items() if key not in old or old[key] != value}
+        removed = [key for key in old if key not in new]
+        if not changes and not removed:
+            return None
+        return {"changes": changes, "removed": removed}
+    if old == new:
+        return None
+    return {"replace": new}
+
+
+class SSESubscription:
+    def __init__(self, datasets: Set[str], max_pending: int = 256):
+        self.datasets = datasets
+        self.queue: "queue.Queue[str]" = queue.Queue(maxsize=max_pending)
+        self.overflowed = False
+
+
+class DashboardPublisher:
+    def __init__(self, tick: float = 1.0):
+        self.tick = tick
+        self.datasets: Dict[str, LiveDataset] = {}
+        self.socketio = None
+        self.socket_subscriptions: Dict[str, Set[str]] = {}  # sid -> jeux de données
+        self.sse_subscriptions: List[SSESubscription] = []
+        self.lock = threading.Lock()
+        self.compute_lock = threading.Lock()  # Un seul calcul à la fois (versions cohérentes)
+        self.thread = None
+        self.stop_event = threading.Event()
+        self.messages_published = 0
+        self.deliveries = 0
+
+    # ==================== ENREGISTREMENT ====================
+
+    def register(self, name: str, producer: Callable[[], Any], interval: float):
+        self.datasets[name] = LiveDataset(name, producer, interval)
+
+    def attach_socketio(self, socketio):
+        """Brancher les événements Socket.IO (dashboard:subscribe / dashboard:unsubscribe)"""
+        from flask import request
+        from flask_socketio import emit, join_room, leave_room
+
+        self.socketio = socketio
+
+        @socketio.on('dashboard:subscribe')
+        def on_subscribe(payload):
+            names = self._known((payload or {}).get('datasets', []))
+            with self.lock:
+                self.socket_subscriptions.setdefault(request.sid, set()).update(names)
+            for name in names:
+                join_room(f"dashboard:{name}")
+                emit('dashboard', self.snapshot(name))
+
+        @socketio.on('dashboard:unsubscribe')
+        def on_unsubscribe(payload):
+            names = self._known((payload or {}).get('datasets', []))
+            with self.lock:
+                self.socket_subscriptions.get(request.sid, set()).difference_update(names)
+            for name in names:
+                leave_room(f"dashboard:{name}")
+
+        @socketio.on('disconnect')
+        def on_disconnect():
+            with self.lock:
+                self.socket_subscriptions.pop(request.sid, None)
+
+    def _known(self, names: Iterable[str]) -> List[str]:
+        return [name for name in names if name in self.datasets]
+
+    # ==================== ABONNEMENTS SSE ====================
+
+    def subscribe_sse(self, names: Iterable[str]) -> SSESubscription:
+        subscription = SSESubscription(set(self._known(names)))
+        with self.lock:
+            self.sse_subscriptions.append(subscription)
+        return subscription
+
+    def unsubscribe_sse(self, subscription: SSESubscription):
+        with self.lock:
+            if subscription in self.sse_subscriptions:
+                self.sse_subscriptions.remove(subscription)
+
+    def sse_stream(self, subscription: SSESubscription, heartbeat: float = 15.0):
+        """Générateur text/event-stream : snapshots puis deltas, ping régulier"""
+        try:
+            for name in sorted(subscription.datasets):
+                yield self._sse_frame(json.dumps(self.snapshot(name), ensure_ascii=False))
+            while True:
+                try:
+                    frame = subscription.queue.get(timeout=heartbeat)
+                except queue.Empty:
+                    yield ": ping\n\n"
+                    continue
+                if subscription.overflowed:
+                    # Client trop lent : repartir d'un état complet
+                    subscription.overflowed = False
+                    with subscription.queue.mutex:
+                        subscription.queue.queue.clear()
+                    for name in sorted(subscription.datasets):
+                        yield self._sse_frame(json.dumps(self.snapshot(name), ensure_ascii=False))
+                    continue
+                yield frame
+        finally:
+            self.unsubscribe_sse(subscription)
+
+    @staticmethod
+    def _sse_frame(data: str) -> str:
+        return f"event: dashboard\ndata: {data}\n\n"
+
+    # ==================== CALCUL ET PUBLICATION ====================
+
+    def subscriber_count(self, name: str) -> int:
+        with self.lock:
+            sockets = sum(1 for names in self.socket_subscriptions.values() if name in names)
+            streams = sum(1 for subscription in self.sse_subscriptions if name in subscription.datasets)
+        return sockets + streams
+
+    def snapshot(self, name: str) -> dict:
+        """État complet d'un jeu de données (calculé s'il ne l'a jamais été)"""
+        dataset = self.datasets[name]
+        with self.compute_lock:
+            if dataset.version == 0:
+                self._refresh(dataset)
+            return dataset.snapshot_message()
+
+    def _refresh(self, dataset: LiveDataset, now: float = None) -> Optional[dict]:
+        try:
+            value = dataset.producer()
+        except Exception as e:
+            dataset.errors += 1
+            print(f"❌ Erreur calcul dashboard '{dataset.name}': {e}")
+            return None
+        dataset.computations += 1
+        dataset.computed_at = time.time() if now is None else now
+        delta = diff_payload(dataset.value, value) if dataset.version else {"replace": value}
+        dataset.value = value
+        if delta is None:
+            return None
+        dataset.version += 1
+        return {"type": "delta", "dataset": dataset.name, "version": dataset.version, **delta}
+
+    def publish(self, message: dict):
+        """Un emit par room Socket.IO + une sérialisation pour tous les clients SSE"""
+        name = message["dataset"]
+        self.messages_published += 1
+        if self.socketio is not None:
+            self.socketio.emit('dashboard', message, to=f"dashboard:{name}")
+        frame = self._sse_frame(json.dumps(message, ensure_ascii=False))
+        with self.lock:
+            targets = [subscription for subscription in self.sse_subscriptions if name in subscription.datasets]
+        for subscription in targets:
+            try:
+                subscription.queue.put_nowait(frame)
+                self.deliveries += 1
+            except queue.Full:
+                subscription.overflowed = True
+
+    def run_once(self, now: float = None):
+        """Une échéance : recalculer les jeux de données dus et abonnés"""
+        now = time.time() if now is None else now
+        for dataset in list(self.datasets.values()):
+            if now - dataset.computed_at < dataset.interval or not self.subscriber_count(dataset.name):
+                continue
+            with self.compute_lock:
+                message = self._refresh(dataset, now)
+                if message is not None:
+                    self.publish(message)
+
+    def start(self):
+        if self.thread and self.thread.is_alive():
+            return
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self._loop, name="arsenal-live-dashboard", daemon=True)
+        self.thread.start()
+        print(f"📡 Publication temps réel du dashboard démarrée ({len(self.datasets)} jeux de données)")
+
+    def stop(self):
+        self.stop_event.set()
+
+    def _loop(self):
+        while not self.stop_event.is_set():
+            try:
+                self.run_once()
+            except Exception as e:
+                print(f"❌ Erreur publication dashboard: {e}")
+            self.stop_event.wait(self.tick)
+
+    def get_stats(self) -> dict:
+        with self.lock:
+            sockets = len(self.socket_subscriptions)
+            streams = len(self.sse_subscriptions)
+        return {
+            "socketio_clients": sockets,
+            "sse_clients": streams,
+            "messages_published": self.messages_published,
+            "sse_deliveries": self.deliveries,
+            "datasets": {
+                name: {
+                    "interval": dataset.interval,
+                    "version": dataset.version,
+                    "computations": dataset.computations,
+                    "errors": dataset.errors,
+                    "subscribers": self.subscriber_count(name),
+                }
+                for name, dataset in self.datasets.items()
+            },
+        }
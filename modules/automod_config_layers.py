@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+🧱 ARSENAL V4 - CONFIGURATION AUTOMOD EN COUCHES
+Une base partagée immuable (get_default_config) + des surcharges éparses
+par serveur. Seules les différences sont stockées dans automod_config.json :
+
+    {"spam_detection": {"max_messages": 8},
+     "word_filter": {"level_1_words": {"$add": ["nul"], "$remove": ["con"]}}}
+
+- dict   : surcharge récursive clé par clé
+- liste  : patch {"$add": [...], "$remove": [...]} appliqué sur la liste de base
+- valeur : remplace simplement la valeur de base
+"""
+
+import json
+from types import MappingProxyType
+from typing import Any, Dict, Mapping, Tuple
+
+LIST_ADD = "$add"
+LIST_REMOVE = "$remove"
+LAYERED_LAYOUT = "layered"
+
+
+def freeze(value: Any) -> Any:
+    """Copie en lecture seule (dict -> MappingProxyType, liste -> tuple)"""
+    if isinstance(value, Mapping):
+        return MappingProxyType({key: freeze(item) for key, item in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(item) for item in value)
+    return value
+
+
+def thaw(value: Any) -> Any:
+    """Copie modifiable d'une valeur (gelée ou non)"""
+    if isinstance(value, Mapping):
+        return {key: thaw(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [thaw(item) for item in value]
+    return value
+
+
+def is_list_patch(value: Any) -> bool:
+    return isinstance(value, Mapping) and bool(value) and set(value) <= {LIST_ADD, LIST_REMOVE}
+
+
+def _lookup(items) -> Any:
+    """Ensemble pour les tests d'appartenance (listes de mots de plusieurs centaines d'entrées)"""
+    try:
+        return set(items)
+    except TypeError:
+        return items
+
+
+def _apply(base_value: Any, override: Any) -> Any:
+    if isinstance(base_value, (list, tuple)) and is_list_patch(override):
+        removed = _lookup(override.get(LIST_REMOVE, []))
+        result = [thaw(item) for item in base_value if item not in removed]
+        result.extend(thaw(item) for item in override.get(LIST_ADD, []) if item not in result)
+        return result
+    if isinstance(base_value, Mapping) and isinstance(override, Mapping):
+        return resolve_config(base_value, override)
+    return thaw(override)
+
+
+def resolve_config(base: Mapping, overrides: Mapping) -> Dict[str, Any]:
+    """Config effective (modifiable) = base + surcharges"""
+    effective = {}
+    for key, base_value in base.items():
+        if key in overrides:
+            effective[key] = _apply(base_value, overrides[key])
+        else:
+            effective[key] = thaw(base_value)
+    for key, override in overrides.items():
+        if key not in base:
+            effective[key] = thaw(override)
+    return effective
+
+
+def diff_config(base: Mapping, effective: Mapping) -> Dict[str, Any]:
+    """Surcharges minimales telles que resolve_config(base, surcharges) == effective
+
+    Les clés absentes de `effective` ne sont pas représentées : elles
+    reprennent la valeur de base.
+    """
+    overrides = {}
+    for key, value in effective.items():
+        if key not in base:
+            overrides[key] = thaw(value)
+            continue
+
+        base_value = base[key]
+        if isinstance(value, Mapping) and isinstance(base_value, Mapping):
+            nested = diff_config(base_value, value)
+            if nested:
+                overrides[key] = nested
+        elif isinstance(value, (list, tuple)) and isinstance(base_value, (list, tuple)):
+            base_items, items = _lookup(base_value), _lookup(value)
+            added = [thaw(item) for item in value if item not in base_items]
+            removed = [thaw(item) for item in base_value if item not in items]
+            patch = {}
+            if added:
+                patch[LIST_ADD] = added
+            if removed:
+                patch[LIST_REMOVE] = removed
+            if patch:
+                overrides[key] = patch
+        elif value != base_value:
+            overrides[key] = thaw(value)
+    return overrides
+
+
+def collapse_server_copies(base: Mapping, servers: Mapping) -> Tuple[Dict[str, Any], int]:
+    """Migration : copies complètes par serveur -> surcharges éparses
+
+    Retourne (surcharges par serveur, nombre de serveurs sans aucune différence).
+    """
+    collapsed = {}
+    identical = 0
+    for guild_id, server_config in servers.items():
+        server_config = {key: value for key, value in server_config.items() if key != "servers"}
+        overrides = diff_config(base, server_config)
+        if overrides:
+            collapsed[guild_id] = overrides
+        else:
+            identical += 1
+    return collapsed, identical
+
+
+def word_lists_signature(word_filter_overrides: Mapping) -> str:
+    """Clé identifiant les listes de mots d'un serveur (partage des automates)"""
+    lists = {key: value for key, value in word_filter_overrides.items() if key.endswith("words")}
+    return json.dumps(lists, sort_keys=True, ensure_ascii=False) if lists else ""
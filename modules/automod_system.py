@@ -16,19 +16,30 @@ import asyncio
 import time
 import re
 import os
+from collections import OrderedDict
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional
 from core.logger import log
+from core.message_pipeline import MessageContext, get_message_pipeline
 from manager.config_manager import config_data, save_config, load_config
+from modules.word_filter_engine import WordFilterMatcher, build_legacy_matcher, build_level_matcher
+from modules.spam_detector import SpamDetector
+from modules.automod_config_layers import (
+    LAYERED_LAYOUT, collapse_server_copies, diff_config, freeze, resolve_config, word_lists_signature
+)
 
 class AutoModSystem:
     def __init__(self, bot):
         self.bot = bot
         self.config_path = "data/automod_config.json"
-        self.user_message_history = {}  # Historique des messages pour détection spam
+        self.spam_detector = SpamDetector()  # Fenêtres glissantes par (serveur, utilisateur)
         self.user_warnings = {}  # Système d'avertissements
         self.raid_tracker = {}  # Suivi des raids par serveur
         self.competing_bots = {}  # Bots concurrents détectés par serveur
+        self.word_matchers = {}  # Automates de filtrage compilés par (mode, listes de mots), partagés entre serveurs
+        self.effective_configs = OrderedDict()  # Configs résolues (base + surcharges), LRU
+        self.max_cached_configs = 1024
+        self.base_config = freeze({key: value for key, value in self.get_default_config().items() if key != "servers"})
         self.load_config()
         
     def load_config(self):
@@ -40,10 +51,23 @@ class AutoModSystem:
                 log.info("🛡️ Configuration automod chargée")
             except Exception as e:
                 log.error(f"❌ Erreur chargement automod config: {e}")
-                self.config = self.get_default_config()
+                self.config = {"layout": LAYERED_LAYOUT, "servers": {}}
         else:
-            self.config = self.get_default_config()
+            self.config = {"layout": LAYERED_LAYOUT, "servers": {}}
             self.save_config()
+        if self.config.get("layout") != LAYERED_LAYOUT:
+            self.migrate_server_copies()
+        self.effective_configs.clear()
+        self.word_matchers.clear()
+    
+    def migrate_server_copies(self):
+        """Migration : copies complètes par serveur -> surcharges éparses sur la base partagée"""
+        servers = self.config.get("servers", {})
+        collapsed, identical = collapse_server_copies(self.base_config, servers)
+        self.config = {"layout": LAYERED_LAYOUT, "servers": collapsed}
+        log.info(f"🧱 Config automod migrée en couches: {len(servers)} serveurs, "
+                 f"{len(collapsed)} avec surcharges, {identical} identiques à la base")
+        self.save_config()
     
     def save_config(self):
         """Sauvegarde la configuration"""
@@ -373,20 +397,52 @@ class AutoModSystem:
             "servers": {}  # Config par serveur
         }
     
+    def get_server_overrides(self, guild_id: int) -> dict:
+        """Surcharges éparses d'un serveur (vide = config de base)"""
+        return self.config["servers"].get(str(guild_id), {})
+    
     def get_server_config(self, guild_id: int):
-        """Récupère la config pour un serveur spécifique"""
+        """Récupère la config effective d'un serveur (base partagée + surcharges), résolue à la demande"""
         guild_id = str(guild_id)
-        if guild_id not in self.config["servers"]:
-            self.config["servers"][guild_id] = self.get_default_config()
-            self.save_config()
-        return self.config["servers"][guild_id]
+        config = self.effective_configs.get(guild_id)
+        if config is not None:
+            self.effective_configs.move_to_end(guild_id)
+            return config
+        
+        config = resolve_config(self.base_config, self.get_server_overrides(guild_id))
+        self.effective_configs[guild_id] = config
+        if len(self.effective_configs) > self.max_cached_configs:
+            self.effective_configs.popitem(last=False)
+        return config
     
     def update_server_config(self, guild_id: int, new_config: dict):
-        """Met à jour la config d'un serveur"""
+        """Met à jour la config d'un serveur (seules les différences avec la base sont stockées)"""
         guild_id = str(guild_id)
-        self.config["servers"][guild_id] = new_config
+        overrides = diff_config(self.base_config, new_config)
+        if overrides:
+            self.config["servers"][guild_id] = overrides
+        else:
+            self.config["servers"].pop(guild_id, None)
+        self.invalidate_server_config(guild_id)
         self.save_config()
     
+    def invalidate_server_config(self, guild_id: int):
+        """Oublie la config résolue d'un serveur (recalculée au prochain accès)"""
+        self.effective_configs.pop(str(guild_id), None)
+    
+    def get_word_matcher(self, guild_id: int, mode: str = "levels") -> WordFilterMatcher:
+        """Automate compilé, partagé par tous les serveurs ayant les mêmes listes de mots"""
+        word_filter_overrides = self.get_server_overrides(guild_id).get("word_filter", {})
+        key = (mode, word_lists_signature(word_filter_overrides))
+        matcher = self.word_matchers.get(key)
+        if matcher is None:
+            word_filter = self.get_server_config(guild_id)["word_filter"]
+            matcher = build_level_matcher(word_filter) if mode == "levels" else build_legacy_matcher(word_filter)
+            if len(self.word_matchers) >= 256:
+                self.word_matchers.clear()  # Listes personnalisées devenues obsolètes
+            self.word_matchers[key] = matcher
+        return matcher
+    
     async def is_exempt(self, message: discord.Message) -> bool:
         """Vérifie si l'utilisateur/salon est exempt"""
         config = self.get_server_config(message.guild.id)
@@ -493,55 +549,35 @@ class AutoModSystem:
         if not config["spam_detection"]["enabled"]:
             return False
         
-        user_id = message.author.id
-        current_time = time.time()
-        
-        # Initialiser l'historique utilisateur
-        if user_id not in self.user_message_history:
-            self.user_message_history[user_id] = []
-        
-        # Ajouter le message actuel
-        self.user_message_history[user_id].append({
-            "time": current_time,
-            "content": message.content,
-            "channel": message.channel.id
-        })
-        
-        # Nettoyer les anciens messages
+        # Enregistrer le message dans la fenêtre glissante (serveur, utilisateur)
         time_window = config["spam_detection"]["time_window"]
-        self.user_message_history[user_id] = [
-            msg for msg in self.user_message_history[user_id]
-            if current_time - msg["time"] <= time_window
-        ]
-        
-        recent_messages = self.user_message_history[user_id]
+        recent_count, duplicates = self.spam_detector.record(
+            message.guild.id,
+            message.author.id,
+            message.content,
+            time_window,
+            config["spam_detection"]["max_messages"]
+        )
         
         # Vérifier le nombre de messages
-        if len(recent_messages) > config["spam_detection"]["max_messages"]:
+        if recent_count > config["spam_detection"]["max_messages"]:
             await self.apply_sanction(
                 message, 
                 config["spam_detection"]["action"],
-                f"Spam détecté ({len(recent_messages)} messages en {time_window}s)",
+                f"Spam détecté ({recent_count} messages en {time_window}s)",
                 config["spam_detection"]["duration"]
             )
             return True
         
         # Vérifier les doublons
-        content_count = {}
-        for msg in recent_messages:
-            content = msg["content"].lower().strip()
-            content_count[content] = content_count.get(content, 0) + 1
-        
-        max_duplicates = config["spam_detection"]["max_duplicates"]
-        for content, count in content_count.items():
-            if count > max_duplicates and content:
-                await self.apply_sanction(
-                    message,
-                    config["spam_detection"]["action"],
-                    f"Messages identiques répétés ({count} fois)",
-                    config["spam_detection"]["duration"]
-                )
-                return True
+        if duplicates > config["spam_detection"]["max_duplicates"]:
+            await self.apply_sanction(
+                message,
+                config["spam_detection"]["action"],
+                f"Messages identiques répétés ({duplicates} fois)",
+                config["spam_detection"]["duration"]
+            )
+            return True
         
         return False
     
@@ -558,92 +594,86 @@ class AutoModSystem:
             return await self.check_advanced_word_filter(message, config, content)
         
         # Ancien système basique (fallback)
-        forbidden_words = config["word_filter"]["words"]
+        match = self.get_word_matcher(message.guild.id, "legacy").highest(content)
         
-        for word in forbidden_words:
-            if word.lower() in content:
-                if config["word_filter"]["auto_delete"]:
-                    await self.apply_sanction(message, "delete", f"Mot interdit détecté: {word}")
-                
-                await self.apply_sanction(
-                    message,
-                    config["word_filter"]["action"],
-                    f"Utilisation de mot interdit: {word}"
-                )
-                return True
+        if match:
+            word = match[1]
+            if config["word_filter"]["auto_delete"]:
+                await self.apply_sanction(message, "delete", f"Mot interdit détecté: {word}")
+            
+            await self.apply_sanction(
+                message,
+                config["word_filter"]["action"],
+                f"Utilisation de mot interdit: {word}"
+            )
+            return True
         
         return False
     
     async def check_advanced_word_filter(self, message: discord.Message, config: dict, content: str) -> bool:
-        """Système de filtrage avancé par niveaux de gravité"""
+        """Système de filtrage avancé par niveaux de gravité (un seul passage, niveau le plus grave)"""
+        match = self.get_word_matcher(message.guild.id).highest(content)
+        if match is None:
+            return False
+        
+        level, word = match
         
         # Niveau 4 - Haine raciale/Extrême (priorité maximale)
-        level_4_words = config["word_filter"].get("level_4_words", [])
-        for word in level_4_words:
-            if word.lower() in content:
-                if config["word_filter"]["auto_delete"]:
-                    await self.apply_sanction(message, "delete", f"Contenu haineux détecté")
-                
-                # Timeout 2 heures + log spécial
-                duration = config["word_filter"].get("level_4_duration", 7200)
-                await self.apply_sanction(
-                    message,
-                    config["word_filter"]["level_4_action"],
-                    f"🚨 Contenu haineux/raciste détecté (Niveau 4)",
-                    duration
-                )
-                
-                # Log spécial pour le niveau 4
-                await self.log_hate_speech(message, word, "Niveau 4 - Haine raciale/Extrême")
-                return True
+        if level == 4:
+            if config["word_filter"]["auto_delete"]:
+                await self.apply_sanction(message, "delete", f"Contenu haineux détecté")
+            
+            # Timeout 2 heures + log spécial
+            duration = config["word_filter"].get("level_4_duration", 7200)
+            await self.apply_sanction(
+                message,
+                config["word_filter"]["level_4_action"],
+                f"🚨 Contenu haineux/raciste détecté (Niveau 4)",
+                duration
+            )
+            
+            # Log spécial pour le niveau 4
+            await self.log_hate_speech(message, word, "Niveau 4 - Haine raciale/Extrême")
+            return True
         
         # Niveau 3 - Vulgarités sexuelles
-        level_3_words = config["word_filter"].get("level_3_words", [])
-        for word in level_3_words:
-            if word.lower() in content:
-                if config["word_filter"]["auto_delete"]:
-                    await self.apply_sanction(message, "delete", f"Contenu sexuel détecté")
-                
-                duration = config["word_filter"].get("level_3_duration", 1800)  # 30 min
-                await self.apply_sanction(
-                    message,
-                    config["word_filter"]["level_3_action"],
-                    f"⚠️ Vulgarité sexuelle détectée (Niveau 3)",
-                    duration
-                )
-                return True
+        if level == 3:
+            if config["word_filter"]["auto_delete"]:
+                await self.apply_sanction(message, "delete", f"Contenu sexuel détecté")
+            
+            duration = config["word_filter"].get("level_3_duration", 1800)  # 30 min
+            await self.apply_sanction(
+                message,
+                config["word_filter"]["level_3_action"],
+                f"⚠️ Vulgarité sexuelle détectée (Niveau 3)",
+                duration
+            )
+            return True
         
         # Niveau 2 - Insultes offensantes
-        level_2_words = config["word_filter"].get("level_2_words", [])
-        for word in level_2_words:
-            if word.lower() in content:
-                if config["word_filter"]["auto_delete"]:
-                    await self.apply_sanction(message, "delete", f"Insulte détectée")
-                
-                duration = config["word_filter"].get("level_2_duration", 300)  # 5 min
-                await self.apply_sanction(
-                    message,
-                    config["word_filter"]["level_2_action"],
-                    f"💢 Insulte offensante détectée (Niveau 2)",
-                    duration
-                )
-                return True
+        if level == 2:
+            if config["word_filter"]["auto_delete"]:
+                await self.apply_sanction(message, "delete", f"Insulte détectée")
+            
+            duration = config["word_filter"].get("level_2_duration", 300)  # 5 min
+            await self.apply_sanction(
+                message,
+                config["word_filter"]["level_2_action"],
+                f"💢 Insulte offensante détectée (Niveau 2)",
+                duration
+            )
+            return True
         
         # Niveau 1 - Grossièretés légères
-        level_1_words = config["word_filter"].get("level_1_words", [])
-        for word in level_1_words:
-            if word.lower() in content:
-                if config["word_filter"]["auto_delete"]:
-                    await self.apply_sanction(message, "delete", f"Grossièreté détectée")
-                
-                await self.apply_sanction(
-                    message,
-                    config["word_filter"]["level_1_action"],
-                    f"😠 Grossièreté détectée (Niveau 1)"
-                )
-                return True
+        if config["word_filter"]["auto_delete"]:
+            await self.apply_sanction(message, "delete", f"Grossièreté détectée")
         
-        return False
+        await self.apply_sanction(
+            message,
+            config["word_filter"]["level_1_action"],
+            f"😠 Grossièreté détectée (Niveau 1)"
+        )
+        return True
     
     async def log_hate_speech(self, message: discord.Message, word: str, level: str):
         """Log spécial pour les contenus haineux (Niveau 4)"""
@@ -821,24 +851,25 @@ class AutoModSystem:
         
         return False
     
-    async def process_message(self, message: discord.Message):
-        """Traite un message avec tous les filtres"""
+    async def process_message(self, message: discord.Message, ctx: MessageContext = None) -> bool:
+        """Traite un message avec tous les filtres ; True si une sanction a été appliquée"""
         if message.author.bot or not message.guild:
-            return
+            return False
         
         config = self.get_server_config(message.guild.id)
-        if not config["enabled"]:
-            return
-        
-        if await self.is_exempt(message):
-            return
+        exempt = config["enabled"] and await self.is_exempt(message)
+        if ctx is not None:
+            ctx.state["automod_config"] = config
+            ctx.state["automod_exempt"] = exempt
+        if not config["enabled"] or exempt:
+            return False
         
-        # Appliquer tous les filtres
-        await self.check_spam(message)
-        await self.check_word_filter(message)
-        await self.check_caps_filter(message)
-        await self.check_mention_spam(message)
-        await self.check_link_filter(message)
+        # Appliquer les filtres, arrêt au premier déclenché (message déjà traité)
+        for check in (self.check_spam, self.check_word_filter, self.check_caps_filter,
+                      self.check_mention_spam, self.check_link_filter):
+            if await check(message):
+                return True
+        return False
 
 # Commandes slash pour l'automod
 automod_group = app_commands.Group(name="automod", description="🛡️ Configuration du système d'auto-modération")
@@ -884,10 +915,13 @@ async def automod_status(interaction: discord.Interaction):
     # Statistiques
     guild_warnings = automod.user_warnings.get(str(interaction.guild.id), {})
     total_warnings = sum(guild_warnings.values())
+    spam_memory = automod.spam_detector.memory_stats()
     
     embed.add_field(
         name="📊 Statistiques",
-        value=f"**Avertissements:** {total_warnings}\n**Utilisateurs suivis:** {len(guild_warnings)}",
+        value=f"**Avertissements:** {total_warnings}\n**Utilisateurs suivis:** {len(guild_warnings)}\n"
+              f"**Historique anti-spam:** {spam_memory['tracked_users']} utilisateurs, "
+              f"{spam_memory['bytes'] / 1024:.1f} Ko",
         inline=True
     )
     
@@ -1346,26 +1380,26 @@ async def test_filter(interaction: discord.Interaction, text: str):
         (1, "level_1_words", "😠 Grossièretés légères")
     ]
     
+    found = automod.get_word_matcher(interaction.guild.id).first_by_level(content)
+    
     for level_num, words_key, level_name in levels:
-        words_list = config["word_filter"].get(words_key, [])
-        for word in words_list:
-            if word.lower() in content:
-                action = config["word_filter"].get(f"level_{level_num}_action", "warn")
-                duration = config["word_filter"].get(f"level_{level_num}_duration", 0)
-                
-                if duration > 0:
-                    if duration >= 3600:
-                        duration_str = f"{duration//3600}h{(duration%3600)//60:02d}min"
-                    elif duration >= 60:
-                        duration_str = f"{duration//60}min{duration%60:02d}s"
-                    else:
-                        duration_str = f"{duration}s"
-                    sanction_str = f"{action} ({duration_str})"
+        word = found.get(level_num)
+        if word:
+            action = config["word_filter"].get(f"level_{level_num}_action", "warn")
+            duration = config["word_filter"].get(f"level_{level_num}_duration", 0)
+            
+            if duration > 0:
+                if duration >= 3600:
+                    duration_str = f"{duration//3600}h{(duration%3600)//60:02d}min"
+                elif duration >= 60:
+                    duration_str = f"{duration//60}min{duration%60:02d}s"
                 else:
-                    sanction_str = action
-                
-                detected_words.append(f"{level_name}: `{word}` → {sanction_str}")
-                break  # Une seule détection par niveau pour éviter le spam
+                    duration_str = f"{duration}s"
+                sanction_str = f"{action} ({duration_str})"
+            else:
+                sanction_str = action
+            
+            detected_words.append(f"{level_name}: `{word}` → {sanction_str}")
     
     if detected_words:
         embed = discord.Embed(
@@ -1403,11 +1437,16 @@ class AutoModCog(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
         self.automod = AutoModSystem(bot)
+        self.pipeline = get_message_pipeline(bot)
+        self.pipeline.register("automod", self.on_message_stage, priority=10)
+    
+    async def cog_unload(self):
+        self.pipeline.unregister("automod")
         
-    @commands.Cog.listener()
-    async def on_message(self, message):
-        """Traite tous les messages avec l'automod"""
-        await self.automod.process_message(message)
+    async def on_message_stage(self, ctx: MessageContext):
+        """Étape pipeline : automod en premier, un message sanctionné ne va pas plus loin"""
+        if await self.automod.process_message(ctx.message, ctx):
+            ctx.stop("automod")
     
     @commands.Cog.listener()
     async def on_member_join(self, member):
@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+⏱️ ARSENAL V4 - COOLDOWNS PARTAGÉS
+Un seul magasin pour tous les cooldowns (daily, work, crime, gain d'XP...)
+
+- clé entière unique par (scope, serveur, utilisateur) -> fin du cooldown en
+  secondes entières : pas de dict par commande, pas d'horodatage lu dans la
+  fiche de l'utilisateur ni en base à chaque message
+- try_acquire() vérifie et pose le cooldown en O(1) ; release() le rend si
+  l'action qu'il protégeait a échoué
+- roue temporelle hachée : chaque entrée est rangée dans la case de sa date de
+  fin ; les cases échues sont vidées au fil de l'eau (coût proportionnel au
+  temps écoulé, pas au nombre d'entrées), la mémoire reste bornée aux
+  cooldowns actifs
+- snapshot() écrit les cooldowns actifs dans un fichier binaire compact
+  (écriture atomique) ; load() les relit au démarrage. snapshot_async() ne
+  copie les entrées que sur la boucle asyncio, l'encodage et l'écriture
+  passent dans un thread
+"""
+
+import asyncio
+import json
+import os
+import struct
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+SNAPSHOT_MAGIC = b"ARSCD1"
+_RECORD = struct.Struct("<HQQq")  # scope, guild_id, user_id, fin du cooldown
+
+
+class CooldownStore:
+    """Cooldowns (scope, guild_id, user_id) avec expiration par roue temporelle"""
+
+    def __init__(self, slots: int = 4096, resolution: int = 1):
+        self.slots = slots
+        self.resolution = resolution  # Secondes couvertes par une case de la roue
+        self.scopes: Dict[str, int] = {}
+        self.scope_names: List[str] = []
+        self.expiry: Dict[int, int] = {}  # clé -> fin du cooldown (epoch, secondes)
+        self._wheel: List[Set[int]] = [set() for _ in range(slots)]
+        self._tick = int(time.time()) // resolution  # Dernière case traitée
+        self.dirty = False
+        self.stats = {"acquired": 0, "rejected": 0, "expired": 0, "released": 0}
+        self._write_lock = threading.Lock()  # Un seul snapshot écrit le fichier à la fois
+
+    # --- Clés ---
+
+    def _scope_id(self, scope: str) -> int:
+        scope_id = self.scopes.get(scope)
+        if scope_id is None:
+            scope_id = self.scopes[scope] = len(self.scope_names)
+            self.scope_names.append(scope)
+        return scope_id
+
+    def _key(self, scope: str, guild_id: int, user_id: int) -> int:
+        # Identifiants Discord sur 64 bits : une seule clé entière, pas de tuple
+        return (self._scope_id(scope) << 128) | (int(guild_id) << 64) | int(user_id)
+
+    @staticmethod
+    def _unpack(key: int) -> Tuple[int, int, int]:
+        return key >> 128, (key >> 64) & 0xFFFFFFFFFFFFFFFF, key & 0xFFFFFFFFFFFFFFFF
+
+    # --- Roue temporelle ---
+
+    def _slot(self, expires: int) -> Set[int]:
+        return self._wheel[(expires // self.resolution) % self.slots]
+
+    def _advance(self, now: int):
+        """Vider les cases échues depuis le dernier passage (au plus un tour de roue)"""
+        tick = now // self.resolution
+        if tick <= self._tick:
+            return
+        start = max(self._tick + 1, tick - self.slots + 1)
+        for current in range(start, tick + 1):
+            bucket = self._wheel[current % self.slots]
+            if not bucket:
+                continue
+            # Les entrées d'un tour suivant partagent la case : seules les échues sortent
+            expired = [key for key in bucket if self.expiry[key] <= now]
+            for key in expired:
+                bucket.discard(key)
+                del self.expiry[key]
+            self.stats["expired"] += len(expired)
+        self._tick = tick
+
+    def _set(self, key: int, expires: int):
+        previous = self.expiry.get(key)
+        if previous is not None:
+            self._slot(previous).discard(key)
+        self.expiry[key] = expires
+        self._slot(expires).add(key)
+        self.dirty = True
+
+    # --- Interface ---
+
+    def remaining(self, scope: str, guild_id: int, user_id: int, now: Optional[float] = None) -> int:
+        """Secondes restantes (0 si le cooldown est terminé ou absent)"""
+        now = int(now if now is not None else time.time())
+        self._advance(now)
+        expires = self.expiry.get(self._key(scope, guild_id, user_id))
+        return expires - now if expires is not None and expires > now else 0
+
+    def try_acquire(self, scope: str, guild_id: int, user_id: int, duration: int,
+                    now: Optional[float] = None) -> int:
+        """
+        Poser le cooldown s'il est libre
+
+        Retourne 0 si l'action est autorisée (cooldown posé pour `duration`
+        secondes), sinon le nombre de secondes restantes.
+        """
+        now = int(now if now is not None else time.time())
+        self._advance(now)
+        key = self._key(scope, guild_id, user_id)
+        expires = self.expiry.get(key)
+        if expires is not None and expires > now:
+            self.stats["rejected"] += 1
+            return expires - now
+        self._set(key, now + int(duration))
+        self.stats["acquired"] += 1
+        return 0
+
+    def release(self, scope: str, guild_id: int, user_id: int):
+        """
+        Annuler un try_acquire() réussi dont l'action a échoué
+
+        try_acquire() ne pose le cooldown que s'il était libre : le retirer
+        rétablit l'état d'avant l'appel.
+        """
+        self.clear(scope, guild_id, user_id)
+        self.stats["released"] += 1
+
+    def set(self, scope: str, guild_id: int, user_id: int, expires: float):
+        """Fixer la fin d'un cooldown (import d'anciens horodatages)"""
+        if int(expires) > int(time.time()):
+            self._set(self._key(scope, guild_id, user_id), int(expires))
+
+    def clear(self, scope: str, guild_id: int, user_id: int):
+        key = self._key(scope, guild_id, user_id)
+        expires = self.expiry.pop(key, None)
+        if expires is not None:
+            self._slot(expires).discard(key)
+            self.dirty = True
+
+    def seed(self, entries: Iterable[Tuple[str, int, int, float]]):
+        """Importer des (scope, guild_id, user_id, fin) ; les cooldowns déjà échus sont ignorés"""
+        for scope, guild_id, user_id, expires in entries:
+            self.set(scope, guild_id, user_id, expires)
+
+    def __len__(self):
+        return len(self.expiry)
+
+    # --- Snapshot disque ---
+
+    def _capture(self) -> Tuple[bytes, List[Tuple[int, int]]]:
+        """Copie des cooldowns actifs à écrire (rapide : aucune I/O, aucun encodage)"""
+        self._advance(int(time.time()))
+        self.dirty = False  # Les modifications suivantes iront dans le prochain snapshot
+        return json.dumps(self.scope_names).encode("utf-8"), list(self.expiry.items())
+
+    def _write(self, path: str, header: bytes, entries: List[Tuple[int, int]]) -> int:
+        records = bytearray()
+        for key, expires in entries:
+            records += _RECORD.pack(*self._unpack(key), expires)
+
+        with self._write_lock:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            temp_path = f"{path}.tmp"
+            with open(temp_path, "wb") as f:
+                f.write(SNAPSHOT_MAGIC + struct.pack("<I", len(header)) + header + records)
+            os.replace(temp_path, path)
+        return len(entries)
+
+    def snapshot(self, path: str) -> int:
+        """Écrire les cooldowns actifs (fichier temporaire puis remplacement atomique)"""
+        try:
+            return self._write(path, *self._capture())
+        except BaseException:
+            self.dirty = True
+            raise
+
+    async def snapshot_async(self, path: str) -> int:
+        """snapshot() sans bloquer la boucle asyncio : encodage et écriture dans un thread"""
+        header, entries = self._capture()
+        try:
+            return await asyncio.to_thread(self._write, path, header, entries)
+        except BaseException:
+            self.dirty = True
+            raise
+
+    def load(self, path: str) -> bool:
+        """Relire un snapshot ; False si le fichier est absent"""
+        if not os.path.exists(path):
+            return False
+        with open(path, "rb") as f:
+            data = f.read()
+        if not data.startswith(SNAPSHOT_MAGIC):
+            raise ValueError(f"Snapshot de cooldowns invalide: {path}")
+        offset = len(SNAPSHOT_MAGIC)
+        (header_size,) = struct.unpack_from("<I", data, offset)
+        offset += 4
+        names = json.loads(data[offset:offset + header_size].decode("utf-8"))
+        offset += header_size
+        for name in names:
+            self._scope_id(name)
+        for scope_id, guild_id, user_id, expires in _RECORD.iter_unpack(data[offset:]):
+            self.set(names[scope_id], guild_id, user_id, expires)
+        self.dirty = False
+        return True
+
+    def get_stats(self) -> dict:
+        return {**self.stats, "active": len(self.expiry), "scopes": list(self.scope_names)}
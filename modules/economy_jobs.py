@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+🗓️ ARSENAL V4 - TÂCHES PLANIFIÉES DE L'ÉCONOMIE
+Traitements appliqués à tous les utilisateurs en une seule passe
+
+- BankInterestJob  : intérêts quotidiens sur le solde bancaire
+                     (int(bank * bank_interest_rate), comme l'aperçu de /economy bank)
+- ExpireBoostsJob  : retrait des active_boosts expirés
+- ExpireItemsJob   : retrait des objets d'inventaire dont "expires" est dépassé
+
+Chaque job décrit sa transformation deux fois :
+- apply(data, dry_run) en Python (backend JSON, cache du backend SQLite)
+- preview_sql / update_sql : une requête ensembliste exécutée par
+  SQLiteEconomyStorage.run_job dans une seule transaction
+
+Le mode dry_run ne modifie rien et retourne l'impact (utilisateurs touchés,
+montant ou nombre d'éléments retirés). EconomyJobScheduler mémorise la
+dernière exécution de chaque job dans les métadonnées du stockage, écrites
+dans la même transaction que le job : un arrêt brutal ne peut pas faire payer
+les intérêts deux fois.
+"""
+
+import time
+from typing import Dict, List, Optional, Tuple
+
+from core.logger import log
+
+# Intervalle par défaut entre deux exécutions (secondes), surchargeable par "batch_jobs" dans la config
+DEFAULT_JOB_INTERVALS = {
+    "bank_interest": 86400,
+    "expire_boosts": 3600,
+    "expire_items": 3600,
+}
+
+
+class EconomyJob:
+    """Traitement par lot sur les données de tous les utilisateurs"""
+
+    name = ""
+    affects_rankings = False  # Colonnes de classement modifiées : index reconstruit après le job
+
+    def apply(self, data: dict, dry_run: bool = False) -> int:
+        """Appliquer le job à un utilisateur ; retourne l'impact (0 : données inchangées)"""
+        raise NotImplementedError
+
+    def preview_sql(self) -> Tuple[str, tuple]:
+        """SELECT (utilisateurs touchés, impact total) sur economy_users"""
+        raise NotImplementedError
+
+    def update_sql(self) -> Tuple[str, tuple]:
+        """UPDATE ensembliste équivalent à apply() sur economy_users"""
+        raise NotImplementedError
+
+
+class BankInterestJob(EconomyJob):
+    name = "bank_interest"
+    affects_rankings = True
+
+    def __init__(self, rate: float):
+        self.rate = rate
+
+    def apply(self, data: dict, dry_run: bool = False) -> int:
+        interest = int(data.get("bank", 0) * self.rate)
+        if interest > 0 and not dry_run:
+            data["bank"] += interest
+            data["total_earned"] = data.get("total_earned", 0) + interest
+        return max(interest, 0)
+
+    def preview_sql(self) -> Tuple[str, tuple]:
+        return ("SELECT COUNT(*), COALESCE(SUM(CAST(bank * ? AS INTEGER)), 0) FROM economy_users "
+                "WHERE CAST(bank * ? AS INTEGER) > 0", (self.rate, self.rate))
+
+    def update_sql(self) -> Tuple[str, tuple]:
+        return ("""
+            UPDATE economy_users SET
+                bank = bank + CAST(bank * :rate AS INTEGER),
+                total_earned = total_earned + CAST(bank * :rate AS INTEGER)
+            WHERE CAST(bank * :rate AS INTEGER) > 0
+        """, {"rate": self.rate})
+
+
+class ExpireBoostsJob(EconomyJob):
+    name = "expire_boosts"
+
+    def __init__(self, now: float):
+        self.now = now
+
+    def apply(self, data: dict, dry_run: bool = False) -> int:
+        boosts = data.get("active_boosts") or {}
+        expired = [boost_id for boost_id, boost in boosts.items() if boost.get("expires", 0) <= self.now]
+        if not dry_run:
+            for boost_id in expired:
+                del boosts[boost_id]
+        return len(expired)
+
+    def preview_sql(self) -> Tuple[str, tuple]:
+        return ("""
+            SELECT COUNT(DISTINCT guild_id || '_' || user_id), COUNT(*)
+            FROM economy_users, json_each(economy_users.data, '$.active_boosts') AS boost
+            WHERE COALESCE(json_extract(boost.value, '$.expires'), 0) <= ?
+        """, (self.now,))
+
+    def update_sql(self) -> Tuple[str, tuple]:
+        return ("""
+            UPDATE economy_users SET data = json_set(data, '$.active_boosts', (
+                SELECT json_group_object(boost.key, json(boost.value))
+                FROM json_each(data, '$.active_boosts') AS boost
+                WHERE COALESCE(json_extract(boost.value, '$.expires'), 0) > :now
+            ))
+            WHERE EXISTS (
+                SELECT 1 FROM json_each(data, '$.active_boosts') AS boost
+                WHERE COALESCE(json_extract(boost.value, '$.expires'), 0) <= :now
+            )
+        """, {"now": self.now})
+
+
+class ExpireItemsJob(EconomyJob):
+    name = "expire_items"
+    # "expires" absent, null ou 0 : objet permanent (IFNULL évite un NOT(NULL) qui retirerait l'objet)
+    EXPIRED_SQL = ("IFNULL(json_extract(item.value, '$.expires'), 0) != 0 "
+                   "AND json_extract(item.value, '$.expires') <= ?")
+
+    def __init__(self, now: float):
+        self.now = now
+
+    def _expired(self, item: dict) -> bool:
+        return bool(item.get("expires")) and item["expires"] <= self.now
+
+    def apply(self, data: dict, dry_run: bool = False) -> int:
+        inventory = data.get("inventory") or []
+        kept = [item for item in inventory if not self._expired(item)]
+        if not dry_run and len(kept) != len(inventory):
+            data["inventory"] = kept
+        return len(inventory) - len(kept)
+
+    def preview_sql(self) -> Tuple[str, tuple]:
+        return (f"""
+            SELECT COUNT(DISTINCT guild_id || '_' || user_id), COUNT(*)
+            FROM economy_users, json_each(economy_users.data, '$.inventory') AS item
+            WHERE {self.EXPIRED_SQL}
+        """, (self.now,))
+
+    def update_sql(self) -> Tuple[str, tuple]:
+        # Sous-requête ordonnée : l'inventaire garde l'ordre d'acquisition
+        expired = self.EXPIRED_SQL.replace("?", ":now")
+        return (f"""
+            UPDATE economy_users SET data = json_set(data, '$.inventory', (
+                SELECT json_group_array(json(value)) FROM (
+                    SELECT item.value AS value FROM json_each(data, '$.inventory') AS item
+                    WHERE NOT ({expired})
+                    ORDER BY item.key
+                )
+            ))
+            WHERE EXISTS (
+                SELECT 1 FROM json_each(data, '$.inventory') AS item WHERE {expired}
+            )
+        """, {"now": self.now})
+
+
+class EconomyJobScheduler:
+    """Exécute les jobs de l'économie à intervalle fixe et journalise leur durée"""
+
+    META_PREFIX = "job_last_run:"
+
+    def __init__(self, economy):
+        self.economy = economy
+
+    def build(self, name: str, now: float) -> EconomyJob:
+        if name == "bank_interest":
+            return BankInterestJob(self.economy.config.get("bank_interest_rate", 0))
+        if name == "expire_boosts":
+            return ExpireBoostsJob(now)
+        if name == "expire_items":
+            return ExpireItemsJob(now)
+        raise ValueError(f"Job économie inconnu: {name}")
+
+    def intervals(self) -> Dict[str, float]:
+        return {**DEFAULT_JOB_INTERVALS, **self.economy.config.get("batch_jobs", {})}
+
+    def last_run(self, name: str) -> Optional[float]:
+        value = self.economy.storage.get_meta(f"{self.META_PREFIX}{name}")
+        return float(value) if value is not None else None
+
+    def run(self, name: str, dry_run: bool = False, now: Optional[float] = None) -> dict:
+        """Exécuter un job maintenant ; en dry_run, seul l'impact est calculé"""
+        now = now if now is not None else time.time()
+        job = self.build(name, now)
+        start = time.perf_counter()
+        users, amount = self.economy.storage.run_job(
+            job, dry_run=dry_run, meta={f"{self.META_PREFIX}{name}": repr(now)}
+        )
+        elapsed = time.perf_counter() - start
+
+        result = {"job": name, "dry_run": dry_run, "users": users, "amount": amount, "elapsed": elapsed}
+        prefix = "🔎 [dry-run] " if dry_run else "🗓️ "
+        log.info(f"{prefix}Job économie {name}: {users} utilisateurs, impact {amount} ({elapsed * 1000:.1f} ms)")
+        return result
+
+    def run_due(self, now: Optional[float] = None) -> List[dict]:
+        """
+        Exécuter les jobs dont l'intervalle est écoulé (un intervalle <= 0 désactive le job)
+
+        Un job jamais exécuté attend un intervalle complet : le premier
+        passage ne fait que poser sa date de référence.
+        """
+        now = now if now is not None else time.time()
+        results = []
+        for name, interval in self.intervals().items():
+            if interval <= 0:
+                continue
+            try:
+                last_run = self.last_run(name)
+                if last_run is None:
+                    self.economy.storage.set_meta(f"{self.META_PREFIX}{name}", repr(now))
+                    log.info(f"🗓️ Job économie {name}: première exécution dans {interval:.0f}s")
+                    continue
+                if now - last_run >= interval:
+                    results.append(self.run(name, now=now))
+            except Exception as e:
+                log.error(f"❌ Erreur job économie {name}: {e}")
+        return results
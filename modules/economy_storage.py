@@ -0,0 +1,584 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+💾 ARSENAL V4 - STOCKAGE DU SYSTÈME D'ÉCONOMIE
+Backends interchangeables pour les données utilisateurs de EconomySystem
+
+- JSONEconomyStorage   : ancien format data/users_economy.json (un seul gros fichier)
+- SQLiteEconomyStorage : une ligne par (guild_id, user_id), lignes modifiées suivies
+                         et écrites par lots dans une seule transaction
+
+Les deux backends appliquent la même politique d'écriture : les lignes modifiées
+sont marquées "sales" puis écrites quand `flush_threshold` lignes attendent ou
+que `flush_interval` secondes se sont écoulées depuis le dernier flush.
+
+run_job() applique les traitements par lot de modules.economy_jobs (intérêts,
+expirations) : une requête ensembliste en SQLite, une passe en mémoire en JSON.
+
+Avec enable_rankings(), chaque put() met aussi à jour un index de classement
+en mémoire (modules.rank_index) : top() et rank() ne parcourent plus la guilde.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from core.logger import log
+from modules.rank_index import GuildRankings
+
+# Champs stockés dans des colonnes dédiées (tri, classement, jobs SQL)
+USER_COLUMNS = ("balance", "bank", "xp", "level", "total_earned", "total_spent")
+
+# Expression SQL de chaque catégorie de classement
+LEADERBOARD_EXPRESSIONS = {
+    "level": "level",
+    "xp": "xp",
+    "money": "balance + bank",
+    "total_earned": "total_earned",
+}
+
+UserKey = Tuple[int, int]
+
+
+def leaderboard_value(data: dict, category: str) -> Optional[int]:
+    """Valeur d'un utilisateur pour une catégorie de classement"""
+    if category == "level":
+        return data["level"]
+    if category == "xp":
+        return data["xp"]
+    if category == "money":
+        return data["balance"] + data["bank"]
+    if category == "total_earned":
+        return data["total_earned"]
+    return None
+
+
+class EconomyStorage:
+    """Interface commune des backends de stockage économie"""
+
+    def __init__(self, flush_interval: float = 5.0, flush_threshold: int = 200):
+        self.flush_interval = flush_interval
+        self.flush_threshold = flush_threshold
+        self.lock = threading.RLock()
+        self._dirty = set()
+        self._last_flush = time.monotonic()
+        self.rankings: Optional[GuildRankings] = None
+
+    # --- À implémenter par les backends ---
+
+    def get(self, guild_id: int, user_id: int) -> Optional[dict]:
+        raise NotImplementedError
+
+    def _store(self, guild_id: int, user_id: int, data: dict):
+        """Garder la version courante en mémoire (sans écrire sur disque)"""
+        raise NotImplementedError
+
+    def _write_dirty(self, keys: List[UserKey]):
+        raise NotImplementedError
+
+    def iter_guild(self, guild_id: int) -> Iterator[Tuple[int, dict]]:
+        raise NotImplementedError
+
+    def iter_all(self, columns_only: bool = False) -> Iterator[Tuple[int, int, dict]]:
+        """(guild_id, user_id, données) ; columns_only : seuls les champs de USER_COLUMNS sont requis"""
+        raise NotImplementedError
+
+    def count(self) -> int:
+        raise NotImplementedError
+
+    def get_meta(self, key: str) -> Optional[str]:
+        raise NotImplementedError
+
+    def set_meta(self, key: str, value: str):
+        raise NotImplementedError
+
+    def _store_meta(self, values: Dict[str, str]):
+        """Enregistrer des métadonnées, au plus tard avec le prochain flush()"""
+        raise NotImplementedError
+
+    # --- Politique d'écriture commune ---
+
+    def put(self, guild_id: int, user_id: int, data: dict):
+        """Enregistrer les données d'un utilisateur (écriture différée)"""
+        with self.lock:
+            self._store(int(guild_id), int(user_id), data)
+            self._dirty.add((int(guild_id), int(user_id)))
+            if self.rankings is not None:
+                self.rankings.update(int(guild_id), int(user_id), data)
+            if (len(self._dirty) >= self.flush_threshold
+                    or time.monotonic() - self._last_flush >= self.flush_interval):
+                self.flush()
+
+    def flush(self) -> int:
+        """Écrire toutes les lignes modifiées ; retourne le nombre de lignes écrites"""
+        with self.lock:
+            self._last_flush = time.monotonic()
+            if not self._dirty:
+                return 0
+            keys = list(self._dirty)
+            self._write_dirty(keys)
+            self._dirty.clear()
+            return len(keys)
+
+    def enable_rankings(self) -> GuildRankings:
+        """Construire l'index de classement depuis le stockage puis le tenir à jour à chaque put()"""
+        with self.lock:
+            rankings = GuildRankings(LEADERBOARD_EXPRESSIONS, leaderboard_value)
+            rankings.rebuild(self.iter_all(columns_only=True))
+            self.rankings = rankings
+        return rankings
+
+    def top(self, guild_id: int, category: str, limit: int) -> List[Tuple[int, int, dict]]:
+        """Classement (user_id, valeur, données) par valeur décroissante"""
+        with self.lock:
+            if self.rankings is None:
+                return self._top_scan(guild_id, category, limit)
+            return [(user_id, value, self.get(guild_id, user_id))
+                    for user_id, value in self.rankings.top(int(guild_id), category, limit)]
+
+    def rank(self, guild_id: int, user_id: int, category: str) -> Tuple[Optional[int], int]:
+        """(rang, nombre de membres classés) ; rang None si le membre n'a pas de données"""
+        with self.lock:
+            if self.rankings is not None:
+                return self.rankings.rank(int(guild_id), int(user_id), category)
+            values = [leaderboard_value(data, category) for _, data in self.iter_guild(guild_id)]
+            values = [value for value in values if value is not None]
+            data = self.get(guild_id, user_id)
+            value = leaderboard_value(data, category) if data is not None else None
+            if value is None:
+                return None, len(values)
+            return sum(1 for other in values if other > value) + 1, len(values)
+
+    def relevel(self, level_for_xp: Callable[[int], int]) -> int:
+        """
+        Recalculer le niveau de tous les utilisateurs après un changement de courbe
+
+        Une évaluation O(1) de la courbe par utilisateur, sans rejouer les gains
+        d'XP ni distribuer de récompenses. Retourne le nombre de niveaux modifiés.
+        """
+        with self.lock:
+            changed = 0
+            for guild_id, user_id, data in list(self.iter_all()):
+                level = level_for_xp(data.get("xp", 0))
+                if data.get("level") != level:
+                    data["level"] = level
+                    self._store(guild_id, user_id, data)
+                    self._dirty.add((guild_id, user_id))
+                    changed += 1
+            self.flush()
+            if self.rankings is not None:
+                self.enable_rankings()
+            return changed
+
+    def run_job(self, job, dry_run: bool = False, meta: Optional[Dict[str, str]] = None) -> Tuple[int, int]:
+        """
+        Appliquer un job économie (modules.economy_jobs) à tous les utilisateurs
+
+        Une passe sur les données puis une seule écriture, qui contient aussi
+        les métadonnées `meta` (date de dernière exécution du job). Retourne
+        (utilisateurs touchés, impact total) ; rien n'est modifié en dry_run.
+        """
+        with self.lock:
+            users = amount = 0
+            for guild_id, user_id, data in list(self.iter_all()):
+                impact = job.apply(data, dry_run=dry_run)
+                if not impact:
+                    continue
+                users += 1
+                amount += impact
+                if not dry_run:
+                    self._store(guild_id, user_id, data)
+                    self._dirty.add((guild_id, user_id))
+            if not dry_run:
+                if meta:
+                    self._store_meta(meta)
+                self.flush()
+                if job.affects_rankings and self.rankings is not None:
+                    self.enable_rankings()
+            return users, amount
+
+    def _top_scan(self, guild_id: int, category: str, limit: int) -> List[Tuple[int, int, dict]]:
+        users = []
+        for user_id, data in self.iter_guild(guild_id):
+            value = leaderboard_value(data, category)
+            if value is not None:
+                users.append((user_id, value, data))
+        users.sort(key=lambda entry: entry[1], reverse=True)
+        return users[:limit]
+
+    def close(self):
+        self.flush()
+
+
+class JSONEconomyStorage(EconomyStorage):
+    """Ancien backend : tout le dictionnaire réécrit dans un fichier JSON"""
+
+    # Métadonnées rangées dans le même fichier : écrites avec les données, jamais séparément
+    META_KEY = "_meta"
+
+    def __init__(self, path: str = "data/users_economy.json", **kwargs):
+        super().__init__(**kwargs)
+        self.path = path
+        self.users_data: Dict[str, dict] = {}
+        if os.path.exists(path):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    self.users_data = json.load(f)
+                log.info("👥 Données utilisateurs économie chargées")
+            except Exception as e:
+                log.error(f"❌ Erreur chargement données utilisateurs: {e}")
+
+    def get(self, guild_id: int, user_id: int) -> Optional[dict]:
+        return self.users_data.get(f"{guild_id}_{user_id}")
+
+    def _store(self, guild_id: int, user_id: int, data: dict):
+        self.users_data[f"{guild_id}_{user_id}"] = data
+
+    def _write_dirty(self, keys: List[UserKey]):
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            # Fichier temporaire puis remplacement : données et métadonnées changent ensemble
+            temp_path = f"{self.path}.tmp"
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(self.users_data, f, indent=4, ensure_ascii=False)
+            os.replace(temp_path, self.path)
+        except Exception as e:
+            log.error(f"❌ Erreur sauvegarde données utilisateurs: {e}")
+
+    def iter_guild(self, guild_id: int) -> Iterator[Tuple[int, dict]]:
+        prefix = f"{guild_id}_"
+        for user_key, data in self.users_data.items():
+            if user_key.startswith(prefix):
+                yield int(user_key.split("_")[1]), data
+
+    def iter_all(self, columns_only: bool = False) -> Iterator[Tuple[int, int, dict]]:
+        for user_key, data in self.users_data.items():
+            try:
+                guild_id, user_id = (int(part) for part in user_key.split("_", 1))
+            except ValueError:
+                continue
+            yield guild_id, user_id, data
+
+    def count(self) -> int:
+        return len(self.users_data) - (self.META_KEY in self.users_data)
+
+    def get_meta(self, key: str) -> Optional[str]:
+        return self.users_data.get(self.META_KEY, {}).get(key)
+
+    def set_meta(self, key: str, value: str):
+        with self.lock:
+            self._store_meta({key: value})
+            self.flush()
+
+    def _store_meta(self, values: Dict[str, str]):
+        self.users_data.setdefault(self.META_KEY, {}).update(values)
+        self._dirty.add((0, 0))  # _write_dirty réécrit tout le fichier : force l'écriture au prochain flush
+
+
+class SQLiteEconomyStorage(EconomyStorage):
+    """
+    Backend SQLite indexé par (guild_id, user_id)
+
+    Les lignes lues sont gardées dans un cache LRU borné ; seules les lignes
+    modifiées sont réécrites, par lots, avec un seul commit.
+    """
+
+    def __init__(self, db_path: str = "data/economy.db", max_cached: int = 50000, **kwargs):
+        super().__init__(**kwargs)
+        self.db_path = db_path
+        self.max_cached = max_cached
+        self._cache: "OrderedDict[UserKey, dict]" = OrderedDict()
+
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        self.conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self._init_database()
+
+    def _init_database(self):
+        with self.lock:
+            self.conn.executescript("""
+                CREATE TABLE IF NOT EXISTS economy_users (
+                    guild_id INTEGER NOT NULL,
+                    user_id INTEGER NOT NULL,
+                    balance INTEGER NOT NULL DEFAULT 0,
+                    bank INTEGER NOT NULL DEFAULT 0,
+                    xp INTEGER NOT NULL DEFAULT 0,
+                    level INTEGER NOT NULL DEFAULT 1,
+                    total_earned INTEGER NOT NULL DEFAULT 0,
+                    total_spent INTEGER NOT NULL DEFAULT 0,
+                    data TEXT NOT NULL DEFAULT '{}',
+                    PRIMARY KEY (guild_id, user_id)
+                ) WITHOUT ROWID;
+
+                CREATE INDEX IF NOT EXISTS idx_economy_level ON economy_users(guild_id, level);
+                CREATE INDEX IF NOT EXISTS idx_economy_xp ON economy_users(guild_id, xp);
+                CREATE INDEX IF NOT EXISTS idx_economy_money ON economy_users(guild_id, balance + bank);
+                CREATE INDEX IF NOT EXISTS idx_economy_earned ON economy_users(guild_id, total_earned);
+
+                CREATE TABLE IF NOT EXISTS economy_meta (
+                    key TEXT PRIMARY KEY,
+                    value TEXT
+                );
+            """)
+
+    # --- Conversion ligne <-> dict ---
+
+    @staticmethod
+    def _to_row(guild_id: int, user_id: int, data: dict) -> tuple:
+        extra = {key: value for key, value in data.items() if key not in USER_COLUMNS}
+        return (guild_id, user_id, *(int(data.get(column, 0)) for column in USER_COLUMNS),
+                json.dumps(extra, ensure_ascii=False))
+
+    @staticmethod
+    def _from_row(row: tuple) -> dict:
+        data = json.loads(row[-1])
+        data.update(zip(USER_COLUMNS, row[:-1]))
+        return data
+
+    _UPSERT = f"""
+        INSERT INTO economy_users (guild_id, user_id, {', '.join(USER_COLUMNS)}, data)
+        VALUES (?, ?, {', '.join('?' * len(USER_COLUMNS))}, ?)
+        ON CONFLICT(guild_id, user_id) DO UPDATE SET
+            {', '.join(f'{column} = excluded.{column}' for column in USER_COLUMNS)},
+            data = excluded.data
+    """
+
+    # --- Cache ---
+
+    def _remember(self, key: UserKey, data: dict):
+        self._cache[key] = data
+        self._cache.move_to_end(key)
+        if len(self._cache) > self.max_cached:
+            for cached_key in list(self._cache)[:-1]:
+                if len(self._cache) <= self.max_cached:
+                    break
+                if cached_key not in self._dirty:
+                    del self._cache[cached_key]
+
+    # --- Interface ---
+
+    def get(self, guild_id: int, user_id: int) -> Optional[dict]:
+        key = (int(guild_id), int(user_id))
+        with self.lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return self._cache[key]
+
+            row = self.conn.execute(
+                f"SELECT {', '.join(USER_COLUMNS)}, data FROM economy_users WHERE guild_id = ? AND user_id = ?",
+                key
+            ).fetchone()
+            if row is None:
+                return None
+            data = self._from_row(row)
+            self._remember(key, data)
+            return data
+
+    def _store(self, guild_id: int, user_id: int, data: dict):
+        self._remember((guild_id, user_id), data)
+
+    def _write_dirty(self, keys: List[UserKey]):
+        rows = [self._to_row(guild_id, user_id, self._cache[(guild_id, user_id)]) for guild_id, user_id in keys]
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            self.conn.executemany(self._UPSERT, rows)
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+        self.conn.execute("COMMIT")
+
+    def iter_guild(self, guild_id: int) -> Iterator[Tuple[int, dict]]:
+        self.flush()
+        cursor = self.conn.execute(
+            f"SELECT user_id, {', '.join(USER_COLUMNS)}, data FROM economy_users WHERE guild_id = ?",
+            (int(guild_id),)
+        )
+        for row in cursor:
+            yield row[0], self._from_row(row[1:])
+
+    def iter_all(self, columns_only: bool = False) -> Iterator[Tuple[int, int, dict]]:
+        self.flush()
+        if columns_only:
+            # Pas de décodage JSON de la colonne data : reconstruction de l'index au démarrage
+            cursor = self.conn.execute(f"SELECT guild_id, user_id, {', '.join(USER_COLUMNS)} FROM economy_users")
+            for row in cursor:
+                yield row[0], row[1], dict(zip(USER_COLUMNS, row[2:]))
+            return
+        cursor = self.conn.execute(f"SELECT guild_id, user_id, {', '.join(USER_COLUMNS)}, data FROM economy_users")
+        for row in cursor:
+            yield row[0], row[1], self._from_row(row[2:])
+
+    def relevel(self, level_for_xp: Callable[[int], int]) -> int:
+        """Une seule requête UPDATE, la courbe étant exposée à SQLite comme fonction SQL"""
+        with self.lock:
+            self.flush()
+            self.conn.create_function("arsenal_level_for_xp", 1, level_for_xp, deterministic=True)
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                changed = self.conn.execute("""
+                    UPDATE economy_users SET level = arsenal_level_for_xp(xp)
+                    WHERE level != arsenal_level_for_xp(xp)
+                """).rowcount
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                raise
+            self.conn.execute("COMMIT")
+            for data in self._cache.values():
+                data["level"] = level_for_xp(data.get("xp", 0))
+            if self.rankings is not None:
+                self.enable_rankings()
+            return changed
+
+    def run_job(self, job, dry_run: bool = False, meta: Optional[Dict[str, str]] = None) -> Tuple[int, int]:
+        """
+        Aperçu + UPDATE ensembliste du job dans une seule transaction, puis même traitement sur le cache
+
+        `meta` est écrit dans economy_meta dans la même transaction : un arrêt
+        brutal ne peut pas laisser un job appliqué sans sa date d'exécution.
+        """
+        with self.lock:
+            self.flush()
+            preview, preview_params = job.preview_sql()
+            if dry_run:
+                users, amount = self.conn.execute(preview, preview_params).fetchone()
+                return users, amount or 0
+            update, update_params = job.update_sql()
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                users, amount = self.conn.execute(preview, preview_params).fetchone()
+                self.conn.execute(update, update_params)
+                self._write_meta(meta or {})
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                raise
+            self.conn.execute("COMMIT")
+            for data in self._cache.values():
+                job.apply(data)
+            if job.affects_rankings and self.rankings is not None:
+                self.enable_rankings()
+            return users, amount or 0
+
+    def _top_scan(self, guild_id: int, category: str, limit: int) -> List[Tuple[int, int, dict]]:
+        expression = LEADERBOARD_EXPRESSIONS.get(category)
+        if expression is None:
+            return []
+        with self.lock:
+            self.flush()
+            rows = self.conn.execute(f"""
+                SELECT user_id, {expression}, {', '.join(USER_COLUMNS)}, data
+                FROM economy_users WHERE guild_id = ?
+                ORDER BY {expression} DESC LIMIT ?
+            """, (int(guild_id), limit)).fetchall()
+        return [(row[0], row[1], self._from_row(row[2:])) for row in rows]
+
+    def count(self) -> int:
+        with self.lock:
+            self.flush()
+            return self.conn.execute("SELECT COUNT(*) FROM economy_users").fetchone()[0]
+
+    def close(self):
+        with self.lock:
+            self.flush()
+            self.conn.close()
+
+    # --- Import de l'ancien format ---
+
+    def get_meta(self, key: str) -> Optional[str]:
+        row = self.conn.execute("SELECT value FROM economy_meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def set_meta(self, key: str, value: str):
+        with self.lock:
+            self._write_meta({key: value})
+
+    def _store_meta(self, values: Dict[str, str]):
+        self._write_meta(values)
+
+    def _write_meta(self, values: Dict[str, str]):
+        self.conn.executemany("INSERT OR REPLACE INTO economy_meta (key, value) VALUES (?, ?)", values.items())
+
+    def import_json(self, json_path: str, force: bool = False) -> int:
+        """
+        Importer un ancien data/users_economy.json (une seule fois)
+
+        Les clés "guild_user" sont éclatées en (guild_id, user_id) et toutes les
+        lignes sont insérées dans une seule transaction. L'import est mémorisé
+        dans economy_meta ; le fichier JSON n'est pas modifié.
+        """
+        meta_key = f"json_import:{os.path.abspath(json_path)}"
+        if not os.path.exists(json_path) or (self.get_meta(meta_key) and not force):
+            return 0
+
+        with open(json_path, "r", encoding="utf-8") as f:
+            users_data = json.load(f)
+
+        rows = []
+        for user_key, data in users_data.items():
+            if user_key == JSONEconomyStorage.META_KEY:
+                continue
+            try:
+                guild_id, user_id = (int(part) for part in user_key.split("_", 1))
+            except ValueError:
+                log.warning(f"⚠️ Clé économie ignorée à l'import: {user_key}")
+                continue
+            rows.append(self._to_row(guild_id, user_id, data))
+
+        with self.lock:
+            self.flush()
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                self.conn.executemany(self._UPSERT, rows)
+                self.conn.execute("INSERT OR REPLACE INTO economy_meta (key, value) VALUES (?, ?)",
+                                  (meta_key, str(time.time())))
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                raise
+            self.conn.execute("COMMIT")
+            self._cache.clear()
+            if self.rankings is not None:
+                self.enable_rankings()
+
+        log.info(f"📥 {len(rows)} utilisateurs économie importés depuis {json_path}")
+        return len(rows)
+
+
+def create_economy_storage(config: Optional[dict] = None, legacy_json_path: str = "data/users_economy.json") -> EconomyStorage:
+    """
+    Créer le backend décrit par la section "storage" de la config économie
+
+    Avec le backend SQLite, l'ancien fichier JSON est importé automatiquement
+    au premier démarrage.
+    """
+    config = config or {}
+    backend = config.get("backend", "sqlite")
+    policy = {
+        "flush_interval": config.get("flush_interval", 5.0),
+        "flush_threshold": config.get("flush_threshold", 200),
+    }
+
+    if backend == "json":
+        return JSONEconomyStorage(config.get("json_path", legacy_json_path), **policy)
+
+    storage = SQLiteEconomyStorage(config.get("db_path", "data/economy.db"),
+                                   max_cached=config.get("max_cached", 50000), **policy)
+    storage.import_json(legacy_json_path)
+    return storage
+
+
+if __name__ == "__main__":
+    # Import manuel : python -m modules.economy_storage data/users_economy.json [data/economy.db]
+    import sys
+
+    if len(sys.argv) < 2:
+        print("Usage: python -m modules.economy_storage <users_economy.json> [economy.db]")
+        sys.exit(1)
+
+    target = SQLiteEconomyStorage(sys.argv[2] if len(sys.argv) > 2 else "data/economy.db")
+    imported = target.import_json(sys.argv[1], force=True)
+    print(f"✅ {imported} utilisateurs importés ({target.count()} au total)")
+    target.close()
@@ -6,27 +6,39 @@ Argent, expérience, niveaux, boutique, banque, récompenses
 """
 
 import discord
-from discord.ext import commands
+from discord.ext import commands, tasks
 from discord import app_commands
 import json
 import asyncio
 import random
 import time
 import os
+from contextlib import contextmanager
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Tuple
 from core.logger import log
+from core.message_pipeline import MessageContext, get_message_pipeline
+from modules.economy_storage import EconomyStorage, create_economy_storage
+from modules.level_curves import LevelCurve, create_level_curve
+from modules.cooldown_store import CooldownStore
+from modules.economy_jobs import DEFAULT_JOB_INTERVALS, EconomyJobScheduler
 
 class EconomySystem:
-    def __init__(self, bot):
+    # Durée des cooldowns de commande (secondes), champ "last_*" correspondant
+    COMMAND_COOLDOWNS = {"daily": 86400, "work": 3600, "crime": 7200}
+
+    def __init__(self, bot, storage: Optional[EconomyStorage] = None):
         self.bot = bot
         self.config_path = "data/economy_config.json"
         self.users_data_path = "data/users_economy.json"
-        self.daily_cooldowns = {}  # Cooldowns pour daily
-        self.work_cooldowns = {}   # Cooldowns pour work
-        self.crime_cooldowns = {}  # Cooldowns pour crime
+        self.cooldowns_path = "data/economy_cooldowns.bin"
         self.load_config()
+        self.level_curve: LevelCurve = create_level_curve(self.config.get("level_curve"), self.config["level_multiplier"])
+        self.storage = storage
         self.load_users_data()
+        self.cooldowns = CooldownStore()
+        self.load_cooldowns()
+        self.jobs = EconomyJobScheduler(self)
         
     def load_config(self):
         """Charge la configuration économie"""
@@ -53,27 +65,69 @@ class EconomySystem:
             log.error(f"❌ Erreur sauvegarde économie: {e}")
     
     def load_users_data(self):
-        """Charge les données utilisateurs"""
-        if os.path.exists(self.users_data_path):
+        """Ouvre le backend de stockage des données utilisateurs"""
+        if self.storage is None:
             try:
-                with open(self.users_data_path, "r", encoding="utf-8") as f:
-                    self.users_data = json.load(f)
-                log.info("👥 Données utilisateurs économie chargées")
+                self.storage = create_economy_storage(self.config.get("storage"), self.users_data_path)
             except Exception as e:
-                log.error(f"❌ Erreur chargement données utilisateurs: {e}")
-                self.users_data = {}
-        else:
-            self.users_data = {}
-            self.save_users_data()
+                log.error(f"❌ Erreur ouverture stockage économie, retour au JSON: {e}")
+                self.storage = create_economy_storage({"backend": "json"}, self.users_data_path)
+        log.info(f"👥 Stockage économie: {type(self.storage).__name__}")
+        try:
+            # Classements en mémoire reconstruits depuis le stockage, puis tenus à jour à chaque écriture
+            self.storage.enable_rankings()
+        except Exception as e:
+            log.error(f"❌ Erreur construction index de classement, tri à la demande: {e}")
     
     def save_users_data(self):
-        """Sauvegarde les données utilisateurs"""
+        """Écrit immédiatement les données utilisateurs modifiées"""
         try:
-            os.makedirs("data", exist_ok=True)
-            with open(self.users_data_path, "w", encoding="utf-8") as f:
-                json.dump(self.users_data, f, indent=4, ensure_ascii=False)
+            self.storage.flush()
         except Exception as e:
             log.error(f"❌ Erreur sauvegarde données utilisateurs: {e}")
+
+    def load_cooldowns(self):
+        """Recharge le snapshot des cooldowns ; au premier lancement, import des champs last_*"""
+        try:
+            if self.cooldowns.load(self.cooldowns_path):
+                log.info(f"⏱️ {len(self.cooldowns)} cooldowns actifs rechargés")
+                return
+        except Exception as e:
+            log.error(f"❌ Erreur lecture snapshot cooldowns, import depuis le stockage: {e}")
+        fields = {"xp": ("last_xp_gain", self.config["xp_cooldown"])}
+        fields.update({scope: (f"last_{scope}", duration) for scope, duration in self.COMMAND_COOLDOWNS.items()})
+        try:
+            self.cooldowns.seed(
+                (scope, guild_id, user_id, data[field] + duration)
+                for guild_id, user_id, data in self.storage.iter_all()
+                for scope, (field, duration) in fields.items()
+                if data.get(field)
+            )
+            self.cooldowns.snapshot(self.cooldowns_path)
+        except Exception as e:
+            log.error(f"❌ Erreur import des cooldowns: {e}")
+
+    async def save_cooldowns(self, force: bool = False):
+        """Snapshot disque des cooldowns actifs (seulement s'ils ont changé), écrit hors de la boucle"""
+        if not (force or self.cooldowns.dirty):
+            return
+        try:
+            await self.cooldowns.snapshot_async(self.cooldowns_path)
+        except Exception as e:
+            log.error(f"❌ Erreur sauvegarde cooldowns: {e}")
+
+    def check_cooldown(self, scope: str, user_id: int, guild_id: int) -> int:
+        """Pose le cooldown d'une commande ; 0 si autorisée, sinon secondes restantes"""
+        return self.cooldowns.try_acquire(scope, guild_id, user_id, self.COMMAND_COOLDOWNS[scope])
+
+    @contextmanager
+    def cooldown_rollback(self, scope: str, user_id: int, guild_id: int):
+        """Rend le cooldown posé par check_cooldown si l'action lève une exception avant son écriture"""
+        try:
+            yield
+        except Exception:
+            self.cooldowns.release(scope, guild_id, user_id)
+            raise
     
     def get_default_config(self):
         """Configuration par défaut"""
@@ -91,6 +145,13 @@ class EconomySystem:
             "crime_fail_penalty": {"min": 50, "max": 500},
             "crime_success_rate": 0.6,  # 60% de réussite
             "bank_interest_rate": 0.02,  # 2% par jour
+            "batch_jobs": dict(DEFAULT_JOB_INTERVALS),  # Secondes entre deux exécutions (0 = désactivé)
+            "storage": {
+                "backend": "sqlite",  # "sqlite" ou "json" (ancien format)
+                "db_path": "data/economy.db",
+                "flush_interval": 5,  # Secondes max avant écriture des lignes modifiées
+                "flush_threshold": 200  # Nombre de lignes modifiées déclenchant une écriture
+            },
             "shop_items": {
                 "premium_role": {
                     "name": "🌟 Rôle Premium",
@@ -163,9 +224,9 @@ class EconomySystem:
     
     def get_user_data(self, user_id: int, guild_id: int) -> dict:
         """Récupère les données d'un utilisateur"""
-        user_key = f"{guild_id}_{user_id}"
-        if user_key not in self.users_data:
-            self.users_data[user_key] = {
+        user_data = self.storage.get(guild_id, user_id)
+        if user_data is None:
+            user_data = {
                 "balance": self.config["starting_balance"],
                 "bank": 0,
                 "xp": self.config["starting_xp"],
@@ -189,75 +250,78 @@ class EconomySystem:
                     "crime_fail": 0
                 }
             }
-            self.save_users_data()
-        return self.users_data[user_key]
+            self.storage.put(guild_id, user_id, user_data)
+        return user_data
     
     def update_user_data(self, user_id: int, guild_id: int, data: dict):
-        """Met à jour les données d'un utilisateur"""
-        user_key = f"{guild_id}_{user_id}"
-        self.users_data[user_key] = data
-        self.save_users_data()
+        """Met à jour les données d'un utilisateur (écriture groupée par le backend)"""
+        self.storage.put(guild_id, user_id, data)
     
     def calculate_level_xp(self, level: int) -> int:
         """Calcule l'XP nécessaire pour un niveau"""
-        return level * self.config["level_multiplier"]
+        return self.level_curve.level_cost(level)
     
     def get_level_from_xp(self, xp: int) -> int:
-        """Calcule le niveau à partir de l'XP"""
-        level = 1
-        while xp >= self.calculate_level_xp(level):
-            xp -= self.calculate_level_xp(level)
-            level += 1
-        return level
+        """Calcule le niveau à partir de l'XP (formule inversée, sans boucle)"""
+        return self.level_curve.level_for_xp(xp)
     
     def get_xp_for_next_level(self, current_xp: int, current_level: int) -> Tuple[int, int]:
         """Retourne (XP actuel dans le niveau, XP nécessaire pour le niveau suivant)"""
-        total_xp_for_level = 0
-        for i in range(1, current_level):
-            total_xp_for_level += self.calculate_level_xp(i)
-        
-        xp_in_current_level = current_xp - total_xp_for_level
-        xp_needed_for_next = self.calculate_level_xp(current_level)
-        
-        return xp_in_current_level, xp_needed_for_next
+        return self.level_curve.progress(current_xp, current_level)
+    
+    def set_level_curve(self, curve_config: dict) -> int:
+        """
+        Change la courbe de niveau et recalcule le niveau de tous les utilisateurs
+        Retourne le nombre d'utilisateurs dont le niveau a changé (aucune récompense distribuée)
+        """
+        curve = create_level_curve(curve_config, self.config["level_multiplier"])
+        self.config["level_curve"] = curve_config
+        if curve_config.get("type", "linear_sum") == "linear_sum":
+            self.config["level_multiplier"] = curve.multiplier
+        self.save_config()
+        self.level_curve = curve
+        changed = self.storage.relevel(curve.level_for_xp)
+        log.info(f"📈 Courbe de niveau changée ({curve_config}) : {changed} niveaux recalculés")
+        return changed
     
     async def add_xp(self, user_id: int, guild_id: int, amount: int = None) -> dict:
         """Ajoute de l'XP à un utilisateur"""
-        user_data = self.get_user_data(user_id, guild_id)
-        
-        # Vérifier le cooldown XP
+        # Vérifier le cooldown XP en mémoire, avant toute lecture du stockage
         current_time = time.time()
-        if current_time - user_data["last_xp_gain"] < self.config["xp_cooldown"]:
+        if self.cooldowns.try_acquire("xp", guild_id, user_id, self.config["xp_cooldown"], current_time):
             return {"leveled_up": False, "xp_gained": 0}
         
-        # Calculer l'XP à ajouter
-        if amount is None:
-            xp_config = self.config["xp_per_message"]
-            amount = random.randint(xp_config["min"], xp_config["max"])
+        with self.cooldown_rollback("xp", user_id, guild_id):
+            user_data = self.get_user_data(user_id, guild_id)
         
-        # Appliquer les boosts XP
-        if "boost_xp" in user_data["active_boosts"]:
-            boost_data = user_data["active_boosts"]["boost_xp"]
-            if current_time < boost_data["expires"]:
-                amount = int(amount * boost_data["multiplier"])
-            else:
-                del user_data["active_boosts"]["boost_xp"]
+            # Calculer l'XP à ajouter
+            if amount is None:
+                xp_config = self.config["xp_per_message"]
+                amount = random.randint(xp_config["min"], xp_config["max"])
         
-        old_level = user_data["level"]
-        user_data["xp"] += amount
-        user_data["last_xp_gain"] = current_time
-        user_data["stats"]["messages_sent"] += 1
+            # Appliquer les boosts XP
+            if "boost_xp" in user_data["active_boosts"]:
+                boost_data = user_data["active_boosts"]["boost_xp"]
+                if current_time < boost_data["expires"]:
+                    amount = int(amount * boost_data["multiplier"])
+                else:
+                    del user_data["active_boosts"]["boost_xp"]
         
-        # Calculer le nouveau niveau
-        new_level = self.get_level_from_xp(user_data["xp"])
-        leveled_up = new_level > old_level
+            old_level = user_data["level"]
+            user_data["xp"] += amount
+            user_data["last_xp_gain"] = current_time
+            user_data["stats"]["messages_sent"] += 1
         
-        if leveled_up:
-            user_data["level"] = new_level
-            # Donner les récompenses de niveau
-            await self.give_level_rewards(user_id, guild_id, new_level)
+            # Calculer le nouveau niveau
+            new_level = self.get_level_from_xp(user_data["xp"])
+            leveled_up = new_level > old_level
         
-        self.update_user_data(user_id, guild_id, user_data)
+            if leveled_up:
+                user_data["level"] = new_level
+                # Donner les récompenses de niveau
+                await self.give_level_rewards(user_id, guild_id, new_level)
+        
+            self.update_user_data(user_id, guild_id, user_data)
         
         return {
             "leveled_up": leveled_up,
@@ -316,36 +380,23 @@ class EconomySystem:
     
     def get_leaderboard(self, guild_id: int, category: str = "level", limit: int = 10) -> List[dict]:
         """Récupère le classement"""
-        guild_users = []
-        
-        for user_key, data in self.users_data.items():
-            if user_key.startswith(f"{guild_id}_"):
-                user_id = int(user_key.split("_")[1])
-                
-                if category == "level":
-                    value = data["level"]
-                elif category == "xp":
-                    value = data["xp"]
-                elif category == "money":
-                    value = data["balance"] + data["bank"]
-                elif category == "total_earned":
-                    value = data["total_earned"]
-                else:
-                    continue
-                
-                guild_users.append({
-                    "user_id": user_id,
-                    "value": value,
-                    "data": data
-                })
-        
-        # Trier par valeur décroissante
-        guild_users.sort(key=lambda x: x["value"], reverse=True)
-        return guild_users[:limit]
+        return [
+            {"user_id": user_id, "value": value, "data": data}
+            for user_id, value, data in self.storage.top(guild_id, category, limit)
+        ]
+    
+    def get_user_rank(self, user_id: int, guild_id: int, category: str = "level") -> Tuple[Optional[int], int]:
+        """Retourne (rang, nombre de membres classés) ; rang None si l'utilisateur n'a pas de données"""
+        return self.storage.rank(guild_id, user_id, category)
 
 # Commandes slash pour l'économie
 economy_group = app_commands.Group(name="economy", description="💰 Système d'économie et de nivellement Arsenal")
 
+def get_economy(client) -> Optional[EconomySystem]:
+    """EconomySystem porté par le cog EconomyCog (None si le cog n'est pas chargé)"""
+    cog = client.get_cog('EconomyCog')
+    return cog.economy if cog else None
+
 @economy_group.command(name="balance", description="💰 Voir votre argent et niveau")
 @app_commands.describe(user="Utilisateur à vérifier (optionnel)")
 async def balance(interaction: discord.Interaction, user: discord.Member = None):
@@ -412,50 +463,51 @@ async def balance(interaction: discord.Interaction, user: discord.Member = None)
 
 @economy_group.command(name="daily", description="🗓️ Récupérer votre récompense quotidienne")
 async def daily_reward(interaction: discord.Interaction):
-    economy = interaction.client.get_cog('EconomySystem')
+    economy = get_economy(interaction.client)
     if not economy:
         await interaction.response.send_message("❌ Système économie non chargé", ephemeral=True)
         return
     
-    user_data = economy.get_user_data(interaction.user.id, interaction.guild.id)
-    current_time = time.time()
-    
     # Vérifier le cooldown (24h)
-    if current_time - user_data["last_daily"] < 86400:
-        remaining = 86400 - (current_time - user_data["last_daily"])
+    remaining = economy.check_cooldown("daily", interaction.user.id, interaction.guild.id)
+    if remaining:
         hours = int(remaining // 3600)
         minutes = int((remaining % 3600) // 60)
         await interaction.response.send_message(f"⏰ Daily déjà récupéré ! Revenez dans {hours}h {minutes}m", ephemeral=True)
         return
     
-    # Calculer la récompense
-    daily_config = economy.config["daily_reward"]
-    base_reward = random.randint(daily_config["min"], daily_config["max"])
-    
-    # Bonus de streak
-    if current_time - user_data["last_daily"] < 172800:  # Moins de 48h
-        user_data["daily_streak"] += 1
-    else:
-        user_data["daily_streak"] = 1
+    with economy.cooldown_rollback("daily", interaction.user.id, interaction.guild.id):
+        user_data = economy.get_user_data(interaction.user.id, interaction.guild.id)
+        current_time = time.time()
     
-    streak_bonus = min(user_data["daily_streak"] * 50, 500)  # Max 500 bonus
-    total_reward = base_reward + streak_bonus
+        # Calculer la récompense
+        daily_config = economy.config["daily_reward"]
+        base_reward = random.randint(daily_config["min"], daily_config["max"])
     
-    # Appliquer les boosts d'argent
-    if "boost_money" in user_data["active_boosts"]:
-        boost_data = user_data["active_boosts"]["boost_money"]
-        if current_time < boost_data["expires"]:
-            total_reward = int(total_reward * boost_data["multiplier"])
+        # Bonus de streak
+        if current_time - user_data["last_daily"] < 172800:  # Moins de 48h
+            user_data["daily_streak"] += 1
         else:
-            del user_data["active_boosts"]["boost_money"]
+            user_data["daily_streak"] = 1
     
-    # Mettre à jour les données
-    user_data["balance"] += total_reward
-    user_data["total_earned"] += total_reward
-    user_data["last_daily"] = current_time
-    user_data["stats"]["daily_claims"] += 1
+        streak_bonus = min(user_data["daily_streak"] * 50, 500)  # Max 500 bonus
+        total_reward = base_reward + streak_bonus
     
-    economy.update_user_data(interaction.user.id, interaction.guild.id, user_data)
+        # Appliquer les boosts d'argent
+        if "boost_money" in user_data["active_boosts"]:
+            boost_data = user_data["active_boosts"]["boost_money"]
+            if current_time < boost_data["expires"]:
+                total_reward = int(total_reward * boost_data["multiplier"])
+            else:
+                del user_data["active_boosts"]["boost_money"]
+    
+        # Mettre à jour les données
+        user_data["balance"] += total_reward
+        user_data["total_earned"] += total_reward
+        user_data["last_daily"] = current_time
+        user_data["stats"]["daily_claims"] += 1
+    
+        economy.update_user_data(interaction.user.id, interaction.guild.id, user_data)
     
     embed = discord.Embed(
         title="🗓️ Récompense Quotidienne",
@@ -480,41 +532,42 @@ async def daily_reward(interaction: discord.Interaction):
 
 @economy_group.command(name="work", description="💼 Travailler pour gagner de l'argent")
 async def work(interaction: discord.Interaction):
-    economy = interaction.client.get_cog('EconomySystem')
+    economy = get_economy(interaction.client)
     if not economy:
         await interaction.response.send_message("❌ Système économie non chargé", ephemeral=True)
         return
     
-    user_data = economy.get_user_data(interaction.user.id, interaction.guild.id)
-    current_time = time.time()
-    
     # Vérifier le cooldown (1h)
-    if current_time - user_data["last_work"] < 3600:
-        remaining = 3600 - (current_time - user_data["last_work"])
+    remaining = economy.check_cooldown("work", interaction.user.id, interaction.guild.id)
+    if remaining:
         minutes = int(remaining // 60)
         seconds = int(remaining % 60)
         await interaction.response.send_message(f"⏰ Vous êtes fatigué ! Reposez-vous encore {minutes}m {seconds}s", ephemeral=True)
         return
     
-    # Choisir un travail aléatoire
-    job = random.choice(economy.config["work_jobs"])
-    reward = random.randint(job["min"], job["max"])
+    with economy.cooldown_rollback("work", interaction.user.id, interaction.guild.id):
+        user_data = economy.get_user_data(interaction.user.id, interaction.guild.id)
+        current_time = time.time()
     
-    # Appliquer les boosts d'argent
-    if "boost_money" in user_data["active_boosts"]:
-        boost_data = user_data["active_boosts"]["boost_money"]
-        if current_time < boost_data["expires"]:
-            reward = int(reward * boost_data["multiplier"])
-        else:
-            del user_data["active_boosts"]["boost_money"]
+        # Choisir un travail aléatoire
+        job = random.choice(economy.config["work_jobs"])
+        reward = random.randint(job["min"], job["max"])
     
-    # Mettre à jour les données
-    user_data["balance"] += reward
-    user_data["total_earned"] += reward
-    user_data["last_work"] = current_time
-    user_data["stats"]["work_count"] += 1
+        # Appliquer les boosts d'argent
+        if "boost_money" in user_data["active_boosts"]:
+            boost_data = user_data["active_boosts"]["boost_money"]
+            if current_time < boost_data["expires"]:
+                reward = int(reward * boost_data["multiplier"])
+            else:
+                del user_data["active_boosts"]["boost_money"]
     
-    economy.update_user_data(interaction.user.id, interaction.guild.id, user_data)
+        # Mettre à jour les données
+        user_data["balance"] += reward
+        user_data["total_earned"] += reward
+        user_data["last_work"] = current_time
+        user_data["stats"]["work_count"] += 1
+    
+        economy.update_user_data(interaction.user.id, interaction.guild.id, user_data)
     
     embed = discord.Embed(
         title="💼 Travail Terminé",
@@ -532,62 +585,63 @@ async def work(interaction: discord.Interaction):
 
 @economy_group.command(name="crime", description="🔫 Commettre un crime (risqué mais lucratif)")
 async def crime(interaction: discord.Interaction):
-    economy = interaction.client.get_cog('EconomySystem')
+    economy = get_economy(interaction.client)
     if not economy:
         await interaction.response.send_message("❌ Système économie non chargé", ephemeral=True)
         return
     
-    user_data = economy.get_user_data(interaction.user.id, interaction.guild.id)
-    current_time = time.time()
-    
     # Vérifier le cooldown (2h)
-    if current_time - user_data["last_crime"] < 7200:
-        remaining = 7200 - (current_time - user_data["last_crime"])
+    remaining = economy.check_cooldown("crime", interaction.user.id, interaction.guild.id)
+    if remaining:
         hours = int(remaining // 3600)
         minutes = int((remaining % 3600) // 60)
         await interaction.response.send_message(f"🚔 Vous êtes surveillé ! Attendez {hours}h {minutes}m", ephemeral=True)
         return
     
-    # Choisir un crime aléatoire
-    crime_activity = random.choice(economy.config["crime_activities"])
-    success = random.random() < economy.config["crime_success_rate"]
+    with economy.cooldown_rollback("crime", interaction.user.id, interaction.guild.id):
+        user_data = economy.get_user_data(interaction.user.id, interaction.guild.id)
+        current_time = time.time()
+    
+        # Choisir un crime aléatoire
+        crime_activity = random.choice(economy.config["crime_activities"])
+        success = random.random() < economy.config["crime_success_rate"]
     
-    if success:
-        reward = random.randint(crime_activity["min"], crime_activity["max"])
+        if success:
+            reward = random.randint(crime_activity["min"], crime_activity["max"])
         
-        # Appliquer les boosts d'argent
-        if "boost_money" in user_data["active_boosts"]:
-            boost_data = user_data["active_boosts"]["boost_money"]
-            if current_time < boost_data["expires"]:
-                reward = int(reward * boost_data["multiplier"])
-            else:
-                del user_data["active_boosts"]["boost_money"]
+            # Appliquer les boosts d'argent
+            if "boost_money" in user_data["active_boosts"]:
+                boost_data = user_data["active_boosts"]["boost_money"]
+                if current_time < boost_data["expires"]:
+                    reward = int(reward * boost_data["multiplier"])
+                else:
+                    del user_data["active_boosts"]["boost_money"]
         
-        user_data["balance"] += reward
-        user_data["total_earned"] += reward
-        user_data["stats"]["crime_success"] += 1
+            user_data["balance"] += reward
+            user_data["total_earned"] += reward
+            user_data["stats"]["crime_success"] += 1
         
-        embed = discord.Embed(
-            title="🔫 Crime Réussi",
-            description=f"**Action:** {crime_activity['name']}\n**Gain:** {economy.format_money(reward)}",
-            color=discord.Color.dark_green()
-        )
+            embed = discord.Embed(
+                title="🔫 Crime Réussi",
+                description=f"**Action:** {crime_activity['name']}\n**Gain:** {economy.format_money(reward)}",
+                color=discord.Color.dark_green()
+            )
         
-    else:
-        penalty = random.randint(crime_activity["fail_min"], crime_activity["fail_max"])
-        penalty = min(penalty, user_data["balance"])  # Ne pas aller en négatif
+        else:
+            penalty = random.randint(crime_activity["fail_min"], crime_activity["fail_max"])
+            penalty = min(penalty, user_data["balance"])  # Ne pas aller en négatif
         
-        user_data["balance"] -= penalty
-        user_data["stats"]["crime_fail"] += 1
+            user_data["balance"] -= penalty
+            user_data["stats"]["crime_fail"] += 1
         
-        embed = discord.Embed(
-            title="🚔 Crime Échoué",
-            description=f"**Action:** {crime_activity['name']}\n**Perte:** {economy.format_money(penalty)}",
-            color=discord.Color.red()
-        )
+            embed = discord.Embed(
+                title="🚔 Crime Échoué",
+                description=f"**Action:** {crime_activity['name']}\n**Perte:** {economy.format_money(penalty)}",
+                color=discord.Color.red()
+            )
     
-    user_data["last_crime"] = current_time
-    economy.update_user_data(interaction.user.id, interaction.guild.id, user_data)
+        user_data["last_crime"] = current_time
+        economy.update_user_data(interaction.user.id, interaction.guild.id, user_data)
     
     embed.add_field(
         name="💰 Nouveau Solde",
@@ -913,10 +967,64 @@ async def leaderboard(interaction: discord.Interaction, category: str = "level")
         leaderboard_text.append(f"{medal} **{username}** - {value_str}")
     
     embed.description = "\n".join(leaderboard_text)
-    embed.set_footer(text=f"Classement Arsenal Economy • Serveur: {interaction.guild.name}")
+    footer = f"Classement Arsenal Economy • Serveur: {interaction.guild.name}"
+    user_rank, ranked_users = economy.get_user_rank(interaction.user.id, interaction.guild.id, category)
+    if user_rank:
+        footer += f" • Votre position: #{user_rank}/{ranked_users}"
+    embed.set_footer(text=footer)
     
     await interaction.response.send_message(embed=embed)
 
+@economy_group.command(name="levelcurve", description="📈 Changer le multiplicateur de niveau (recalcule tous les niveaux)")
+@app_commands.describe(multiplier="XP nécessaire = niveau * multiplicateur")
+@app_commands.checks.has_permissions(administrator=True)
+async def level_curve(interaction: discord.Interaction, multiplier: int):
+    economy = get_economy(interaction.client)
+    if not economy:
+        await interaction.response.send_message("❌ Système économie non chargé", ephemeral=True)
+        return
+    
+    # La configuration économie est commune à tous les serveurs
+    if not await interaction.client.is_owner(interaction.user):
+        await interaction.response.send_message("❌ Réservé au propriétaire du bot", ephemeral=True)
+        return
+    
+    if multiplier <= 0:
+        await interaction.response.send_message("❌ Le multiplicateur doit être positif", ephemeral=True)
+        return
+    
+    await interaction.response.defer(ephemeral=True)
+    changed = await asyncio.to_thread(economy.set_level_curve, {"type": "linear_sum", "multiplier": multiplier})
+    await interaction.followup.send(f"📈 Multiplicateur de niveau: **{multiplier}** • {changed:,} niveaux recalculés", ephemeral=True)
+
+@economy_group.command(name="jobs", description="🗓️ Lancer un traitement par lot (intérêts, expirations)")
+@app_commands.describe(job="Traitement à lancer", dry_run="Calculer l'impact sans rien modifier")
+@app_commands.choices(job=[
+    app_commands.Choice(name="🏦 Intérêts bancaires", value="bank_interest"),
+    app_commands.Choice(name="⚡ Boosts expirés", value="expire_boosts"),
+    app_commands.Choice(name="🎒 Objets expirés", value="expire_items")
+])
+@app_commands.checks.has_permissions(administrator=True)
+async def batch_jobs(interaction: discord.Interaction, job: str, dry_run: bool = True):
+    economy = get_economy(interaction.client)
+    if not economy:
+        await interaction.response.send_message("❌ Système économie non chargé", ephemeral=True)
+        return
+    
+    # Les jobs portent sur tous les serveurs
+    if not await interaction.client.is_owner(interaction.user):
+        await interaction.response.send_message("❌ Réservé au propriétaire du bot", ephemeral=True)
+        return
+    
+    await interaction.response.defer(ephemeral=True)
+    result = await asyncio.to_thread(economy.jobs.run, job, dry_run)
+    mode = "🔎 Simulation" if dry_run else "✅ Appliqué"
+    await interaction.followup.send(
+        f"{mode} • **{job}** : {result['users']:,} utilisateurs, impact {result['amount']:,} "
+        f"({result['elapsed'] * 1000:.1f} ms)",
+        ephemeral=True
+    )
+
 @economy_group.command(name="give", description="💸 Donner de l'argent à un autre utilisateur")
 @app_commands.describe(
     user="Utilisateur à qui donner l'argent",
@@ -975,12 +1083,35 @@ class EconomyCog(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
         self.economy = EconomySystem(bot)
+        self.flush_storage.start()
+        self.run_batch_jobs.start()
+        self.pipeline = get_message_pipeline(bot)
+        self.pipeline.register("economy_xp", self.on_message_stage, priority=100)
+    
+    async def cog_unload(self):
+        """Écrire les données en attente avant le déchargement"""
+        self.pipeline.unregister("economy_xp")
+        self.flush_storage.cancel()
+        self.run_batch_jobs.cancel()
+        self.economy.storage.close()
+        await self.economy.save_cooldowns(force=True)
+    
+    @tasks.loop(seconds=5)
+    async def flush_storage(self):
+        """Écrire périodiquement les lignes modifiées même sans nouveau message"""
+        self.economy.save_users_data()
+        # Snapshot des cooldowns toutes les 30 secondes
+        if self.flush_storage.current_loop % 6 == 0:
+            await self.economy.save_cooldowns()
         
-    @commands.Cog.listener()
-    async def on_message(self, message):
-        """Donner de l'XP pour les messages"""
-        if message.author.bot or not message.guild:
-            return
+    @tasks.loop(minutes=10)
+    async def run_batch_jobs(self):
+        """Lancer les jobs économie arrivés à échéance (hors de la boucle d'événements)"""
+        await asyncio.to_thread(self.economy.jobs.run_due)
+    
+    async def on_message_stage(self, ctx: MessageContext):
+        """Étape pipeline : donner de l'XP pour les messages (sautée si l'automod a sanctionné)"""
+        message = ctx.message
         
         # Ajouter de l'XP
         result = await self.economy.add_xp(message.author.id, message.guild.id)
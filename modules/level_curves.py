@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+📈 ARSENAL V4 - COURBES DE NIVEAU
+XP -> niveau en O(1) (formule inversée) ou O(log n) (table), sans boucle par niveau
+
+Toutes les courbes partent du niveau 1 à 0 XP ; `total_xp(level)` est l'XP
+cumulée nécessaire pour atteindre `level`.
+
+- LinearSumCurve : le niveau N coûte N * multiplier (courbe historique de
+                   EconomySystem), total = multiplier * N(N-1)/2
+- QuadraticCurve : total = base * (N-1)² (courbe du bot Arsenal_V4,
+                   niveau = isqrt(xp / base) + 1)
+- TableCurve     : seuils cumulés explicites, recherche dichotomique ; au-delà
+                   de la table, chaque niveau coûte autant que le dernier palier
+
+Configuration ("level_curve" dans economy_config.json) :
+    {"type": "linear_sum", "multiplier": 100}
+    {"type": "quadratic", "base": 100}
+    {"type": "table", "thresholds": [0, 100, 300, 600, 1000]}
+"""
+
+import math
+from bisect import bisect_right
+from typing import List, Optional, Sequence, Tuple
+
+
+class LevelCurve:
+    """Courbe de niveau : total_xp() et son inverse level_for_xp()"""
+
+    def total_xp(self, level: int) -> int:
+        """XP cumulée pour atteindre `level` (total_xp(1) == 0)"""
+        raise NotImplementedError
+
+    def level_for_xp(self, xp: int) -> int:
+        raise NotImplementedError
+
+    def level_cost(self, level: int) -> int:
+        """XP à gagner pendant le niveau `level` pour passer au suivant"""
+        return self.total_xp(level + 1) - self.total_xp(level)
+
+    def progress(self, xp: int, level: Optional[int] = None) -> Tuple[int, int]:
+        """(XP acquise dans le niveau courant, XP nécessaire pour le niveau suivant)"""
+        if level is None:
+            level = self.level_for_xp(xp)
+        return xp - self.total_xp(level), self.level_cost(level)
+
+    def _settle(self, level: int, xp: int) -> int:
+        # Corrige l'estimation flottante d'un cran : total_xp(level) <= xp < total_xp(level + 1)
+        level = max(1, level)
+        while level > 1 and self.total_xp(level) > xp:
+            level -= 1
+        while self.total_xp(level + 1) <= xp:
+            level += 1
+        return level
+
+
+class LinearSumCurve(LevelCurve):
+    def __init__(self, multiplier: float = 100):
+        if multiplier <= 0:
+            raise ValueError("multiplier doit être positif")
+        self.multiplier = multiplier
+
+    def total_xp(self, level: int) -> int:
+        if isinstance(self.multiplier, int):
+            return self.multiplier * level * (level - 1) // 2
+        return self.multiplier * level * (level - 1) / 2
+
+    def level_cost(self, level: int) -> int:
+        return level * self.multiplier
+
+    def level_for_xp(self, xp: int) -> int:
+        if xp <= 0:
+            return 1
+        # multiplier * N(N-1)/2 <= xp  <=>  N <= (1 + sqrt(1 + 8 xp / multiplier)) / 2
+        return self._settle(int((1 + math.sqrt(1 + 8 * xp / self.multiplier)) / 2), xp)
+
+
+class QuadraticCurve(LevelCurve):
+    def __init__(self, base: int = 100):
+        if base <= 0:
+            raise ValueError("base doit être positive")
+        self.base = base
+
+    def total_xp(self, level: int) -> int:
+        return self.base * (level - 1) ** 2
+
+    def level_for_xp(self, xp: int) -> int:
+        if xp <= 0:
+            return 1
+        if isinstance(self.base, int) and isinstance(xp, int):
+            return math.isqrt(xp // self.base) + 1  # Exact, même pour de très grandes valeurs
+        return self._settle(int(math.sqrt(xp / self.base)) + 1, xp)
+
+
+class TableCurve(LevelCurve):
+    def __init__(self, thresholds: Sequence[int]):
+        thresholds = list(thresholds)
+        if not thresholds or thresholds[0] != 0:
+            thresholds = [0] + thresholds
+        if len(thresholds) < 2 or any(b <= a for a, b in zip(thresholds, thresholds[1:])):
+            raise ValueError("thresholds doit être strictement croissant")
+        self.thresholds: List[int] = thresholds
+        self.tail_cost = thresholds[-1] - thresholds[-2]  # Coût des niveaux au-delà de la table
+
+    def total_xp(self, level: int) -> int:
+        if level <= len(self.thresholds):
+            return self.thresholds[max(level, 1) - 1]
+        return self.thresholds[-1] + (level - len(self.thresholds)) * self.tail_cost
+
+    def level_for_xp(self, xp: int) -> int:
+        if xp >= self.thresholds[-1]:
+            return len(self.thresholds) + int((xp - self.thresholds[-1]) // self.tail_cost)
+        return bisect_right(self.thresholds, xp)
+
+
+CURVES = {
+    "linear_sum": lambda config: LinearSumCurve(config.get("multiplier", 100)),
+    "quadratic": lambda config: QuadraticCurve(config.get("base", 100)),
+    "table": lambda config: TableCurve(config["thresholds"]),
+}
+
+
+def create_level_curve(config: Optional[dict] = None, level_multiplier: float = 100) -> LevelCurve:
+    """
+    Courbe décrite par la section "level_curve" de la config économie
+
+    Sans section (anciennes configs), la courbe historique linear_sum est
+    construite à partir de `level_multiplier`.
+    """
+    config = dict(config or {})
+    curve_type = config.get("type", "linear_sum")
+    if curve_type not in CURVES:
+        raise ValueError(f"Courbe de niveau inconnue: {curve_type}")
+    if curve_type == "linear_sum":
+        config.setdefault("multiplier", level_multiplier)
+    return CURVES[curve_type](config)
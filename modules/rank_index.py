@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+🏆 ARSENAL V4 - INDEX DE CLASSEMENT
+Rang d'un membre et top K sans trier toute la guilde à chaque appel
+
+- RankIndex     : liste triée de (-valeur, user_id) + valeur courante de chaque
+                  membre ; rang et top K en O(log n), mise à jour en O(log n)
+- GuildRankings : un RankIndex par (guild_id, catégorie), tenu à jour à chaque
+                  écriture et reconstruit depuis le stockage au démarrage
+
+Rang "compétition" : les ex æquo partagent le même rang (1, 2, 2, 4...).
+
+sortedcontainers (SortedList) est utilisé s'il est installé ; sinon repli sur
+une liste Python triée + bisect (insertion en O(n), mais un simple memmove).
+"""
+
+from bisect import bisect_left, insort
+from collections import defaultdict
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+try:
+    from sortedcontainers import SortedList
+    SORTEDCONTAINERS_AVAILABLE = True
+except ImportError:
+    SORTEDCONTAINERS_AVAILABLE = False
+
+
+class _BisectList:
+    """Sous-ensemble de SortedList sur une liste triée (repli sans sortedcontainers)"""
+
+    def __init__(self, iterable=()):
+        self._items = sorted(iterable)
+
+    def add(self, item):
+        insort(self._items, item)
+
+    def remove(self, item):
+        index = bisect_left(self._items, item)
+        if index == len(self._items) or self._items[index] != item:
+            raise ValueError(f"{item!r} absent de la liste")
+        del self._items[index]
+
+    def bisect_left(self, item) -> int:
+        return bisect_left(self._items, item)
+
+    def islice(self, start: int = None, stop: int = None):
+        return iter(self._items[start:stop])
+
+    def __len__(self):
+        return len(self._items)
+
+
+def _sorted_list(iterable=()):
+    return SortedList(iterable) if SORTEDCONTAINERS_AVAILABLE else _BisectList(iterable)
+
+
+class RankIndex:
+    """Classement d'un ensemble de membres par valeur décroissante"""
+
+    def __init__(self, values: Iterable[Tuple[int, int]] = ()):
+        self.values: Dict[int, int] = dict(values)
+        self._sorted = _sorted_list((-value, user_id) for user_id, value in self.values.items())
+
+    def update(self, user_id: int, value: int):
+        old = self.values.get(user_id)
+        if old == value:
+            return
+        if old is not None:
+            self._sorted.remove((-old, user_id))
+        self.values[user_id] = value
+        self._sorted.add((-value, user_id))
+
+    def remove(self, user_id: int):
+        old = self.values.pop(user_id, None)
+        if old is not None:
+            self._sorted.remove((-old, user_id))
+
+    def rank(self, user_id: int) -> Optional[int]:
+        """Rang (1 = premier) ; None si le membre n'est pas classé"""
+        value = self.values.get(user_id)
+        if value is None:
+            return None
+        # (-valeur,) précède tous les (-valeur, user_id) : nombre de membres strictement devant
+        return self._sorted.bisect_left((-value,)) + 1
+
+    def top(self, limit: int) -> List[Tuple[int, int]]:
+        """[(user_id, valeur)] par valeur décroissante, ex æquo par user_id croissant"""
+        return [(user_id, -negated) for negated, user_id in self._sorted.islice(0, limit)]
+
+    def __len__(self):
+        return len(self.values)
+
+
+class GuildRankings:
+    """Un RankIndex par (guild_id, catégorie)"""
+
+    def __init__(self, categories: Iterable[str], value_of: Callable[[dict, str], Optional[int]]):
+        self.categories = tuple(categories)
+        self.value_of = value_of  # (données, catégorie) -> valeur classée
+        self.indexes: Dict[Tuple[int, str], RankIndex] = {}
+
+    def rebuild(self, users: Iterable[Tuple[int, int, dict]]):
+        """Reconstruire tous les index depuis (guild_id, user_id, données)"""
+        grouped: Dict[Tuple[int, str], Dict[int, int]] = defaultdict(dict)
+        for guild_id, user_id, data in users:
+            for category in self.categories:
+                value = self.value_of(data, category)
+                if value is not None:
+                    grouped[(guild_id, category)][user_id] = value
+        self.indexes = {key: RankIndex(values.items()) for key, values in grouped.items()}
+
+    def update(self, guild_id: int, user_id: int, data: dict):
+        for category in self.categories:
+            value = self.value_of(data, category)
+            index = self.indexes.get((guild_id, category))
+            if index is None:
+                index = self.indexes[(guild_id, category)] = RankIndex()
+            if value is None:
+                index.remove(user_id)
+            else:
+                index.update(user_id, value)
+
+    def rank(self, guild_id: int, user_id: int, category: str) -> Tuple[Optional[int], int]:
+        """(rang, nombre de membres classés)"""
+        index = self.indexes.get((guild_id, category))
+        if index is None:
+            return None, 0
+        return index.rank(user_id), len(index)
+
+    def top(self, guild_id: int, category: str, limit: int) -> List[Tuple[int, int]]:
+        index = self.indexes.get((guild_id, category))
+        return index.top(limit) if index is not None else []
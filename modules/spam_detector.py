@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+🚫 ARSENAL V4 - DÉTECTEUR DE SPAM À FENÊTRE GLISSANTE
+Historique borné par (serveur, utilisateur) : deque de (horodatage, empreinte
+du contenu) + compteur de doublons tenu à jour à chaque entrée/sortie.
+
+- Mise à jour O(1) amortie (chaque message entre et sort une seule fois)
+- Le contenu n'est pas conservé, seulement son empreinte
+- Les utilisateurs inactifs sont purgés périodiquement
+"""
+
+import sys
+import time
+from collections import deque
+from typing import Dict, Optional, Tuple
+
+
+class _History:
+    """Fenêtre d'un utilisateur sur un serveur"""
+
+    __slots__ = ("events", "counts", "last_seen")
+
+    def __init__(self):
+        self.events = deque()  # (horodatage, empreinte ou None si message vide)
+        self.counts: Dict[int, int] = {}  # empreinte -> occurrences dans la fenêtre
+        self.last_seen = 0.0
+
+    def _drop_oldest(self):
+        _, digest = self.events.popleft()
+        if digest is not None:
+            remaining = self.counts[digest] - 1
+            if remaining:
+                self.counts[digest] = remaining
+            else:
+                del self.counts[digest]
+
+
+class SpamDetector:
+    """Compteurs de débit et de doublons par (serveur, utilisateur)"""
+
+    def __init__(self, capacity: int = 32, idle_ttl: float = 600.0, sweep_interval: float = 60.0):
+        self.capacity = capacity  # Taille max d'une fenêtre (agrandie si max_messages l'exige)
+        self.idle_ttl = idle_ttl
+        self.sweep_interval = sweep_interval
+        self.histories: Dict[Tuple[int, int], _History] = {}
+        self.last_sweep: Optional[float] = None
+        self.swept_total = 0
+
+    def record(self, guild_id: int, user_id: int, content: str, time_window: float,
+               max_messages: int, now: Optional[float] = None) -> Tuple[int, int]:
+        """Enregistre un message ; retourne (messages dans la fenêtre, doublons de ce contenu)"""
+        now = time.time() if now is None else now
+        if self.last_sweep is None:
+            self.last_sweep = now
+        elif now - self.last_sweep >= self.sweep_interval:
+            self.sweep(now)
+
+        key = (guild_id, user_id)
+        history = self.histories.get(key)
+        if history is None:
+            history = self.histories[key] = _History()
+        history.last_seen = now
+
+        normalized = content.lower().strip()
+        digest = hash(normalized) if normalized else None
+        history.events.append((now, digest))
+        if digest is not None:
+            history.counts[digest] = history.counts.get(digest, 0) + 1
+
+        # Sorties : messages hors fenêtre puis dépassement de capacité
+        events = history.events
+        capacity = max(self.capacity, max_messages + 1)
+        while events and now - events[0][0] > time_window:
+            history._drop_oldest()
+        while len(events) > capacity:
+            history._drop_oldest()
+
+        duplicates = history.counts.get(digest, 0) if digest is not None else 0
+        return len(events), duplicates
+
+    def forget(self, guild_id: int, user_id: int):
+        self.histories.pop((guild_id, user_id), None)
+
+    def sweep(self, now: Optional[float] = None) -> int:
+        """Purge les utilisateurs inactifs depuis idle_ttl ; retourne le nombre supprimé"""
+        now = time.time() if now is None else now
+        limit = now - self.idle_ttl
+        idle = [key for key, history in self.histories.items() if history.last_seen < limit]
+        for key in idle:
+            del self.histories[key]
+        self.last_sweep = now
+        self.swept_total += len(idle)
+        return len(idle)
+
+    def memory_stats(self) -> dict:
+        """Empreinte mémoire approximative de la structure (en octets)"""
+        event_size = sys.getsizeof((0.0, 0)) + sys.getsizeof(0.0) + sys.getsizeof(0)
+        total = sys.getsizeof(self.histories)
+        events = 0
+        for key, history in self.histories.items():
+            events += len(history.events)
+            total += (sys.getsizeof(key) + sys.getsizeof(history)
+                      + sys.getsizeof(history.events) + sys.getsizeof(history.counts)
+                      + len(history.events) * event_size)
+        return {
+            "tracked_users": len(self.histories),
+            "events": events,
+            "bytes": total,
+            "swept_total": self.swept_total,
+        }
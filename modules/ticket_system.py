@@ -14,6 +14,7 @@ import os
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional
 from core.logger import log
+from core.message_pipeline import MessageContext, get_message_pipeline
 
 class TicketSystem:
     def __init__(self, bot):
@@ -474,21 +475,24 @@ class TicketCog(commands.Cog):
         # Ajouter les vues persistantes
         self.bot.add_view(TicketPanelView(self.ticket_system))
         self.bot.add_view(TicketControlView(self.ticket_system, 0, 0))  # Placeholder
-    
-    @commands.Cog.listener()
-    async def on_message(self, message):
-        """Met à jour l'activité des tickets"""
-        if message.author.bot or not message.guild:
-            return
         
+        self.pipeline = get_message_pipeline(bot)
+        self.pipeline.register("tickets", self.on_message_stage, priority=50)
+    
+    async def cog_unload(self):
+        self.pipeline.unregister("tickets")
+        self.pipeline.flush()
+    
+    async def on_message_stage(self, ctx: MessageContext):
+        """Étape pipeline : met à jour l'activité des tickets"""
         # Vérifier si c'est un salon de ticket
-        tickets_data = self.ticket_system.get_server_tickets(message.guild.id)
+        tickets_data = self.ticket_system.get_server_tickets(ctx.guild_id)
         for ticket_data in tickets_data["tickets"].values():
-            if ticket_data["channel_id"] == message.channel.id and ticket_data["status"] == "open":
-                # Mettre à jour l'activité
+            if ticket_data["channel_id"] == ctx.channel_id and ticket_data["status"] == "open":
+                # Mettre à jour l'activité (sauvegarde groupée par le pipeline)
                 ticket_data["last_activity"] = datetime.now().isoformat()
                 ticket_data["messages_count"] = ticket_data.get("messages_count", 0) + 1
-                self.ticket_system.save_tickets_data()
+                ctx.mark_dirty("tickets", self.ticket_system.save_tickets_data)
                 break
 
 
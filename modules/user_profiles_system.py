@@ -14,6 +14,7 @@ import os
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional
 from core.logger import log
+from core.message_pipeline import MessageContext, get_message_pipeline
 
 class UserProfileSystem:
     def __init__(self, bot):
@@ -979,18 +980,25 @@ class UserProfileCog(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
         self.profile_system = UserProfileSystem(bot)
+        self.pipeline = get_message_pipeline(bot)
+        self.pipeline.register("user_profiles", self.on_message_stage, priority=110)
     
-    @commands.Cog.listener()
-    async def on_message(self, message):
-        """Écoute les messages pour appliquer les styles et mettre à jour les stats"""
-        if message.author.bot or not message.guild:
-            return
+    async def cog_unload(self):
+        self.pipeline.unregister("user_profiles")
+        self.pipeline.flush()
+    
+    async def on_message_stage(self, ctx: MessageContext):
+        """Étape pipeline : met à jour les stats (sauvegarde groupée par le pipeline)"""
+        message = ctx.message
         
-        # Mettre à jour les statistiques
-        await self.profile_system.update_user_statistics(message.author.id, "messages_sent")
+        # Mettre à jour les statistiques en mémoire
+        profile = self.profile_system.get_user_profile(ctx.user_id)
+        profile["statistics"]["messages_sent"] = profile["statistics"].get("messages_sent", 0) + 1
+        profile["statistics"]["last_activity"] = datetime.now().isoformat()
+        ctx.mark_dirty("profiles", self.profile_system.save_profiles)
         
         # Vérifier les nouveaux succès
-        new_achievements = await self.profile_system.check_achievements(message.author.id)
+        new_achievements = await self.profile_system.check_achievements(ctx.user_id)
         if new_achievements:
             embed = discord.Embed(
                 title="🏆 Nouveau(x) Succès Débloqué(s) !",
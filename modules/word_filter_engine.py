@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+🔎 ARSENAL V4 - MOTEUR DE FILTRAGE DE MOTS (AHO-CORASICK)
+Un automate par configuration de serveur : tous les mots de tous les niveaux
+sont recherchés en un seul passage sur le message.
+
+Même sémantique que l'ancien filtre (`mot.lower() in contenu`) : recherche
+de sous-chaînes, le niveau le plus grave trouvé l'emporte.
+"""
+
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Match = (niveau, mot)
+Match = Tuple[int, str]
+
+
+class WordFilterMatcher:
+    """Automate Aho-Corasick multi-niveaux"""
+
+    def __init__(self, words_by_level: Dict[int, Iterable[str]]):
+        # Nœud i : transitions[i] (char -> nœud), fail[i], best[i] = meilleur match terminant ici
+        self.transitions: List[Dict[str, int]] = [{}]
+        self.fail: List[int] = [0]
+        self.best: List[Optional[Match]] = [None]
+        self.outputs: List[List[Match]] = [[]]
+        self.max_level = 0
+        self.word_count = 0
+
+        for level, words in words_by_level.items():
+            for word in words:
+                word = word.lower()
+                if word:
+                    self._insert(word, level)
+                    self.max_level = max(self.max_level, level)
+        self._build_links()
+
+    def _insert(self, word: str, level: int):
+        node = 0
+        for char in word:
+            next_node = self.transitions[node].get(char)
+            if next_node is None:
+                next_node = len(self.transitions)
+                self.transitions.append({})
+                self.fail.append(0)
+                self.best.append(None)
+                self.outputs.append([])
+                self.transitions[node][char] = next_node
+            node = next_node
+        self.outputs[node].append((level, word))
+        self.word_count += 1
+
+    def _build_links(self):
+        """Liens d'échec en largeur + propagation des sorties"""
+        queue = list(self.transitions[0].values())
+        for node in queue:
+            self.best[node] = max(self.outputs[node], default=None, key=lambda match: match[0])
+
+        index = 0
+        while index < len(queue):
+            node = queue[index]
+            index += 1
+            for char, child in self.transitions[node].items():
+                queue.append(child)
+                fallback = self.fail[node]
+                while fallback and char not in self.transitions[fallback]:
+                    fallback = self.fail[fallback]
+                target = self.transitions[fallback].get(char, 0)
+                self.fail[child] = target if target != child else 0
+
+                inherited = self.outputs[self.fail[child]]
+                self.outputs[child] = self.outputs[child] + inherited
+                self.best[child] = max(self.outputs[child], default=None, key=lambda match: match[0])
+
+    def _scan(self, content: str):
+        """Générateur des nœuds atteints caractère par caractère"""
+        transitions, fail = self.transitions, self.fail
+        node = 0
+        for char in content:
+            while node and char not in transitions[node]:
+                node = fail[node]
+            node = transitions[node].get(char, 0)
+            yield node
+
+    def highest(self, content: str) -> Optional[Match]:
+        """Match le plus grave du message (contenu déjà en minuscules), ou None"""
+        best, max_level = self.best, self.max_level
+        found = None
+        for node in self._scan(content):
+            match = best[node]
+            if match is not None and (found is None or match[0] > found[0]):
+                found = match
+                if found[0] == max_level:
+                    break  # Impossible de trouver plus grave
+        return found
+
+    def first_by_level(self, content: str) -> Dict[int, str]:
+        """Premier mot détecté pour chaque niveau (pour /automod test_filter)"""
+        found: Dict[int, str] = {}
+        for node in self._scan(content):
+            for level, word in self.outputs[node]:
+                found.setdefault(level, word)
+        return found
+
+
+def build_level_matcher(word_filter_config: dict) -> WordFilterMatcher:
+    """Automate des listes level_1_words ... level_4_words d'une config word_filter"""
+    return WordFilterMatcher({
+        level: word_filter_config.get(f"level_{level}_words", [])
+        for level in (1, 2, 3, 4)
+    })
+
+
+def build_legacy_matcher(word_filter_config: dict) -> WordFilterMatcher:
+    """Automate de l'ancienne liste "words" (un seul niveau)"""
+    return WordFilterMatcher({1: word_filter_config.get("words", [])})
@@ -0,0 +1,94 @@
+"""
+📄 Arsenal V4 - Cache des fragments de pages du webpanel
+Le contenu de <body> (sans <script>/<style>) de chaque page du frontend est
+extrait une seule fois puis servi depuis la mémoire avec un ETag fort.
+Une entrée est reconstruite dès que le fichier change (mtime/taille vérifiés
+au plus une fois par `check_interval` secondes).
+"""
+
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from typing import Dict, NamedTuple, Optional
+
+BODY_PATTERN = re.compile(r'<body[^>]*>(.*?)</body>', re.DOTALL | re.IGNORECASE)
+SCRIPT_PATTERN = re.compile(r'<script[^>]*>.*?</script>', re.DOTALL | re.IGNORECASE)
+STYLE_PATTERN = re.compile(r'<style[^>]*>.*?</style>', re.DOTALL | re.IGNORECASE)
+
+
+def extract_fragment(full_content: str) -> str:
+    """Contenu principal d'une page : <body> sans scripts ni styles"""
+    body_match = BODY_PATTERN.search(full_content)
+    # Si pas de balise body, prendre tout le contenu
+    content = body_match.group(1).strip() if body_match else full_content
+    content = SCRIPT_PATTERN.sub('', content)
+    return STYLE_PATTERN.sub('', content)
+
+
+class PageFragment(NamedTuple):
+    payload: bytes   # Réponse JSON {"content", "page"} déjà sérialisée
+    etag: str        # Empreinte forte du payload (sans guillemets)
+    mtime_ns: int
+    size: int
+    checked_at: float
+
+
+class PageFragmentCache:
+    def __init__(self, directory: str, check_interval: float = 1.0):
+        self.directory = directory
+        self.check_interval = check_interval
+        self.entries: Dict[str, PageFragment] = {}
+        self.lock = threading.Lock()
+        self.stats = {'hits': 0, 'builds': 0, 'invalidations': 0}
+
+    def path_for(self, page_name: str) -> str:
+        return os.path.join(self.directory, f'{page_name}.html')
+
+    def get(self, page_name: str) -> Optional[PageFragment]:
+        """Fragment à jour de la page, ou None si le fichier n'existe pas"""
+        now = time.monotonic()
+        entry = self.entries.get(page_name)
+        if entry is not None and now - entry.checked_at < self.check_interval:
+            self.stats['hits'] += 1
+            return entry
+
+        try:
+            stat = os.stat(self.path_for(page_name))
+        except FileNotFoundError:
+            self.entries.pop(page_name, None)
+            return None
+
+        if entry is not None and entry.mtime_ns == stat.st_mtime_ns and entry.size == stat.st_size:
+            entry = entry._replace(checked_at=now)
+            self.entries[page_name] = entry
+            self.stats['hits'] += 1
+            return entry
+
+        if entry is not None:
+            self.stats['invalidations'] += 1
+        return self._build(page_name, stat, now)
+
+    def _build(self, page_name: str, stat: os.stat_result, now: float) -> PageFragment:
+        with self.lock:
+            with open(self.path_for(page_name), 'r', encoding='utf-8') as f:
+                content = extract_fragment(f.read())
+            payload = json.dumps({"content": content, "page": page_name}, ensure_ascii=False).encode('utf-8')
+            entry = PageFragment(
+                payload=payload,
+                etag=hashlib.sha256(payload).hexdigest()[:32],
+                mtime_ns=stat.st_mtime_ns,
+                size=stat.st_size,
+                checked_at=now,
+            )
+            self.entries[page_name] = entry
+            self.stats['builds'] += 1
+            return entry
+
+    def invalidate(self, page_name: str = None):
+        if page_name is None:
+            self.entries.clear()
+        else:
+            self.entries.pop(page_name, None)
@@ -0,0 +1,392 @@
+"""
+⏱️ Arsenal V4 - Métriques de latence du webpanel
+Middleware Flask qui mesure chaque requête, en mémoire et sans dépendance :
+
+- compteurs par route (règle Flask, pas l'URL) / méthode / statut, erreurs
+- histogrammes de latence à buckets fixes -> p50/p95/p99 estimés
+- temps passé dans SQLite et dans les appels HTTP sortants (requests),
+  globalement et par requête
+- échantillonnage des requêtes lentes avec leur décomposition complète
+
+Exposition : texte Prometheus (/metrics) et JSON (performance.html).
+
+L'instrumentation de sqlite3.connect et de requests.Session.request n'est
+installée que par init_app(), et ne mesure que les appels faits pendant une
+requête Flask : ailleurs (threads de fond, bot, scripts) les fonctions
+d'origine sont appelées telles quelles.
+
+Réglages : ARSENAL_SLOW_REQUEST_MS  seuil des requêtes lentes (vide = désactivé)
+           ARSENAL_METRICS_TOKEN    jeton Bearer exigé sur /metrics (optionnel)
+"""
+
+import os
+import re
+import sqlite3
+import threading
+import time
+from bisect import bisect_left
+from collections import deque
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+
+# Bornes supérieures des buckets, en secondes : pas ~x1.5 pour des percentiles à ~15 % près
+BUCKETS = (0.001, 0.002, 0.003, 0.005, 0.0075, 0.01, 0.015, 0.02, 0.03, 0.05, 0.075, 0.1,
+           0.15, 0.2, 0.3, 0.5, 0.75, 1.0, 1.5, 2.0, 3.0, 5.0, 10.0)
+
+SQL_TARGET = re.compile(r'^\s*(\w+).*?\b(?:FROM|INTO|UPDATE|TABLE(?: IF NOT EXISTS)?)\s+["\[`]?(\w+)', re.IGNORECASE | re.DOTALL)
+
+
+class LatencyHistogram:
+    __slots__ = ('counts', 'count', 'total', 'max')
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)  # Dernier bucket : +Inf
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds: float):
+        self.counts[bisect_left(BUCKETS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def quantile(self, q: float) -> float:
+        """Estimation par interpolation linéaire dans le bucket (comme histogram_quantile)"""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        cumulative = 0
+        for index, bucket_count in enumerate(self.counts):
+            if cumulative + bucket_count >= rank and bucket_count:
+                lower = BUCKETS[index - 1] if index > 0 else 0.0
+                upper = BUCKETS[index] if index < len(BUCKETS) else self.max
+                return min(lower + (upper - lower) * (rank - cumulative) / bucket_count, self.max)
+            cumulative += bucket_count
+        return self.max
+
+    def summary(self) -> Dict[str, float]:
+        return {
+            'count': self.count,
+            'avg_ms': round(self.total / self.count * 1000, 2) if self.count else 0.0,
+            'p50_ms': round(self.quantile(0.50) * 1000, 2),
+            'p95_ms': round(self.quantile(0.95) * 1000, 2),
+            'p99_ms': round(self.quantile(0.99) * 1000, 2),
+            'max_ms': round(self.max * 1000, 2)
+        }
+
+
+class RequestTimer:
+    """Décomposition d'une requête en cours (un par thread)"""
+    __slots__ = ('method', 'path', 'started', 'spans', 'totals')
+
+    def __init__(self, method: str, path: str):
+        self.method = method
+        self.path = path
+        self.started = time.perf_counter()
+        self.spans: List[Tuple[str, str, float]] = []
+        self.totals = {'sqlite': [0, 0.0], 'http': [0, 0.0]}
+
+
+class RequestMetrics:
+    def __init__(self, slow_threshold_ms: Optional[float] = None, slow_samples: int = 50, max_spans: int = 200):
+        self.lock = threading.Lock()
+        self.requests: Dict[Tuple[str, str, int], int] = {}
+        self.errors: Dict[Tuple[str, str], int] = {}
+        self.latency: Dict[Tuple[str, str], LatencyHistogram] = {}
+        self.dependencies: Dict[Tuple[str, str], LatencyHistogram] = {}
+        self.slow_threshold_ms = slow_threshold_ms
+        self.slow_requests = deque(maxlen=slow_samples)
+        self.slow_total = 0
+        self.max_spans = max_spans
+        self.started_at = time.time()
+        self.local = threading.local()
+
+    # Cycle de vie d'une requête
+
+    def start_request(self, method: str, path: str) -> RequestTimer:
+        timer = self.local.timer = RequestTimer(method, path)
+        return timer
+
+    def finish_request(self, route: str, status: int, error: bool = False) -> Optional[float]:
+        timer = getattr(self.local, 'timer', None)
+        if timer is None:
+            return None
+        self.local.timer = None
+        elapsed = time.perf_counter() - timer.started
+        key = (timer.method, route)
+        with self.lock:
+            request_key = (timer.method, route, status)
+            self.requests[request_key] = self.requests.get(request_key, 0) + 1
+            if error or status >= 500:
+                self.errors[key] = self.errors.get(key, 0) + 1
+            histogram = self.latency.get(key)
+            if histogram is None:
+                histogram = self.latency[key] = LatencyHistogram()
+            histogram.observe(elapsed)
+
+        if self.slow_threshold_ms is not None and elapsed * 1000 >= self.slow_threshold_ms:
+            self._sample_slow(timer, route, status, elapsed)
+        return elapsed
+
+    def _sample_slow(self, timer: RequestTimer, route: str, status: int, elapsed: float):
+        dependencies_ms = sum(total for _, total in timer.totals.values()) * 1000
+        sample = {
+            'timestamp': time.time(),
+            'method': timer.method,
+            'path': timer.path,
+            'route': route,
+            'status': status,
+            'total_ms': round(elapsed * 1000, 2),
+            'sqlite': {'calls': timer.totals['sqlite'][0], 'ms': round(timer.totals['sqlite'][1] * 1000, 2)},
+            'http': {'calls': timer.totals['http'][0], 'ms': round(timer.totals['http'][1] * 1000, 2)},
+            'app_ms': round(max(elapsed * 1000 - dependencies_ms, 0.0), 2),
+            'spans': [{'kind': kind, 'name': name, 'ms': round(seconds * 1000, 2)} for kind, name, seconds in timer.spans]
+        }
+        with self.lock:
+            self.slow_requests.append(sample)
+            self.slow_total += 1
+
+    # Dépendances (SQLite, HTTP)
+
+    def record_dependency(self, kind: str, target: str, seconds: float, detail: str = None, call: bool = True):
+        """call=False : temps ajouté à la requête sans compter un nouvel appel (lecture des lignes)"""
+        if call:
+            with self.lock:
+                key = (kind, target)
+                histogram = self.dependencies.get(key)
+                if histogram is None:
+                    histogram = self.dependencies[key] = LatencyHistogram()
+                histogram.observe(seconds)
+        timer = getattr(self.local, 'timer', None)
+        if timer is not None:
+            totals = timer.totals[kind]
+            totals[0] += call
+            totals[1] += seconds
+            if self.slow_threshold_ms is not None and len(timer.spans) < self.max_spans:
+                timer.spans.append((kind, (detail or target)[:160], seconds))
+
+    @contextmanager
+    def track(self, kind: str, target: str, detail: str = None):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record_dependency(kind, target, time.perf_counter() - started, detail)
+
+    # Exposition
+
+    def set_slow_threshold(self, threshold_ms: Optional[float]):
+        self.slow_threshold_ms = threshold_ms
+
+    def snapshot(self, top: int = None) -> Dict[str, Any]:
+        with self.lock:
+            routes = []
+            for (method, route), histogram in self.latency.items():
+                routes.append({'method': method, 'route': route, 'errors': self.errors.get((method, route), 0),
+                               **histogram.summary()})
+            dependencies = [{'kind': kind, 'target': target, **histogram.summary()}
+                            for (kind, target), histogram in self.dependencies.items()]
+            slow = list(self.slow_requests)
+            slow_total = self.slow_total
+        routes.sort(key=lambda route: route['p95_ms'], reverse=True)
+        dependencies.sort(key=lambda dependency: dependency['count'] * dependency['avg_ms'], reverse=True)
+        return {
+            'uptime_seconds': round(time.time() - self.started_at),
+            'total_requests': sum(route['count'] for route in routes),
+            'total_errors': sum(route['errors'] for route in routes),
+            'routes': routes[:top] if top else routes,
+            'dependencies': dependencies[:top] if top else dependencies,
+            'slow_requests': {
+                'enabled': self.slow_threshold_ms is not None,
+                'threshold_ms': self.slow_threshold_ms,
+                'total': slow_total,
+                'samples': list(reversed(slow))
+            }
+        }
+
+    def render_prometheus(self) -> str:
+        lines = []
+        with self.lock:
+            lines += ['# HELP arsenal_http_requests_total Requêtes HTTP traitées',
+                      '# TYPE arsenal_http_requests_total counter']
+            for (method, route, status), count in sorted(self.requests.items()):
+                lines.append(f'arsenal_http_requests_total{_labels(method=method, route=route, status=status)} {count}')
+            lines += ['# HELP arsenal_http_request_errors_total Requêtes en erreur (5xx ou exception)',
+                      '# TYPE arsenal_http_request_errors_total counter']
+            for (method, route), count in sorted(self.errors.items()):
+                lines.append(f'arsenal_http_request_errors_total{_labels(method=method, route=route)} {count}')
+            lines += ['# HELP arsenal_http_request_duration_seconds Durée des requêtes HTTP',
+                      '# TYPE arsenal_http_request_duration_seconds histogram']
+            for (method, route), histogram in sorted(self.latency.items()):
+                lines += _histogram_lines('arsenal_http_request_duration_seconds', histogram, method=method, route=route)
+            lines += ['# HELP arsenal_dependency_duration_seconds Durée des appels SQLite et HTTP sortants',
+                      '# TYPE arsenal_dependency_duration_seconds histogram']
+            for (kind, target), histogram in sorted(self.dependencies.items()):
+                lines += _histogram_lines('arsenal_dependency_duration_seconds', histogram, kind=kind, target=target)
+            lines += ['# HELP arsenal_slow_requests_total Requêtes au-dessus du seuil ARSENAL_SLOW_REQUEST_MS',
+                      '# TYPE arsenal_slow_requests_total counter',
+                      f'arsenal_slow_requests_total {self.slow_total}']
+        return '\n'.join(lines) + '\n'
+
+
+def _escape(value: Any) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(**labels) -> str:
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + '}'
+
+
+def _histogram_lines(name: str, histogram: LatencyHistogram, **labels) -> List[str]:
+    lines = []
+    cumulative = 0
+    for bound, count in zip(BUCKETS + ('+Inf',), histogram.counts):
+        cumulative += count
+        lines.append(f'{name}_bucket{_labels(**labels, le=bound)} {cumulative}')
+    lines.append(f'{name}_sum{_labels(**labels)} {histogram.total:.6f}')
+    lines.append(f'{name}_count{_labels(**labels)} {histogram.count}')
+    return lines
+
+
+@lru_cache(maxsize=2048)
+def sql_target(statement: str) -> str:
+    """'SELECT users' : verbe + table, pour garder peu de séries"""
+    match = SQL_TARGET.match(statement)
+    if match:
+        return f"{match.group(1).upper()} {match.group(2)}"
+    return statement.split(None, 1)[0].upper() if statement.strip() else 'SQL'
+
+
+# Instrumentation SQLite : connexions et curseurs chronométrés
+
+class TimedCursor(sqlite3.Cursor):
+    def execute(self, sql, parameters=()):
+        started = time.perf_counter()
+        try:
+            return super().execute(sql, parameters)
+        finally:
+            _metrics.record_dependency('sqlite', sql_target(sql), time.perf_counter() - started, sql)
+
+    # execute() ne lit que la première ligne : le reste du travail se fait ici
+    def fetchall(self):
+        started = time.perf_counter()
+        try:
+            return super().fetchall()
+        finally:
+            _metrics.record_dependency('sqlite', 'FETCH', time.perf_counter() - started, 'fetchall', call=False)
+
+    def fetchmany(self, size=None):
+        started = time.perf_counter()
+        try:
+            return super().fetchmany(self.arraysize if size is None else size)
+        finally:
+            _metrics.record_dependency('sqlite', 'FETCH', time.perf_counter() - started, 'fetchmany', call=False)
+
+    def executemany(self, sql, seq_of_parameters):
+        with _metrics.track('sqlite', sql_target(sql), sql):
+            return super().executemany(sql, seq_of_parameters)
+
+    def executescript(self, sql_script):
+        with _metrics.track('sqlite', 'SCRIPT'):
+            return super().executescript(sql_script)
+
+
+class TimedConnection(sqlite3.Connection):
+    def cursor(self, factory=TimedCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+    def commit(self):
+        with _metrics.track('sqlite', 'COMMIT'):
+            return super().commit()
+
+
+_original_connect = sqlite3.connect
+_original_session_request = None
+
+
+def _in_request() -> bool:
+    """Une requête Flask instrumentée est en cours dans ce thread"""
+    return _metrics is not None and getattr(_metrics.local, 'timer', None) is not None
+
+
+def _timed_connect(*args, **kwargs):
+    if _in_request():
+        kwargs.setdefault('factory', TimedConnection)
+    return _original_connect(*args, **kwargs)
+
+
+def instrument_sqlite():
+    """sqlite3.connect() renvoie des connexions chronométrées pendant les requêtes Flask"""
+    sqlite3.connect = _timed_connect
+
+
+def instrument_requests():
+    """Chronométrer requests.Session.request (requests.get/post et client REST Discord)"""
+    global _original_session_request
+    try:
+        import requests
+    except ImportError:
+        return False
+    if _original_session_request is not None:
+        return True
+    _original_session_request = requests.Session.request
+
+    def timed_request(session, method, url, *args, **kwargs):
+        if not _in_request():
+            return _original_session_request(session, method, url, *args, **kwargs)
+        host = url.split('://', 1)[-1].split('/', 1)[0]
+        with _metrics.track('http', f"{method.upper()} {host}", f"{method.upper()} {url.split('?', 1)[0]}"):
+            return _original_session_request(session, method, url, *args, **kwargs)
+
+    requests.Session.request = timed_request
+    return True
+
+
+def init_app(app, metrics: 'RequestMetrics' = None):
+    """Brancher le middleware sur une application Flask (seul point d'installation de l'instrumentation)"""
+    global _metrics
+    from flask import g, request
+
+    # Les connexions et appels HTTP chronométrés alimentent les métriques de cette application
+    metrics = _metrics = metrics or get_request_metrics()
+
+    @app.before_request
+    def _metrics_start():
+        metrics.start_request(request.method, request.path)
+
+    @app.after_request
+    def _metrics_status(response):
+        g.metrics_status = response.status_code
+        return response
+
+    @app.teardown_request
+    def _metrics_finish(error=None):
+        # Règle de route (/api/user/<user_id>) : une série par route, pas par URL
+        route = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+        status = 500 if error is not None else g.get('metrics_status', 500)
+        metrics.finish_request(route, status, error is not None)
+
+    instrument_sqlite()
+    instrument_requests()
+    return metrics
+
+
+_metrics: Optional[RequestMetrics] = None
+
+
+def get_request_metrics() -> RequestMetrics:
+    """Métriques partagées du processus webpanel"""
+    global _metrics
+    if _metrics is None:
+        threshold = os.environ.get('ARSENAL_SLOW_REQUEST_MS', '').strip()
+        _metrics = RequestMetrics(slow_threshold_ms=float(threshold) if threshold else None)
+    return _metrics
@@ -7,12 +7,16 @@ from datetime import datetime, timedelta
 import json
 import os
 
+from command_rollups import CommandRollups
+
 class ArsenalDatabase:
     def __init__(self):
         self.db_path = 'arsenal_v4.db'
         self.connection = None
         self.connect()
         self.create_tables()
+        # Agrégats horaires / journaliers des logs de commandes (analytics)
+        self.rollups = CommandRollups(self.db_path)
 
     def connect(self):
         """Connexion à la base de données SQLite"""
@@ -281,16 +285,9 @@ class ArsenalDatabase:
             cursor.execute("SELECT COUNT(*) FROM servers WHERE is_active = 1")
             stats['total_servers'] = cursor.fetchone()[0]
             
-            # Nombre total de commandes exécutées
-            cursor.execute("SELECT COUNT(*) FROM commands_log")
-            stats['total_commands'] = cursor.fetchone()[0]
-            
-            # Commandes des dernières 24h
-            cursor.execute("""
-                SELECT COUNT(*) FROM commands_log 
-                WHERE executed_at >= datetime('now', '-24 hours')
-            """)
-            stats['commands_24h'] = cursor.fetchone()[0]
+            # Commandes de commands_log : agrégats (total cumulé + fenêtre glissante de 24h)
+            stats['total_commands'] = self.rollups.bucket('commands_log', 'total', '')['total']
+            stats['commands_24h'] = self.rollups.window('commands_log', 24)['total']
             
             return stats
         except Exception as e:
@@ -0,0 +1,322 @@
+"""
+🗄️ Arsenal V4 - Stockage d'état partagé du webpanel
+L'état qui vivait dans la mémoire d'un seul processus (sessions de connexion
+figées, parties de casino, historique des notifications, stats du bot) passe
+par un backend interchangeable, pour que le panel tourne sur N workers :
+
+- memory : dictionnaire du processus (développement, un seul worker)
+- sqlite : fichier SQLite en mode WAL partagé par tous les workers d'une machine
+- redis  : serveur Redis ou compatible (module `redis` requis)
+
+Choix par variables d'environnement :
+    ARSENAL_STATE_BACKEND=memory|sqlite|redis   (défaut : memory)
+    ARSENAL_STATE_PATH=arsenal_state.db         (sqlite)
+    ARSENAL_STATE_URL=redis://localhost:6379/0  (redis)
+
+Les valeurs sont sérialisées en JSON ; update() est atomique entre workers.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+try:
+    import redis
+    REDIS_AVAILABLE = True
+except ImportError:
+    redis = None
+    REDIS_AVAILABLE = False
+
+
+class StateStore:
+    """Interface commune : (namespace, clé) -> valeur JSON, TTL optionnel"""
+
+    backend = 'abstract'
+
+    def get(self, namespace: str, key: str, default: Any = None) -> Any:
+        raise NotImplementedError
+
+    def set(self, namespace: str, key: str, value: Any, ttl: float = None):
+        raise NotImplementedError
+
+    def delete(self, namespace: str, key: str) -> bool:
+        raise NotImplementedError
+
+    def update(self, namespace: str, key: str, fn: Callable[[Any], Any], ttl: float = None) -> Any:
+        """Lecture-modification-écriture atomique : fn(valeur ou None) -> nouvelle valeur (None supprime)"""
+        raise NotImplementedError
+
+    def items(self, namespace: str) -> Dict[str, Any]:
+        raise NotImplementedError
+
+    def cleanup_expired(self) -> int:
+        return 0
+
+    # Opérations dérivées, identiques pour tous les backends
+
+    def pop(self, namespace: str, key: str, default: Any = None) -> Any:
+        popped = []
+
+        def take(value):
+            popped.append(value)
+            return None
+
+        self.update(namespace, key, take)
+        return popped[0] if popped and popped[0] is not None else default
+
+    def incr(self, namespace: str, key: str, amount: float = 1) -> float:
+        return self.update(namespace, key, lambda value: (value or 0) + amount)
+
+    def push(self, namespace: str, key: str, item: Any, max_length: int = None) -> List[Any]:
+        """Ajouter à une liste en gardant les max_length derniers éléments"""
+        def append(value):
+            value = list(value or [])
+            value.append(item)
+            return value[-max_length:] if max_length else value
+        return self.update(namespace, key, append)
+
+    def claim(self, namespace: str, key: str, interval: float) -> bool:
+        """True pour un seul worker par intervalle (tâches périodiques)"""
+        now = time.time()
+        claimed = self.update(namespace, key, lambda last: now if not last or now - last >= interval else last)
+        return claimed == now
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {'backend': self.backend}
+
+
+class MemoryStateStore(StateStore):
+    backend = 'memory'
+
+    def __init__(self):
+        self.data: Dict[str, Dict[str, tuple]] = {}  # namespace -> clé -> (JSON, expiration)
+        self.lock = threading.RLock()
+
+    def _read(self, namespace: str, key: str) -> Any:
+        entry = self.data.get(namespace, {}).get(key)
+        if entry is None:
+            return None
+        raw, expires_at = entry
+        if expires_at is not None and expires_at <= time.time():
+            del self.data[namespace][key]
+            return None
+        # Copie via JSON : même comportement que les backends partagés
+        return json.loads(raw)
+
+    def _write(self, namespace: str, key: str, value: Any, ttl: float = None):
+        if value is None:
+            self.data.get(namespace, {}).pop(key, None)
+            return
+        expires_at = time.time() + ttl if ttl else None
+        self.data.setdefault(namespace, {})[key] = (json.dumps(value), expires_at)
+
+    def get(self, namespace, key, default=None):
+        with self.lock:
+            value = self._read(namespace, key)
+        return default if value is None else value
+
+    def set(self, namespace, key, value, ttl=None):
+        with self.lock:
+            self._write(namespace, key, value, ttl)
+
+    def delete(self, namespace, key):
+        with self.lock:
+            return self.data.get(namespace, {}).pop(key, None) is not None
+
+    def update(self, namespace, key, fn, ttl=None):
+        with self.lock:
+            value = fn(self._read(namespace, key))
+            self._write(namespace, key, value, ttl)
+            return value
+
+    def items(self, namespace):
+        with self.lock:
+            keys = list(self.data.get(namespace, {}))
+            values = {key: self._read(namespace, key) for key in keys}
+        return {key: value for key, value in values.items() if value is not None}
+
+    def cleanup_expired(self):
+        now = time.time()
+        removed = 0
+        with self.lock:
+            for entries in self.data.values():
+                for key in [key for key, (_, expires_at) in entries.items() if expires_at is not None and expires_at <= now]:
+                    del entries[key]
+                    removed += 1
+        return removed
+
+    def get_stats(self):
+        with self.lock:
+            return {'backend': self.backend, 'keys': sum(len(entries) for entries in self.data.values())}
+
+
+class SQLiteStateStore(StateStore):
+    """Fichier SQLite (WAL) partagé : lecteurs concurrents, un écrivain à la fois"""
+
+    backend = 'sqlite'
+
+    def __init__(self, path: str = 'arsenal_state.db', busy_timeout: float = 5.0):
+        self.path = path
+        self.busy_timeout = busy_timeout
+        self.local = threading.local()
+        conn = self._connection()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS state (
+                namespace TEXT NOT NULL,
+                key TEXT NOT NULL,
+                value TEXT NOT NULL,
+                expires_at REAL,
+                PRIMARY KEY (namespace, key)
+            ) WITHOUT ROWID
+        """)
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_state_expires ON state(expires_at) WHERE expires_at IS NOT NULL")
+
+    def _connection(self) -> sqlite3.Connection:
+        """Une connexion par thread (autocommit, transactions explicites)"""
+        conn = getattr(self.local, 'connection', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=self.busy_timeout, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA synchronous=NORMAL")  # Suffisant en WAL
+            self.local.connection = conn
+        return conn
+
+    def _read(self, conn, namespace, key):
+        row = conn.execute(
+            "SELECT value FROM state WHERE namespace = ? AND key = ? AND (expires_at IS NULL OR expires_at > ?)",
+            (namespace, key, time.time())
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def _write(self, conn, namespace, key, value, ttl):
+        if value is None:
+            conn.execute("DELETE FROM state WHERE namespace = ? AND key = ?", (namespace, key))
+        else:
+            conn.execute(
+                "INSERT OR REPLACE INTO state (namespace, key, value, expires_at) VALUES (?, ?, ?, ?)",
+                (namespace, key, json.dumps(value), time.time() + ttl if ttl else None)
+            )
+
+    def get(self, namespace, key, default=None):
+        value = self._read(self._connection(), namespace, key)
+        return default if value is None else value
+
+    def set(self, namespace, key, value, ttl=None):
+        self._write(self._connection(), namespace, key, value, ttl)
+
+    def delete(self, namespace, key):
+        cursor = self._connection().execute("DELETE FROM state WHERE namespace = ? AND key = ?", (namespace, key))
+        return cursor.rowcount > 0
+
+    def update(self, namespace, key, fn, ttl=None):
+        conn = self._connection()
+        # BEGIN IMMEDIATE : verrou d'écriture pris avant la lecture (pas de mise à jour perdue)
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            value = fn(self._read(conn, namespace, key))
+            self._write(conn, namespace, key, value, ttl)
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return value
+
+    def items(self, namespace):
+        rows = self._connection().execute(
+            "SELECT key, value FROM state WHERE namespace = ? AND (expires_at IS NULL OR expires_at > ?)",
+            (namespace, time.time())
+        ).fetchall()
+        return {key: json.loads(value) for key, value in rows}
+
+    def cleanup_expired(self):
+        cursor = self._connection().execute("DELETE FROM state WHERE expires_at <= ?", (time.time(),))
+        return cursor.rowcount
+
+    def get_stats(self):
+        keys = self._connection().execute("SELECT COUNT(*) FROM state").fetchone()[0]
+        return {'backend': self.backend, 'path': self.path, 'keys': keys}
+
+
+class RedisStateStore(StateStore):
+    """Redis ou compatible : une clé "arsenal:<namespace>:<clé>" par valeur"""
+
+    backend = 'redis'
+
+    def __init__(self, url: str = 'redis://localhost:6379/0', prefix: str = 'arsenal'):
+        if not REDIS_AVAILABLE:
+            raise RuntimeError("Module redis non installé (pip install redis)")
+        self.client = redis.Redis.from_url(url)
+        self.prefix = prefix
+
+    def _key(self, namespace, key):
+        return f"{self.prefix}:{namespace}:{key}"
+
+    def get(self, namespace, key, default=None):
+        raw = self.client.get(self._key(namespace, key))
+        return default if raw is None else json.loads(raw)
+
+    def set(self, namespace, key, value, ttl=None):
+        if value is None:
+            self.client.delete(self._key(namespace, key))
+        else:
+            self.client.set(self._key(namespace, key), json.dumps(value), px=int(ttl * 1000) if ttl else None)
+
+    def delete(self, namespace, key):
+        return bool(self.client.delete(self._key(namespace, key)))
+
+    def update(self, namespace, key, fn, ttl=None):
+        full_key = self._key(namespace, key)
+        with self.client.pipeline() as pipe:
+            while True:
+                try:
+                    # WATCH : la transaction échoue si un autre worker a modifié la clé
+                    pipe.watch(full_key)
+                    raw = pipe.get(full_key)
+                    value = fn(None if raw is None else json.loads(raw))
+                    pipe.multi()
+                    if value is None:
+                        pipe.delete(full_key)
+                    else:
+                        pipe.set(full_key, json.dumps(value), px=int(ttl * 1000) if ttl else None)
+                    pipe.execute()
+                    return value
+                except redis.WatchError:
+                    continue
+
+    def items(self, namespace):
+        prefix = self._key(namespace, '')
+        keys = list(self.client.scan_iter(match=f"{prefix}*"))
+        values = self.client.mget(keys) if keys else []
+        return {key.decode()[len(prefix):]: json.loads(raw) for key, raw in zip(keys, values) if raw is not None}
+
+    def get_stats(self):
+        return {'backend': self.backend, 'keys': self.client.dbsize()}
+
+
+def create_state_store(backend: str = None) -> StateStore:
+    backend = (backend or os.environ.get('ARSENAL_STATE_BACKEND', 'memory')).lower()
+    if backend == 'sqlite':
+        return SQLiteStateStore(os.environ.get('ARSENAL_STATE_PATH', 'arsenal_state.db'))
+    if backend == 'redis':
+        return RedisStateStore(os.environ.get('ARSENAL_STATE_URL', 'redis://localhost:6379/0'))
+    return MemoryStateStore()
+
+
+_state_store: Optional[StateStore] = None
+_state_store_lock = threading.Lock()
+
+
+def get_state_store() -> StateStore:
+    """Stockage d'état partagé du processus (backend choisi par l'environnement)"""
+    global _state_store
+    if _state_store is None:
+        with _state_store_lock:
+            if _state_store is None:
+                _state_store = create_state_store()
+                print(f"🗄️ Stockage d'état du webpanel : {_state_store.backend}")
+                if _state_store.backend == 'memory' and int(os.environ.get('WEB_CONCURRENCY', '1')) > 1:
+                    print("⚠️ WEB_CONCURRENCY > 1 avec le backend memory : sessions et parties non partagées entre workers")
+    return _state_store
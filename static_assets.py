@@ -0,0 +1,224 @@
+"""
+🗜️ Arsenal V4 - Pipeline d'assets statiques du webpanel
+Au démarrage, chaque fichier du frontend est haché (empreinte SHA-256) et
+précompressé en gzip et brotli (si le module `brotli` est installé).
+Les requêtes reçoivent le meilleur encodage accepté par le client :
+
+- URL avec empreinte (js/arsenal-ultimate.3f2a9c1b0d4e.js) -> Cache-Control immutable, 1 an
+- URL simple (js/arsenal-ultimate.js)                       -> no-cache + ETag (304 si inchangé)
+
+Les fichiers modifiés sur disque sont recompressés au prochain accès par URL simple.
+"""
+
+import gzip
+import hashlib
+import mimetypes
+import os
+import threading
+import time
+from typing import Dict, NamedTuple, Optional, Tuple
+
+try:
+    import brotli
+    BROTLI_AVAILABLE = True
+except ImportError:
+    brotli = None
+    BROTLI_AVAILABLE = False
+
+# Types texte qui gagnent à être compressés (images/polices déjà compressées)
+COMPRESSIBLE_EXTENSIONS = {'.html', '.htm', '.js', '.jsx', '.mjs', '.css', '.json', '.svg', '.txt', '.md', '.map', '.xml'}
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+REVALIDATE_CACHE_CONTROL = 'no-cache'
+FINGERPRINT_LENGTH = 12
+
+
+class Asset(NamedTuple):
+    path: str                       # Chemin logique relatif ("js/arsenal-ultimate.js")
+    fingerprinted_path: str         # "js/arsenal-ultimate.<empreinte>.js"
+    digest: str
+    mimetype: str
+    encodings: Dict[str, bytes]     # "identity", "gzip", "br" -> contenu
+    mtime_ns: int
+    size: int
+
+
+def parse_accept_encoding(header: Optional[str]) -> Dict[str, float]:
+    """Accept-Encoding -> {encodage: q}"""
+    accepted = {}
+    for part in (header or '').split(','):
+        name, _, params = part.strip().partition(';')
+        name = name.strip().lower()
+        if not name:
+            continue
+        quality = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[name] = quality
+    return accepted
+
+
+def fingerprint_name(path: str, digest: str) -> str:
+    root, ext = os.path.splitext(path)
+    return f"{root}.{digest[:FINGERPRINT_LENGTH]}{ext}"
+
+
+class AssetPipeline:
+    def __init__(self, directory: str, gzip_level: int = 9, brotli_quality: int = 11):
+        self.directory = os.path.abspath(directory)
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.assets: Dict[str, Asset] = {}
+        self.fingerprints: Dict[str, str] = {}  # chemin avec empreinte -> chemin logique
+        self.lock = threading.Lock()
+        self.build_seconds = 0.0
+
+    # ==================== CONSTRUCTION ====================
+
+    def build(self) -> 'AssetPipeline':
+        """Hacher et précompresser tout le répertoire"""
+        start = time.perf_counter()
+        if os.path.isdir(self.directory):
+            for root, dirs, files in os.walk(self.directory):
+                dirs[:] = [name for name in dirs if name not in ('node_modules', '.git', '__pycache__')]
+                for name in files:
+                    relative = os.path.relpath(os.path.join(root, name), self.directory).replace(os.sep, '/')
+                    self._load(relative)
+        self.build_seconds = time.perf_counter() - start
+        return self
+
+    def _load(self, path: str) -> Optional[Asset]:
+        full_path = os.path.join(self.directory, path)
+        try:
+            stat = os.stat(full_path)
+            with open(full_path, 'rb') as f:
+                data = f.read()
+        except OSError:
+            return None
+
+        digest = hashlib.sha256(data).hexdigest()
+        encodings = {'identity': data}
+        if os.path.splitext(path)[1].lower() in COMPRESSIBLE_EXTENSIONS and data:
+            compressed = gzip.compress(data, compresslevel=self.gzip_level, mtime=0)
+            if len(compressed) < len(data):
+                encodings['gzip'] = compressed
+            if BROTLI_AVAILABLE:
+                compressed = brotli.compress(data, quality=self.brotli_quality)
+                if len(compressed) < len(data):
+                    encodings['br'] = compressed
+
+        asset = Asset(
+            path=path,
+            fingerprinted_path=fingerprint_name(path, digest),
+            digest=digest,
+            mimetype=mimetypes.guess_type(path)[0] or 'application/octet-stream',
+            encodings=encodings,
+            mtime_ns=stat.st_mtime_ns,
+            size=stat.st_size,
+        )
+        with self.lock:
+            previous = self.assets.get(path)
+            if previous is not None:
+                self.fingerprints.pop(previous.fingerprinted_path, None)
+            self.assets[path] = asset
+            self.fingerprints[asset.fingerprinted_path] = path
+        return asset
+
+    # ==================== RÉSOLUTION ====================
+
+    def resolve(self, path: str) -> Tuple[Optional[Asset], bool]:
+        """(asset, URL avec empreinte ?) pour un chemin demandé"""
+        path = path.lstrip('/')
+        logical = self.fingerprints.get(path)
+        if logical is not None:
+            return self.assets.get(logical), True
+
+        asset = self.assets.get(path)
+        try:
+            stat = os.stat(os.path.join(self.directory, path))
+        except OSError:
+            return None, False
+        if asset is None or asset.mtime_ns != stat.st_mtime_ns or asset.size != stat.st_size:
+            # Nouveau fichier ou modifié depuis la construction
+            if not os.path.realpath(os.path.join(self.directory, path)).startswith(self.directory + os.sep):
+                return None, False
+            asset = self._load(path)
+        return asset, False
+
+    def asset_url(self, path: str, prefix: str = '') -> str:
+        """URL avec empreinte d'un asset (URL simple si inconnu)"""
+        asset = self.assets.get(path.lstrip('/'))
+        return f"{prefix}/{asset.fingerprinted_path if asset else path.lstrip('/')}"
+
+    @staticmethod
+    def choose_encoding(asset: Asset, accept_encoding: Optional[str]) -> str:
+        accepted = parse_accept_encoding(accept_encoding)
+        wildcard = accepted.get('*', 0.0)
+        best, best_quality = 'identity', 0.0
+        for encoding in ('br', 'gzip'):
+            quality = accepted.get(encoding, wildcard)
+            if encoding in asset.encodings and quality > best_quality:
+                best, best_quality = encoding, quality
+        return best
+
+    # ==================== RAPPORT ====================
+
+    def manifest(self) -> Dict[str, str]:
+        return {path: asset.fingerprinted_path for path, asset in self.assets.items()}
+
+    def report(self) -> dict:
+        """Octets économisés par encodage"""
+        totals = {'identity': 0, 'gzip': 0, 'br': 0}
+        for asset in self.assets.values():
+            identity = len(asset.encodings['identity'])
+            totals['identity'] += identity
+            totals['gzip'] += len(asset.encodings.get('gzip', asset.encodings['identity']))
+            totals['br'] += len(asset.encodings.get('br', asset.encodings.get('gzip', asset.encodings['identity'])))
+        return {
+            'files': len(self.assets),
+            'bytes': totals,
+            'saved_gzip': totals['identity'] - totals['gzip'],
+            'saved_br': totals['identity'] - totals['br'],
+            'brotli_available': BROTLI_AVAILABLE,
+            'build_seconds': round(self.build_seconds, 3),
+        }
+
+
+def serve_asset(pipeline: AssetPipeline, path: str, request):
+    """Réponse Flask pour un asset (encodage négocié, ETag, 304, cache immuable) ou None"""
+    from flask import Response
+
+    asset, fingerprinted = pipeline.resolve(path)
+    if asset is None:
+        return None
+
+    encoding = pipeline.choose_encoding(asset, request.headers.get('Accept-Encoding'))
+    response = Response(asset.encodings[encoding], mimetype=asset.mimetype)
+    if encoding != 'identity':
+        response.headers['Content-Encoding'] = encoding
+    response.headers['Vary'] = 'Accept-Encoding'
+    response.headers['Cache-Control'] = IMMUTABLE_CACHE_CONTROL if fingerprinted else REVALIDATE_CACHE_CONTROL
+    # ETag fort par représentation (le contenu compressé diffère du contenu brut)
+    response.set_etag(f"{asset.digest[:32]}-{encoding}")
+    return response.make_conditional(request)
+
+
+_pipelines: Dict[str, AssetPipeline] = {}
+_pipelines_lock = threading.Lock()
+
+
+def get_asset_pipeline(directory: str) -> AssetPipeline:
+    """Pipeline (construit une fois) pour un répertoire"""
+    key = os.path.abspath(directory)
+    with _pipelines_lock:
+        pipeline = _pipelines.get(key)
+        if pipeline is None:
+            pipeline = _pipelines[key] = AssetPipeline(key).build()
+            report = pipeline.report()
+            print(f"🗜️ Assets {key}: {report['files']} fichiers, "
+                  f"{report['saved_gzip'] // 1024} Ko économisés (gzip), "
+                  f"{report['saved_br'] // 1024} Ko (brotli) en {report['build_seconds']}s")
+    return pipeline
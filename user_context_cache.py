@@ -0,0 +1,127 @@
+"""
+👤 Arsenal V4 - Cache du contexte utilisateur du webpanel
+Identité Discord, serveurs accessibles, grade (table user_roles) et
+permissions calculées, mis en cache par utilisateur :
+
+- TTL par entrée, taille bornée (LRU)
+- chargement unique par utilisateur : 10 appels API parallèles au chargement
+  d'une page attendent la même lecture au lieu d'en faire 10
+- invalidation explicite (connexion, déconnexion, édition admin)
+- compteurs hits/misses exposés au panel admin (/api/admin/cache/stats)
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, NamedTuple, Optional
+
+
+class _Entry(NamedTuple):
+    value: Any
+    expires_at: float  # time.monotonic()
+
+
+class _PendingLoad:
+    __slots__ = ('event', 'value', 'error', 'stale')
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.value = None
+        self.error: Optional[BaseException] = None
+        self.stale = False  # Invalidé pendant le chargement : ne pas mettre en cache
+
+
+class UserContextCache:
+    def __init__(self, ttl: float = 300.0, max_entries: int = 2048):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.entries: "OrderedDict[Hashable, _Entry]" = OrderedDict()
+        self.loading: Dict[Hashable, _PendingLoad] = {}
+        self.lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0, 'coalesced': 0, 'expired': 0,
+                      'evictions': 0, 'invalidations': 0, 'load_errors': 0}
+
+    def get(self, key: Hashable, loader: Callable[[], Any]) -> Any:
+        """Valeur en cache, sinon loader() (une seule fois pour les appels simultanés)"""
+        now = time.monotonic()
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                if entry.expires_at > now:
+                    self.entries.move_to_end(key)
+                    self.stats['hits'] += 1
+                    return entry.value
+                del self.entries[key]
+                self.stats['expired'] += 1
+
+            pending = self.loading.get(key)
+            owner = pending is None
+            if owner:
+                pending = self.loading[key] = _PendingLoad()
+                self.stats['misses'] += 1
+            else:
+                self.stats['coalesced'] += 1
+
+        if not owner:
+            pending.event.wait()
+            if pending.error is not None:
+                raise pending.error
+            return pending.value
+
+        try:
+            pending.value = loader()
+        except BaseException as e:
+            pending.error = e
+            with self.lock:
+                self.stats['load_errors'] += 1
+            raise
+        finally:
+            with self.lock:
+                self.loading.pop(key, None)
+                if pending.error is None and not pending.stale:
+                    self.entries[key] = _Entry(pending.value, time.monotonic() + self.ttl)
+                    if len(self.entries) > self.max_entries:
+                        self.entries.popitem(last=False)
+                        self.stats['evictions'] += 1
+            pending.event.set()
+        return pending.value
+
+    def invalidate(self, key: Hashable) -> bool:
+        """Oublier un utilisateur (déconnexion, changement de grade...)"""
+        with self.lock:
+            pending = self.loading.get(key)
+            if pending is not None:
+                pending.stale = True
+            removed = self.entries.pop(key, None) is not None
+            if removed or pending is not None:
+                self.stats['invalidations'] += 1
+            return removed
+
+    def clear(self):
+        with self.lock:
+            for pending in self.loading.values():
+                pending.stale = True
+            self.stats['invalidations'] += len(self.entries)
+            self.entries.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self.lock:
+            lookups = self.stats['hits'] + self.stats['misses'] + self.stats['coalesced']
+            return {
+                **self.stats,
+                'entries': len(self.entries),
+                'max_entries': self.max_entries,
+                'ttl': self.ttl,
+                'hit_rate': round((lookups - self.stats['misses']) / lookups * 100, 1) if lookups else 0.0,
+            }
+
+
+_user_context_cache: Optional[UserContextCache] = None
+
+
+def get_user_context_cache() -> UserContextCache:
+    """Cache partagé du processus webpanel"""
+    global _user_context_cache
+    if _user_context_cache is None:
+        _user_context_cache = UserContextCache()
+    return _user_context_cache
@@ -0,0 +1,308 @@
+"""
+👥 Arsenal V4 - Annuaire utilisateurs du panel admin
+Lecture de la table users pour /api/admin/users sans charger toute la table :
+
+- pagination par curseur (keyset) : (clé de tri, id) > (dernière valeur, dernier id)
+- tri et filtres côté serveur (préfixe de pseudo, bannis, VIP, riches, nouveaux)
+- statistiques agrégées en SQL (COUNT/SUM), cachées quelques secondes
+- export complet en JSON streamé (fetchmany), mémoire constante
+
+Les colonnes économie (arsenal_coins, arsenal_gems, arsenal_xp, is_vip) ne
+sont pas dans le schéma de base : elles sont ajoutées au premier accès
+(INTEGER NOT NULL DEFAULT 0). Chaque tri a un index sur exactement
+l'expression triée, suivie de id : une page = une recherche dans l'index.
+"""
+
+import base64
+import json
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, Iterator, List, Optional, Tuple
+
+# Colonnes ajoutées à users si absentes (routes admin d'édition / VIP, tris économie)
+ECONOMY_COLUMNS = ('arsenal_coins', 'arsenal_gems', 'arsenal_xp', 'is_vip')
+
+# Tri demandé -> (colonne SQL, valeur de remplacement des NULL)
+SORTS = {
+    'username': ('username', ''),
+    'id': ('id', 0),
+    'created_at': ('created_at', ''),
+    'last_activity': ('last_seen', ''),
+    'coins': ('arsenal_coins', 0),
+    'gems': ('arsenal_gems', 0),
+    'xp': ('arsenal_xp', 0),
+}
+
+FILTERS = ('all', 'banned', 'vip', 'rich', 'new', 'online')
+
+DEFAULT_LIMIT = 100
+MAX_LIMIT = 500
+EXPORT_BATCH = 500
+
+
+class InvalidQuery(ValueError):
+    pass
+
+
+def encode_cursor(sort_value: Any, user_id: int) -> str:
+    raw = json.dumps([sort_value, user_id], separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str) -> Tuple[Any, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        sort_value, user_id = json.loads(raw)
+        return sort_value, int(user_id)
+    except (ValueError, TypeError):
+        raise InvalidQuery("Curseur invalide")
+
+
+class StatsCache:
+    """Totaux par (recherche, filtre), gardés ttl secondes"""
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self.entries: Dict[Hashable, Tuple[float, Any]] = {}
+        self.lock = threading.Lock()
+
+    def get(self, key: Hashable, loader: Callable[[], Any]) -> Any:
+        now = time.monotonic()
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and entry[0] > now:
+                return entry[1]
+        value = loader()
+        with self.lock:
+            # Les clés expirées partent ici : le nombre de combinaisons (recherche, filtre) reste borné
+            self.entries = {k: v for k, v in self.entries.items() if v[0] > now}
+            self.entries[key] = (now + self.ttl, value)
+        return value
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+class UserDirectory:
+    def __init__(self, db_path: str, stats_ttl: float = 15.0):
+        self.db_path = db_path
+        self.stats_cache = StatsCache(ttl=stats_ttl)
+        self._columns: Optional[set] = None
+        self._not_null: set = set()
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path)
+
+    def columns(self) -> set:
+        """Colonnes présentes dans users (détectées une fois, colonnes et index créés au passage)"""
+        if self._columns is None:
+            with self._lock:
+                if self._columns is None:
+                    conn = self._connect()
+                    try:
+                        self._columns = self._migrate(conn)
+                    finally:
+                        conn.close()
+        return self._columns
+
+    def _migrate(self, conn: sqlite3.Connection) -> set:
+        table = {row[1]: bool(row[3]) for row in conn.execute("PRAGMA table_info(users)")}
+        for column in ECONOMY_COLUMNS:
+            if column not in table:
+                conn.execute(f"ALTER TABLE users ADD COLUMN {column} INTEGER NOT NULL DEFAULT 0")
+                table[column] = True
+        self._not_null = {column for column, not_null in table.items() if not_null}
+        # Préfixe insensible à la casse : LIKE utilise l'index NOCASE
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_users_username_nocase ON users(username COLLATE NOCASE, id)")
+        conn.execute("DROP INDEX IF EXISTS idx_users_last_seen")  # Remplacé par idx_users_sort_last_activity
+        # Un index par tri, sur l'expression exacte de ORDER BY (COALESCE compris)
+        for sort, (column, null_value) in SORTS.items():
+            if column in ('id', 'username') or column not in table:
+                continue
+            expression = self._sort_expression(column, null_value)
+            conn.execute(f"CREATE INDEX IF NOT EXISTS idx_users_sort_{sort} ON users({expression}, id)")
+        conn.commit()
+        return set(table)
+
+    def _column(self, name: str, default: Any = 0) -> str:
+        return name if name in self.columns() else repr(default)
+
+    def _select(self) -> str:
+        return f"""
+            SELECT id, username, avatar, created_at, last_seen,
+                   {self._column('arsenal_coins')}, {self._column('arsenal_gems')}, {self._column('arsenal_xp')},
+                   {self._column('is_vip')}, is_banned
+            FROM users
+        """
+
+    def _vip_condition(self) -> str:
+        if 'is_vip' in self.columns():
+            return "is_vip = 1"
+        if 'arsenal_gems' in self.columns():
+            return "arsenal_gems > 1000"  # Même règle que le filtre VIP historique du panel
+        return "0"
+
+    def _where(self, search: str = '', filter_name: str = 'all') -> Tuple[List[str], List[Any]]:
+        if filter_name not in FILTERS:
+            raise InvalidQuery(f"Filtre inconnu: {filter_name}")
+        conditions, params = [], []
+        search = (search or '').strip()
+        if search:
+            escaped = search.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+            if search.isdigit():
+                conditions.append("(username LIKE ? ESCAPE '\\' OR id = ?)")
+                params.extend([escaped + '%', int(search)])
+            else:
+                conditions.append("username LIKE ? ESCAPE '\\'")
+                params.append(escaped + '%')
+        if filter_name == 'banned':
+            conditions.append("is_banned = 1")
+        elif filter_name == 'vip':
+            conditions.append(self._vip_condition())
+        elif filter_name == 'rich':
+            conditions.append(f"{self._column('arsenal_coins')} > 100000")
+        elif filter_name == 'new':
+            conditions.append("created_at > datetime('now', '-7 days')")
+        elif filter_name == 'online':
+            conditions.append("0")  # Pas de présence en base
+        return conditions, params
+
+    def _sort(self, sort: str, order: str) -> str:
+        if sort not in SORTS:
+            raise InvalidQuery(f"Tri inconnu: {sort}")
+        if order not in ('asc', 'desc'):
+            raise InvalidQuery(f"Ordre inconnu: {order}")
+        column, null_value = SORTS[sort]
+        if column not in self.columns():
+            return 'id'
+        if column == 'username':
+            return "username COLLATE NOCASE"  # NOT NULL et indexé : l'index sert au tri
+        if column == 'id':
+            return 'id'
+        return self._sort_expression(column, null_value)
+
+    def _sort_expression(self, column: str, null_value: Any) -> str:
+        if column in self._not_null:
+            return column
+        # NULL remplacé pour que la comparaison (clé, id) > (?, ?) reste totale
+        return f"COALESCE({column}, {null_value!r})"
+
+    @staticmethod
+    def _row_to_user(row) -> Dict[str, Any]:
+        discord_id = str(row[0])
+        return {
+            'user_id': row[0],
+            'discord_id': discord_id,
+            'username': row[1] or f"User_{discord_id[-4:]}",
+            'avatar': row[2],
+            'created_at': row[3],
+            'last_activity': row[4],
+            'arsenal_coins': row[5] or 0,
+            'arsenal_gems': row[6] or 0,
+            'arsenal_xp': row[7] or 0,
+            'is_vip': bool(row[8]),
+            'is_banned': bool(row[9]),
+            'is_online': False
+        }
+
+    def page(self, search: str = '', filter_name: str = 'all', sort: str = 'username', order: str = 'asc',
+             cursor: str = None, limit: int = DEFAULT_LIMIT) -> Dict[str, Any]:
+        """Une page d'utilisateurs + curseur de la suivante (None en fin de liste)"""
+        limit = max(1, min(int(limit), MAX_LIMIT))
+        conditions, params = self._where(search, filter_name)
+        expression = self._sort(sort, order)
+        if cursor:
+            sort_value, last_id = decode_cursor(cursor)
+            # (clé, id) > (v, id) développé : la première inégalité permet à SQLite de chercher dans l'index
+            op = '>' if order == 'asc' else '<'
+            conditions.append(f"{expression} {op}= ? AND ({expression} {op} ? OR id {op} ?)")
+            params.extend([sort_value, sort_value, last_id])
+
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ''
+        conn = self._connect()
+        try:
+            # Une ligne de plus pour savoir s'il reste une page
+            rows = conn.execute(self._keyset_sql(expression, where, order), params + [limit + 1]).fetchall()
+        finally:
+            conn.close()
+
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1][0], rows[-1][1]) if has_more else None
+        return {
+            'users': [self._row_to_user(row[1:]) for row in rows],
+            'next_cursor': next_cursor,
+            'has_more': has_more,
+            'sort': sort,
+            'order': order,
+            'limit': limit
+        }
+
+    def _keyset_sql(self, expression: str, where: str, order: str) -> str:
+        """Requête triée par (clé, id) ; la clé est renvoyée en première colonne pour le curseur"""
+        select = self._select().replace("SELECT id,", f"SELECT {expression} AS sort_key, id,", 1)
+        return f"{select} {where} ORDER BY {expression} {order.upper()}, id {order.upper()} LIMIT ?"
+
+    def stats(self, search: str = '', filter_name: str = 'all') -> Dict[str, Any]:
+        """Totaux calculés en SQL, cachés stats_ttl secondes par (recherche, filtre)"""
+        return self.stats_cache.get((search or '', filter_name), lambda: self._compute_stats(search, filter_name))
+
+    def _compute_stats(self, search: str, filter_name: str) -> Dict[str, Any]:
+        conditions, params = self._where(search, filter_name)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ''
+        coins = self._column('arsenal_coins')
+        conn = self._connect()
+        try:
+            total, total_coins, total_gems, total_xp, banned, vip = conn.execute(f"""
+                SELECT COUNT(*), SUM({coins}), SUM({self._column('arsenal_gems')}), SUM({self._column('arsenal_xp')}),
+                       SUM(is_banned), SUM({self._vip_condition()})
+                FROM users {where}
+            """, params).fetchone()
+            richest_order = f"{coins} DESC, id" if 'arsenal_coins' in self.columns() else "username COLLATE NOCASE, id"
+            richest = conn.execute(f"SELECT username FROM users {where} ORDER BY {richest_order} LIMIT 1", params).fetchone()
+        finally:
+            conn.close()
+        return {
+            'total_users': total,
+            'total_coins': total_coins or 0,
+            'total_gems': total_gems or 0,
+            'total_xp': total_xp or 0,
+            'banned_users': banned or 0,
+            'vip_users': vip or 0,
+            'online_users': 0,
+            'richest_user': richest[0] if richest else None
+        }
+
+    def iter_export(self, search: str = '', filter_name: str = 'all', sort: str = 'username',
+                    order: str = 'asc') -> Iterator[str]:
+        """Export complet en morceaux JSON, lu par lots de EXPORT_BATCH lignes"""
+        conditions, params = self._where(search, filter_name)
+        expression = self._sort(sort, order)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ''
+        stats = self.stats(search, filter_name)
+
+        def generate():
+            conn = self._connect()
+            try:
+                cursor = conn.execute(self._keyset_sql(expression, where, order), params + [-1])
+                yield '{"success": true, "users": ['
+                first = True
+                while True:
+                    rows = cursor.fetchmany(EXPORT_BATCH)
+                    if not rows:
+                        break
+                    chunk = ','.join(json.dumps(self._row_to_user(row[1:]), ensure_ascii=False) for row in rows)
+                    yield chunk if first else ',' + chunk
+                    first = False
+                yield '], "stats": ' + json.dumps(stats, ensure_ascii=False) + '}'
+            finally:
+                conn.close()
+
+        return generate()
+
+    def invalidate(self):
+        """Après une modification admin (ban, VIP, édition)"""
+        self.stats_cache.clear()
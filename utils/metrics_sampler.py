@@ -0,0 +1,154 @@
+"""
+📈 Arsenal V4 - Échantillonneur de métriques système en arrière-plan
+Un thread relève CPU, mémoire, disque, réseau et processus à intervalle fixe
+dans un buffer circulaire. Les endpoints et commandes lisent le dernier
+échantillon (ou une fenêtre) instantanément, sans psutil.cpu_percent(interval=1).
+
+Réglages : ARSENAL_METRICS_INTERVAL (secondes, défaut 2)
+           ARSENAL_METRICS_HISTORY (nombre d'échantillons, défaut 1800 = 1h)
+"""
+
+import os
+import threading
+import time
+from collections import deque
+from typing import Dict, List, Optional
+
+try:
+    import psutil
+    PSUTIL_AVAILABLE = True
+except ImportError:
+    psutil = None
+    PSUTIL_AVAILABLE = False
+
+# Champs numériques moyennés lors du sous-échantillonnage
+AVERAGED_FIELDS = ('cpu_usage', 'memory_usage', 'disk_usage', 'net_sent_rate', 'net_recv_rate',
+                   'processes', 'process_cpu', 'process_memory_mb')
+
+
+class MetricsSampler:
+    def __init__(self, interval: float = 2.0, history: int = 1800, disk_path: str = '.'):
+        self.interval = interval
+        self.disk_path = disk_path
+        self.samples = deque(maxlen=history)
+        self.lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.thread = None
+        self.process = psutil.Process() if PSUTIL_AVAILABLE else None
+        self.boot_time = psutil.boot_time() if PSUTIL_AVAILABLE else None
+        self.sample_errors = 0
+
+    def start(self):
+        """Démarrer le thread d'échantillonnage (idempotent)"""
+        if not PSUTIL_AVAILABLE or (self.thread and self.thread.is_alive()):
+            return
+        # Amorcer les compteurs CPU : les appels suivants (interval=None) mesurent depuis le précédent
+        psutil.cpu_percent(interval=None)
+        self.process.cpu_percent(interval=None)
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self._loop, name="arsenal-metrics", daemon=True)
+        self.thread.start()
+        print(f"📈 Échantillonneur de métriques démarré ({self.interval}s, {self.samples.maxlen} échantillons)")
+
+    def stop(self):
+        self.stop_event.set()
+
+    def _loop(self):
+        while not self.stop_event.is_set():
+            try:
+                self.sample()
+            except Exception as e:
+                self.sample_errors += 1
+                print(f"❌ Erreur échantillonnage métriques: {e}")
+            self.stop_event.wait(self.interval)
+
+    def sample(self) -> Dict:
+        """Relever un échantillon (non bloquant) et l'ajouter au buffer"""
+        now = time.time()
+        memory = psutil.virtual_memory()
+        network = psutil.net_io_counters()
+        with self.process.oneshot():
+            process_cpu = self.process.cpu_percent(interval=None)
+            process_memory = self.process.memory_info().rss
+
+        sample = {
+            'timestamp': now,
+            'cpu_usage': psutil.cpu_percent(interval=None),
+            'memory_usage': memory.percent,
+            'disk_usage': psutil.disk_usage(self.disk_path).percent,
+            'network_io': {'sent': network.bytes_sent, 'recv': network.bytes_recv},
+            'net_sent_rate': 0.0,
+            'net_recv_rate': 0.0,
+            'processes': len(psutil.pids()),
+            'process_cpu': process_cpu,
+            'process_memory_mb': round(process_memory / 1024 / 1024, 1),
+            'boot_time': self.boot_time,
+        }
+
+        with self.lock:
+            if self.samples:
+                previous = self.samples[-1]
+                elapsed = now - previous['timestamp']
+                if elapsed > 0:
+                    sample['net_sent_rate'] = max(0.0, (network.bytes_sent - previous['network_io']['sent']) / elapsed)
+                    sample['net_recv_rate'] = max(0.0, (network.bytes_recv - previous['network_io']['recv']) / elapsed)
+            self.samples.append(sample)
+        return sample
+
+    def latest(self) -> Optional[Dict]:
+        """Dernier échantillon (relevé immédiatement si le buffer est encore vide)"""
+        with self.lock:
+            if self.samples:
+                return dict(self.samples[-1])
+        if not PSUTIL_AVAILABLE:
+            return None
+        return dict(self.sample())
+
+    def window(self, seconds: float, points: int = 120) -> List[Dict]:
+        """Historique des `seconds` dernières secondes, réduit à `points` moyennes au plus"""
+        cutoff = time.time() - seconds
+        with self.lock:
+            selected = [sample for sample in self.samples if sample['timestamp'] >= cutoff]
+        if points <= 0 or len(selected) <= points:
+            return [{'timestamp': sample['timestamp'], **{field: sample[field] for field in AVERAGED_FIELDS}}
+                    for sample in selected]
+
+        # Moyenne par seau de taille égale
+        history = []
+        bucket_size = len(selected) / points
+        for index in range(points):
+            bucket = selected[int(index * bucket_size):int((index + 1) * bucket_size)]
+            if not bucket:
+                continue
+            point = {'timestamp': bucket[-1]['timestamp']}
+            for field in AVERAGED_FIELDS:
+                point[field] = round(sum(sample[field] for sample in bucket) / len(bucket), 2)
+            history.append(point)
+        return history
+
+    def get_status(self) -> Dict:
+        return {
+            'available': PSUTIL_AVAILABLE,
+            'running': bool(self.thread and self.thread.is_alive()),
+            'interval': self.interval,
+            'samples': len(self.samples),
+            'capacity': self.samples.maxlen,
+            'errors': self.sample_errors,
+        }
+
+
+_sampler = None
+_sampler_lock = threading.Lock()
+
+
+def get_metrics_sampler() -> MetricsSampler:
+    """Instance unique du processus, démarrée au premier appel"""
+    global _sampler
+    with _sampler_lock:
+        if _sampler is None:
+            _sampler = MetricsSampler(
+                interval=float(os.environ.get('ARSENAL_METRICS_INTERVAL', 2.0)),
+                history=int(os.environ.get('ARSENAL_METRICS_HISTORY', 1800)),
+            )
+            _sampler.start()
+    return _sampler
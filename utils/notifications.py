@@ -1,24 +1,57 @@
 """
 🔔 Arsenal V4 - Système de Notifications Push
 Notifications en temps réel pour le webpanel
+
+L'historique vit dans le stockage d'état partagé (state_store.py) : tous les
+workers du webpanel voient les mêmes notifications, et chacun diffuse à ses
+propres abonnés celles qu'il n'a pas encore envoyées.
+
+Le compteur de séquence et l'historique partagent une seule clé ('feed') :
+une notification reçoit son numéro et entre dans l'historique dans la même
+mise à jour atomique, l'historique reste donc trié par séquence.
 """
 
+import os
+import sys
 import json
 import time
 import threading
 from datetime import datetime
 from typing import Dict, List, Any
 
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from state_store import get_state_store
+
+NOTIFICATIONS_NAMESPACE = 'notifications'
+HISTORY_LIMIT = 100
+
 class ArsenalNotificationSystem:
-    def __init__(self):
-        self.subscribers = {}  # WebSocket connections
-        self.notification_queue = []
-        self.notification_history = []
+    def __init__(self, store=None):
+        self.subscribers = {}  # WebSocket connections (propres à ce worker)
+        self.store = store or get_state_store()
+        self.last_broadcast_seq = 0
         self.running = False
         
+    def _feed(self) -> Dict[str, Any]:
+        return self.store.get(NOTIFICATIONS_NAMESPACE, 'feed') or {'seq': 0, 'history': []}
+
+    def _update_history(self, fn):
+        """Modifier l'historique partagé sans toucher au compteur de séquence"""
+        def apply(feed):
+            feed = feed or {'seq': 0, 'history': []}
+            feed['history'] = fn(feed['history'])
+            return feed
+        self.store.update(NOTIFICATIONS_NAMESPACE, 'feed', apply)
+
+    @property
+    def notification_history(self) -> List[Dict[str, Any]]:
+        return self._feed()['history']
+        
     def start(self):
         """Démarrer le système de notifications"""
         self.running = True
+        # Ne pas rediffuser l'historique existant au démarrage du worker
+        self.last_broadcast_seq = self._feed()['seq']
         self.notification_thread = threading.Thread(target=self._notification_loop, daemon=True)
         self.notification_thread.start()
         print("🔔 Système de notifications démarré")
@@ -32,10 +65,11 @@ class ArsenalNotificationSystem:
         """Boucle principale des notifications"""
         while self.running:
             try:
-                # Vérifier s'il y a des notifications à envoyer
-                if self.notification_queue:
-                    notification = self.notification_queue.pop(0)
-                    self._broadcast_notification(notification)
+                # Diffuser les notifications ajoutées depuis le dernier passage (tous workers)
+                for notification in self.notification_history:
+                    if notification.get('seq', 0) > self.last_broadcast_seq:
+                        self._broadcast_notification(notification)
+                        self.last_broadcast_seq = notification['seq']
                     
                 # Générer des notifications automatiques périodiques
                 self._generate_auto_notifications()
@@ -47,12 +81,9 @@ class ArsenalNotificationSystem:
                 time.sleep(10)
                 
     def _generate_auto_notifications(self):
-        """Générer des notifications automatiques"""
-        current_time = time.time()
-        
+        """Générer des notifications automatiques (un seul worker par intervalle)"""
         # Notification de monitoring système (toutes les 5 minutes)
-        if not hasattr(self, '_last_system_check') or current_time - self._last_system_check > 300:
-            self._last_system_check = current_time
+        if self.store.claim(NOTIFICATIONS_NAMESPACE, 'last_system_check', 300):
             self.add_notification({
                 'type': 'system',
                 'title': '🔍 Monitoring Système',
@@ -62,8 +93,7 @@ class ArsenalNotificationSystem:
             })
             
         # Notification de santé du bot (toutes les 2 minutes)
-        if not hasattr(self, '_last_bot_check') or current_time - self._last_bot_check > 120:
-            self._last_bot_check = current_time
+        if self.store.claim(NOTIFICATIONS_NAMESPACE, 'last_bot_check', 120):
             self.add_notification({
                 'type': 'bot_status',
                 'title': '🤖 Bot Status',
@@ -75,7 +105,6 @@ class ArsenalNotificationSystem:
     def add_notification(self, notification_data):
         """Ajouter une nouvelle notification"""
         notification = {
-            'id': f"notif_{int(time.time())}_{len(self.notification_queue)}",
             'timestamp': time.time(),
             'read': False,
             'type': notification_data.get('type', 'info'),
@@ -88,12 +117,17 @@ class ArsenalNotificationSystem:
             'data': notification_data.get('data', {})
         }
         
-        self.notification_queue.append(notification)
-        self.notification_history.append(notification)
-        
-        # Garder seulement les 100 dernières notifications
-        if len(self.notification_history) > 100:
-            self.notification_history = self.notification_history[-100:]
+        def append(feed):
+            feed = feed or {'seq': 0, 'history': []}
+            # Numéro de séquence partagé : identifiant unique entre workers et curseur de diffusion
+            feed['seq'] += 1
+            notification['seq'] = feed['seq']
+            notification['id'] = f"notif_{int(notification['timestamp'])}_{feed['seq']}"
+            # Garder seulement les 100 dernières notifications
+            feed['history'] = (feed['history'] + [notification])[-HISTORY_LIMIT:]
+            return feed
+
+        self.store.update(NOTIFICATIONS_NAMESPACE, 'feed', append)
             
         print(f"🔔 Nouvelle notification: {notification['title']}")
         
@@ -161,11 +195,18 @@ class ArsenalNotificationSystem:
             
     def mark_as_read(self, notification_id):
         """Marquer une notification comme lue"""
-        for notif in self.notification_history:
-            if notif['id'] == notification_id:
-                notif['read'] = True
-                return True
-        return False
+        found = False
+        
+        def mark(history):
+            nonlocal found
+            for notif in history or []:
+                if notif['id'] == notification_id:
+                    notif['read'] = True
+                    found = True
+            return history
+        
+        self._update_history(mark)
+        return found
         
     def get_unread_count(self, user_id=None):
         """Obtenir le nombre de notifications non lues"""
@@ -174,10 +215,10 @@ class ArsenalNotificationSystem:
     def clear_old_notifications(self, days=7):
         """Nettoyer les anciennes notifications"""
         cutoff = time.time() - (days * 24 * 3600)
-        self.notification_history = [
-            n for n in self.notification_history 
+        self._update_history(lambda history: [
+            n for n in history
             if n['timestamp'] > cutoff
-        ]
+        ])
         
     def add_user_action_notification(self, user, action, details=None):
         """Ajouter une notification d'action utilisateur"""